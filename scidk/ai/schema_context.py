@@ -4,10 +4,13 @@ Neo4j Schema Grounding for Chat.
 Prevents LLM hallucination by injecting actual database schema into prompts.
 This is THE differentiator: generic Neo4j chatbots hallucinate labels/relationships.
 
-Performance: Schema caching with 5-min TTL is critical to reduce prefill time.
+Performance: Schema caching with 5-min TTL is critical to reduce prefill time; expired
+entries are served while a background refresh runs.
 """
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
+import os
+import threading
 import time
 
 
@@ -16,6 +19,7 @@ class SchemaCache:
     Simple in-memory cache for Neo4j schema with TTL.
 
     Critical for performance: Avoids repeated Neo4j queries and reduces LLM prefill time.
+    Expired entries are kept so they can be served while a background refresh runs.
     """
 
     def __init__(self, ttl_seconds: int = 300):
@@ -28,50 +32,193 @@ class SchemaCache:
         self.ttl_seconds = ttl_seconds
         self._cache: Dict[str, Any] = {}
         self._timestamps: Dict[str, float] = {}
+        self._refreshing: set = set()
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
 
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """Get cached schema if not expired."""
-        if key not in self._cache:
+        entry = self.get_stale(key)
+        if entry is None or entry[1]:
             return None
+        return entry[0]
 
-        # Check expiration
-        if time.time() - self._timestamps[key] > self.ttl_seconds:
-            # Expired - remove from cache
-            del self._cache[key]
-            del self._timestamps[key]
-            return None
-
-        return self._cache[key]
+    def get_stale(self, key: str) -> Optional[Tuple[Dict[str, Any], bool]]:
+        """(schema, expired) for key, including expired entries; None if never cached."""
+        with self._lock:
+            if key not in self._cache:
+                return None
+            return self._cache[key], time.time() - self._timestamps[key] > self.ttl_seconds
 
     def set(self, key: str, value: Dict[str, Any]):
         """Store schema in cache with current timestamp."""
-        self._cache[key] = value
-        self._timestamps[key] = time.time()
+        with self._lock:
+            self._cache[key] = value
+            self._timestamps[key] = time.time()
+            self._errors.pop(key, None)
+
+    def refresh_async(self, key: str, load: Callable[[], Dict[str, Any]]) -> bool:
+        """Run load() on a background thread and store its result; one refresh per key at a time."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def _run():
+            try:
+                self.set(key, load())
+            except Exception as e:
+                # Keep serving the stale schema; the error is visible in get_cache_stats()
+                with self._lock:
+                    self._errors[key] = str(e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_run, name=f'schema-context-{key}', daemon=True).start()
+        return True
+
+    def invalidate(self, key: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        """Drop one key, every key starting with prefix, or everything when neither is given."""
+        with self._lock:
+            keys = [k for k in self._cache
+                    if (key is None or k == key) and (prefix is None or k.startswith(prefix))]
+            for k in keys:
+                self._cache.pop(k, None)
+                self._timestamps.pop(k, None)
+            return len(keys)
 
     def clear(self):
         """Clear all cached schemas."""
-        self._cache.clear()
-        self._timestamps.clear()
+        self.invalidate()
 
 
 # Global schema cache (shared across requests)
 _schema_cache = SchemaCache(ttl_seconds=300)  # 5 minutes
 
+# Property discovery: 'sample' reads at most SCIDK_SCHEMA_PROPS_SAMPLE nodes per label (default 1000);
+# 'procedure' uses db.schema.nodeTypeProperties()
+_MAX_COUNTED_LABELS = 1000
+
+
+def _quote(name: str) -> str:
+    return '`' + str(name).replace('`', '``') + '`'
+
+
+def _sample_size() -> int:
+    try:
+        return max(1, int(os.environ.get('SCIDK_SCHEMA_PROPS_SAMPLE') or 1000))
+    except Exception:
+        return 1000
+
+
+def _union(parts: List[str]) -> str:
+    return "CALL {\n" + "\nUNION ALL\n".join(parts) + "\n}\n"
+
+
+def _label_counts(session, labels: List[str]) -> Dict[str, int]:
+    """Count-store node counts for all labels in one round trip."""
+    if not labels:
+        return {}
+    parts = [f"MATCH (n:{_quote(l)}) RETURN {i} AS i, count(n) AS c" for i, l in enumerate(labels)]
+    counts = {l: 0 for l in labels}
+    for record in session.run(_union(parts) + "RETURN i, c"):
+        counts[labels[record["i"]]] = int(record["c"] or 0)
+    return counts
+
+
+def _sampled_properties(session, labels: List[str], max_props: int, sample: int) -> Dict[str, List[str]]:
+    """Most frequent property keys per label over a bounded sample of each label, in one round trip."""
+    if not labels:
+        return {}
+    parts = [
+        f"MATCH (n:{_quote(l)}) WITH n LIMIT $sample UNWIND keys(n) AS key RETURN {i} AS i, key, count(*) AS freq"
+        for i, l in enumerate(labels)
+    ]
+    freq: Dict[str, List[Tuple[int, str]]] = {l: [] for l in labels}
+    for record in session.run(_union(parts) + "RETURN i, key, freq", sample=sample):
+        freq[labels[record["i"]]].append((int(record["freq"]), record["key"]))
+    return {l: [k for _, k in sorted(v, key=lambda t: (-t[0], t[1]))[:max_props]] for l, v in freq.items()}
+
+
+def _procedure_properties(session, labels: List[str], max_props: int) -> Dict[str, List[str]]:
+    """Property keys per label from db.schema.nodeTypeProperties(), mandatory ones first."""
+    wanted = set(labels)
+    found: Dict[str, List[Tuple[bool, str]]] = {l: [] for l in labels}
+    result = session.run(
+        "CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName, mandatory "
+        "RETURN nodeLabels, propertyName, mandatory"
+    )
+    for record in result:
+        name = record["propertyName"]
+        if not name:
+            continue
+        for label in record["nodeLabels"] or []:
+            if label in wanted and all(name != n for _, n in found[label]):
+                found[label].append((bool(record["mandatory"]), name))
+    return {l: [n for _, n in sorted(v, key=lambda t: (not t[0], t[1]))[:max_props]] for l, v in found.items()}
+
+
+def _cache_key(uri: Optional[str], database: Optional[str]) -> str:
+    return f"schema:{uri or ''}:{database or 'neo4j'}"
+
+
+def load_schema(neo4j_driver, database: str = "neo4j", max_labels: int = 50, max_props_per_label: int = 5) -> Dict[str, Any]:
+    """Read labels, relationship types, label counts and properties from Neo4j (four round trips)."""
+    strategy = (os.environ.get('SCIDK_SCHEMA_PROPS_STRATEGY') or 'sample').strip().lower()
+    with neo4j_driver.session(database=database) as session:
+        record = session.run(
+            "CALL db.labels() YIELD label WITH collect(label) AS labels "
+            "CALL db.relationshipTypes() YIELD relationshipType "
+            "RETURN labels, collect(relationshipType) AS relationships"
+        ).single()
+        all_labels = list(record["labels"] or []) if record else []
+        relationships = list(record["relationships"] or []) if record else []
+        if record is None:
+            # No relationship types: the aggregation above returns no row
+            all_labels = [r["label"] for r in session.run("CALL db.labels() YIELD label RETURN label")]
+
+        # Rank labels by usage (most-used first) from the count store, take top N
+        try:
+            label_counts = _label_counts(session, all_labels[:_MAX_COUNTED_LABELS])
+        except Exception:
+            label_counts = {l: 0 for l in all_labels[:_MAX_COUNTED_LABELS]}
+        sorted_labels = sorted(label_counts.keys(), key=lambda l: label_counts[l], reverse=True)
+        labels = sorted_labels[:max_labels]
+
+        try:
+            if strategy == 'procedure':
+                properties = _procedure_properties(session, labels, max_props_per_label)
+            else:
+                properties = _sampled_properties(session, labels, max_props_per_label, _sample_size())
+        except Exception:
+            properties = {l: [] for l in labels}
+
+    return {
+        "labels": labels,
+        "relationships": relationships,
+        "properties": properties,
+        "label_counts": {l: label_counts[l] for l in labels},
+    }
+
 
-def get_schema_context(neo4j_driver, database: str = "neo4j", max_labels: int = 50, max_props_per_label: int = 5) -> Dict[str, Any]:
+def get_schema_context(neo4j_driver, database: str = "neo4j", max_labels: int = 50, max_props_per_label: int = 5,
+                       uri: Optional[str] = None) -> Dict[str, Any]:
     """
     Query Neo4j for schema information and return structured context.
 
     Optimized for lean context to reduce LLM prefill time:
     - Limit to top 50 labels (truncate large schemas)
-    - Limit to 5 most common properties per label
-    - Cache results for 5 minutes
+    - Limit to 5 most common properties per label, discovered from a bounded sample per label
+    - Cache results for 5 minutes per (uri, database); once expired, the cached schema is still
+      returned while a background refresh runs, so only the very first call waits on Neo4j
 
     Args:
         neo4j_driver: Neo4j driver instance
         database: Database name (default "neo4j")
         max_labels: Maximum number of labels to include (default 50)
         max_props_per_label: Max properties per label (default 5)
+        uri: Neo4j URI, part of the cache key (see invalidate_schema_cache)
 
     Returns:
         Dict with keys:
@@ -81,71 +228,27 @@ def get_schema_context(neo4j_driver, database: str = "neo4j", max_labels: int =
             - label_counts: Dict[label, int] (optional, for ranking)
             - cached: bool (whether result came from cache)
             - cached_at: float (timestamp if cached)
+            - stale: bool (cached result past its TTL, refresh in progress)
     """
-    cache_key = f"schema:{database}"
+    cache_key = _cache_key(uri, database)
+
+    def _load():
+        schema = load_schema(neo4j_driver, database=database, max_labels=max_labels, max_props_per_label=max_props_per_label)
+        schema['cached_at'] = time.time()
+        return schema
 
     # Check cache first
-    cached = _schema_cache.get(cache_key)
+    cached = _schema_cache.get_stale(cache_key)
     if cached:
-        cached['cached'] = True
-        return cached
-
-    # Query Neo4j for schema
-    with neo4j_driver.session(database=database) as session:
-        # Get labels
-        labels_result = session.run("CALL db.labels() YIELD label RETURN label")
-        all_labels = [record["label"] for record in labels_result]
-
-        # Get label counts to rank by usage (most-used labels first)
-        label_counts = {}
-        for label in all_labels[:max_labels]:  # Limit to avoid long query
-            try:
-                count_result = session.run(f"MATCH (n:`{label}`) RETURN count(n) as count")
-                label_counts[label] = count_result.single()["count"]
-            except Exception:
-                # Skip labels that cause errors (invalid syntax, etc.)
-                label_counts[label] = 0
-
-        # Sort labels by usage, take top N
-        sorted_labels = sorted(label_counts.keys(), key=lambda l: label_counts[l], reverse=True)
-        labels = sorted_labels[:max_labels]
-
-        # Get relationship types
-        rels_result = session.run("CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType")
-        relationships = [record["relationshipType"] for record in rels_result]
+        schema, expired = cached
+        if expired:
+            _schema_cache.refresh_async(cache_key, _load)
+        return dict(schema, cached=True, stale=expired)
 
-        # Get property keys per label (limit to top N most common)
-        properties = {}
-        for label in labels:
-            try:
-                props_result = session.run(
-                    f"""
-                    MATCH (n:`{label}`)
-                    UNWIND keys(n) AS key
-                    RETURN key, count(*) as freq
-                    ORDER BY freq DESC
-                    LIMIT {max_props_per_label}
-                    """
-                )
-                properties[label] = [record["key"] for record in props_result]
-            except Exception:
-                # Skip labels with query issues
-                properties[label] = []
-
-    schema = {
-        "labels": labels,
-        "relationships": relationships,
-        "properties": properties,
-        "label_counts": label_counts,
-        "cached": False,
-        "cached_at": None
-    }
-
-    # Cache result
+    # Cold cache: query Neo4j for schema
+    schema = _load()
     _schema_cache.set(cache_key, schema)
-    schema['cached_at'] = time.time()
-
-    return schema
+    return dict(schema, cached=False, stale=False)
 
 
 def build_system_prompt(schema: Dict[str, Any], base_prompt: Optional[str] = None) -> str:
@@ -212,6 +315,20 @@ def refresh_schema_cache():
     _schema_cache.clear()
 
 
+def invalidate_schema_cache(uri: Optional[str] = None, database: Optional[str] = None) -> int:
+    """
+    Drop cached schemas for one database, every database on uri, or everything.
+
+    Returns:
+        Number of cache entries dropped
+    """
+    if database is not None:
+        return _schema_cache.invalidate(key=_cache_key(uri, database))
+    if uri is not None:
+        return _schema_cache.invalidate(prefix=f"schema:{uri}:")
+    return _schema_cache.invalidate()
+
+
 def get_cache_stats() -> Dict[str, Any]:
     """
     Get cache statistics for observability.
@@ -223,5 +340,7 @@ def get_cache_stats() -> Dict[str, Any]:
         "size": len(_schema_cache._cache),
         "keys": list(_schema_cache._cache.keys()),
         "timestamps": {k: datetime.fromtimestamp(v).isoformat() for k, v in _schema_cache._timestamps.items()},
-        "ttl_seconds": _schema_cache.ttl_seconds
+        "ttl_seconds": _schema_cache.ttl_seconds,
+        "refreshing": sorted(_schema_cache._refreshing),
+        "errors": dict(_schema_cache._errors),
     }
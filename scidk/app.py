@@ -193,6 +193,10 @@ def create_app():
     from .web.routes import register_blueprints
     register_blueprints(app)
 
+    # Attribute SQLite statements to the endpoint serving them (registered before auth so its queries count too)
+    from .core.sqlite_pool import install_request_hooks
+    install_request_hooks(app)
+
     # Initialize authentication middleware
     from .web.auth_middleware import init_auth_middleware
     init_auth_middleware(app)
@@ -22,16 +22,25 @@ def _db_path() -> Path:
 
 
 def connect() -> sqlite3.Connection:
-    p = _db_path()
-    conn = sqlite3.connect(str(p))
-    try:
-        conn.execute('PRAGMA journal_mode=WAL;')
-    except Exception:
-        pass
-    return conn
+    from . import sqlite_pool
+    return sqlite_pool.connect(str(_db_path()))
 
 
 def init_db(conn: Optional[sqlite3.Connection] = None):
+    """Create the selections/annotations schema; runs once per database file and process."""
+    from . import sqlite_pool
+    own = False
+    if conn is None:
+        conn = connect()
+        own = True
+    try:
+        sqlite_pool.run_once(conn, 'annotations', _init_schema)
+    finally:
+        if own:
+            conn.close()
+
+
+def _init_schema(conn: Optional[sqlite3.Connection] = None):
     own = False
     if conn is None:
         conn = connect()
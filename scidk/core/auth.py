@@ -9,15 +9,209 @@ Security features:
 - Session tokens using secrets.token_urlsafe()
 - Failed login attempt logging
 - Configurable session expiration
+
+Performance: get_auth_manager() returns one AuthManager per database file for the whole process,
+and all managers on a file share an in-memory auth state cache (enabled flag, session rows
+including lock state). Entries live for SCIDK_AUTH_CACHE_TTL_SEC (default 30s; 0 disables) and are
+invalidated explicitly on logout, lock/unlock and user/config changes. last_activity updates are
+buffered and written in batches every SCIDK_AUTH_ACTIVITY_FLUSH_SEC (default 60s; 0 = write
+through), so an authenticated request normally does no SQLite I/O at all.
 """
 
+import atexit
+import functools
+import os
 import sqlite3
 import secrets
+import threading
 import bcrypt
 import time
+from collections import OrderedDict
 from typing import Optional, Dict, Any
 from pathlib import Path
 
+from . import sqlite_pool
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) if os.environ.get(name) not in (None, '') else default)
+    except Exception:
+        return default
+
+
+class _AuthStateCache:
+    """Process-wide cache of auth state for one settings database, shared by all AuthManagers on it."""
+
+    MAX_SESSIONS = 10000
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.ttl = _env_float('SCIDK_AUTH_CACHE_TTL_SEC', 30.0)
+        self.flush_interval = _env_float('SCIDK_AUTH_ACTIVITY_FLUSH_SEC', 60.0)
+        self._lock = threading.Lock()
+        self._enabled: Optional[tuple] = None  # (value, fetched_at)
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (row or None, fetched_at)
+        self._activity: Dict[str, float] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._generation = 0  # bumped on every invalidation; stale loads are not cached
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+
+    def _fresh(self, fetched_at: float) -> bool:
+        return self.ttl > 0 and (time.time() - fetched_at) < self.ttl
+
+    def get_enabled(self) -> Optional[bool]:
+        with self._lock:
+            if self._enabled is not None and self._fresh(self._enabled[1]):
+                self.hits += 1
+                return self._enabled[0]
+            self.misses += 1
+            return None
+
+    def put_enabled(self, value: bool, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._enabled = (bool(value), time.time())
+
+    def get_session(self, token: str):
+        """Returns (found, row); row is None for tokens known not to exist."""
+        with self._lock:
+            hit = self._sessions.get(token)
+            if hit is not None and self._fresh(hit[1]):
+                self._sessions.move_to_end(token)
+                self.hits += 1
+                return True, hit[0]
+            self.misses += 1
+            return False, None
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def put_session(self, token: str, row: Optional[Dict[str, Any]], generation: int) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._sessions[token] = (row, time.time())
+            self._sessions.move_to_end(token)
+            while len(self._sessions) > self.MAX_SESSIONS:
+                self._sessions.popitem(last=False)
+
+    def evict_session(self, token: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._sessions.pop(token, None)
+
+    def clear(self) -> None:
+        """Drop cached sessions and the enabled flag (user/config changes)."""
+        with self._lock:
+            self._generation += 1
+            self._sessions.clear()
+            self._enabled = None
+
+    def touch(self, token: str, ts: float) -> bool:
+        """Buffer a last_activity update. Returns False when buffering is off (caller writes through)."""
+        if self.flush_interval <= 0:
+            return False
+        with self._lock:
+            self._activity[token] = ts
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True, name='scidk-auth-activity')
+                self._flusher.start()
+        return True
+
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+            with self._lock:
+                if not self._activity:
+                    self._flusher = None
+                    return
+
+    def flush(self) -> int:
+        """Write buffered last_activity timestamps in one transaction."""
+        with self._lock:
+            pending, self._activity = self._activity, {}
+        if not pending or not os.path.exists(self.db_path):
+            # Nothing buffered, or the database was removed (sessions are gone with it)
+            return 0
+        try:
+            conn = sqlite_pool.connect(self.db_path, timeout=10)
+            try:
+                conn.executemany(
+                    "UPDATE auth_sessions SET last_activity = ? WHERE token = ?",
+                    [(ts, token) for token, ts in pending.items()],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            with self._lock:
+                self.flushes += 1
+        except Exception as e:
+            print(f"AuthManager activity flush error: {e}")
+        return len(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                'sessions_cached': len(self._sessions),
+                'pending_activity': len(self._activity),
+                'flushes': self.flushes,
+                'ttl_sec': self.ttl,
+                'flush_interval_sec': self.flush_interval,
+            }
+
+
+_CACHES: Dict[str, _AuthStateCache] = {}
+_MANAGERS: Dict[str, 'AuthManager'] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _db_key(db_path: str) -> str:
+    return db_path if db_path == ':memory:' else os.path.abspath(db_path)
+
+
+def _state_cache(db_path: str) -> _AuthStateCache:
+    if db_path == ':memory:':
+        # Private database per connection: nothing to share, and flushes could not reach it
+        cache = _AuthStateCache(db_path)
+        cache.flush_interval = 0
+        return cache
+    key = _db_key(db_path)
+    with _REGISTRY_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = _CACHES[key] = _AuthStateCache(db_path)
+        return cache
+
+
+def flush_auth_activity() -> None:
+    """Write all buffered last_activity updates (called at exit; safe to call any time)."""
+    for cache in list(_CACHES.values()):
+        cache.flush()
+
+
+atexit.register(flush_auth_activity)
+
+
+def _synchronized(fn):
+    """Serialize use of the manager's shared SQLite connection across request threads."""
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        with self._db_lock:
+            return fn(self, *args, **kwargs)
+    return wrapper
+
 
 class AuthManager:
     """Manage authentication config, password verification, and sessions."""
@@ -29,6 +223,12 @@ class AuthManager:
             db_path: Path to settings database (default: scidk_settings.db)
         """
         self.db_path = db_path
+        self._db_lock = threading.RLock()
+        self._closed = False
+        self._cache = _state_cache(db_path)
+        if db_path != ':memory:' and not os.path.exists(db_path):
+            # New (or deleted and recreated) database: nothing cached for the old file applies
+            self._cache.clear()
         self.db = sqlite3.connect(db_path, check_same_thread=False)
         self.db.execute('PRAGMA journal_mode=WAL;')
         self.init_tables()
@@ -184,20 +384,86 @@ class AuthManager:
         Returns:
             bool: True if auth is enabled, False otherwise
         """
+        cached = self._cache.get_enabled()
+        if cached is not None:
+            return cached
+        generation = self._cache.generation()
         try:
-            # Check if there are any enabled users in auth_users (multi-user mode)
-            cur = self.db.execute("SELECT COUNT(*) FROM auth_users WHERE enabled = 1")
-            user_count = cur.fetchone()[0]
-            if user_count > 0:
-                return True
-
-            # Fall back to auth_config for backward compatibility
-            cur = self.db.execute("SELECT enabled FROM auth_config WHERE id = 1")
-            row = cur.fetchone()
-            return bool(row and row[0]) if row else False
+            with self._db_lock:
+                # Check if there are any enabled users in auth_users (multi-user mode)
+                cur = self.db.execute("SELECT 1 FROM auth_users WHERE enabled = 1 LIMIT 1")
+                enabled = cur.fetchone() is not None
+
+                # Fall back to auth_config for backward compatibility
+                if not enabled:
+                    cur = self.db.execute("SELECT enabled FROM auth_config WHERE id = 1")
+                    row = cur.fetchone()
+                    enabled = bool(row and row[0]) if row else False
         except Exception:
             return False
+        self._cache.put_enabled(enabled, generation)
+        return enabled
+
+    def _session_row(self, token: str) -> Optional[Dict[str, Any]]:
+        """Session state (joined with its user) from the shared cache, loading it on a miss.
 
+        Returns None when the token does not exist.
+        """
+        found, row = self._cache.get_session(token)
+        if found:
+            return row
+        generation = self._cache.generation()
+        with self._db_lock:
+            cur = self.db.execute(
+                """
+                SELECT s.username, s.user_id, s.expires_at, s.locked, s.locked_at, u.role, u.enabled
+                FROM auth_sessions s
+                LEFT JOIN auth_users u ON s.user_id = u.id
+                WHERE s.token = ?
+                """,
+                (token,)
+            )
+            r = cur.fetchone()
+        row = None
+        if r:
+            row = {
+                'username': r[0],
+                'user_id': r[1],
+                'expires_at': float(r[2] or 0),
+                'locked': bool(r[3]),
+                'locked_at': r[4],
+                'role': r[5],
+                'user_enabled': r[6],
+            }
+        self._cache.put_session(token, row, generation)
+        return row
+
+    def _touch_session(self, token: str, now: float) -> None:
+        """Record session activity; buffered and flushed in batches unless write-through is configured."""
+        if self._cache.touch(token, now):
+            return
+        with self._db_lock:
+            self.db.execute(
+                "UPDATE auth_sessions SET last_activity = ? WHERE token = ?",
+                (now, token)
+            )
+            self.db.commit()
+
+    def invalidate_cache(self, token: Optional[str] = None) -> None:
+        """Drop cached auth state: one session, or everything (users, config and all sessions)."""
+        if token is not None:
+            self._cache.evict_session(token)
+        else:
+            self._cache.clear()
+
+    def flush_activity(self) -> int:
+        """Write buffered last_activity updates now. Returns the number of sessions written."""
+        return self._cache.flush()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+    @_synchronized
     def get_config(self) -> Dict[str, Any]:
         """Get current auth configuration (without password hash).
 
@@ -219,6 +485,7 @@ class AuthManager:
         except Exception:
             return {'enabled': False, 'username': None, 'has_password': False}
 
+    @_synchronized
     def set_config(self, enabled: bool, username: Optional[str] = None,
                    password: Optional[str] = None) -> bool:
         """Save authentication configuration.
@@ -273,11 +540,13 @@ class AuthManager:
                 )
 
             self.db.commit()
+            self.invalidate_cache()
             return True
         except Exception as e:
             print(f"AuthManager.set_config error: {e}")
             return False
 
+    @_synchronized
     def verify_credentials(self, username: str, password: str) -> bool:
         """Verify username and password against stored credentials.
 
@@ -303,6 +572,7 @@ class AuthManager:
             print(f"AuthManager.verify_credentials error: {e}")
             return False
 
+    @_synchronized
     def create_session(self, username: str, duration_hours: int = 24) -> str:
         """Create a new session token for the given username.
 
@@ -346,33 +616,21 @@ class AuthManager:
 
         try:
             now = time.time()
-            cur = self.db.execute(
-                """
-                SELECT username, expires_at FROM auth_sessions
-                WHERE token = ? AND expires_at > ?
-                """,
-                (token, now)
-            )
-            row = cur.fetchone()
+            row = self._session_row(token)
 
-            if not row:
+            if not row or row['expires_at'] <= now:
                 return None
 
-            username = row[0]
-
             # Update last activity timestamp
             if update_activity:
-                self.db.execute(
-                    "UPDATE auth_sessions SET last_activity = ? WHERE token = ?",
-                    (now, token)
-                )
-                self.db.commit()
+                self._touch_session(token, now)
 
-            return username
+            return row['username']
         except Exception as e:
             print(f"AuthManager.verify_session error: {e}")
             return None
 
+    @_synchronized
     def delete_session(self, token: str) -> bool:
         """Delete a session (logout).
 
@@ -385,19 +643,23 @@ class AuthManager:
         try:
             self.db.execute("DELETE FROM auth_sessions WHERE token = ?", (token,))
             self.db.commit()
+            self.invalidate_cache(token)
             return True
         except Exception:
             return False
 
+    @_synchronized
     def cleanup_expired_sessions(self):
         """Remove all expired sessions from the database."""
         try:
             now = time.time()
             self.db.execute("DELETE FROM auth_sessions WHERE expires_at <= ?", (now,))
             self.db.commit()
+            self.invalidate_cache()
         except Exception as e:
             print(f"AuthManager.cleanup_expired_sessions error: {e}")
 
+    @_synchronized
     def log_failed_attempt(self, username: str, ip_address: Optional[str] = None):
         """Log a failed login attempt for security monitoring.
 
@@ -415,6 +677,7 @@ class AuthManager:
         except Exception as e:
             print(f"AuthManager.log_failed_attempt error: {e}")
 
+    @_synchronized
     def get_failed_attempts(self, since_timestamp: Optional[float] = None, limit: int = 100) -> list:
         """Get recent failed login attempts.
 
@@ -463,6 +726,7 @@ class AuthManager:
 
     # ========== Multi-User Management Methods ==========
 
+    @_synchronized
     def list_users(self, include_disabled: bool = False) -> list:
         """Get list of all users.
 
@@ -509,6 +773,7 @@ class AuthManager:
             print(f"AuthManager.list_users error: {e}")
             return []
 
+    @_synchronized
     def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID.
 
@@ -545,6 +810,7 @@ class AuthManager:
             print(f"AuthManager.get_user error: {e}")
             return None
 
+    @_synchronized
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username.
 
@@ -581,6 +847,7 @@ class AuthManager:
             print(f"AuthManager.get_user_by_username error: {e}")
             return None
 
+    @_synchronized
     def create_user(self, username: str, password: str, role: str = 'user',
                     created_by: Optional[str] = None) -> Optional[int]:
         """Create a new user.
@@ -610,12 +877,14 @@ class AuthManager:
                 (username, password_hash, role, now, now, created_by)
             )
             self.db.commit()
+            self.invalidate_cache()
 
             return cur.lastrowid
         except Exception as e:
             print(f"AuthManager.create_user error: {e}")
             return None
 
+    @_synchronized
     def update_user(self, user_id: int, username: Optional[str] = None,
                     password: Optional[str] = None, role: Optional[str] = None,
                     enabled: Optional[bool] = None) -> bool:
@@ -665,12 +934,14 @@ class AuthManager:
             query = f"UPDATE auth_users SET {', '.join(updates)} WHERE id = ?"
             self.db.execute(query, params)
             self.db.commit()
+            self.invalidate_cache()
 
             return True
         except Exception as e:
             print(f"AuthManager.update_user error: {e}")
             return False
 
+    @_synchronized
     def delete_user(self, user_id: int) -> bool:
         """Delete a user (and all their sessions).
 
@@ -692,12 +963,14 @@ class AuthManager:
             # Delete user (CASCADE will delete sessions)
             self.db.execute("DELETE FROM auth_users WHERE id = ?", (user_id,))
             self.db.commit()
+            self.invalidate_cache()
 
             return True
         except Exception as e:
             print(f"AuthManager.delete_user error: {e}")
             return False
 
+    @_synchronized
     def delete_user_sessions(self, user_id: int) -> bool:
         """Delete all sessions for a user (force logout).
 
@@ -710,11 +983,13 @@ class AuthManager:
         try:
             self.db.execute("DELETE FROM auth_sessions WHERE user_id = ?", (user_id,))
             self.db.commit()
+            self.invalidate_cache()
             return True
         except Exception as e:
             print(f"AuthManager.delete_user_sessions error: {e}")
             return False
 
+    @_synchronized
     def count_admin_users(self) -> int:
         """Count the number of admin users.
 
@@ -729,6 +1004,7 @@ class AuthManager:
 
     # ========== Session Management (Updated for Multi-User) ==========
 
+    @_synchronized
     def verify_user_credentials(self, username: str, password: str) -> Optional[Dict[str, Any]]:
         """Verify username and password against auth_users table.
 
@@ -779,6 +1055,7 @@ class AuthManager:
             print(f"AuthManager.verify_user_credentials error: {e}")
             return None
 
+    @_synchronized
     def create_user_session(self, user_id: int, username: str, duration_hours: int = 24) -> str:
         """Create a new session token for the given user.
 
@@ -823,38 +1100,24 @@ class AuthManager:
 
         try:
             now = time.time()
-            cur = self.db.execute(
-                """
-                SELECT s.username, s.user_id, u.role, u.enabled
-                FROM auth_sessions s
-                JOIN auth_users u ON s.user_id = u.id
-                WHERE s.token = ? AND s.expires_at > ?
-                """,
-                (token, now)
-            )
-            row = cur.fetchone()
+            row = self._session_row(token)
 
-            if not row:
+            # Multi-user sessions only: the session must belong to an existing user
+            if not row or row['expires_at'] <= now or row['user_id'] is None or row['role'] is None:
                 return None
 
-            username, user_id, role, enabled = row
-
-            if not enabled:
+            if not row['user_enabled']:
                 return None
 
             # Update last activity timestamp
             if update_activity:
-                self.db.execute(
-                    "UPDATE auth_sessions SET last_activity = ? WHERE token = ?",
-                    (now, token)
-                )
-                self.db.commit()
+                self._touch_session(token, now)
 
             return {
-                'id': user_id,
-                'username': username,
-                'role': role,
-                'enabled': bool(enabled),
+                'id': row['user_id'],
+                'username': row['username'],
+                'role': row['role'],
+                'enabled': bool(row['user_enabled']),
             }
         except Exception as e:
             print(f"AuthManager.get_session_user error: {e}")
@@ -862,6 +1125,7 @@ class AuthManager:
 
     # ========== Audit Logging ==========
 
+    @_synchronized
     def log_audit(self, username: str, action: str, details: Optional[str] = None,
                   ip_address: Optional[str] = None):
         """Log an audit event.
@@ -885,6 +1149,7 @@ class AuthManager:
         except Exception as e:
             print(f"AuthManager.log_audit error: {e}")
 
+    @_synchronized
     def get_audit_log(self, since_timestamp: Optional[float] = None,
                       username: Optional[str] = None, limit: int = 100) -> list:
         """Get audit log entries.
@@ -932,6 +1197,7 @@ class AuthManager:
 
     # ========== Session Locking ==========
 
+    @_synchronized
     def lock_session(self, token: str) -> bool:
         """Lock a session (auto-lock feature).
 
@@ -948,11 +1214,13 @@ class AuthManager:
                 (now, token)
             )
             self.db.commit()
+            self.invalidate_cache(token)
             return True
         except Exception as e:
             print(f"AuthManager.lock_session error: {e}")
             return False
 
+    @_synchronized
     def unlock_session(self, token: str, password: str) -> bool:
         """Unlock a locked session with password verification.
 
@@ -996,6 +1264,7 @@ class AuthManager:
                 (token,)
             )
             self.db.commit()
+            self.invalidate_cache(token)
 
             # Log successful unlock
             ip_address = None  # Will be set by API route
@@ -1016,12 +1285,8 @@ class AuthManager:
             bool: True if session is locked, False otherwise
         """
         try:
-            cur = self.db.execute(
-                "SELECT locked FROM auth_sessions WHERE token = ?",
-                (token,)
-            )
-            row = cur.fetchone()
-            return bool(row and row[0]) if row else False
+            row = self._session_row(token)
+            return bool(row and row['locked'])
         except Exception:
             return False
 
@@ -1035,23 +1300,15 @@ class AuthManager:
             dict or None: Lock info with keys: username, locked, locked_at
         """
         try:
-            cur = self.db.execute(
-                """
-                SELECT username, locked, locked_at
-                FROM auth_sessions
-                WHERE token = ?
-                """,
-                (token,)
-            )
-            row = cur.fetchone()
+            row = self._session_row(token)
 
             if not row:
                 return None
 
             return {
-                'username': row[0],
-                'locked': bool(row[1]),
-                'locked_at': row[2],
+                'username': row['username'],
+                'locked': row['locked'],
+                'locked_at': row['locked_at'],
             }
         except Exception as e:
             print(f"AuthManager.get_session_lock_info error: {e}")
@@ -1059,6 +1316,7 @@ class AuthManager:
 
     def close(self):
         """Close database connection."""
+        self._closed = True
         try:
             self.db.close()
         except Exception:
@@ -1066,7 +1324,10 @@ class AuthManager:
 
 
 def get_auth_manager(db_path: str = 'scidk_settings.db') -> AuthManager:
-    """Factory function to get AuthManager instance.
+    """Factory function to get the process-wide AuthManager for a settings database.
+
+    The instance (and its connection, table setup and migrations) is created once per database
+    file and reused; a closed instance is replaced on the next call.
 
     Args:
         db_path: Path to settings database
@@ -1074,4 +1335,18 @@ def get_auth_manager(db_path: str = 'scidk_settings.db') -> AuthManager:
     Returns:
         AuthManager: Configured auth manager instance
     """
-    return AuthManager(db_path=db_path)
+    if db_path == ':memory:':
+        return AuthManager(db_path=db_path)
+    key = _db_key(db_path)
+    with _REGISTRY_LOCK:
+        mgr = _MANAGERS.get(key)
+        if mgr is not None and not mgr._closed and os.path.exists(key):
+            return mgr
+    mgr = AuthManager(db_path=db_path)
+    with _REGISTRY_LOCK:
+        current = _MANAGERS.get(key)
+        if current is not None and not current._closed and os.path.exists(key):
+            mgr.close()
+            return current
+        _MANAGERS[key] = mgr
+        return mgr
@@ -14,6 +14,7 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from .backup_manager import BackupManager
+from . import sqlite_pool
 
 
 class BackupScheduler:
@@ -57,7 +58,7 @@ class BackupScheduler:
         }
 
         try:
-            db = sqlite3.connect(self.settings_db_path)
+            db = sqlite_pool.connect(self.settings_db_path)
             db.execute('PRAGMA journal_mode=WAL;')
 
             # Ensure settings table exists
@@ -410,7 +411,7 @@ class BackupScheduler:
         import sqlite3
 
         try:
-            db = sqlite3.connect(self.settings_db_path)
+            db = sqlite_pool.connect(self.settings_db_path)
             db.execute('PRAGMA journal_mode=WAL;')
 
             # Update database
@@ -1,8 +1,8 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
 from . import path_index_sqlite as pix
-from .folder_hierarchy import build_complete_folder_hierarchy
+from .folder_hierarchy import build_complete_folder_hierarchy, iter_folder_hierarchy
 
 
 def _parent(path: str) -> str:
@@ -41,14 +41,16 @@ def build_rows_for_scan_from_index(scan_id: str, scan: Dict, include_hierarchy:
 
     Returns rows (files) and folder_rows (folders). If include_hierarchy is True,
     enhances folder_rows with missing ancestors relative to scan['path'].
+    Materializes the whole scan; commits stream the same rows through IndexRowSource instead.
     """
     conn = pix.connect()
     pix.init_db(conn)
     try:
         cur = conn.cursor()
+        scope, params = pix.scan_scope(conn, scan_id)
         cur.execute(
-            "SELECT path, parent_path, name, depth, type, size, modified_time, file_extension, mime_type FROM files WHERE scan_id = ?",
-            (scan_id,)
+            "SELECT path, parent_path, name, depth, type, size, modified_time, file_extension, mime_type FROM files WHERE " + scope,
+            params
         )
         items = cur.fetchall()
     finally:
@@ -74,21 +76,7 @@ def build_rows_for_scan_from_index(scan_id: str, scan: Dict, include_hierarchy:
                 'parent_name': _name(par),
             })
         else:
-            par = (parent or '').strip() or _parent(p)
-            rows.append({
-                'checksum': None,
-                'path': p,
-                'filename': name or _name(p),
-                'extension': ext or '',
-                'size_bytes': int(size or 0),
-                'created': 0.0,
-                'modified': float(mtime or 0.0),
-                'mime_type': mime,
-                'folder': par,
-                'parent': par,
-                'parent_in_scan': True,
-                'interps': [],
-            })
+            rows.append(_file_row(p, parent, name, size, mtime, ext, mime))
 
     if include_hierarchy:
         try:
@@ -98,3 +86,128 @@ def build_rows_for_scan_from_index(scan_id: str, scan: Dict, include_hierarchy:
             pass
 
     return rows, folder_rows
+
+
+def _file_row(p, parent, name, size, mtime, ext, mime) -> Dict:
+    par = (parent or '').strip() or _parent(p)
+    return {
+        'checksum': None,
+        'path': p,
+        'filename': name or _name(p),
+        'extension': ext or '',
+        'size_bytes': int(size or 0),
+        'created': 0.0,
+        'modified': float(mtime or 0.0),
+        'mime_type': mime,
+        'folder': par,
+        'parent': par,
+        'parent_in_scan': True,
+        'interps': [],
+    }
+
+
+def _stream(sql: str, params: tuple, chunk_size: int) -> Iterator[tuple]:
+    conn = pix.connect(readonly=True)
+    pix.init_db(conn)
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            chunk = cur.fetchmany(chunk_size)
+            if not chunk:
+                break
+            yield from chunk
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class IndexRowSource:
+    """Re-iterable, chunked file/folder row streams for one scan, read from the SQLite index.
+
+    Same row shapes as build_rows_for_scan_from_index, but nothing is materialized: each call to
+    files()/folders() opens its own cursor and yields rows chunk_size at a time, so a commit engine
+    can read the scan once per phase with flat memory. folders() always covers every file's folder.
+    """
+
+    def __init__(self, scan_id: str, scan: Dict, include_hierarchy: bool = True, chunk_size: int = 5000):
+        self.scan_id = scan_id
+        self.scan = scan
+        self.include_hierarchy = include_hierarchy
+        self.chunk_size = max(1, int(chunk_size or 5000))
+        self._scope = None
+
+    def _where(self, extra: str = '') -> Tuple[str, tuple]:
+        """WHERE clause and params for this scan's rows (append-mode or versioned index)."""
+        if self._scope is None:
+            conn = pix.connect()
+            pix.init_db(conn)
+            try:
+                sql, params = pix.scan_scope(conn, self.scan_id)
+            finally:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._scope = (sql, tuple(params))
+        sql, params = self._scope
+        return f"WHERE {sql}{(' AND ' + extra) if extra else ''}", params
+
+    def files(self) -> Iterator[Dict]:
+        where, params = self._where("COALESCE(type, '') != 'folder'")
+        for item in _stream(
+            "SELECT path, parent_path, name, size, modified_time, file_extension, mime_type FROM files " + where,
+            params, self.chunk_size,
+        ):
+            yield _file_row(*item)
+
+    def _explicit_folders(self) -> Iterator[Dict]:
+        where, params = self._where("type = 'folder'")
+        for (p, parent, name) in _stream(
+            "SELECT path, parent_path, name FROM files " + where,
+            params, self.chunk_size,
+        ):
+            par = (parent or '').strip() or _parent(p)
+            yield {'path': p, 'name': name or _name(p), 'parent': par, 'parent_name': _name(par)}
+
+    def _file_folders(self) -> Iterator[str]:
+        where, params = self._where("COALESCE(type, '') != 'folder'")
+        for (parent,) in _stream(
+            "SELECT DISTINCT parent_path FROM files " + where,
+            params, self.chunk_size,
+        ):
+            if (parent or '').strip():
+                yield parent
+        # Rows indexed without parent_path: derive the folder from the path
+        where, params = self._where("COALESCE(type, '') != 'folder' AND (parent_path IS NULL OR parent_path = '')")
+        for (p,) in _stream(
+            "SELECT path FROM files " + where,
+            params, self.chunk_size,
+        ):
+            yield _parent(p)
+
+    def folders(self) -> Iterator[Dict]:
+        if not self.include_hierarchy:
+            seen = set()
+            for fr in self._explicit_folders():
+                if fr['path'] not in seen:
+                    seen.add(fr['path'])
+                    yield fr
+            return
+        yield from iter_folder_hierarchy(self._explicit_folders(), self._file_folders(), self.scan)
+
+    def count_files(self) -> int:
+        where, params = self._where("COALESCE(type, '') != 'folder'")
+        conn = pix.connect()
+        pix.init_db(conn)
+        try:
+            row = conn.execute("SELECT COUNT(*) FROM files " + where, params).fetchone()
+            return int(row[0] or 0) if row else 0
+        except Exception:
+            return 0
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
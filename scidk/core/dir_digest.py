@@ -0,0 +1,278 @@
+"""Hierarchical (Merkle-style) directory digests for incremental local rescans.
+
+Every directory walked by a recursive scan gets two digests, persisted per scan root in the
+SQLite table ``dir_digests`` (latest state only, one row per directory):
+
+- own_digest:  immediate files' (name, size, mtime_ns)
+- tree_digest: own_digest plus each child directory's (name, tree_digest)
+
+A rescan compares digests directory by directory (primary-key lookups, no JSON decoding) to skip
+the files of unchanged directories and to report exactly which subtrees were added, removed or
+modified. With ``trust_mtime`` a whole subtree is skipped without listing it when every directory
+stored for it still has its recorded (mtime_ns, inode): one lookup plus one stat per directory (no
+file stats). Adding, removing or renaming an entry anywhere below changes the mtime of the
+directory holding it, so such changes are caught at any depth; a file rewritten in place keeps its
+directory's mtime, so the mode suits archives where data lands in new files. Pruning needs a
+top-down walk: with a post-order enumerator (ncdu/gdu) the tracker runs in digest mode and the
+report carries requested_mode='trust_mtime' and prune_unsupported=True.
+
+own_digest hashes the listing's mtime at the precision the enumerator reports, so the first rescan
+after switching between scandir and ncdu/gdu sees every directory as modified (file content hashes
+are still served by HashCache).
+"""
+import hashlib
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+from . import path_index_sqlite as pix
+
+MODES = ('digest', 'trust_mtime')
+MAX_REPORTED_CHANGES = 1000
+
+
+def own_digest(files) -> str:
+    """Digest of a directory's immediate files from the listing's stat results."""
+    h = hashlib.blake2b(digest_size=16)
+    for name, st, _regular in sorted(files, key=lambda f: f[0]):
+        h.update(f"{name}\0{int(st.st_size)}\0{int(st.st_mtime_ns)}\n".encode('utf-8', 'surrogateescape'))
+    return h.hexdigest()
+
+
+def tree_digest(own: str, children: Dict[str, str]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(own.encode('ascii'))
+    for name in sorted(children):
+        h.update(f"\n{name}\0{children[name]}".encode('utf-8', 'surrogateescape'))
+    return h.hexdigest()
+
+
+def ensure_table(conn) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dir_digests (
+            root TEXT NOT NULL,
+            path TEXT NOT NULL,
+            scan_id TEXT,
+            dir_mtime_ns INTEGER,
+            dir_ino INTEGER,
+            own_digest TEXT,
+            tree_digest TEXT,
+            files INTEGER,
+            bytes INTEGER,
+            subtree_dirs INTEGER,
+            subtree_files INTEGER,
+            subtree_bytes INTEGER,
+            updated REAL,
+            PRIMARY KEY (root, path)
+        );
+        """
+    )
+
+
+class DirDigestTracker:
+    """Collects per-directory digests during one recursive walk and reconciles them with the stored tree."""
+
+    def __init__(self, root: str, scan_id: str, mode: str = 'digest', counter=None, supports_prune: bool = True):
+        self.root = root
+        self.scan_id = scan_id
+        self.requested_mode = mode if mode in MODES else 'digest'
+        # Post-order enumerators have walked a subtree before its parent is visited, so nothing can be pruned
+        self.prune_unsupported = self.requested_mode == 'trust_mtime' and not supports_prune
+        self.mode = 'digest' if self.prune_unsupported else self.requested_mode
+        self.counter = counter
+        self._conn = pix.connect()
+        ensure_table(self._conn)
+        self._cur: Dict[str, dict] = {}
+        self._trusted: Dict[str, tuple] = {}
+        # trust_mtime: subtrees whose stored directories were all stat'ed, and changed dirs plus their ancestors
+        self._checked: Set[str] = set()
+        self._dirty: Set[str] = set()
+        self.files_skipped = 0
+        self.dirs_skipped = 0
+        self.report: Dict[str, object] = {}
+
+    def previous(self, path: str) -> Optional[tuple]:
+        """(own_digest, tree_digest, dir_mtime_ns, dir_ino, subtree_dirs, subtree_files, subtree_bytes) or None."""
+        try:
+            return self._conn.execute(
+                "SELECT own_digest, tree_digest, dir_mtime_ns, dir_ino, subtree_dirs, subtree_files, subtree_bytes "
+                "FROM dir_digests WHERE root = ? AND path = ?",
+                (self.root, path),
+            ).fetchone()
+        except Exception:
+            return None
+
+    def _dir_stat(self, path: str):
+        if self.mode != 'trust_mtime':
+            return None
+        try:
+            if self.counter is not None:
+                self.counter.inc('stat')
+            return os.stat(path, follow_symlinks=False)
+        except Exception:
+            return None
+
+    def visit(self, dirpath: str, dirnames: List[str], files) -> bool:
+        """Record a walked directory. Returns True when its own files are unchanged since the last scan.
+        In trust_mtime mode, unchanged child subtrees are removed from dirnames (pruned)."""
+        own = own_digest(files)
+        st = self._dir_stat(dirpath)
+        self._cur[dirpath] = {
+            'own': own,
+            'children': list(dirnames),
+            'files': len(files),
+            'bytes': sum(int(f[1].st_size) for f in files),
+            'mtime_ns': int(st.st_mtime_ns) if st is not None else None,
+            'ino': int(st.st_ino) if st is not None else None,
+        }
+        if self.mode == 'trust_mtime':
+            keep = []
+            for name in dirnames:
+                child = os.path.join(dirpath, name)
+                prev = self.previous(child)
+                if prev and self._subtree_unchanged(child):
+                    self._trusted[child] = prev
+                    self.dirs_skipped += int(prev[4] or 1)
+                    self.files_skipped += int(prev[5] or 0)
+                else:
+                    keep.append(name)
+            dirnames[:] = keep
+        prev = self.previous(dirpath)
+        return bool(prev and prev[0] == own)
+
+    def _subtree_unchanged(self, top: str) -> bool:
+        """True when every stored directory under top (inclusive) still has its recorded (mtime_ns, inode).
+
+        The stored subtree is stat'ed once; later checks of directories inside it reuse the result.
+        """
+        checked = top
+        while checked not in self._checked:
+            parent = os.path.dirname(checked)
+            if parent == checked:
+                break
+            checked = parent
+        if checked not in self._checked:
+            try:
+                rows = self._conn.execute(
+                    "SELECT path, dir_mtime_ns, dir_ino FROM dir_digests "
+                    "WHERE root = ? AND (path = ? OR substr(path, 1, ?) = ?)",
+                    (self.root, top, len(top) + 1, top + os.sep),
+                ).fetchall()
+            except Exception:
+                return False
+            for path, mtime_ns, ino in rows:
+                st = self._dir_stat(path) if mtime_ns is not None else None
+                if st is None or int(st.st_mtime_ns) != int(mtime_ns) or int(st.st_ino) != int(ino or 0):
+                    # Mark the path and its ancestors up to top, so any subtree containing it is walked
+                    while path not in self._dirty:
+                        self._dirty.add(path)
+                        if path == top:
+                            break
+                        path = os.path.dirname(path)
+            self._checked.add(top)
+        return top not in self._dirty
+
+    def trusted(self) -> Set[str]:
+        return set(self._trusted)
+
+    def discard(self) -> None:
+        """Drop this walk's digests (incomplete walk); the stored tree is left untouched."""
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    def finalize(self) -> Dict[str, object]:
+        """Roll digests up bottom-up, persist them, and return the change report."""
+        rolled: Dict[str, tuple] = {}  # path -> (tree, subtree_dirs, subtree_files, subtree_bytes)
+        for path in sorted(self._cur, key=lambda p: p.count(os.sep), reverse=True):
+            d = self._cur[path]
+            children: Dict[str, str] = {}
+            sd, sf, sb = 1, d['files'], d['bytes']
+            for name in d['children']:
+                child = os.path.join(path, name)
+                if child in rolled:
+                    t, cd, cf, cb = rolled[child]
+                elif child in self._trusted:
+                    p = self._trusted[child]
+                    t, cd, cf, cb = p[1] or '', int(p[4] or 1), int(p[5] or 0), int(p[6] or 0)
+                else:
+                    t, cd, cf, cb = '', 0, 0, 0  # not descended (e.g. symlinked directory)
+                children[name] = t
+                sd, sf, sb = sd + cd, sf + cf, sb + cb
+            rolled[path] = (tree_digest(d['own'], children), sd, sf, sb)
+
+        try:
+            prev_rows = {
+                r[0]: (r[1], r[2])
+                for r in self._conn.execute("SELECT path, own_digest, tree_digest FROM dir_digests WHERE root = ?", (self.root,))
+            }
+        except Exception:
+            prev_rows = {}
+
+        def _under_trusted(p: str) -> bool:
+            return any(p == t or p.startswith(t + os.sep) for t in self._trusted)
+
+        changes: List[Dict[str, str]] = []
+        unchanged = 0
+        for path in sorted(self._cur):
+            prev = prev_rows.get(path)
+            parent = os.path.dirname(path)
+            if prev is None:
+                # Only the top-most new directory of an added subtree is reported
+                if path == self.root or parent in prev_rows:
+                    changes.append({'path': path, 'change': 'added'})
+            elif prev[1] == rolled[path][0]:
+                unchanged += 1
+            elif prev[0] != self._cur[path]['own']:
+                changes.append({'path': path, 'change': 'modified'})
+        removed = [
+            p for p in prev_rows
+            if p not in self._cur and os.path.dirname(p) in self._cur and not _under_trusted(p)
+        ]
+        changes.extend({'path': p, 'change': 'removed'} for p in sorted(removed))
+        changes.sort(key=lambda c: c['path'])
+
+        now = time.time()
+        try:
+            for p in removed:
+                self._conn.execute(
+                    "DELETE FROM dir_digests WHERE root = ? AND (path = ? OR substr(path, 1, ?) = ?)",
+                    (self.root, p, len(p) + 1, p + os.sep),
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dir_digests(root, path, scan_id, dir_mtime_ns, dir_ino, own_digest, tree_digest, "
+                "files, bytes, subtree_dirs, subtree_files, subtree_bytes, updated) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                [
+                    (self.root, p, self.scan_id, d['mtime_ns'], d['ino'], d['own'], rolled[p][0],
+                     d['files'], d['bytes'], rolled[p][1], rolled[p][2], rolled[p][3], now)
+                    for p, d in self._cur.items()
+                ],
+            )
+            self._conn.commit()
+        except Exception:
+            pass
+        finally:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+        root_prev = prev_rows.get(self.root)
+        self.report = {
+            'mode': self.mode,
+            'requested_mode': self.requested_mode,
+            'prune_unsupported': self.prune_unsupported,
+            'root_digest': rolled.get(self.root, ('',))[0],
+            'previous_root_digest': root_prev[1] if root_prev else None,
+            'unchanged': bool(root_prev and rolled.get(self.root) and root_prev[1] == rolled[self.root][0]),
+            'dirs_walked': len(self._cur),
+            'dirs_unchanged': unchanged,
+            'subtrees_skipped': len(self._trusted),
+            'dirs_skipped': self.dirs_skipped,
+            'files_skipped': self.files_skipped,
+            'changed_count': len(changes),
+            'changed_subtrees': changes[:MAX_REPORTED_CHANGES],
+        }
+        return self.report
@@ -0,0 +1,196 @@
+"""Filesystem enumerator backends for local scans.
+
+Every backend exposes the same walk contract as ``fs_walk.scandir_walk``:
+``walk(root, counter) -> Iterator[(dirpath, dirnames, files)]`` where ``files`` is a list of
+``(name, stat, is_regular)`` and ``stat`` carries st_size/st_mtime/st_mtime_ns/st_ctime/st_ino/st_dev,
+so no follow-up stat is needed downstream.
+
+Backends:
+- python: in-process os.scandir traversal (default; top-down, supports pruning via dirnames)
+- ncdu:   streams ``ncdu -x -e -o -`` JSON export through an incremental (ijson) parser
+- gdu:    streams ``gdu -o -`` JSON export (same ncdu export format)
+
+External backends emit each directory after its whole subtree (post-order), so pruning by mutating
+``dirnames`` has no effect for them; the tool has already walked the tree. Scans therefore run
+trust_mtime rescans as plain digest rescans on these backends and say so in the scan report.
+
+Their stat metadata is coarser than scandir's: mtime in whole seconds and st_ino only for
+hardlinked files (0 otherwise). EntryStat.coarse marks it, and HashCache compares such entries at
+second precision without the inode, so digests cached by either backend are reused by the other.
+"""
+import os
+import shutil
+import subprocess
+from typing import IO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .fs_walk import SyscallCounter, scandir_walk
+
+WalkItem = Tuple[str, List[str], List[Tuple[str, object, bool]]]
+
+
+class EntryStat(NamedTuple):
+    """stat_result-compatible metadata reported by an external enumerator."""
+    st_size: int
+    st_mtime: float
+    st_mtime_ns: int
+    st_ctime: float
+    st_ino: int
+    st_dev: int
+
+    # Whole-second mtime; st_ino / st_dev are 0 when the export omits them
+    coarse = True
+
+
+def _entry_stat(info: Dict, dev: int) -> EntryStat:
+    size = int(info.get('asize') or 0)
+    try:
+        mtime = float(info.get('mtime') or 0)
+    except Exception:
+        mtime = 0.0
+    return EntryStat(size, mtime, int(mtime * 1_000_000_000), mtime, int(info.get('ino') or 0), int(dev or 0))
+
+
+def parse_ncdu_export(stream: IO[bytes]) -> Iterator[WalkItem]:
+    """Incrementally parse an ncdu-format JSON export (ncdu -o / gdu -o).
+
+    Format: [major, minor, {meta}, [ {dir info}, {file}, [ {subdir info}, ... ], ... ]]
+    Memory is bounded by the entries of the directories currently open on the stack,
+    never by the size of the export. Yields directories in post-order.
+    """
+    import ijson  # type: ignore
+
+    # Frame: [path, dirnames, files, dev, has_info, excluded]
+    stack: List[list] = []
+    depth = 0
+    cur_map: Optional[Dict] = None
+    cur_key: Optional[str] = None
+    map_depth = 0
+    for event, value in ijson.basic_parse(stream):
+        if cur_map is not None:
+            if event == 'map_key':
+                if map_depth == 1:
+                    cur_key = value
+            elif event == 'start_map' or event == 'start_array':
+                map_depth += 1
+            elif event == 'end_map' or event == 'end_array':
+                map_depth -= 1
+                if map_depth == 0:
+                    info, cur_map = cur_map, None
+                    if depth < 2:
+                        continue  # top-level metadata map
+                    frame = stack[-1]
+                    if not frame[4]:
+                        parent = stack[-2] if len(stack) > 1 else None
+                        name = str(info.get('name') or '')
+                        frame[0] = os.path.join(parent[0], name) if parent else name
+                        frame[3] = int(info.get('dev') or (parent[3] if parent else 0))
+                        frame[4] = True
+                        frame[5] = bool(info.get('excluded') or info.get('read_error'))
+                        if parent is not None and not frame[5]:
+                            parent[1].append(name)
+                    elif not info.get('excluded'):
+                        regular = not info.get('notreg')
+                        frame[2].append((str(info.get('name') or ''), _entry_stat(info, frame[3]), regular))
+            elif map_depth == 1 and cur_key is not None:
+                cur_map[cur_key] = value
+            continue
+        if event == 'start_map':
+            cur_map = {}
+            cur_key = None
+            map_depth = 1
+        elif event == 'start_array':
+            depth += 1
+            if depth >= 2:
+                stack.append([None, [], [], 0, False, False])
+        elif event == 'end_array':
+            depth -= 1
+            if depth >= 1 and stack:
+                frame = stack.pop()
+                if frame[4] and not frame[5]:
+                    yield frame[0], frame[1], frame[2]
+
+
+class Enumerator:
+    """Base enumerator. Subclasses implement available() and walk()."""
+    name = 'base'
+    supports_prune = False
+
+    def available(self) -> bool:
+        return False
+
+    def walk(self, root: str, counter: Optional[SyscallCounter] = None) -> Iterator[WalkItem]:
+        raise NotImplementedError
+
+
+class PythonEnumerator(Enumerator):
+    name = 'python'
+    supports_prune = True
+
+    def available(self) -> bool:
+        return True
+
+    def walk(self, root: str, counter: Optional[SyscallCounter] = None) -> Iterator[WalkItem]:
+        return scandir_walk(root, counter)
+
+
+class _ExportEnumerator(Enumerator):
+    """Runs an external tool that writes an ncdu-format export to stdout and streams-parses it."""
+    binary = ''
+
+    def _argv(self, exe: str, root: str) -> List[str]:
+        raise NotImplementedError
+
+    def available(self) -> bool:
+        return shutil.which(self.binary) is not None
+
+    def walk(self, root: str, counter: Optional[SyscallCounter] = None) -> Iterator[WalkItem]:
+        exe = shutil.which(self.binary)
+        if not exe:
+            raise FileNotFoundError(f"{self.binary} not found on PATH")
+        if counter is not None:
+            counter.inc('subprocess')
+        proc = subprocess.Popen(self._argv(exe, root), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            yield from parse_ncdu_export(proc.stdout)
+        finally:
+            try:
+                proc.stdout.close()
+            except Exception:
+                pass
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+
+class NcduEnumerator(_ExportEnumerator):
+    name = 'ncdu'
+    binary = 'ncdu'
+
+    def _argv(self, exe: str, root: str) -> List[str]:
+        # -x stay on one filesystem, -e extended info (mtime), -o - export JSON to stdout
+        return [exe, '-q', '-x', '-e', '-o', '-', root]
+
+
+class GduEnumerator(_ExportEnumerator):
+    name = 'gdu'
+    binary = 'gdu'
+
+    def _argv(self, exe: str, root: str) -> List[str]:
+        return [exe, '--non-interactive', '--no-progress', '--output-file', '-', root]
+
+
+ENUMERATORS: Dict[str, Enumerator] = {
+    'python': PythonEnumerator(),
+    'ncdu': NcduEnumerator(),
+    'gdu': GduEnumerator(),
+}
+
+
+def get_enumerator(name: Optional[str] = None) -> Enumerator:
+    """Resolve an enumerator by name ('auto' → SCIDK_SCAN_ENUMERATOR or python).
+    Falls back to python when the requested external tool is not installed."""
+    key = (name or 'auto').strip().lower()
+    if key == 'auto':
+        key = (os.environ.get('SCIDK_SCAN_ENUMERATOR') or 'python').strip().lower()
+    enum = ENUMERATORS.get(key) or ENUMERATORS['python']
+    return enum if enum.available() else ENUMERATORS['python']
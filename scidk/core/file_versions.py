@@ -0,0 +1,396 @@
+"""
+Versioned storage for the `files` index (SCIDK_FILES_STORAGE=versioned).
+
+The default 'append' mode writes a full copy of every scanned row into `files`, tagged with the
+scan_id, so a nightly rescan of a 3M-file tree adds 3M rows per night. In versioned mode `files`
+holds one current row per (host, path) — host is the row's `remote` tag — and each row carries
+the validity interval of that version as scan sequence numbers:
+
+    valid_from  seq of the scan that first saw this version
+    valid_to    seq of the scan that replaced or lost it (NULL while current)
+
+Scan sequence numbers are allocated in file_scan_versions, which also records each scan's host,
+root and recursion. A rescan only inserts rows for created or modified entries, closes rows for
+deleted ones and logs those changes to file_history, so file_history is the diff log between
+scans. Unchanged entries are not rewritten: their paths are staged in file_scan_seen until the
+scan is finalized, which closes the current rows it neither re-inserted nor saw. scan_scope() turns any scan id (versioned or legacy) into a WHERE clause over `files`, so
+per-scan views are read through the (host, ...) indexes without materializing a copy.
+
+compact() drops row versions that no retained scan can see (and old append-mode copies), then
+VACUUMs; it is exposed as POST /api/admin/files/compact and `python -m scidk.core.file_versions`.
+"""
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Columns compared to decide whether a rescanned entry is a new version
+_VERSION_COLS = ('type', 'size', 'modified_time', 'hash', 'etag')
+
+
+def storage_mode() -> str:
+    mode = (os.environ.get('SCIDK_FILES_STORAGE') or 'append').strip().lower()
+    return 'versioned' if mode == 'versioned' else 'append'
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Versioning columns on files plus the scan sequence table; no-ops when already present."""
+    cur = conn.cursor()
+    cols = {row[1] for row in cur.execute("PRAGMA table_info(files);").fetchall()}
+    for col, decl in (('host', 'TEXT'), ('valid_from', 'INTEGER'), ('valid_to', 'INTEGER')):
+        if col not in cols:
+            cur.execute(f"ALTER TABLE files ADD COLUMN {col} {decl};")
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS file_scan_versions (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            scan_id TEXT NOT NULL UNIQUE,
+            host TEXT,
+            root TEXT,
+            recursive INTEGER,
+            created INTEGER DEFAULT 0,
+            modified INTEGER DEFAULT 0,
+            deleted INTEGER DEFAULT 0,
+            started REAL,
+            finalized REAL
+        );
+        """
+    )
+    # Paths a scan saw unchanged, kept until finalize_scan (or compact, for scans never finalized)
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS file_scan_seen (seq INTEGER NOT NULL, host TEXT NOT NULL, path TEXT NOT NULL, "
+        "PRIMARY KEY (seq, host, path)) WITHOUT ROWID;"
+    )
+    # One current version per (host, path); append-mode rows have host NULL and stay out of these indexes
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_files_current ON files(host, path) WHERE valid_to IS NULL AND host IS NOT NULL;")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_files_host_path ON files(host, path, valid_from) WHERE host IS NOT NULL;")
+    # Browse order (type DESC, name) with the scan_scope columns, so per-scan listings filter in the index
+    # and read only the rows they return
+    cur.execute("DROP INDEX IF EXISTS idx_files_host_parent;")
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_files_host_parent_type_name ON files("
+        "host, parent_path, type DESC, name, valid_from, valid_to, path, file_extension) WHERE host IS NOT NULL;"
+    )
+
+
+def _prefix_range(root: str) -> Tuple[str, str]:
+    """[lo, hi) bounds covering every path strictly under root, usable by an index (unlike LIKE 'root/%')."""
+    prefix = root if root.endswith(':') or root.endswith('/') else root + '/'
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def scan_info(conn: sqlite3.Connection, scan_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        row = conn.execute(
+            "SELECT seq, host, root, recursive, created, modified, deleted, finalized FROM file_scan_versions WHERE scan_id = ?",
+            (scan_id,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if not row:
+        return None
+    keys = ('seq', 'host', 'root', 'recursive', 'created', 'modified', 'deleted', 'finalized')
+    return dict(zip(keys, row))
+
+
+def scan_scope(conn: sqlite3.Connection, scan_id: str) -> Tuple[str, List[Any]]:
+    """(where_sql, params) selecting a scan's rows from `files` in either storage mode."""
+    info = scan_info(conn, scan_id)
+    if info is None:
+        return "scan_id = ?", [scan_id]
+    seq = info['seq']
+    sql = "host = ? AND valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)"
+    params: List[Any] = [info['host'] or '', seq, seq]
+    root = info.get('root')
+    if root:
+        if info.get('recursive') == 0:
+            sql += " AND (path = ? OR parent_path = ?)"
+            params += [root, root]
+        else:
+            lo, hi = _prefix_range(root)
+            sql += " AND (path = ? OR (path >= ? AND path < ?))"
+            params += [root, lo, hi]
+    return sql, params
+
+
+def _scan_seq(conn: sqlite3.Connection, scan_id: str, host: str, cache: Dict[str, int]) -> int:
+    seq = cache.get(scan_id)
+    if seq is None:
+        conn.execute(
+            "INSERT OR IGNORE INTO file_scan_versions(scan_id, host, started) VALUES(?,?,?)", (scan_id, host, time.time())
+        )
+        seq = int(conn.execute("SELECT seq FROM file_scan_versions WHERE scan_id = ?", (scan_id,)).fetchone()[0])
+        cache[scan_id] = seq
+    return seq
+
+
+def _history(cur: sqlite3.Cursor, entries: List[Tuple]) -> None:
+    if entries:
+        cur.executemany(
+            "INSERT INTO file_history(filesystem, path, size, modified_time, hash, scan_id, change_type, "
+            "previous_size, previous_modified_time, previous_path, logical_key) VALUES (?,?,?,?,?,?,?,?,?,?,NULL)",
+            entries,
+        )
+
+
+def _stage_batch(cur: sqlite3.Cursor, rows: Sequence[Tuple], seqs: Dict[str, int]) -> None:
+    """Load a batch into temp.file_batch, keeping the last report of a (host, path) within the batch."""
+    cur.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS file_batch (path TEXT, parent_path TEXT, name TEXT, depth INTEGER, type TEXT, "
+        "size INTEGER, modified_time REAL, file_extension TEXT, mime_type TEXT, etag TEXT, hash TEXT, remote TEXT, "
+        "scan_id TEXT, extra_json TEXT, host TEXT NOT NULL, seq INTEGER NOT NULL, PRIMARY KEY (host, path))"
+    )
+    cur.execute("DELETE FROM temp.file_batch")
+    cur.executemany(
+        "INSERT OR REPLACE INTO temp.file_batch VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+        (tuple(r) + (r[11] or '', seqs[r[12]]) for r in rows),
+    )
+
+
+def upsert_rows(conn: sqlite3.Connection, rows: Sequence[Tuple]) -> int:
+    """Apply one batch of index rows (the batch_insert_files tuple shape) as versions.
+
+    The batch is joined against the current rows in one statement. Unchanged entries are only staged
+    in file_scan_seen; new and changed entries insert a row (closing the previous version) and are
+    logged to file_history. Returns the number of rows processed. Does not commit.
+    """
+    if not rows:
+        return 0
+    cur = conn.cursor()
+    seqs: Dict[str, int] = {}
+    for r in rows:
+        _scan_seq(conn, r[12], r[11] or '', seqs)
+    _stage_batch(cur, rows, seqs)
+    matched = cur.execute(
+        "SELECT b.host, b.path, b.size, b.modified_time, b.hash, b.scan_id, b.seq, "
+        "f.rowid, f.valid_from, f.size, f.modified_time, "
+        "f.type IS b.type AND f.size IS b.size AND f.modified_time IS b.modified_time AND f.hash IS b.hash AND f.etag IS b.etag "
+        # CROSS JOIN keeps the batch as the outer loop, probing idx_files_current once per row
+        "FROM temp.file_batch b CROSS JOIN files f "
+        "ON f.host = b.host AND f.path = b.path AND f.valid_to IS NULL AND f.host IS NOT NULL"
+    ).fetchall()
+    counts: Dict[str, List[int]] = {sid: [0, 0] for sid in seqs}
+    seen: List[Tuple] = []
+    same_scan: List[Tuple] = []
+    closed: List[Tuple] = []
+    history: List[Tuple] = []
+    for host, path, size, mtime, ahash, scan_id, seq, rowid, valid_from, prev_size, prev_mtime, unchanged in matched:
+        if unchanged:
+            if valid_from != seq:
+                seen.append((seq, host, path))
+        elif valid_from == seq:
+            # Same entry reported again within one scan: the later report wins
+            same_scan.append((rowid, host, path))
+        else:
+            closed.append((seq, rowid))
+            history.append((host, path, size, mtime, ahash, scan_id, 'modified', prev_size, prev_mtime, path))
+            counts[scan_id][1] += 1
+    cur.executemany("INSERT OR IGNORE INTO file_scan_seen(seq, host, path) VALUES (?,?,?)", seen)
+    cur.executemany(
+        "UPDATE files SET (parent_path, name, depth, type, size, modified_time, file_extension, mime_type, etag, hash, extra_json) = "
+        "(SELECT parent_path, name, depth, type, size, modified_time, file_extension, mime_type, etag, hash, extra_json "
+        "FROM temp.file_batch WHERE host = ? AND path = ?) WHERE rowid = ?",
+        [(host, path, rowid) for rowid, host, path in same_scan],
+    )
+    cur.executemany("UPDATE files SET valid_to = ? WHERE rowid = ?", closed)
+    # New entries and new versions: everything in the batch without a current row after the closes above
+    created = cur.execute(
+        "SELECT b.host, b.path, b.size, b.modified_time, b.hash, b.scan_id FROM temp.file_batch b "
+        "WHERE NOT EXISTS (SELECT 1 FROM files f WHERE f.host = b.host AND f.path = b.path AND f.valid_to IS NULL "
+        "AND f.host IS NOT NULL)"
+    ).fetchall()
+    modified = {(h[0], h[1]) for h in history}
+    for host, path, size, mtime, ahash, scan_id in created:
+        if (host, path) not in modified:
+            history.append((host, path, size, mtime, ahash, scan_id, 'created', None, None, None))
+            counts[scan_id][0] += 1
+    cur.execute(
+        "INSERT INTO files(path, parent_path, name, depth, type, size, modified_time, file_extension, mime_type, etag, hash, "
+        "remote, scan_id, extra_json, host, valid_from, valid_to) "
+        "SELECT b.path, b.parent_path, b.name, b.depth, b.type, b.size, b.modified_time, b.file_extension, b.mime_type, "
+        "b.etag, b.hash, b.remote, b.scan_id, b.extra_json, b.host, b.seq, NULL FROM temp.file_batch b "
+        "WHERE NOT EXISTS (SELECT 1 FROM files f WHERE f.host = b.host AND f.path = b.path AND f.valid_to IS NULL "
+        "AND f.host IS NOT NULL)"
+    )
+    _history(cur, history)
+    for scan_id, (n_created, n_modified) in counts.items():
+        if n_created or n_modified:
+            cur.execute(
+                "UPDATE file_scan_versions SET created = created + ?, modified = modified + ? WHERE scan_id = ?",
+                (n_created, n_modified, scan_id),
+            )
+    return len(rows)
+
+
+def finalize_scan(conn: sqlite3.Connection, scan_id: str, root: str, recursive: bool = True,
+                  unchanged_dirs: Iterable[str] = (), skip_subtrees: Iterable[str] = ()) -> Optional[Dict[str, int]]:
+    """Close current rows under root that this scan neither inserted nor saw unchanged, and record
+    the scan's scope.
+
+    unchanged_dirs: directories whose immediate files were skipped as unchanged (incremental scans);
+    their file rows stay current. skip_subtrees: subtrees pruned without listing; nothing under them
+    is closed. Returns {'created', 'modified', 'deleted'} or None for append-mode scans. Does not commit.
+    """
+    info = scan_info(conn, scan_id)
+    if info is None:
+        return None
+    seq, host = info['seq'], info['host'] or ''
+    root = str(root)
+    unchanged = set(unchanged_dirs or ())
+    pruned = [_prefix_range(s) for s in (skip_subtrees or ())]
+    unseen = ("valid_to IS NULL AND valid_from < ? AND NOT EXISTS (SELECT 1 FROM file_scan_seen s "
+              "WHERE s.seq = ? AND s.host = files.host AND s.path = files.path)")
+    if recursive:
+        lo, hi = _prefix_range(root)
+        candidates = conn.execute(
+            "SELECT rowid, path, parent_path, type, size, modified_time FROM files "
+            f"WHERE host = ? AND (path = ? OR (path >= ? AND path < ?)) AND {unseen}",
+            (host, root, lo, hi, seq, seq),
+        ).fetchall()
+    else:
+        candidates = conn.execute(
+            "SELECT rowid, path, parent_path, type, size, modified_time FROM files "
+            f"WHERE host = ? AND parent_path = ? AND {unseen}",
+            (host, root, seq, seq),
+        ).fetchall()
+    closed: List[Tuple[int, int]] = []
+    history: List[Tuple] = []
+    for rowid, path, parent, typ, size, mtime in candidates:
+        if path == root:
+            continue
+        if typ != 'folder' and parent in unchanged:
+            continue
+        if any(lo_ <= path < hi_ or path == lo_.rstrip('/') for lo_, hi_ in pruned):
+            continue
+        closed.append((seq, rowid))
+        history.append((host, path, None, None, None, scan_id, 'deleted', size, mtime, path))
+    cur = conn.cursor()
+    cur.executemany("UPDATE files SET valid_to = ? WHERE rowid = ?", closed)
+    _history(cur, history)
+    cur.execute("DELETE FROM file_scan_seen WHERE seq = ?", (seq,))
+    cur.execute(
+        "UPDATE file_scan_versions SET root = ?, recursive = ?, deleted = deleted + ?, finalized = ? WHERE seq = ?",
+        (root, 1 if recursive else 0, len(closed), time.time(), seq),
+    )
+    info = scan_info(conn, scan_id) or {}
+    return {'created': int(info.get('created') or 0), 'modified': int(info.get('modified') or 0), 'deleted': len(closed)}
+
+
+def _drop_scan_records(cur: sqlite3.Cursor, scan_ids: List[str]) -> None:
+    """Remove the scans rows (and their per-scan tables) of scans whose index rows were compacted away."""
+    for i in range(0, len(scan_ids), 500):
+        chunk = scan_ids[i:i + 500]
+        marks = ','.join('?' * len(chunk))
+        for table, col in (('scan_members', 'scan_id'), ('scan_items', 'scan_id'), ('scan_progress', 'scan_id'),
+                           ('scan_selection_rules', 'scan_id'), ('scans', 'id')):
+            try:
+                cur.execute(f"DELETE FROM {table} WHERE {col} IN ({marks})", chunk)
+            except sqlite3.OperationalError:
+                pass  # table not created in this database
+
+
+def compact(conn: sqlite3.Connection, keep_scans: int = 3, vacuum: bool = True) -> Dict[str, Any]:
+    """Drop index rows that only old scans can see, keeping the newest keep_scans scans per (host, root)
+    (versioned) or per scan root (append mode), then VACUUM.
+
+    The dropped scans are removed from `scans` as well, so they no longer list; their ids are returned
+    in 'dropped_scan_ids'.
+    """
+    keep = max(1, int(keep_scans or 1))
+    out: Dict[str, Any] = {'keep_scans': keep, 'versions_removed': 0, 'scan_copies_removed': 0, 'scans_dropped': 0}
+    dropped: List[str] = []
+    cur = conn.cursor()
+    # Versioned: retention is per (host, root), so a root scanned once keeps its scan however often other
+    # roots of the same host are rescanned. A scan not finalized yet has no root and covers its whole host.
+    try:
+        scans = cur.execute("SELECT seq, scan_id, host, root, recursive FROM file_scan_versions ORDER BY seq DESC").fetchall()
+    except sqlite3.OperationalError:
+        scans = []
+    versioned = {r[1] for r in scans}
+    seen_per_root: Dict[Tuple[Any, Any], int] = {}
+    kept: Dict[str, List[Tuple]] = {}
+    for seq, scan_id, host, root, recursive in scans:
+        n = seen_per_root.get((host, root), 0)
+        seen_per_root[(host, root)] = n + 1
+        if n < keep:
+            lo, hi = _prefix_range(root) if root else (None, None)
+            kept.setdefault(host or '', []).append((seq, root, 1 if recursive is None else recursive, lo, hi))
+        else:
+            dropped.append(scan_id)
+    if scans:
+        cur.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS compact_kept (seq INTEGER PRIMARY KEY, root TEXT, recursive INTEGER, lo TEXT, hi TEXT)"
+        )
+    for host, rows in kept.items():
+        cur.execute("DELETE FROM temp.compact_kept")
+        cur.executemany("INSERT INTO temp.compact_kept VALUES (?,?,?,?,?)", rows)
+        # A closed version can go once no retained scan whose scope covers its path falls in [valid_from, valid_to)
+        cur.execute(
+            "DELETE FROM files WHERE host = ? AND valid_to IS NOT NULL AND NOT EXISTS (SELECT 1 FROM temp.compact_kept k "
+            "WHERE k.seq >= files.valid_from AND k.seq < files.valid_to AND (k.root IS NULL OR files.path = k.root "
+            "OR (k.recursive = 0 AND files.parent_path = k.root) OR (k.recursive <> 0 AND files.path >= k.lo AND files.path < k.hi)))",
+            (host,),
+        )
+        out['versions_removed'] += cur.rowcount
+    for i in range(0, len(dropped), 500):
+        chunk = dropped[i:i + 500]
+        cur.execute(f"DELETE FROM file_scan_versions WHERE scan_id IN ({','.join('?' * len(chunk))})", chunk)
+    # Staged observations of scans that were finalized (or dropped above) are no longer needed
+    try:
+        cur.execute("DELETE FROM file_scan_seen WHERE seq NOT IN (SELECT seq FROM file_scan_versions WHERE finalized IS NULL)")
+    except sqlite3.OperationalError:
+        pass
+    # Append mode: drop per-scan copies older than the newest keep scans of the same root
+    try:
+        roots = [r[0] for r in cur.execute("SELECT DISTINCT root FROM scans WHERE root IS NOT NULL").fetchall()]
+    except sqlite3.OperationalError:
+        roots = []
+    for root in roots:
+        old = [r[0] for r in cur.execute(
+            "SELECT id FROM scans WHERE root = ? ORDER BY coalesce(completed, started) DESC LIMIT -1 OFFSET ?",
+            (root, keep)).fetchall()]
+        for sid in old:
+            cur.execute("DELETE FROM files WHERE scan_id = ? AND host IS NULL", (sid,))
+            out['scan_copies_removed'] += cur.rowcount
+        dropped += [sid for sid in old if sid not in versioned]
+    _drop_scan_records(cur, dropped)
+    out['scans_dropped'] = len(dropped)
+    out['dropped_scan_ids'] = dropped
+    # Paths whose last rows were removed leave the search index
+    try:
+        from .search_index import purge_missing
+        out['search_removed'] = purge_missing(conn)
+    except sqlite3.OperationalError:
+        pass
+    conn.commit()
+    if vacuum:
+        try:
+            conn.execute("VACUUM")
+            out['vacuumed'] = True
+        except Exception as e:
+            out['vacuumed'] = False
+            out['vacuum_error'] = str(e)
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import json
+    from . import path_index_sqlite as pix
+
+    ap = argparse.ArgumentParser(description='Compact the SciDK file index (drops rows only old scans can see).')
+    ap.add_argument('command', choices=['compact'])
+    ap.add_argument('--keep', type=int, default=3, help='scans to keep per host/root (default 3)')
+    ap.add_argument('--no-vacuum', action='store_true')
+    args = ap.parse_args(argv)
+    conn = pix.connect()
+    try:
+        pix.init_db(conn)
+        print(json.dumps(compact(conn, keep_scans=args.keep, vacuum=not args.no_vacuum)))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
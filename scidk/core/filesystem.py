@@ -2,8 +2,6 @@ from pathlib import Path
 import hashlib
 import mimetypes
 import os
-import shutil
-import subprocess
 import time
 from typing import Dict, Iterable, List, Optional
 
@@ -16,118 +14,37 @@ class FilesystemManager:
         self.graph = graph
         self.registry = registry
         self.last_scan_source = 'python'  # one of: ncdu, gdu, python
-
-    def _list_files_with_ncdu(self, path: Path, recursive: bool = True) -> List[Path]:
-        """Attempt to use ncdu to enumerate files under path.
-        Returns a list of file Paths. If ncdu is unavailable or parsing fails, returns an empty list.
-        Note: ncdu's export format is not a stable public API; we heuristically extract absolute paths
-        from stdout. This is best-effort and falls back to Python traversal when empty.
-        """
-        ncdu = shutil.which('ncdu')
-        if not ncdu:
-            return []
+        # Files at or above this size get a sampled fingerprint instead of a full SHA-256 (0 disables).
         try:
-            # -q quiet, -o - output to stdout, -x stay on one filesystem
-            # We do not use interactive TUI (ncurses) because -o implies export without UI.
-            # Some ncdu versions may write a binary-like export. We'll scan stdout for path tokens.
-            proc = subprocess.run(
-                [ncdu, '-q', '-o', '-', '-x', str(path)],
-                check=False,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            blob = proc.stdout or b''
-            if not blob:
-                return []
-            root_bytes = os.fsencode(str(path.resolve()))
-            # Collect candidate strings separated by common delimiters
-            candidates: List[bytes] = []
-            for sep in (b'\x00', b'\n', b'\r', b'\t'):
-                candidates.extend(blob.split(sep))
-            found: List[Path] = []
-            seen = set()
-            for c in candidates:
-                if not c:
-                    continue
-                # Heuristic: look for substrings that start with the root path
-                idx = c.find(root_bytes)
-                if idx == -1:
-                    continue
-                # Trim to the end of token (strip control chars)
-                token = c[idx:]
-                # Clean potential trailing non-printables
-                token = token.strip(b'\x00\r\n\t\x01\x02\x03\x04\x05\x06\x07\x08\x0b\x0c\x0e\x0f')
-                try:
-                    s = os.fsdecode(token)
-                except Exception:
-                    continue
-                # Filter to within root and existing files
-                try:
-                    p = Path(s)
-                except Exception:
-                    continue
-                if p.exists() and p.is_file():
-                    # For non-recursive mode, later we'll filter by parent
-                    if s not in seen:
-                        seen.add(s)
-                        found.append(p)
-            # If non-recursive requested, keep only immediate children files
-            if not recursive:
-                found = [p for p in found if p.parent.resolve() == path.resolve()]
-            return found
+            self.sampled_min_bytes = int(os.environ.get('SCIDK_SAMPLED_HASH_MIN_BYTES') or 0)
         except Exception:
-            return []
+            self.sampled_min_bytes = 0
 
-    def _list_files_with_gdu(self, path: Path, recursive: bool = True) -> List[Path]:
-        """Attempt to use gdu to enumerate files under path via JSON output.
-        Returns a list of file Paths. If gdu is unavailable or parsing fails, returns an empty list.
-        We avoid strict schema by scanning stdout for absolute path tokens.
-        """
-        gdu = shutil.which('gdu')
-        if not gdu:
+    def _list_files_with_enumerator(self, name: str, path: Path, recursive: bool = True) -> List[Path]:
+        """Enumerate files under path with an external enumerator backend (see core.enumerators).
+        Returns an empty list if the tool is unavailable or its export cannot be parsed."""
+        from .enumerators import ENUMERATORS
+        enum = ENUMERATORS.get(name)
+        if enum is None or not enum.available():
             return []
+        root = os.path.realpath(str(path))
+        found: List[Path] = []
         try:
-            # Common flags: --json --no-progress
-            proc = subprocess.run(
-                [gdu, '--json', '--no-progress', str(path)],
-                check=False,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            blob = proc.stdout or b''
-            if not blob:
-                return []
-            root_bytes = os.fsencode(str(path.resolve()))
-            candidates: List[bytes] = []
-            for sep in (b'\x00', b'\n', b'\r', b'\t', b'"', b"'"):
-                candidates.extend(blob.split(sep))
-            found: List[Path] = []
-            seen = set()
-            for c in candidates:
-                if not c:
-                    continue
-                idx = c.find(root_bytes)
-                if idx == -1:
-                    continue
-                token = c[idx:]
-                token = token.strip(b'\x00\r\n\t\x01\x02\x03\x04\x05\x06\x07\x08\x0b\x0c\x0e\x0f')
-                try:
-                    s = os.fsdecode(token)
-                except Exception:
-                    continue
-                try:
-                    p = Path(s)
-                except Exception:
+            for dirpath, _dirnames, files in enum.walk(root):
+                if not recursive and dirpath != root:
                     continue
-                if p.exists() and p.is_file():
-                    if not recursive and p.parent.resolve() != path.resolve():
-                        continue
-                    if s not in seen:
-                        seen.add(s)
-                        found.append(p)
-            return found
+                found.extend(Path(dirpath) / fname for fname, _st, regular in files if regular)
         except Exception:
             return []
+        return found
+
+    def _list_files_with_ncdu(self, path: Path, recursive: bool = True) -> List[Path]:
+        """Enumerate files via ncdu's JSON export (ncdu -o -), parsed incrementally."""
+        return self._list_files_with_enumerator('ncdu', path, recursive=recursive)
+
+    def _list_files_with_gdu(self, path: Path, recursive: bool = True) -> List[Path]:
+        """Enumerate files via gdu's JSON export (gdu -o -, ncdu-compatible format)."""
+        return self._list_files_with_enumerator('gdu', path, recursive=recursive)
 
     def _iter_files_python(self, path: Path, recursive: bool = True) -> Iterable[Path]:
         files = path.rglob('*') if recursive else path.glob('*')
@@ -176,9 +93,24 @@ class FilesystemManager:
             count += 1
         return count
 
-    def create_dataset_node(self, file_path: Path) -> Dict:
-        st = file_path.stat()
-        checksum = self.calculate_checksum(file_path)
+    def create_dataset_node(self, file_path: Path, stat_result: Optional[os.stat_result] = None, hash_cache=None) -> Dict:
+        """Build a dataset dict for a local file.
+        Pass stat_result when the caller already has it (e.g. from os.scandir) to avoid a second stat.
+        Pass hash_cache (core.hash_cache.HashCache) to reuse the stored digest of unchanged files.
+        """
+        st = stat_result if stat_result is not None else file_path.stat()
+        sampled = bool(self.sampled_min_bytes) and int(st.st_size) >= self.sampled_min_bytes
+        if sampled:
+            from .path_index_sqlite import compute_sampled_fingerprint
+            compute = lambda: compute_sampled_fingerprint(str(file_path))
+        else:
+            compute = lambda: self.calculate_checksum(file_path)
+        if hash_cache is not None:
+            checksum = hash_cache.get_or_compute(str(file_path), st, compute, algo='sampled' if sampled else None)
+        else:
+            checksum = compute()
+        if not checksum:
+            raise OSError(f"Unable to fingerprint {file_path}")
         mime, _ = mimetypes.guess_type(str(file_path))
         return {
             'path': str(file_path),
@@ -189,9 +121,30 @@ class FilesystemManager:
             'modified': st.st_mtime,
             'mime_type': mime or 'application/octet-stream',
             'checksum': checksum,
+            # 'sampled' identities cover size + head/tail/interior blocks only; see complete_sampled_checksum
+            'checksum_mode': 'sampled' if sampled else 'full',
             'lifecycle_state': 'active'
         }
 
+    def complete_sampled_checksum(self, dataset: Dict, hash_cache=None) -> Optional[str]:
+        """Compute the full SHA-256 for a dataset whose identity is a sampled fingerprint.
+        The dataset keeps its sampled checksum as identity; the full digest is stored as 'full_checksum'.
+        Intended to run lazily in the background after a scan. Returns the digest or None.
+        """
+        if dataset.get('checksum_mode') != 'sampled' or dataset.get('full_checksum'):
+            return dataset.get('full_checksum')
+        p = Path(dataset.get('path') or '')
+        try:
+            st = p.stat()
+            if hash_cache is not None:
+                digest = hash_cache.get_or_compute(str(p), st, lambda: self.calculate_checksum(p))
+            else:
+                digest = self.calculate_checksum(p)
+        except Exception:
+            return None
+        dataset['full_checksum'] = digest
+        return digest
+
     def create_dataset_remote(self, remote_path: str, size_bytes: int = 0, modified_ts: float = 0.0, mime: Optional[str] = None) -> Dict:
         """Create a dataset node for a remote (non-local) file.
         Uses a stable checksum derived from the remote path string to ensure idempotency.
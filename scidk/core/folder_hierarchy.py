@@ -117,3 +117,56 @@ def build_complete_folder_hierarchy(rows: List[Dict], folder_rows: List[Dict], s
         seen_fp.add(key)
         dedup.append(fr)
     return dedup
+
+
+def iter_folder_hierarchy(folder_rows: Iterable[Dict], file_folders: Iterable[str], scan: Dict) -> Iterable[Dict]:
+    """Streaming counterpart of build_complete_folder_hierarchy.
+
+    Yields the same deduplicated (path, parent) folder rows, in discovery order instead of sorted,
+    while holding only the set of folder paths already emitted (never the file rows). file_folders
+    is the stream of each file's containing folder (duplicates are fine).
+    """
+    scan_base = (scan or {}).get('path') or ''
+    emitted = set()  # set[Tuple[str, str]] (path, parent)
+    walked = set()   # folders whose ancestor chain up to scan_base has been emitted
+
+    def _row(child: str, par: str):
+        key = (child, par)
+        if key in emitted:
+            return None
+        emitted.add(key)
+        return {'path': child, 'name': _name_of(child), 'parent': par, 'parent_name': _name_of(par) if par else ''}
+
+    def _node(pth: str):
+        return _row(pth, _parent_of(pth))
+
+    def _chain(start: str) -> Iterable[Dict]:
+        curp = start
+        while curp and curp not in walked:
+            walked.add(curp)
+            par = _parent_of(curp)
+            if not par or par == curp:
+                break
+            for r in (_node(par), _node(curp), _row(curp, par)):
+                if r is not None:
+                    yield r
+            if scan_base and par == scan_base:
+                break
+            curp = par
+
+    def _folder(child: str, parent: str) -> Iterable[Dict]:
+        for r in (_node(child), _node(parent) if parent else None, _row(child, parent) if parent else None):
+            if r is not None:
+                yield r
+        if parent:
+            yield from _chain(parent)
+
+    for fr in folder_rows or []:
+        child = (fr.get('path') or '').strip()
+        if child:
+            yield from _folder(child, fr.get('parent') or _parent_of(child))
+
+    for fld in file_folders or []:
+        fld = (fld or '').strip()
+        if fld:
+            yield from _folder(fld, _parent_of(fld))
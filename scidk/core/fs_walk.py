@@ -0,0 +1,106 @@
+"""Single-pass, os.scandir-based directory traversal for local scans.
+
+Each directory is listed exactly once and each file is stat'ed exactly once; the resulting
+``os.stat_result`` is carried through to index rows, directory signatures and dataset creation
+so no later stage needs to stat or resolve the path again. Syscalls are tallied per scan in a
+``SyscallCounter`` so the saving is observable in scan telemetry.
+"""
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class SyscallCounter:
+    """Thread-safe tally of filesystem syscalls issued during one scan (scandir, stat, open)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    def inc(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + int(n)
+
+    def get(self, name: str) -> int:
+        return int(self._counts.get(name, 0))
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+def entry_stat(ent: os.DirEntry, counter: Optional[SyscallCounter] = None) -> Optional[os.stat_result]:
+    """Stat a DirEntry once. Regular files reuse the lstat DirEntry already caches; symlinks are followed
+    (matching Path.stat semantics) and fall back to lstat when dangling. Returns None if unreadable."""
+    try:
+        if counter is not None:
+            counter.inc('stat')
+        if ent.is_symlink():
+            try:
+                return ent.stat(follow_symlinks=True)
+            except OSError:
+                return ent.stat(follow_symlinks=False)
+        return ent.stat(follow_symlinks=False)
+    except OSError:
+        return None
+
+
+def scandir_walk(top: str, counter: Optional[SyscallCounter] = None) -> Iterator[Tuple[str, List[str], List[Tuple[str, Optional[os.stat_result], bool]]]]:
+    """Top-down walk like os.walk(followlinks=False), built on one os.scandir per directory.
+
+    Yields (dirpath, dirnames, files) where files is a list of (name, stat_result, is_regular).
+    Callers may prune traversal by mutating dirnames in place, exactly as with os.walk.
+    Symlinks to directories are listed in dirnames but never descended into.
+    """
+    stack = [top]
+    while stack:
+        dirpath = stack.pop()
+        dirnames: List[str] = []
+        links: set = set()
+        files: List[Tuple[str, Optional[os.stat_result], bool]] = []
+        try:
+            if counter is not None:
+                counter.inc('scandir')
+            with os.scandir(dirpath) as it:
+                for ent in it:
+                    try:
+                        is_dir = ent.is_dir()  # follows symlinks, like os.walk's classification
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        dirnames.append(ent.name)
+                        try:
+                            if ent.is_symlink():
+                                links.add(ent.name)
+                        except OSError:
+                            links.add(ent.name)
+                        continue
+                    try:
+                        regular = ent.is_file(follow_symlinks=False)
+                    except OSError:
+                        regular = False
+                    files.append((ent.name, entry_stat(ent, counter), regular))
+        except OSError:
+            continue
+        yield dirpath, dirnames, files
+        # Push in reverse so children are visited in listing order
+        for name in reversed(dirnames):
+            if name not in links:
+                stack.append(os.path.join(dirpath, name))
+
+
+def dir_signature(files: List[Tuple[str, Optional[os.stat_result], bool]]) -> Dict[str, object]:
+    """Immediate-files signature (regular files only) from already-collected stats."""
+    total = 0
+    max_m = 0.0
+    files_n = 0
+    for _name, st, regular in files:
+        if not regular:
+            continue
+        files_n += 1
+        if st is None:
+            continue
+        total += int(st.st_size)
+        if st.st_mtime and float(st.st_mtime) > max_m:
+            max_m = float(st.st_mtime)
+    return {'files': files_n, 'sum_size': int(total), 'max_mtime': float(max_m)}
@@ -0,0 +1,199 @@
+"""Candidate index for client-side fuzzy matching (FuzzyMatchingService.match_external_data).
+
+Scoring every external value against every existing value is O(N x M). ``FuzzyIndex`` keeps the
+scorer results identical for every pair that can reach the threshold and only generates those
+pairs (plus some false positives that scoring rejects):
+
+- Length filter: a length pair whose best possible score is below the threshold is never compared
+  (ratio <= 2*min/(l1+l2); Jaro-Winkler is bounded through Jaro's m <= min(l1, l2)).
+- q-gram filter (levenshtein ratio): a pair within Indel distance d shares at least
+  max(l1, l2) - q + 1 - q*d q-grams (counted as a multiset: grams are keyed by occurrence).
+  When that bound tau is positive, every qualifying target shares one of the value's
+  len - tau + 1 rarest grams, so only those grams' posting lists are probed; candidates whose
+  hits there cannot reach their own length's bound are dropped before scoring.
+- Scoring: rapidfuzz ``process.cdist`` over the candidates with ``score_cutoff`` at the threshold.
+
+Where no bound applies (short strings, low thresholds, Jaro-Winkler) candidates fall back to the
+length-filtered set. ``max_comparisons`` caps candidates scored per external value; when a value
+has more, the ones sharing the most grams are kept and the result is flagged ``truncated``.
+Large inputs are split across worker processes (SCIDK_FUZZY_WORKERS, default CPU count; inputs
+below SCIDK_FUZZY_PARALLEL_MIN values, default 5000, are matched inline).
+
+Phonetic blocking is not used: equal phonetic codes are neither necessary nor sufficient for an
+edit-distance score over the threshold, so it would change recall.
+"""
+import math
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Q = 2
+_EPS = 1e-9
+
+
+def occurrence_grams(text: str, q: int = Q) -> List[Tuple[str, int]]:
+    """q-grams keyed by occurrence (('ab', 0), ('ab', 1), ...) so set overlap equals multiset overlap."""
+    seen: Dict[str, int] = {}
+    out = []
+    for i in range(len(text) - q + 1):
+        g = text[i:i + q]
+        n = seen.get(g, 0)
+        seen[g] = n + 1
+        out.append((g, n))
+    return out
+
+
+def _length_bound(algorithm: str, la: int, lb: int) -> float:
+    """Upper bound of the similarity (0..1) of any two strings of these lengths."""
+    if la == 0 and lb == 0:
+        return 1.0
+    lo = min(la, lb)
+    if algorithm == 'jaro_winkler':
+        if lo == 0:
+            return 0.0
+        jaro = (lo / la + lo / lb + 1.0) / 3.0
+        return jaro + 0.4 * (1.0 - jaro)  # Winkler prefix boost: at most 4 chars x 0.1
+    return 2.0 * lo / (la + lb)
+
+
+def _scorer(algorithm: str):
+    """(rapidfuzz scorer, scale to 0..1) matching FuzzyMatchingService._compute_similarity."""
+    if algorithm == 'jaro_winkler':
+        from rapidfuzz.distance import JaroWinkler
+        return JaroWinkler.normalized_similarity, 1.0
+    from rapidfuzz import fuzz
+    return fuzz.ratio, 100.0
+
+
+class FuzzyIndex:
+    """Inverted q-gram index over normalized target values (order matters: ties go to the first)."""
+
+    def __init__(self, values: Sequence[str], algorithm: str = 'levenshtein', threshold: float = 0.8,
+                 max_comparisons: Optional[int] = None):
+        import numpy as np
+        self.values = list(values)
+        self.algorithm = algorithm if algorithm == 'jaro_winkler' else 'levenshtein'
+        self.threshold = float(threshold)
+        self.max_comparisons = int(max_comparisons) if max_comparisons else 0
+        self.lengths = np.fromiter((len(v) for v in self.values), dtype=np.int32, count=len(self.values))
+        self.by_length: Dict[int, object] = {}
+        for ln in np.unique(self.lengths):
+            self.by_length[int(ln)] = np.flatnonzero(self.lengths == ln).astype(np.int32)
+        postings: Dict[Tuple[str, int], List[int]] = {}
+        if self.algorithm == 'levenshtein':
+            for idx, v in enumerate(self.values):
+                for key in occurrence_grams(v):
+                    postings.setdefault(key, []).append(idx)
+        self.postings = {k: np.asarray(v, dtype=np.int32) for k, v in postings.items()}
+
+    # -- candidate generation -----------------------------------------------------------------
+    def _allowed_lengths(self, n: int) -> List[int]:
+        return [ln for ln in self.by_length if _length_bound(self.algorithm, n, ln) >= self.threshold - _EPS]
+
+    def _tau(self, n: int, ln: int) -> int:
+        dmax = math.floor((1.0 - self.threshold) * (n + ln) + _EPS)
+        return max(n, ln) - Q + 1 - Q * dmax
+
+    def candidates(self, value: str):
+        """(sorted target indices to score, truncated flag)."""
+        import numpy as np
+        n = len(value)
+        lengths = self._allowed_lengths(n)
+        if not lengths:
+            return np.empty(0, dtype=np.int32), False
+        allowed = np.zeros(int(max(self.by_length)) + 1, dtype=bool)
+        allowed[lengths] = True
+        keys = occurrence_grams(value) if self.algorithm == 'levenshtein' else []
+        tau = min(self._tau(n, ln) for ln in lengths) if keys else 0
+        if tau > 0:
+            keys.sort(key=lambda k: len(self.postings.get(k, ())))
+            probe = [self.postings[k] for k in keys[:len(keys) - tau + 1] if k in self.postings]
+            if not probe:
+                return np.empty(0, dtype=np.int32), False
+            cand, hits = np.unique(np.concatenate(probe), return_counts=True)
+            keep = allowed[self.lengths[cand]]
+            cand, hits = cand[keep], hits[keep]
+            # The tau - 1 unprobed grams add at most tau - 1 to the overlap: drop candidates that
+            # cannot reach their length-specific bound even then
+            need = np.zeros(len(allowed), dtype=np.int64)
+            for ln in lengths:
+                need[ln] = self._tau(n, ln) - (tau - 1)
+            cand = cand[hits >= need[self.lengths[cand]]]
+        else:
+            cand = np.concatenate([self.by_length[ln] for ln in lengths])
+            cand.sort()
+            cand = cand[allowed[self.lengths[cand]]]
+        if self.max_comparisons and len(cand) > self.max_comparisons:
+            return self._most_overlapping(cand, keys), True
+        return cand, False
+
+    def _most_overlapping(self, cand, keys):
+        """Keep the max_comparisons candidates sharing the most grams with the value."""
+        import numpy as np
+        counts = np.zeros(len(self.values), dtype=np.int32)
+        for k in keys:
+            p = self.postings.get(k)
+            if p is not None:
+                counts[p] += 1
+        order = np.argsort(-counts[cand], kind='stable')[:self.max_comparisons]
+        return np.sort(cand[order])
+
+    # -- scoring ------------------------------------------------------------------------------
+    def best_match(self, value: str) -> Tuple[int, float, bool, int]:
+        """(target index or -1, similarity 0..1, truncated, comparisons) for one normalized value."""
+        import numpy as np
+        from rapidfuzz import process
+        cand, truncated = self.candidates(value)
+        if len(cand) == 0:
+            return -1, 0.0, truncated, 0
+        scorer, scale = _scorer(self.algorithm)
+        cutoff = max(0.0, self.threshold - 1e-6) * scale  # slack: scorers with a cutoff round differently
+        choices = [self.values[i] for i in cand]
+        scores = process.cdist([value], choices, scorer=scorer, score_cutoff=cutoff, dtype=np.float64)[0]
+        best = int(np.argmax(scores))
+        if scores[best] <= 0:
+            return -1, 0.0, truncated, len(cand)
+        return int(cand[best]), float(scores[best]) / scale, truncated, len(cand)
+
+    def match_many(self, values: Sequence[str]) -> List[Tuple[int, float, bool, int]]:
+        return [self.best_match(v) for v in values]
+
+
+# -- worker processes -------------------------------------------------------------------------
+_WORKER_INDEX: Optional[FuzzyIndex] = None
+
+
+def _init_worker(index: FuzzyIndex) -> None:
+    global _WORKER_INDEX
+    _WORKER_INDEX = index
+
+
+def _match_chunk(values: List[str]) -> List[Tuple[int, float, bool, int]]:
+    return _WORKER_INDEX.match_many(values)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except Exception:
+        return default
+
+
+def match_values(index: FuzzyIndex, values: List[str], workers: Optional[int] = None) -> List[Tuple[int, float, bool, int]]:
+    """Best match for each value, split across worker processes for large inputs."""
+    workers = int(workers if workers is not None else _env_int('SCIDK_FUZZY_WORKERS', os.cpu_count() or 1))
+    if workers <= 1 or len(values) < _env_int('SCIDK_FUZZY_PARALLEL_MIN', 5000):
+        return index.match_many(values)
+    try:
+        import multiprocessing as mp
+        from concurrent.futures import ProcessPoolExecutor
+        size = max(1, math.ceil(len(values) / (workers * 4)))
+        chunks = [values[i:i + size] for i in range(0, len(values), size)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(index,)) as pool:
+            out: List[Tuple[int, float, bool, int]] = []
+            for part in pool.map(_match_chunk, chunks):
+                out.extend(part)
+            return out
+    except Exception:
+        # Process pool unavailable (sandboxed, unpicklable state): same result inline
+        return index.match_many(values)
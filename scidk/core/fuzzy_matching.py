@@ -85,6 +85,7 @@ class FuzzyMatchingService:
         self.db.execute('PRAGMA journal_mode=WAL;')
         self.db.row_factory = sqlite3.Row
         self._matcher = None  # Lazy-load rapidfuzz
+        self.last_match_stats: Dict[str, int] = {}  # candidate/comparison counts of the last match_external_data
         self.init_tables()
 
     def init_tables(self):
@@ -286,6 +287,10 @@ class FuzzyMatchingService:
                 'confidence': float (0.0-1.0),
                 'is_match': bool
             }
+
+        Only pairs that can reach settings.threshold are scored (see core.fuzzy_index), so a
+        record without a match reports confidence 0.0. At most settings.max_comparisons
+        candidates are scored per distinct value; records that hit the cap carry 'truncated'.
         """
         self._ensure_matcher()
         if settings is None:
@@ -294,9 +299,6 @@ class FuzzyMatchingService:
         if settings.algorithm == 'exact':
             return self._match_exact(external_records, existing_nodes, match_key, settings)
 
-        fuzz = self._matcher['fuzz']
-        matches = []
-
         # Normalize all existing node values for comparison
         existing_normalized = {}
         for node in existing_nodes:
@@ -306,7 +308,14 @@ class FuzzyMatchingService:
                 if len(normalized) >= settings.min_string_length:
                     existing_normalized[normalized] = node
 
-        # Match each external record
+        # Candidate index in front of scoring: only pairs that can reach the threshold are scored
+        from .fuzzy_index import FuzzyIndex, match_values
+        targets = list(existing_normalized)
+        target_nodes = list(existing_normalized.values())
+        index = FuzzyIndex(targets, settings.algorithm, settings.threshold, settings.max_comparisons)
+
+        matches: List[Optional[Dict[str, Any]]] = []
+        pending: List[Tuple[int, str]] = []
         for record in external_records:
             if match_key not in record or not record[match_key]:
                 matches.append({
@@ -330,28 +339,32 @@ class FuzzyMatchingService:
                 })
                 continue
 
-            # Find best match
-            best_match = None
-            best_confidence = 0.0
-
-            for norm_value, node in existing_normalized.items():
-                confidence = self._compute_similarity(
-                    external_value, norm_value, settings.algorithm, fuzz
-                )
-
-                if confidence > best_confidence:
-                    best_confidence = confidence
-                    best_match = node
-
-            is_match = best_confidence >= settings.threshold
-
-            matches.append({
-                'external_record': record,
-                'matched_node': best_match if is_match else None,
+            pending.append((len(matches), external_value))
+            matches.append(None)
+
+        # Score distinct values once (repeated external values are common in sample sheets)
+        distinct = list(dict.fromkeys(v for _, v in pending))
+        best = dict(zip(distinct, match_values(index, distinct)))
+        for pos, external_value in pending:
+            target_idx, best_confidence, truncated, _compared = best[external_value]
+            is_match = target_idx >= 0 and best_confidence >= settings.threshold
+            result = {
+                'external_record': external_records[pos],
+                'matched_node': target_nodes[target_idx] if is_match else None,
                 'confidence': best_confidence,
                 'is_match': is_match
-            })
-
+            }
+            if truncated:
+                result['truncated'] = True
+            matches[pos] = result
+
+        self.last_match_stats = {
+            'external': len(external_records),
+            'targets': len(targets),
+            'distinct_values': len(distinct),
+            'comparisons': sum(v[3] for v in best.values()),
+            'truncated': sum(1 for v in best.values() if v[2]),
+        }
         return matches
 
     def _match_exact(
@@ -405,8 +418,9 @@ class FuzzyMatchingService:
             return fuzz.ratio(str1, str2) / 100.0
 
         elif algorithm == 'jaro_winkler':
-            # Jaro-Winkler distance (0-100), normalize to 0.0-1.0
-            return fuzz.Jaro.distance(str1, str2)
+            # Jaro-Winkler similarity, already 0.0-1.0
+            from rapidfuzz.distance import JaroWinkler
+            return JaroWinkler.normalized_similarity(str1, str2)
 
         else:
             # Default to Levenshtein
@@ -1,6 +1,6 @@
 import hashlib
 import time
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 
 class InMemoryGraph:
@@ -24,6 +24,9 @@ class InMemoryGraph:
         self.ro_files: Dict[str, set] = {}
         # ro_id -> set of folder paths (strings) contained in RO
         self.ro_folders: Dict[str, set] = {}
+        # Dataset checksums changed since the search index last synced (see search_index.sync_graph)
+        self._search_dirty: set = set()
+        self._search_synced = False
 
     def _dataset_id(self, checksum: str) -> str:
         return hashlib.sha1(checksum.encode()).hexdigest()[:16]
@@ -95,6 +98,7 @@ class InMemoryGraph:
             ds['interpretation_errors'] = []
             self.datasets[checksum] = ds
             self.by_id[ds['id']] = checksum
+        self._search_dirty.add(checksum)
         return ds
 
     def add_interpretation(self, checksum: str, interpreter_id: str, payload: Dict):
@@ -104,10 +108,21 @@ class InMemoryGraph:
         payload = payload.copy()
         payload['timestamp'] = payload.get('timestamp') or time.time()
         ds['interpretations'][interpreter_id] = payload
+        self._search_dirty.add(checksum)
 
     def list_datasets(self) -> List[Dict]:
         return list(self.datasets.values())
 
+    def search_changes(self):
+        """(full, datasets) for the search index: every dataset before the first sync, then changed ones."""
+        if not self._search_synced:
+            return True, list(self.datasets.values())
+        return False, [self.datasets[ch] for ch in list(self._search_dirty) if ch in self.datasets]
+
+    def mark_search_synced(self, full: bool, checksums: List[str]):
+        self._search_synced = self._search_synced or full
+        self._search_dirty.difference_update(checksums)
+
     def get_dataset(self, dataset_id: str) -> Optional[Dict]:
         checksum = self.by_id.get(dataset_id)
         if not checksum:
@@ -325,6 +340,14 @@ class InMemoryGraph:
         for ch in to_del:
             del self.dataset_scans[ch]
 
+    # Columns of the rows iter_instances yields for each supported label
+    INSTANCE_COLUMNS = {
+        'File': ['id', 'path', 'filename', 'extension', 'size_bytes', 'created', 'modified', 'mime_type', 'checksum'],
+        'Folder': ['path', 'name', 'file_count'],
+        'Scan': ['id', 'started', 'ended', 'committed', 'num_files'],
+        'ResearchObject': ['id', 'name', 'path', 'created_at', 'file_count', 'folder_count'],
+    }
+
     def list_instances(self, label: str) -> List[Dict]:
         """Return instance rows for the given node label.
         Supported labels: File, Folder, Scan.
@@ -332,11 +355,27 @@ class InMemoryGraph:
         - Folder: returns dicts with path and file_count
         - Scan: returns committed scans with id, started/ended timestamps and counts
         """
+        return list(self.iter_instances(label))
+
+    def instance_columns(self, label: str) -> Optional[List[str]]:
+        """Column names of the rows iter_instances(label) yields; None when the label has no fixed columns."""
+        cols = self.INSTANCE_COLUMNS.get((label or '').strip())
+        return list(cols) if cols is not None else None
+
+    def iter_instances(self, label: str, limit: Optional[int] = None) -> Iterator[Dict]:
+        """Yield instance rows for the given node label (see list_instances), one at a time."""
         label = (label or '').strip()
+        n = 0
+        for row in self._instance_rows(label):
+            if limit is not None and n >= limit:
+                return
+            n += 1
+            yield row
+
+    def _instance_rows(self, label: str) -> Iterator[Dict]:
         if label == 'File':
-            rows = []
             for d in self.list_datasets():
-                rows.append({
+                yield {
                     'id': d.get('id'),
                     'path': d.get('path'),
                     'filename': d.get('filename'),
@@ -346,8 +385,8 @@ class InMemoryGraph:
                     'modified': d.get('modified'),
                     'mime_type': d.get('mime_type'),
                     'checksum': d.get('checksum'),
-                })
-            return rows
+                }
+            return
         if label == 'Folder':
             from pathlib import Path as _P
             counts: Dict[str, int] = {}
@@ -357,9 +396,9 @@ class InMemoryGraph:
                     continue
                 parent = str(_P(p).parent)
                 counts[parent] = counts.get(parent, 0) + 1
-            rows = [{'path': k, 'name': (_P(k).name if k else ''), 'file_count': v} for k, v in counts.items()]
-            rows.sort(key=lambda r: r['path'])
-            return rows
+            for k in sorted(counts):
+                yield {'path': k, 'name': (_P(k).name if k else ''), 'file_count': counts[k]}
+            return
         if label == 'Scan':
             rows = []
             for sid, s in self.scans.items():
@@ -371,7 +410,8 @@ class InMemoryGraph:
                     'num_files': len(s.get('checksums') or []),
                 })
             rows.sort(key=lambda r: r.get('started') or 0, reverse=True)
-            return rows
+            yield from rows
+            return
         if label == 'ResearchObject':
             rows = []
             for ro_id, ro in self.research_objects.items():
@@ -384,5 +424,4 @@ class InMemoryGraph:
                     'folder_count': len(self.ro_folders.get(ro_id, set())),
                 })
             rows.sort(key=lambda r: (r.get('name') or r.get('path') or ''))
-            return rows
-        return []
+            yield from rows
@@ -0,0 +1,143 @@
+"""Persistent content-hash cache backed by the SQLite path index (table ``hash_cache``).
+
+A file whose (size, mtime_ns, inode, dev) tuple matches the cached row reuses the stored digest
+instead of re-reading its content. Metadata from external enumerators (ncdu/gdu) only has whole-second
+mtimes and mostly no inode: when either side is coarse the mtime is compared in seconds, and an
+unknown (0) inode or device is not compared, so both backends share the cache. ``verify=True`` forces a rehash of every file, refreshes the
+cache, and counts digests that changed without a metadata change (silent corruption / clock skew).
+
+Safe to share across scan worker threads: each thread gets its own SQLite connection and writes
+are buffered and flushed in batches.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import path_index_sqlite as pix
+
+
+_NS = 1_000_000_000
+
+
+def _key(st: os.stat_result) -> Tuple[int, int, int, int]:
+    return (int(st.st_size), int(st.st_mtime_ns), int(st.st_ino), int(st.st_dev))
+
+
+def _matches(row: Tuple[int, int, int, int], st: os.stat_result) -> bool:
+    size, mtime_ns, inode, dev = row
+    cur_size, cur_mtime_ns, cur_inode, cur_dev = _key(st)
+    if size != cur_size:
+        return False
+    # Rows stored from a coarse listing have no inode (unless the file is hardlinked)
+    coarse = getattr(st, 'coarse', False) or inode == 0
+    if (mtime_ns // _NS != cur_mtime_ns // _NS) if coarse else (mtime_ns != cur_mtime_ns):
+        return False
+    if inode and cur_inode and inode != cur_inode:
+        return False
+    return not (dev and cur_dev and dev != cur_dev)
+
+
+class HashCache:
+    def __init__(self, algo: str = 'sha256', verify: bool = False, flush_every: int = 1000):
+        self.algo = algo
+        self.verify = bool(verify)
+        self.flush_every = int(flush_every)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns: List = []
+        self._pending: List[Tuple] = []
+        self.hits = 0
+        self.misses = 0
+        self.mismatches = 0
+        self.stored = 0
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Used only by this thread; check_same_thread=False so close() can run from the scan thread
+            conn = pix.connect(check_same_thread=False)
+            pix.init_db(conn)
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    def lookup(self, path: str, st: os.stat_result, algo: Optional[str] = None) -> Optional[str]:
+        """Return the cached digest if the file's metadata tuple is unchanged, else None."""
+        try:
+            row = self._conn().execute(
+                "SELECT size, mtime_ns, inode, dev, digest FROM hash_cache WHERE path = ? AND algo = ?",
+                (path, algo or self.algo),
+            ).fetchone()
+        except Exception:
+            return None
+        if row and _matches(tuple(int(v) if v is not None else -1 for v in row[:4]), st):
+            return row[4]
+        return None
+
+    def store(self, path: str, st: os.stat_result, digest: str, algo: Optional[str] = None) -> None:
+        size, mtime_ns, inode, dev = _key(st)
+        with self._lock:
+            self._pending.append((path, algo or self.algo, size, mtime_ns, inode, dev, digest, time.time()))
+            do_flush = len(self._pending) >= self.flush_every
+        if do_flush:
+            self.flush()
+
+    def get_or_compute(self, path: str, st: Optional[os.stat_result], compute: Callable[[], str], algo: Optional[str] = None) -> str:
+        """Return the digest for path, hashing only on a cache miss (or always in verify mode).
+        algo overrides the cache's default algorithm (e.g. 'sampled' fingerprints next to 'sha256')."""
+        if st is None:
+            return compute()
+        cached = self.lookup(path, st, algo)
+        if cached is not None and not self.verify:
+            with self._lock:
+                self.hits += 1
+            return cached
+        digest = compute()
+        with self._lock:
+            self.misses += 1
+            if cached is not None and cached != digest:
+                self.mismatches += 1
+        if cached != digest:
+            self.store(path, st, digest, algo)
+        return digest
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            conn = self._conn()
+            conn.executemany(
+                "INSERT OR REPLACE INTO hash_cache(path, algo, size, mtime_ns, inode, dev, digest, updated) VALUES (?,?,?,?,?,?,?,?)",
+                batch,
+            )
+            conn.commit()
+            with self._lock:
+                self.stored += len(batch)
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for c in conns:
+            try:
+                c.close()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, object]:
+        total = self.hits + self.misses
+        return {
+            'algo': self.algo,
+            'verify': self.verify,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total) if total else 0.0,
+            'mismatches': self.mismatches,
+            'stored': self.stored,
+        }
@@ -0,0 +1,236 @@
+"""Content-addressed cache of interpreter results (SQLite table ``interpretation_cache``).
+
+Key: (checksum, interpreter id, interpreter version, config hash). A file whose content checksum is
+unchanged is not re-interpreted by the same interpreter version with the same configuration.
+
+- Size-bounded: once the stored results exceed SCIDK_INTERP_CACHE_MAX_MB (default 256), least
+  recently used entries are evicted. The stored size is summed once per instance and then kept as a
+  running total (adjusted by this instance's writes and deletes), so flushes do not rescan the table.
+- Version invalidation: ``invalidate_stale_versions(registry)`` drops rows written by any interpreter
+  version other than the one currently registered (runs once per cache instance).
+- Metrics: hits/misses/stores/evictions per instance via ``stats()``.
+
+Error results are never cached (they may be transient: timeouts, memory caps, missing deps).
+Thread-safe like HashCache: one SQLite connection per thread, writes buffered and flushed in batches.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import path_index_sqlite as pix
+
+
+def config_hash(interp) -> str:
+    """Stable hash of an interpreter's JSON-serializable instance configuration."""
+    cfg = {}
+    for k, v in sorted((getattr(interp, '__dict__', None) or {}).items()):
+        if k.startswith('_') or k in ('id', 'version'):
+            continue
+        try:
+            json.dumps(v)
+        except Exception:
+            continue
+        cfg[k] = v
+    return hashlib.sha1(json.dumps(cfg, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _max_bytes() -> int:
+    try:
+        return int(float(os.environ.get('SCIDK_INTERP_CACHE_MAX_MB') or 256) * 1024 * 1024)
+    except Exception:
+        return 256 * 1024 * 1024
+
+
+class InterpretationCache:
+    def __init__(self, max_bytes: Optional[int] = None, flush_every: int = 500):
+        self.max_bytes = int(max_bytes if max_bytes is not None else _max_bytes())
+        self.flush_every = int(flush_every)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns: List = []
+        self._pending: List[Tuple] = []
+        self._touched: Dict[Tuple, float] = {}
+        self._total: Optional[int] = None  # bytes stored, loaded on the first flush
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        self.invalidated = 0
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = pix.connect(check_same_thread=False)
+            pix.init_db(conn)
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    def _key(self, checksum: str, interp) -> Tuple[str, str, str, str]:
+        return (checksum, getattr(interp, 'id', ''), str(getattr(interp, 'version', '0.0.1')), config_hash(interp))
+
+    def get(self, checksum: Optional[str], interp) -> Optional[Dict[str, Any]]:
+        if not checksum:
+            return None
+        key = self._key(checksum, interp)
+        try:
+            row = self._conn().execute(
+                "SELECT result_json FROM interpretation_cache WHERE checksum = ? AND interpreter_id = ? "
+                "AND interpreter_version = ? AND config_hash = ?",
+                key,
+            ).fetchone()
+        except Exception:
+            row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+        try:
+            return json.loads(row[0])
+        except Exception:
+            return None
+
+    def put(self, checksum: Optional[str], interp, result: Dict[str, Any]) -> None:
+        if not checksum or not isinstance(result, dict) or result.get('status') == 'error':
+            return
+        try:
+            blob = json.dumps(result, default=str)
+        except Exception:
+            return
+        now = time.time()
+        with self._lock:
+            self._pending.append(self._key(checksum, interp) + (blob, len(blob), now, now))
+            do_flush = len(self._pending) >= self.flush_every
+        if do_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, []
+            touched, self._touched = self._touched, {}
+        if not batch and not touched:
+            return
+        try:
+            conn = self._conn()
+            if batch:
+                delta = self._size_delta(conn, batch)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO interpretation_cache(checksum, interpreter_id, interpreter_version, config_hash, "
+                    "result_json, size_bytes, created, last_used) VALUES (?,?,?,?,?,?,?,?)",
+                    batch,
+                )
+            if touched:
+                conn.executemany(
+                    "UPDATE interpretation_cache SET last_used = ? WHERE checksum = ? AND interpreter_id = ? "
+                    "AND interpreter_version = ? AND config_hash = ?",
+                    [(ts,) + key for key, ts in touched.items()],
+                )
+            conn.commit()
+            with self._lock:
+                self.stored += len(batch)
+                if batch and self._total is not None:
+                    self._total += delta
+            if batch:
+                self._evict(conn)
+        except Exception:
+            pass
+
+    def _size_delta(self, conn, batch: List[Tuple]) -> int:
+        """Bytes the batch adds: its final size per key minus the size of the rows it replaces."""
+        sizes = {row[:4]: row[5] for row in batch}
+        replaced = 0
+        for key in sizes:
+            old = conn.execute(
+                "SELECT size_bytes FROM interpretation_cache WHERE checksum = ? AND interpreter_id = ? "
+                "AND interpreter_version = ? AND config_hash = ?",
+                key,
+            ).fetchone()
+            replaced += int(old[0] or 0) if old else 0
+        return sum(sizes.values()) - replaced
+
+    def _stored_bytes(self, conn) -> int:
+        with self._lock:
+            total = self._total
+        if total is None:
+            total = int(conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM interpretation_cache").fetchone()[0] or 0)
+            with self._lock:
+                if self._total is None:
+                    self._total = total
+                total = self._total
+        return total
+
+    def _evict(self, conn) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        if self.max_bytes <= 0:
+            return
+        excess = self._stored_bytes(conn) - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        freed = 0
+        for rowid, size in conn.execute("SELECT rowid, size_bytes FROM interpretation_cache ORDER BY last_used ASC"):
+            victims.append((rowid,))
+            freed += int(size or 0)
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM interpretation_cache WHERE rowid = ?", victims)
+        conn.commit()
+        with self._lock:
+            self.evicted += len(victims)
+            self._total -= freed
+
+    def invalidate_stale_versions(self, registry) -> int:
+        """Delete cached results of interpreter versions that are no longer the registered one."""
+        current = {iid: str(getattr(i, 'version', '0.0.1')) for iid, i in (getattr(registry, 'by_id', None) or {}).items()}
+        if not current:
+            return 0
+        try:
+            conn = self._conn()
+            n = freed = 0
+            for iid, ver in current.items():
+                freed += int(conn.execute(
+                    "SELECT COALESCE(SUM(size_bytes), 0) FROM interpretation_cache WHERE interpreter_id = ? "
+                    "AND interpreter_version != ?",
+                    (iid, ver),
+                ).fetchone()[0] or 0)
+                n += conn.execute(
+                    "DELETE FROM interpretation_cache WHERE interpreter_id = ? AND interpreter_version != ?",
+                    (iid, ver),
+                ).rowcount or 0
+            conn.commit()
+        except Exception:
+            return 0
+        with self._lock:
+            self.invalidated += n
+            if self._total is not None:
+                self._total -= freed
+        return n
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            conns, self._conns = self._conns, []
+            self._local = threading.local()
+        for c in conns:
+            try:
+                c.close()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, object]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total) if total else 0.0,
+            'stored': self.stored,
+            'evicted': self.evicted,
+            'invalidated': self.invalidated,
+            'max_bytes': self.max_bytes,
+        }
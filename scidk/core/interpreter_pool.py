@@ -0,0 +1,336 @@
+"""Interpreter execution engine backed by a pool of worker processes.
+
+``submit(interp, path)`` returns a ``concurrent.futures.Future`` resolved with the interpreter's
+result dict, so callers can consume results as they finish (``as_completed``) and CPU-heavy parsing
+runs on every core instead of inside the scan thread.
+
+Limits are enforced per task by a dispatcher thread in the parent process:
+- time: a worker exceeding its interpreter's timeout is killed and replaced (InterpreterTimeout)
+- memory: worker RSS is polled from /proc; a worker over the cap is killed (InterpreterMemoryExceeded)
+Per-interpreter limits come from ``timeout_sec`` / ``max_rss_mb`` attributes on the interpreter,
+overridable via SCIDK_INTERP_LIMITS='{"xlsx_table": {"timeout_sec": 120, "max_rss_mb": 2048}}';
+defaults are SCIDK_INTERP_TIMEOUT_SEC (60) and SCIDK_INTERP_MAX_RSS_MB (0 = no cap).
+
+Every finished task is reported to ``registry.record_usage`` with its in-worker execution time.
+SCIDK_INTERP_EXECUTION=inline runs interpreters in the calling thread (same accounting, no limits);
+interpreters that cannot be pickled always run inline.
+"""
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import pickle
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+class InterpreterTimeout(Exception):
+    pass
+
+
+class InterpreterMemoryExceeded(Exception):
+    pass
+
+
+class InterpreterWorkerDied(Exception):
+    pass
+
+
+def _worker_main(conn) -> None:
+    """Worker loop: receive (interp_key, blob, path), run, send (ok, payload, elapsed_ms).
+    The key names one pickled configuration of an interpreter; blob is None when the worker already
+    holds it. ('ready',) is sent once after startup and ('loaded',) after unpickling a new
+    interpreter, so process start-up and interpreter imports are not charged to a task's time limit."""
+    cache: Dict[str, Any] = {}
+    conn.send(('ready',))
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        if msg is None:
+            return
+        interp_key, blob, path = msg
+        try:
+            if blob is not None:
+                cache[interp_key] = pickle.loads(blob)
+                conn.send(('loaded',))
+        except BaseException as e:
+            conn.send((False, f"cannot load interpreter {interp_key}: {e}", 0.0))
+            continue
+        t0 = time.perf_counter()
+        try:
+            result = cache[interp_key].interpret(Path(path))
+            out = (True, result)
+        except BaseException as e:  # MemoryError, RecursionError, ...
+            out = (False, f"{type(e).__name__}: {e}")
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        try:
+            conn.send((out[0], out[1], elapsed_ms))
+        except Exception as e:
+            conn.send((False, f"unpicklable result: {e}", elapsed_ms))
+
+
+def _rss_mb(pid: int) -> float:
+    try:
+        with open(f'/proc/{pid}/status', 'rb') as fh:
+            for line in fh:
+                if line.startswith(b'VmRSS:'):
+                    return int(line.split()[1]) / 1024.0
+    except Exception:
+        pass
+    return 0.0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except Exception:
+        return default
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child = ctx.Pipe(duplex=True)
+        self.proc = ctx.Process(target=_worker_main, args=(child,), daemon=True, name='scidk-interp-worker')
+        self.proc.start()
+        child.close()
+        self.known: set = set()
+        self.ready = False
+        self.task: Optional[tuple] = None
+        self.started = 0.0
+
+    def kill(self) -> None:
+        try:
+            self.proc.kill()
+            self.proc.join(timeout=5)
+        except Exception:
+            pass
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+class InterpreterPool:
+    def __init__(self, workers: Optional[int] = None, timeout_sec: Optional[float] = None,
+                 max_rss_mb: Optional[float] = None, poll_interval: float = 0.05, start_method: str = 'spawn'):
+        self.workers = int(workers or os.environ.get('SCIDK_INTERP_WORKERS') or (os.cpu_count() or 2))
+        self.timeout_sec = float(timeout_sec if timeout_sec is not None else _env_float('SCIDK_INTERP_TIMEOUT_SEC', 60.0))
+        self.max_rss_mb = float(max_rss_mb if max_rss_mb is not None else _env_float('SCIDK_INTERP_MAX_RSS_MB', 0.0))
+        try:
+            self.overrides: Dict[str, Dict[str, float]] = json.loads(os.environ.get('SCIDK_INTERP_LIMITS') or '{}')
+        except Exception:
+            self.overrides = {}
+        self.poll_interval = poll_interval
+        self._ctx = mp.get_context(start_method)
+        self._pending: deque = deque()
+        self._cv = threading.Condition()
+        self._pool: list = []
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'submitted': 0, 'completed': 0, 'errors': 0, 'timeouts': 0, 'memory_kills': 0,
+                      'worker_deaths': 0, 'inline': 0, 'respawns': 0}
+
+    # -- limits -------------------------------------------------------------------------------
+    def limits_for(self, interp) -> Tuple[float, float]:
+        iid = getattr(interp, 'id', '')
+        o = self.overrides.get(iid) or {}
+        timeout = o.get('timeout_sec', getattr(interp, 'timeout_sec', None) or self.timeout_sec)
+        rss = o.get('max_rss_mb', getattr(interp, 'max_rss_mb', None) or self.max_rss_mb)
+        return float(timeout or 0), float(rss or 0)
+
+    # -- submission ---------------------------------------------------------------------------
+    @staticmethod
+    def _blob(interp) -> Tuple[str, Optional[bytes]]:
+        """(key, pickled interpreter). Pickled on every submit so a reconfigured interpreter is
+        never served from a stale copy; the key includes a digest of the bytes, so workers unpickle
+        each configuration once and only receive the blob when they do not hold that key yet."""
+        iid = getattr(interp, 'id', '')
+        try:
+            blob = pickle.dumps(interp)
+        except Exception:
+            return iid, None
+        return f"{iid}@{hashlib.blake2b(blob, digest_size=8).hexdigest()}", blob
+
+    def submit(self, interp, path, registry=None) -> Future:
+        fut: Future = Future()
+        key, blob = self._blob(interp)
+        if blob is None:
+            # Not transferable to a worker process: run inline with the same accounting
+            with self._cv:
+                self.stats['submitted'] += 1
+                self.stats['inline'] += 1
+            return run_inline(interp, path, registry, fut)
+        timeout, rss = self.limits_for(interp)
+        with self._cv:
+            self.stats['submitted'] += 1
+            if self._closed:
+                raise RuntimeError('interpreter pool is closed')
+            self._pending.append((fut, interp.id, blob, str(path), timeout, rss, registry, key))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch, daemon=True, name='scidk-interp-dispatch')
+                self._thread.start()
+            self._cv.notify()
+        return fut
+
+    # -- dispatcher ---------------------------------------------------------------------------
+    def _finish(self, task, ok: bool, value, elapsed_ms: float) -> None:
+        fut, iid, _blob, _path, _t, _r, registry, _key = task
+        success = ok and not (isinstance(value, dict) and value.get('status') == 'error')
+        if registry is not None:
+            try:
+                registry.record_usage(iid, success=success, execution_time_ms=int(elapsed_ms))
+            except Exception:
+                pass
+        if ok:
+            self.stats['completed'] += 1
+            fut.set_result(value)
+        else:
+            self.stats['errors'] += 1
+            fut.set_exception(value if isinstance(value, BaseException) else RuntimeError(str(value)))
+
+    def _replace(self, w: _Worker) -> None:
+        w.kill()
+        self._pool.remove(w)
+        self.stats['respawns'] += 1
+
+    def _dispatch(self) -> None:
+        from multiprocessing.connection import wait
+        while True:
+            with self._cv:
+                while not self._pending and not any(w.task for w in self._pool) and not self._closed:
+                    self._cv.wait()
+                if self._closed and not self._pending and not any(w.task for w in self._pool):
+                    break
+                # Assign pending tasks to idle workers, growing the pool up to its size
+                while self._pending:
+                    idle = next((w for w in self._pool if w.ready and w.task is None), None)
+                    if idle is None:
+                        starting = sum(1 for w in self._pool if not w.ready)
+                        if starting < len(self._pending) and len(self._pool) < self.workers:
+                            self._pool.append(_Worker(self._ctx))
+                        break
+                    task = self._pending.popleft()
+                    if not task[0].set_running_or_notify_cancel():
+                        continue
+                    try:
+                        key = task[7]
+                        idle.conn.send((key, None if key in idle.known else task[2], task[3]))
+                        idle.known.add(key)
+                        idle.task, idle.started = task, time.monotonic()
+                    except Exception as e:
+                        self._finish(task, False, InterpreterWorkerDied(str(e)), 0.0)
+                        self._replace(idle)
+            busy = [w for w in self._pool if w.task is not None or not w.ready]
+            if not busy:
+                continue
+            ready = wait([w.conn for w in busy], timeout=self.poll_interval)
+            now = time.monotonic()
+            for w in busy:
+                task = w.task
+                if w.conn in ready:
+                    try:
+                        msg = w.conn.recv()
+                        if len(msg) == 1:
+                            # Control message: worker started / interpreter loaded -> (re)start the task clock
+                            w.ready = True
+                            w.started = now
+                            continue
+                        ok, value, elapsed_ms = msg
+                    except (EOFError, OSError):
+                        # Killed from outside (e.g. kernel OOM killer) or crashed in native code
+                        self.stats['worker_deaths'] += 1
+                        if task is None:
+                            self._replace(w)
+                            continue
+                        w.task = None
+                        self._finish(task, False, InterpreterWorkerDied(f"worker exited with code {w.proc.exitcode}"), (now - w.started) * 1000.0)
+                        self._replace(w)
+                        continue
+                    w.task = None
+                    self._finish(task, ok, value, elapsed_ms)
+                    continue
+                if task is None:
+                    continue
+                timeout, rss_cap = task[4], task[5]
+                if timeout and now - w.started > timeout:
+                    self.stats['timeouts'] += 1
+                    w.task = None
+                    self._finish(task, False, InterpreterTimeout(f"{task[1]} exceeded {timeout:g}s on {task[3]}"), (now - w.started) * 1000.0)
+                    self._replace(w)
+                elif rss_cap and _rss_mb(w.proc.pid) > rss_cap:
+                    self.stats['memory_kills'] += 1
+                    w.task = None
+                    self._finish(task, False, InterpreterMemoryExceeded(f"{task[1]} exceeded {rss_cap:g} MB RSS on {task[3]}"), (now - w.started) * 1000.0)
+                    self._replace(w)
+        for w in list(self._pool):
+            try:
+                w.conn.send(None)
+                w.proc.join(timeout=2)
+            except Exception:
+                pass
+            w.kill()
+        self._pool = []
+
+    def close(self) -> None:
+        with self._cv:
+            self._closed = True
+            self._cv.notify()
+        t = self._thread
+        if t is not None:
+            t.join(timeout=10)
+
+
+def run_inline(interp, path, registry=None, fut: Optional[Future] = None) -> Future:
+    """Run an interpreter in the calling thread, resolving a Future and recording usage."""
+    fut = fut or Future()
+    t0 = time.perf_counter()
+    try:
+        result = interp.interpret(Path(path))
+        ok = True
+    except Exception as e:
+        result, ok = e, False
+    elapsed_ms = (time.perf_counter() - t0) * 1000.0
+    if registry is not None:
+        try:
+            success = ok and not (isinstance(result, dict) and result.get('status') == 'error')
+            registry.record_usage(getattr(interp, 'id', ''), success=success, execution_time_ms=int(elapsed_ms))
+        except Exception:
+            pass
+    if ok:
+        fut.set_result(result)
+    else:
+        fut.set_exception(result)
+    return fut
+
+
+_POOL: Optional[InterpreterPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def execution_mode() -> str:
+    mode = (os.environ.get('SCIDK_INTERP_EXECUTION') or 'process').strip().lower()
+    return mode if mode in ('process', 'inline') else 'process'
+
+
+def get_interpreter_pool() -> InterpreterPool:
+    """Process-wide pool; workers are spawned lazily on first submit and reused across scans."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = InterpreterPool()
+            import atexit
+            atexit.register(_POOL.close)
+        return _POOL
+
+
+def submit_interpretation(interp, path, registry=None) -> Future:
+    """Run interp on path per SCIDK_INTERP_EXECUTION; the Future resolves with the result dict."""
+    if execution_mode() == 'inline':
+        return run_inline(interp, path, registry)
+    return get_interpreter_pool().submit(interp, path, registry)
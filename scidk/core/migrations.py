@@ -36,6 +36,25 @@ def _set_version(conn: sqlite3.Connection, v: int):
 
 
 def migrate(conn: Optional[sqlite3.Connection] = None) -> int:
+    """Apply schema migrations once per database file and process (see sqlite_pool.run_once).
+    Returns the final schema version after migrations.
+    """
+    from . import sqlite_pool
+    own = False
+    if conn is None:
+        conn = pix.connect()
+        own = True
+    try:
+        return sqlite_pool.run_once(conn, 'migrations', _apply)
+    finally:
+        if own:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def _apply(conn: Optional[sqlite3.Connection] = None) -> int:
     """Apply minimal schema migrations.
     Returns the final schema version after migrations.
     v1: Ensure selections/selection_items/annotations base exist (register existing annotations schema)
@@ -741,6 +760,78 @@ def migrate(conn: Optional[sqlite3.Connection] = None) -> int:
             _set_version(conn, 24)
             version = 24
 
+        # v25: Per-directory Merkle digests for incremental rescans (replaces directory_cache JSON rows)
+        if version < 25:
+            from .dir_digest import ensure_table as _ensure_dir_digests
+            _ensure_dir_digests(conn)
+            cur.execute("DELETE FROM directory_cache;")
+            conn.commit()
+            _set_version(conn, 25)
+            version = 25
+
+        # v26: Resumable checkpoints for streaming graph transfers (keyset cursor per transfer)
+        if version < 26:
+            from ..services.graph_transfer import ensure_table as _ensure_transfer_checkpoints
+            _ensure_transfer_checkpoints(conn)
+            conn.commit()
+            _set_version(conn, 26)
+            version = 26
+
+        # v27: GraphRAG caches (question -> generated Cypher, Cypher + params -> result), next to graphrag_feedback
+        if version < 27:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS graphrag_cypher_cache (
+                    question_key TEXT NOT NULL,
+                    schema_version TEXT NOT NULL,
+                    question TEXT,
+                    cypher TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (question_key, schema_version)
+                );
+                """
+            )
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS graphrag_result_cache (
+                    key TEXT PRIMARY KEY,
+                    cypher TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    epoch INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                """
+            )
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_graphrag_result_cache_cypher ON graphrag_result_cache(cypher);")
+            conn.commit()
+            _set_version(conn, 27)
+            version = 27
+
+        # v28: normalized scan membership; counts as columns, checksum lists moved out of scans.extra_json
+        if version < 28:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scan_members (
+                    scan_id TEXT NOT NULL,
+                    checksum TEXT NOT NULL,
+                    PRIMARY KEY (scan_id, checksum)
+                ) WITHOUT ROWID;
+                """
+            )
+            for col in ('file_count INTEGER', 'checksum_count INTEGER'):
+                try:
+                    cur.execute(f"ALTER TABLE scans ADD COLUMN {col}")
+                except sqlite3.OperationalError:
+                    pass
+            from .scan_members import backfill_from_extra_json as _backfill_scan_members
+            _backfill_scan_members(conn)
+            conn.commit()
+            _set_version(conn, 28)
+            version = 28
+
         return version
     finally:
         if own:
@@ -1,5 +1,4 @@
-from typing import Dict, List, Optional
-from neo4j import GraphDatabase
+from typing import Dict, Iterator, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,7 +13,8 @@ class Neo4jGraph:
         self._uri = uri
         self._auth = auth
         self._auth_mode = auth_mode
-        self._driver = GraphDatabase.driver(uri, auth=auth) if auth is not None else GraphDatabase.driver(uri)
+        from ..services.neo4j_drivers import shared_driver
+        self._driver = shared_driver(uri, auth=auth, database=database)
         self._db = database
         logger.info(f"Neo4jGraph initialized with backend=neo4j, uri={uri}, database={database}")
 
@@ -55,8 +55,8 @@ class Neo4jGraph:
 
         Args:
             scan: Scan metadata dict with id, path, started, ended, etc.
-            rows: Optional list of file dicts to write
-            folder_rows: Optional list of folder dicts to write
+            rows: Optional file rows to write (list, or callable returning an iterator)
+            folder_rows: Optional folder rows to write (list, or callable returning an iterator)
 
         Returns:
             Dict with verification results including counts
@@ -74,11 +74,18 @@ class Neo4jGraph:
                                    self._auth[1] if self._auth else None,
                                    self._db, self._auth_mode).connect()
                 try:
-                    client.ensure_constraints()
-                    wres = client.write_scan(rows or [], folder_rows or [], scan)
+                    from ..services.neo4j_commit import engine_options, single_session
+                    constraints = client.ensure_constraints()
+                    if single_session(constraints):
+                        logger.warning(f"Neo4j identity constraints missing or not checkable ({constraints['missing']}); "
+                                       f"committing scan {sid} with one session (SCIDK_NEO4J_CONSTRAINTS=create adds them)")
+                    wres = client.write_scan(rows or [], folder_rows or [], scan, **engine_options(constraints))
                     vres = client.verify(sid)
                     logger.info(f"Neo4j commit completed: {wres.get('written_files', 0)} files, "
-                              f"{wres.get('written_folders', 0)} folders for scan {sid}")
+                              f"{wres.get('written_folders', 0)} folders for scan {sid} "
+                              f"in {wres.get('sec')}s ({wres.get('rows_per_sec')} rows/s)")
+                    if wres.get('error'):
+                        vres['error'] = wres['error']
                     return vres
                 finally:
                     client.close()
@@ -125,37 +132,58 @@ class Neo4jGraph:
             nodes = [n for n in nodes if n.get('count')]
             return {'nodes': nodes, 'edges': edges, 'truncated': False}
 
+    # Row columns for the labels with dedicated queries; other labels return node properties
+    INSTANCE_COLUMNS = {
+        'File': ['id', 'path', 'filename', 'extension', 'size_bytes', 'created', 'modified', 'mime_type', 'checksum'],
+        'Folder': ['path', 'name', 'file_count'],
+        'Scan': ['id', 'started', 'ended', 'committed', 'num_files'],
+        'ResearchObject': ['id'],
+    }
+
     def list_instances(self, label: str) -> List[Dict]:
+        # Preview listing: capped at 1000 rows
+        return list(self.iter_instances(label, limit=1000))
+
+    def instance_columns(self, label: str) -> Optional[List[str]]:
+        """Column names of the rows iter_instances(label) yields; None for arbitrary labels, whose columns
+        are taken from the rows themselves (see instance_export.resolve_columns)."""
+        cols = self.INSTANCE_COLUMNS.get((label or '').strip())
+        return list(cols) if cols is not None else None
+
+    def iter_instances(self, label: str, limit: Optional[int] = None) -> Iterator[Dict]:
+        """Yield instance rows as the driver fetches them; the session stays open until the iterator is exhausted or closed."""
         label = (label or '').strip()
-        if not label:
-            return []
+        if not label or label == 'ResearchObject':
+            return
+        cap = f" LIMIT {int(limit)}" if limit is not None else ""
 
         with self._session() as s:
             # For hardcoded labels, use specific optimized queries
             if label == 'File':
-                rows = s.run(
-                    "MATCH (f:File) RETURN f.path AS path, f.filename AS filename, f.extension AS extension, f.size_bytes AS size_bytes, f.created AS created, f.modified AS modified, f.mime_type AS mime_type LIMIT 1000"
-                ).data()
-                return [{**r, 'id': r['path'], 'checksum': None} for r in rows]
+                for r in s.run(
+                    "MATCH (f:File) RETURN f.path AS path, f.filename AS filename, f.extension AS extension, f.size_bytes AS size_bytes, f.created AS created, f.modified AS modified, f.mime_type AS mime_type" + cap
+                ):
+                    r = r.data()
+                    yield {**r, 'id': r['path'], 'checksum': None}
+                return
             if label == 'Folder':
-                return s.run(
-                    "MATCH (d:Folder) OPTIONAL MATCH (d)-[:CONTAINS]->(f:File) WITH d, count(f) AS file_count RETURN d.path AS path, d.name AS name, file_count ORDER BY path LIMIT 1000"
-                ).data()
+                for r in s.run(
+                    "MATCH (d:Folder) OPTIONAL MATCH (d)-[:CONTAINS]->(f:File) WITH d, count(f) AS file_count RETURN d.path AS path, d.name AS name, file_count ORDER BY path" + cap
+                ):
+                    yield r.data()
+                return
             if label == 'Scan':
-                return s.run(
-                    "MATCH (sc:Scan) WITH sc ORDER BY sc.started DESC NULLS LAST RETURN sc.id AS id, sc.started AS started, sc.ended AS ended, coalesce(sc.committed,true) AS committed, 0 AS num_files LIMIT 1000"
-                ).data()
-            if label == 'ResearchObject':
-                return []
+                for r in s.run(
+                    "MATCH (sc:Scan) WITH sc ORDER BY sc.started DESC NULLS LAST RETURN sc.id AS id, sc.started AS started, sc.ended AS ended, coalesce(sc.committed,true) AS committed, 0 AS num_files" + cap
+                ):
+                    yield r.data()
+                return
 
             # For arbitrary labels, query all nodes with that label and return all properties
             try:
                 # Use backticks to handle labels with special characters
-                query = f"MATCH (n:`{label}`) RETURN n LIMIT 1000"
-                result = s.run(query).data()
-
+                result = s.run(f"MATCH (n:`{label}`) RETURN n" + cap)
                 # Extract node properties and add an id field
-                rows = []
                 for record in result:
                     node = record.get('n')
                     if node:
@@ -169,9 +197,7 @@ class Neo4jGraph:
                             else:
                                 # Use Neo4j internal id as fallback
                                 props['id'] = str(node.id)
-                        rows.append(props)
-                return rows
+                        yield props
             except Exception as e:
-                # If query fails (e.g., label doesn't exist), return empty list
+                # If query fails (e.g., label doesn't exist), end the rows
                 print(f"Error querying instances for label '{label}': {e}")
-                return []
@@ -9,6 +9,10 @@ import hashlib
 # files(path, parent_path, name, depth, type, size, modified_time, file_extension, mime_type, etag, hash, remote, scan_id, extra_json)
 
 
+# Negative cache_size means KB pages; -80000 ≈ ~80MB if 1KB page, engines vary — acceptable default
+_PRAGMAS = ("PRAGMA cache_size=-80000;",)
+
+
 def _db_path() -> Path:
     # Allow override via env; default to ~/.scidk/db/files.db
     base = os.environ.get('SCIDK_DB_PATH')
@@ -20,22 +24,47 @@ def _db_path() -> Path:
     return p
 
 
-def connect() -> sqlite3.Connection:
+def connect(check_same_thread: bool = True, readonly: bool = False) -> sqlite3.Connection:
+    """Pooled connection to the path index (see sqlite_pool); close() returns it to the pool.
+
+    readonly=True serves from the query_only reader pool. check_same_thread=False opens a plain,
+    unpooled connection for callers that hand it to another thread.
+    """
     p = _db_path()
-    conn = sqlite3.connect(str(p))
+    if check_same_thread:
+        from . import sqlite_pool
+        return sqlite_pool.connect(str(p), readonly=readonly, pragmas=_PRAGMAS)
+    if not p.exists():
+        from . import sqlite_pool
+        sqlite_pool.forget_file(str(p))
+    conn = sqlite3.connect(str(p), check_same_thread=check_same_thread)
     # Performance/safety PRAGMAs
     try:
         conn.execute('PRAGMA journal_mode=WAL;')
         conn.execute("PRAGMA synchronous=NORMAL;")
         conn.execute("PRAGMA temp_store=MEMORY;")
-        # Negative cache_size means KB pages; -80000 ≈ ~80MB if 1KB page, engines vary — acceptable default
-        conn.execute("PRAGMA cache_size=-80000;")
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
     except Exception:
         pass
     return conn
 
 
 def init_db(conn: Optional[sqlite3.Connection] = None):
+    """Create the path index schema; runs once per database file and process."""
+    from . import sqlite_pool
+    own = False
+    if conn is None:
+        conn = connect()
+        own = True
+    try:
+        sqlite_pool.run_once(conn, 'path_index', _init_schema)
+    finally:
+        if own:
+            conn.close()
+
+
+def _init_schema(conn: Optional[sqlite3.Connection] = None):
     own = False
     if conn is None:
         conn = connect()
@@ -76,6 +105,13 @@ def init_db(conn: Optional[sqlite3.Connection] = None):
         cur.execute("CREATE INDEX IF NOT EXISTS idx_files_scan_parent_name ON files(scan_id, parent_path, name);")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_files_scan_ext ON files(scan_id, file_extension);")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_files_scan_type ON files(scan_id, type);")
+        # Browse (FSIndexService.browse_children): keyset order type DESC, name ASC with the extension filter
+        # in the index, so a page reads only its own rows from the table (it returns interpretation_json,
+        # which is too large to cover)
+        cur.execute("DROP INDEX IF EXISTS idx_files_scan_parent_type_name;")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_files_scan_browse ON files(scan_id, parent_path, type DESC, name, file_extension);"
+        )
         
         # Minimal history table for future change tracking
         cur.execute(
@@ -98,6 +134,48 @@ def init_db(conn: Optional[sqlite3.Connection] = None):
         )
         cur.execute("CREATE INDEX IF NOT EXISTS idx_hist_path ON file_history(path);")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_hist_scan ON file_history(scan_id);")
+        # Content-hash cache: digest is reused while (size, mtime_ns, inode, dev) is unchanged
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS hash_cache (
+                path TEXT NOT NULL,
+                algo TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER,
+                dev INTEGER,
+                digest TEXT NOT NULL,
+                updated REAL,
+                PRIMARY KEY (path, algo)
+            );
+            """
+        )
+        # Interpreter results keyed by content checksum + interpreter id/version/config (see interpretation_cache)
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS interpretation_cache (
+                checksum TEXT NOT NULL,
+                interpreter_id TEXT NOT NULL,
+                interpreter_version TEXT NOT NULL,
+                config_hash TEXT NOT NULL,
+                result_json TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created REAL,
+                last_used REAL,
+                PRIMARY KEY (checksum, interpreter_id, interpreter_version, config_hash)
+            );
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_interp_cache_last_used ON interpretation_cache(last_used);")
+        # Versioned storage columns/indexes (SCIDK_FILES_STORAGE=versioned, see file_versions)
+        try:
+            from .file_versions import ensure_schema as _ensure_versions
+            _ensure_versions(conn)
+        except Exception:
+            pass
+        # Dataset search (GET /api/search, see search_index)
+        from .search_index import ensure_schema as _ensure_search
+        _ensure_search(conn)
         conn.commit()
     finally:
         if own:
@@ -215,13 +293,53 @@ def get_latest_file_meta(path: str) -> Optional[Tuple[Optional[int], Optional[fl
         conn.close()
 
 
+SAMPLED_BLOCK_SIZE = 1024 * 1024
+SAMPLED_BLOCKS = 16
+
+
+def compute_sampled_fingerprint(file_path: str, block_size: int = SAMPLED_BLOCK_SIZE, blocks: int = SAMPLED_BLOCKS) -> Optional[str]:
+    """Partial content fingerprint for very large files: blake2b over the file size, the head block,
+    the tail block and `blocks` evenly spaced interior blocks, read through mmap.
+    Reads at most (blocks + 2) * block_size bytes regardless of file size; small files are hashed whole.
+    Not a content hash: two files can share a fingerprint if they differ only outside the sampled blocks.
+    Returns hex digest or None if unreadable.
+    """
+    import mmap
+    try:
+        size = os.path.getsize(file_path)
+        h = hashlib.blake2b(digest_size=32)
+        h.update(b'scidk-sampled-v1')
+        h.update(int(size).to_bytes(8, 'little'))
+        h.update(int(block_size).to_bytes(8, 'little'))
+        if size == 0:
+            return h.hexdigest()
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if size <= (blocks + 2) * block_size:
+                    h.update(mm[:])
+                    return h.hexdigest()
+                offsets = [0]
+                span = size - 2 * block_size
+                for i in range(1, blocks + 1):
+                    offsets.append(block_size + (span * i) // (blocks + 1) - block_size // 2)
+                offsets.append(size - block_size)
+                for off in offsets:
+                    h.update(mm[off:off + block_size])
+        return h.hexdigest()
+    except Exception:
+        return None
+
+
 def compute_content_hash(file_path: str, policy: str = 'auto', chunk_size: int = 1024 * 1024) -> Optional[str]:
-    """Compute content hash with policy: 'auto' → blake3 if available else blake2b; 'blake3', 'blake2b', or 'none'.
+    """Compute content hash with policy: 'auto' → blake3 if available else blake2b; 'blake3', 'blake2b',
+    'sampled' (size + head/tail + evenly spaced blocks, see compute_sampled_fingerprint), or 'none'.
     Returns hex digest string or None if policy is 'none' or file unreadable.
     """
     policy = (policy or 'auto').lower()
     if policy == 'none':
         return None
+    if policy == 'sampled':
+        return compute_sampled_fingerprint(file_path)
     try:
         if policy in ('blake3', 'auto'):
             try:
@@ -252,12 +370,32 @@ def compute_content_hash(file_path: str, policy: str = 'auto', chunk_size: int =
 
 
 def batch_insert_files(rows: Iterable[Tuple], batch_size: int = 10000) -> int:
-    """Insert rows in batches. Returns total inserted."""
+    """Insert rows in batches. Returns total inserted.
+
+    With SCIDK_FILES_STORAGE=versioned rows are applied as versions of the current (host, path)
+    entries instead of appended (see file_versions).
+    """
     conn = connect()
     init_db(conn)
     total = 0
     try:
         cur = conn.cursor()
+        from . import file_versions as _fv
+        from .search_index import index_file_rows
+        if _fv.storage_mode() == 'versioned':
+            buf: List[Tuple] = []
+            for r in rows:
+                buf.append(r)
+                if len(buf) >= batch_size:
+                    total += _fv.upsert_rows(conn, buf)
+                    index_file_rows(conn, buf)
+                    conn.commit()
+                    buf = []
+            if buf:
+                total += _fv.upsert_rows(conn, buf)
+                index_file_rows(conn, buf)
+                conn.commit()
+            return total
         buf: List[Tuple] = []
         for r in rows:
             buf.append(r)
@@ -266,6 +404,7 @@ def batch_insert_files(rows: Iterable[Tuple], batch_size: int = 10000) -> int:
                     "INSERT INTO files(path, parent_path, name, depth, type, size, modified_time, file_extension, mime_type, etag, hash, remote, scan_id, extra_json) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
                     buf,
                 )
+                index_file_rows(conn, buf)
                 conn.commit()
                 total += len(buf)
                 buf.clear()
@@ -274,6 +413,7 @@ def batch_insert_files(rows: Iterable[Tuple], batch_size: int = 10000) -> int:
                 "INSERT INTO files(path, parent_path, name, depth, type, size, modified_time, file_extension, mime_type, etag, hash, remote, scan_id, extra_json) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
                 buf,
             )
+            index_file_rows(conn, buf)
             conn.commit()
             total += len(buf)
         return total
@@ -281,12 +421,47 @@ def batch_insert_files(rows: Iterable[Tuple], batch_size: int = 10000) -> int:
         conn.close()
 
 
-def apply_basic_change_history(scan_id: str, target_root: str) -> dict:
+def scan_scope(conn: sqlite3.Connection, scan_id: str) -> Tuple[str, List]:
+    """(where_sql, params) selecting one scan's rows from files, for append-mode and versioned scans alike."""
+    from .file_versions import scan_scope as _scope
+    return _scope(conn, scan_id)
+
+
+def finalize_versioned_scan(scan_id: str, target_root: str, recursive: bool = True,
+                            unchanged_dirs: Optional[Iterable[str]] = None,
+                            skip_subtrees: Optional[Iterable[str]] = None) -> Optional[dict]:
+    """Close entries a versioned scan no longer saw; None for append-mode scans.
+
+    In both modes, paths under target_root the scan did not see leave the search index.
+    """
+    conn = connect()
+    init_db(conn)
+    try:
+        from .file_versions import finalize_scan
+        from .search_index import remove_deleted, remove_unseen
+        counts = finalize_scan(conn, scan_id, target_root, recursive=recursive,
+                               unchanged_dirs=unchanged_dirs or (), skip_subtrees=skip_subtrees or ())
+        if counts is not None:
+            remove_deleted(conn, scan_id)
+        else:
+            remove_unseen(conn, scan_id, target_root, recursive=recursive,
+                          unchanged_dirs=unchanged_dirs or (), skip_subtrees=skip_subtrees or ())
+        conn.commit()
+        return counts
+    finally:
+        conn.close()
+
+
+def apply_basic_change_history(scan_id: str, target_root: str, recursive: bool = True) -> dict:
     """
     Compute created/modified/deleted vs the most recent previous scan that indexed the same target_root prefix,
     and append rows into file_history. This is a minimal, size-based change detector for MVP.
+    Versioned scans already logged created/modified rows while indexing; only deletions are computed here.
     Returns counts dict.
     """
+    versioned = finalize_versioned_scan(scan_id, target_root, recursive=recursive)
+    if versioned is not None:
+        return versioned
     conn = connect()
     init_db(conn)
     try:
@@ -344,6 +519,8 @@ def apply_basic_change_history(scan_id: str, target_root: str) -> dict:
             (scan_id,),
         )
         modified = cur.rowcount if hasattr(cur, 'rowcount') else 0
+        from .search_index import remove_deleted
+        remove_deleted(conn, scan_id)
         conn.commit()
         return {"created": int(created), "modified": int(modified), "deleted": int(deleted)}
     finally:
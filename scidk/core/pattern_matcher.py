@@ -1,7 +1,10 @@
+from bisect import bisect_right
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
 import fnmatch
+import os
+import re
 
 
 @dataclass
@@ -44,15 +47,149 @@ class PatternMatcher:
         return True
 
 
+def path_suffix(name: str) -> str:
+    """Path.suffix semantics on a plain filename string."""
+    i = name.rfind('.')
+    return name[i:] if 0 < i < len(name) - 1 else ''
+
+
+_GLOB_CHARS = set('*?[')
+
+
+class CompiledRules:
+    """Rules compiled once into bitmask indexes; bit i is the i-th rule in priority order.
+
+    - pattern: '*' rules are always on; '*<literal>' rules go into a suffix index keyed by length;
+      everything else is checked against one combined regex first and individually only on a hit
+    - ext condition: extension -> mask index (rules without an ext condition are always admissible)
+    - min_size/max_size: the size axis is cut at every rule boundary; each bucket holds the mask of
+      rules admissible for sizes in that range (bisect on the boundaries)
+    Matching a path is a handful of dict lookups and integer ANDs instead of fnmatch per rule.
+    """
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules: List[Rule] = sorted(rules, key=lambda r: r.priority, reverse=True)
+        self.n = len(rules)
+        self.all_mask = (1 << len(self.rules)) - 1
+        self._normcase = os.path.normcase if os.path.normcase('A') != 'A' else None
+        self.any_pattern_mask = 0
+        self.suffixes: Dict[int, Dict[str, int]] = {}
+        complex_: Dict[str, int] = {}
+        self.no_ext_mask = 0
+        self.ext_masks: Dict[str, int] = {}
+        bounds = set()
+        for i, r in enumerate(self.rules):
+            bit = 1 << i
+            pat = r.pattern or '*'
+            if self._normcase:
+                pat = self._normcase(pat)
+            lit = pat[1:]
+            if pat == '*':
+                self.any_pattern_mask |= bit
+            elif pat.startswith('*') and lit and not (_GLOB_CHARS & set(lit)):
+                by_len = self.suffixes.setdefault(len(lit), {})
+                by_len[lit] = by_len.get(lit, 0) | bit
+            else:
+                complex_[pat] = complex_.get(pat, 0) | bit
+            cond = r.conditions or {}
+            if 'ext' in cond:
+                ext = str(cond['ext']).lower()
+                self.ext_masks[ext] = self.ext_masks.get(ext, 0) | bit
+            else:
+                self.no_ext_mask |= bit
+            if 'min_size' in cond:
+                bounds.add(int(cond['min_size']))
+            if 'max_size' in cond:
+                bounds.add(int(cond['max_size']) + 1)
+        self.suffix_lengths = sorted(self.suffixes)
+        # Identical patterns share one regex; the combined alternation rejects most paths in one pass
+        rxs = {pat: fnmatch.translate(pat) for pat in complex_}
+        self.complex = [(bits, re.compile(rxs[pat])) for pat, bits in complex_.items()]
+        self.complex_any = re.compile('|'.join(f'(?:{rx})' for rx in rxs.values())) if rxs else None
+        self.bounds = sorted(bounds)
+        reps = [(self.bounds[0] - 1) if self.bounds else 0] + self.bounds
+        self.size_masks = [self._size_mask(v) for v in reps]
+
+    def _size_mask(self, size: int) -> int:
+        mask = 0
+        for i, r in enumerate(self.rules):
+            cond = r.conditions or {}
+            if 'max_size' in cond and size > int(cond['max_size']):
+                continue
+            if 'min_size' in cond and size < int(cond['min_size']):
+                continue
+            mask |= 1 << i
+        return mask
+
+    def pattern_mask(self, name: str, full: str, admissible: int = -1) -> int:
+        """Mask of rules whose glob matches name or full; patterns outside admissible are not evaluated."""
+        if self._normcase:
+            name, full = self._normcase(name), self._normcase(full)
+        mask = self.any_pattern_mask
+        # A literal suffix matches the filename iff it matches the full path (the name is its tail)
+        for n in self.suffix_lengths:
+            hit = self.suffixes[n].get(full[-n:])
+            if hit:
+                mask |= hit
+        if self.complex_any is not None and (self.complex_any.match(name) or self.complex_any.match(full)):
+            for bits, rx in self.complex:
+                if bits & admissible and (rx.match(name) or rx.match(full)):
+                    mask |= bits
+        return mask
+
+    def match_mask(self, full: str, ext: Optional[str] = None, size: Optional[int] = None) -> int:
+        name = full.rsplit(os.sep, 1)[-1]
+        if ext is None:
+            ext = path_suffix(name)
+        mask = self.no_ext_mask | self.ext_masks.get(ext.lower(), 0)
+        if size is not None:
+            mask &= self.size_masks[bisect_right(self.bounds, size)]
+        if not mask:
+            return 0
+        return mask & self.pattern_mask(name, full, mask)
+
+    def rules_for(self, mask: int) -> List[Rule]:
+        out = []
+        i = 0
+        while mask:
+            if mask & 1:
+                out.append(self.rules[i])
+            mask >>= 1
+            i += 1
+        return out
+
+
 class RuleEngine:
     """Holds rules and can select applicable ones ordered by priority."""
     def __init__(self):
         self.rules: List[Rule] = []
+        self._compiled: Optional[CompiledRules] = None
 
     def add_rule(self, rule: Rule):
         self.rules.append(rule)
+        self._compiled = None
+
+    def invalidate(self):
+        """Drop the compiled matcher (call after mutating rules in place)."""
+        self._compiled = None
+
+    def compiled(self) -> CompiledRules:
+        c = self._compiled
+        if c is None or c.n != len(self.rules):
+            c = CompiledRules(self.rules)
+            self._compiled = c
+        return c
+
+    def applicable(self, path: Union[Path, str], dataset: Dict) -> List[Rule]:
+        c = self.compiled()
+        return c.rules_for(c.match_mask(str(path), dataset.get('extension') or '', dataset.get('size_bytes')))
 
-    def applicable(self, path: Path, dataset: Dict) -> List[Rule]:
-        pm = PatternMatcher()
-        matched = [r for r in self.rules if pm.matches(r, path, dataset)]
-        return sorted(matched, key=lambda r: r.priority, reverse=True)
+    def match_masks(self, paths: Iterable[str], extensions: Optional[Iterable[str]] = None,
+                    sizes: Optional[Iterable[Optional[int]]] = None) -> List[int]:
+        """Batch API: rule bitmasks (see CompiledRules.rules_for) for a column of paths.
+        extensions default to each path's suffix; sizes default to unknown (size conditions ignored)."""
+        c = self.compiled()
+        mm = c.match_mask
+        paths = list(paths)
+        exts = list(extensions) if extensions is not None else [None] * len(paths)
+        szs = list(sizes) if sizes is not None else [None] * len(paths)
+        return [mm(p, e, s) for p, e, s in zip(paths, exts, szs)]
@@ -19,6 +19,8 @@ import uuid
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from . import sqlite_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,7 +39,7 @@ class PluginInstanceManager:
 
     def _init_db(self):
         """Initialize database schema for plugin instances."""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite_pool.connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -60,7 +62,7 @@ class PluginInstanceManager:
 
     def _get_connection(self) -> sqlite3.Connection:
         """Get a database connection."""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
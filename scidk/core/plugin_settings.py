@@ -12,6 +12,8 @@ from datetime import datetime
 from pathlib import Path
 import os
 
+from . import sqlite_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,7 +66,7 @@ def get_plugin_setting(plugin_name: str, key: str, default: Any = None) -> Any:
     """
     try:
         db_path = _get_db_path()
-        conn = sqlite3.connect(db_path)
+        conn = sqlite_pool.connect(db_path)
         cur = conn.execute(
             "SELECT value, encrypted FROM plugin_settings WHERE plugin_name = ? AND key = ?",
             (plugin_name, key)
@@ -101,7 +103,7 @@ def set_plugin_setting(plugin_name: str, key: str, value: Any, encrypted: bool =
     """
     try:
         db_path = _get_db_path()
-        conn = sqlite3.connect(db_path)
+        conn = sqlite_pool.connect(db_path)
 
         # Serialize value to JSON
         if isinstance(value, (dict, list)):
@@ -144,7 +146,7 @@ def get_all_plugin_settings(plugin_name: str, include_encrypted: bool = True) ->
     """
     try:
         db_path = _get_db_path()
-        conn = sqlite3.connect(db_path)
+        conn = sqlite_pool.connect(db_path)
         cur = conn.execute(
             "SELECT key, value, encrypted FROM plugin_settings WHERE plugin_name = ?",
             (plugin_name,)
@@ -181,7 +183,7 @@ def delete_plugin_setting(plugin_name: str, key: str):
     """
     try:
         db_path = _get_db_path()
-        conn = sqlite3.connect(db_path)
+        conn = sqlite_pool.connect(db_path)
         conn.execute(
             "DELETE FROM plugin_settings WHERE plugin_name = ? AND key = ?",
             (plugin_name, key)
@@ -202,7 +204,7 @@ def delete_all_plugin_settings(plugin_name: str):
     """
     try:
         db_path = _get_db_path()
-        conn = sqlite3.connect(db_path)
+        conn = sqlite_pool.connect(db_path)
         conn.execute(
             "DELETE FROM plugin_settings WHERE plugin_name = ?",
             (plugin_name,)
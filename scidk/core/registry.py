@@ -1,8 +1,8 @@
+import os
 from collections import defaultdict
-from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
-from .pattern_matcher import Rule, RuleEngine
+from .pattern_matcher import Rule, RuleEngine, path_suffix
 
 
 class InterpreterRegistry:
@@ -75,18 +75,7 @@ class InterpreterRegistry:
         if interpreter_id in self.by_id:
             self.enabled_interpreters.discard(interpreter_id)
 
-    def select_for_dataset(self, dataset: Dict) -> List:
-        """Selection with rule precedence and extension fallback.
-        - Evaluate rules; if any match, return interpreters in rule priority order (deduped).
-        - Otherwise, return interpreters registered for the dataset's extension.
-        - Respect enabled state (when any enables recorded).
-        """
-        path = Path(dataset.get('path', ''))
-        matches = self.rules.applicable(path, dataset)
-        def _enabled_list(candidates: List[object]) -> List[object]:
-            if not self.enabled_interpreters:
-                return candidates
-            return [i for i in candidates if self._is_enabled(getattr(i, 'id', ''))]
+    def _resolve(self, matches: List, extension: str) -> List:
         if matches:
             result: List[object] = []
             seen = set()
@@ -97,4 +86,34 @@ class InterpreterRegistry:
                     seen.add(interp.id)
             if result:
                 return result
-        return _enabled_list(self.get_by_extension(dataset.get('extension', '')))
+        candidates = self.get_by_extension(extension or '')
+        if not self.enabled_interpreters:
+            return candidates
+        return [i for i in candidates if self._is_enabled(getattr(i, 'id', ''))]
+
+    def select_for_dataset(self, dataset: Dict) -> List:
+        """Selection with rule precedence and extension fallback.
+        - Evaluate rules; if any match, return interpreters in rule priority order (deduped).
+        - Otherwise, return interpreters registered for the dataset's extension.
+        - Respect enabled state (when any enables recorded).
+        """
+        matches = self.rules.applicable(str(dataset.get('path', '')), dataset)
+        return self._resolve(matches, dataset.get('extension', ''))
+
+    def select_batch(self, paths: Iterable[str], extensions: Optional[Iterable[str]] = None,
+                     sizes: Optional[Iterable[Optional[int]]] = None) -> List[List]:
+        """Interpreter assignments for a column of paths (same precedence as select_for_dataset).
+        Paths sharing a rule mask and extension share one resolved interpreter list."""
+        paths = list(paths)
+        exts = list(extensions) if extensions is not None else [path_suffix(p.rsplit(os.sep, 1)[-1]).lower() for p in paths]
+        masks = self.rules.match_masks(paths, exts, sizes)
+        compiled = self.rules.compiled()
+        memo: Dict[tuple, List] = {}
+        out: List[List] = []
+        for mask, ext in zip(masks, exts):
+            key = (mask, ext)
+            sel = memo.get(key)
+            if sel is None:
+                sel = memo[key] = self._resolve(compiled.rules_for(mask), ext)
+            out.append(sel)
+        return out
@@ -0,0 +1,107 @@
+"""
+Normalized scan membership: which dataset checksums a scan produced.
+
+Scans used to carry their full checksum list inside scans.extra_json, so every listing had to
+json.loads blobs that grow with the scan (millions of SHA-256 strings for large trees). The list now
+lives in scan_members(scan_id, checksum) and the counts are plain columns on scans (file_count,
+checksum_count), so listings read summary columns and a small extra_json only.
+
+Migration v28 moves historical blobs over once (backfill_from_extra_json).
+"""
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+_INSERT_BATCH = 10000
+
+
+def save_scan(conn: sqlite3.Connection, scan_id: str, root: str, started: float, completed: float,
+              status: str, extra: Dict[str, Any], checksums: Optional[Iterable[str]] = None) -> None:
+    """INSERT OR REPLACE a scans row with its summary columns and replace its members.
+
+    Any 'checksums' key in extra is moved to scan_members rather than serialized. Does not commit.
+    """
+    extra = dict(extra or {})
+    listed = extra.pop('checksums', None)
+    if checksums is None:
+        checksums = listed or []
+    checksums = list(checksums)
+    file_count = extra.get('file_count')
+    conn.execute(
+        "INSERT OR REPLACE INTO scans(id, root, started, completed, status, extra_json, file_count, checksum_count) "
+        "VALUES(?,?,?,?,?,?,?,?)",
+        (
+            scan_id,
+            root,
+            float(started or 0.0),
+            float(completed or 0.0),
+            status,
+            json.dumps(extra),
+            int(file_count) if file_count is not None else None,
+            len(checksums),
+        ),
+    )
+    replace_members(conn, scan_id, checksums)
+
+
+def replace_members(conn: sqlite3.Connection, scan_id: str, checksums: Iterable[str]) -> int:
+    conn.execute("DELETE FROM scan_members WHERE scan_id = ?", (scan_id,))
+    total = 0
+    batch: List[tuple] = []
+    for ch in checksums:
+        if not ch:
+            continue
+        batch.append((scan_id, ch))
+        if len(batch) >= _INSERT_BATCH:
+            conn.executemany("INSERT OR IGNORE INTO scan_members(scan_id, checksum) VALUES(?,?)", batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        conn.executemany("INSERT OR IGNORE INTO scan_members(scan_id, checksum) VALUES(?,?)", batch)
+        total += len(batch)
+    return total
+
+
+def load_checksums(conn: sqlite3.Connection, scan_id: str) -> List[str]:
+    rows = conn.execute("SELECT checksum FROM scan_members WHERE scan_id = ? ORDER BY checksum", (scan_id,)).fetchall()
+    return [r[0] for r in rows]
+
+
+def delete_members(conn: sqlite3.Connection, scan_ids: Iterable[str]) -> None:
+    conn.executemany("DELETE FROM scan_members WHERE scan_id = ?", [(sid,) for sid in scan_ids])
+
+
+def backfill_from_extra_json(conn: sqlite3.Connection) -> int:
+    """Move checksum lists out of scans.extra_json into scan_members and fill the count columns.
+
+    Works one scan at a time so that a history of very large blobs never has to be held in memory
+    at once. Returns the number of scans rewritten. Does not commit.
+    """
+    ids = [r[0] for r in conn.execute(
+        "SELECT id FROM scans WHERE checksum_count IS NULL OR extra_json LIKE '%\"checksums\"%'").fetchall()]
+    moved = 0
+    for sid in ids:
+        row = conn.execute("SELECT extra_json FROM scans WHERE id = ?", (sid,)).fetchone()
+        try:
+            extra = json.loads(row[0]) if row and row[0] else {}
+        except Exception:
+            extra = {}
+        if not isinstance(extra, dict):
+            extra = {}
+        checksums = extra.pop('checksums', None)
+        file_count = extra.get('file_count')
+        try:
+            file_count = int(file_count) if file_count is not None else None
+        except Exception:
+            file_count = None
+        if checksums is not None:
+            count = replace_members(conn, sid, checksums or [])
+            conn.execute(
+                "UPDATE scans SET extra_json = ?, file_count = ?, checksum_count = ? WHERE id = ?",
+                (json.dumps(extra), file_count, count, sid),
+            )
+            moved += 1
+        else:
+            count = conn.execute("SELECT COUNT(*) FROM scan_members WHERE scan_id = ?", (sid,)).fetchone()[0]
+            conn.execute("UPDATE scans SET file_count = ?, checksum_count = ? WHERE id = ?", (file_count, count, sid))
+    return moved
@@ -0,0 +1,179 @@
+"""Staged, bounded pipeline for local filesystem scans.
+
+Stages:
+- walker: the calling thread drains an iterator of items (e.g. file paths from a directory walk)
+  into a bounded work queue. When workers fall behind, ``put`` blocks and the walk pauses (backpressure).
+- workers: a pool of threads runs ``process(item)`` (stat/hash/interpret) and returns ``(row, payload)``.
+- writer: a single thread owns all shared-state mutation. It applies ``sink(payload)`` per item and
+  flushes index rows to ``write_rows`` in batches.
+
+Peak memory is bounded by ``queue_size`` and ``batch_size`` rather than by the size of the tree.
+"""
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_STOP = object()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        v = int(os.environ.get(name) or default)
+        return v if v > 0 else default
+    except Exception:
+        return default
+
+
+@dataclass
+class PipelineConfig:
+    workers: int = 4
+    queue_size: int = 1000
+    batch_size: int = 5000
+
+    @classmethod
+    def from_env(cls, overrides: Optional[Dict[str, Any]] = None) -> 'PipelineConfig':
+        """Build config from SCIDK_SCAN_WORKERS / SCIDK_SCAN_QUEUE_SIZE / SCIDK_SCAN_BATCH_SIZE,
+        with optional per-scan overrides (keys: workers, queue_size, batch_size)."""
+        cfg = cls(
+            workers=_env_int('SCIDK_SCAN_WORKERS', min(8, os.cpu_count() or 2)),
+            queue_size=_env_int('SCIDK_SCAN_QUEUE_SIZE', 1000),
+            batch_size=_env_int('SCIDK_SCAN_BATCH_SIZE', 5000),
+        )
+        for key in ('workers', 'queue_size', 'batch_size'):
+            try:
+                val = int((overrides or {}).get(key) or 0)
+            except Exception:
+                val = 0
+            if val > 0:
+                setattr(cfg, key, val)
+        return cfg
+
+
+class ScanPipeline:
+    """Run walker -> worker pool -> batched writer over a stream of items.
+
+    process(item) -> Optional[(row, payload)]; row (tuple) is buffered for write_rows, payload goes to sink.
+    write_rows(rows) -> int is called from the writer thread with at most batch_size rows.
+    sink(payload) is called from the writer thread, so it may safely mutate non-thread-safe state.
+    """
+
+    def __init__(self, config: Optional[PipelineConfig] = None):
+        self.config = config or PipelineConfig.from_env()
+        self.stats: Dict[str, Any] = {}
+
+    def run(
+        self,
+        items: Iterable[Any],
+        process: Callable[[Any], Optional[Tuple[Optional[tuple], Any]]],
+        write_rows: Optional[Callable[[List[tuple]], int]] = None,
+        sink: Optional[Callable[[Any], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, Any]:
+        cfg = self.config
+        work_q: queue.Queue = queue.Queue(maxsize=cfg.queue_size)
+        result_q: queue.Queue = queue.Queue(maxsize=cfg.queue_size)
+        stats: Dict[str, Any] = {
+            'workers': cfg.workers,
+            'queue_size': cfg.queue_size,
+            'batch_size': cfg.batch_size,
+            'submitted': 0,
+            'processed': 0,
+            'errors': 0,
+            'rows_written': 0,
+            'batches': 0,
+            'max_queue_depth': 0,
+            'canceled': False,
+            'walk_error': None,
+            'write_error': None,
+        }
+        lock = threading.Lock()
+        write_exc: List[BaseException] = []
+        t0 = time.time()
+
+        def _worker():
+            while True:
+                item = work_q.get()
+                if item is _STOP:
+                    return
+                try:
+                    out = process(item)
+                except Exception:
+                    out = None
+                    with lock:
+                        stats['errors'] += 1
+                result_q.put(out)
+
+        def _flush(buf: List[tuple]):
+            if not buf or write_rows is None:
+                buf.clear()
+                return
+            try:
+                n = write_rows(list(buf))
+                stats['rows_written'] += int(n if n is not None else len(buf))
+                stats['batches'] += 1
+            except Exception as e:
+                # Keep draining so workers never block on a full result queue; re-raise after join
+                if not write_exc:
+                    write_exc.append(e)
+                    stats['write_error'] = str(e)
+            buf.clear()
+
+        def _writer():
+            buf: List[tuple] = []
+            while True:
+                out = result_q.get()
+                if out is _STOP:
+                    break
+                stats['processed'] += 1
+                if out is not None:
+                    row, payload = out
+                    if row is not None:
+                        buf.append(row)
+                        if len(buf) >= cfg.batch_size:
+                            _flush(buf)
+                    if payload is not None and sink is not None:
+                        try:
+                            sink(payload)
+                        except Exception:
+                            with lock:
+                                stats['errors'] += 1
+                if on_progress is not None:
+                    try:
+                        on_progress(stats['processed'])
+                    except Exception:
+                        pass
+            _flush(buf)
+
+        workers = [threading.Thread(target=_worker, daemon=True, name=f'scidk-scan-worker-{i}') for i in range(cfg.workers)]
+        writer = threading.Thread(target=_writer, daemon=True, name='scidk-scan-writer')
+        for t in workers:
+            t.start()
+        writer.start()
+        try:
+            for item in items:
+                if should_cancel is not None and should_cancel():
+                    stats['canceled'] = True
+                    break
+                work_q.put(item)
+                stats['submitted'] += 1
+                depth = work_q.qsize()
+                if depth > stats['max_queue_depth']:
+                    stats['max_queue_depth'] = depth
+        except Exception as e:
+            stats['walk_error'] = str(e)
+        finally:
+            for _ in workers:
+                work_q.put(_STOP)
+            for t in workers:
+                t.join()
+            result_q.put(_STOP)
+            writer.join()
+        stats['elapsed_ms'] = (time.time() - t0) * 1000.0
+        self.stats = stats
+        if write_exc:
+            raise write_exc[0]
+        return stats
@@ -0,0 +1,303 @@
+"""
+Search index behind GET /api/search.
+
+search_docs holds one row per file path, merged from two sources:
+
+- the `files` index: batch_insert_files() upserts every file row it writes (filename, extension,
+  size, mtime, scan_id). When a local scan finishes, paths under its root that it no longer saw
+  are removed (from file_history in versioned mode, by scan_id in append mode), and
+  file_versions.compact() purges paths left without any `files` row; existing rows are
+  backfilled once when the table is created;
+- the in-memory graph: datasets (dataset id and interpreter ids) changed since the last search are
+  applied by sync_graph() at the start of a search. The first sync in a process replaces whatever
+  an earlier process left behind.
+
+Text matching uses an FTS5 table with the trigram tokenizer over filename, path and interpreter
+ids, so any substring of three or more characters is an index lookup (case-insensitive). Shorter
+queries, and SQLite builds without FTS5 trigram support (before 3.34), fall back to LIKE over
+search_docs. The FTS table is external-content: new rows are added in one range insert per batch,
+updates and deletes go through triggers, and it is only touched when a path is added or removed or
+its interpreters change, not on every rescan. The filename is the tail of the path, so only path
+and interpreter ids are tokenized.
+
+Filters (extension, interpreter id, size and modification time) are applied with the text match.
+Ranking is filename hits, then other path hits, then interpreter-only hits; within a tier, earlier
+and shorter filename matches first. Only the first SCIDK_SEARCH_MAX_CANDIDATES matches (default
+5000) are ranked, so a very broad query costs the same as a narrow one; search() reports when
+that cap was hit. bm25 is not used: it scores trigram phrases poorly and must visit every match.
+"""
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_MAX_CANDIDATES = 5000
+# Trigram FTS cannot match fewer characters than this
+MIN_FTS_QUERY = 3
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """search_docs, its FTS5 trigram index and triggers (when supported); backfills from files once."""
+    cur = conn.cursor()
+    exists = cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='search_docs'").fetchone()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS search_docs (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            filename TEXT,
+            extension TEXT,
+            size INTEGER,
+            modified REAL,
+            scan_id TEXT,
+            dataset_id TEXT,
+            interpreters TEXT NOT NULL DEFAULT '',
+            in_files INTEGER NOT NULL DEFAULT 0
+        );
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_search_docs_ext ON search_docs(extension);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_search_docs_size ON search_docs(size);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_search_docs_modified ON search_docs(modified);")
+    try:
+        cur.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+            "path, interpreters, content='search_docs', content_rowid='id', tokenize='trigram');"
+        )
+        cur.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS search_docs_ad AFTER DELETE ON search_docs BEGIN
+                INSERT INTO search_fts(search_fts, rowid, path, interpreters)
+                VALUES ('delete', old.id, old.path, old.interpreters);
+            END;
+            CREATE TRIGGER IF NOT EXISTS search_docs_au AFTER UPDATE OF path, interpreters ON search_docs BEGIN
+                INSERT INTO search_fts(search_fts, rowid, path, interpreters)
+                VALUES ('delete', old.id, old.path, old.interpreters);
+                INSERT INTO search_fts(rowid, path, interpreters) VALUES (new.id, new.path, new.interpreters);
+            END;
+            """
+        )
+    except sqlite3.OperationalError:
+        # No FTS5 or no trigram tokenizer: search() falls back to LIKE
+        pass
+    if not exists:
+        cols = {row[1] for row in cur.execute("PRAGMA table_info(files);").fetchall()}
+        if cols:
+            current = " AND valid_to IS NULL" if 'valid_to' in cols else ""
+            last = _last_id(conn)
+            cur.execute(
+                "INSERT INTO search_docs(path, filename, extension, size, modified, scan_id, in_files) "
+                "SELECT path, name, file_extension, size, modified_time, scan_id, 1 FROM files "
+                f"WHERE type = 'file'{current} ORDER BY rowid "
+                "ON CONFLICT(path) DO UPDATE SET extension=excluded.extension, size=excluded.size, "
+                "modified=excluded.modified, scan_id=excluded.scan_id"
+            )
+            _index_new(conn, last)
+
+
+def has_fts(conn: sqlite3.Connection) -> bool:
+    from . import sqlite_pool
+    return bool(sqlite_pool.run_once(conn, 'search_fts', lambda c: c.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'search_fts'").fetchone()))
+
+
+def _last_id(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT coalesce(max(id), 0) FROM search_docs").fetchone()[0]
+
+
+def _index_new(conn: sqlite3.Connection, last_id: int) -> None:
+    """Add rows inserted after last_id to the FTS table in one statement.
+
+    New rows get ids above the previous maximum, so a range insert covers them; a per-row
+    AFTER INSERT trigger costs about ten times as much on large scans.
+    """
+    if has_fts(conn):
+        conn.execute(
+            "INSERT INTO search_fts(rowid, path, interpreters) SELECT id, path, interpreters FROM search_docs WHERE id > ?",
+            (last_id,),
+        )
+
+
+def index_file_rows(conn: sqlite3.Connection, rows: Sequence[Tuple]) -> None:
+    """Upsert `files` rows (the batch_insert_files tuple layout) into search_docs; folders are skipped."""
+    last = _last_id(conn)
+    conn.executemany(
+        "INSERT INTO search_docs(path, filename, extension, size, modified, scan_id, in_files) VALUES (?,?,?,?,?,?,1) "
+        "ON CONFLICT(path) DO UPDATE SET extension=excluded.extension, size=excluded.size, "
+        "modified=excluded.modified, scan_id=excluded.scan_id, in_files=1",
+        [(r[0], r[2], r[7], r[5], r[6], r[12]) for r in rows if r[4] == 'file'],
+    )
+    _index_new(conn, last)
+
+
+def remove_deleted(conn: sqlite3.Connection, scan_id: str) -> None:
+    """Drop paths the scan logged as deleted in file_history (unless the graph still holds them)."""
+    conn.execute(
+        "DELETE FROM search_docs WHERE dataset_id IS NULL AND path IN "
+        "(SELECT path FROM file_history WHERE scan_id = ? AND change_type = 'deleted')",
+        (scan_id,),
+    )
+
+
+def remove_unseen(conn: sqlite3.Connection, scan_id: str, root: str, recursive: bool = True,
+                  unchanged_dirs: Iterable[str] = (), skip_subtrees: Iterable[str] = ()) -> int:
+    """Append-mode counterpart of remove_deleted: drop file paths under root that this scan did not write.
+
+    Files in unchanged_dirs and under skip_subtrees were skipped, not deleted, so they stay (as in
+    file_versions.finalize_scan). Paths the graph still holds are kept. Returns rows removed.
+    """
+    from .file_versions import _prefix_range
+    lo, hi = _prefix_range(str(root))
+    candidates = conn.execute(
+        "SELECT id, path FROM search_docs WHERE dataset_id IS NULL AND path >= ? AND path < ? AND scan_id IS NOT ?",
+        (lo, hi, scan_id),
+    ).fetchall()
+    if not recursive:
+        candidates = [(i, p) for i, p in candidates if '/' not in p[len(lo):]]
+    unchanged = set(unchanged_dirs or ())
+    pruned = [_prefix_range(s) for s in (skip_subtrees or ())]
+    gone = [
+        (i,) for i, p in candidates
+        if p.rsplit('/', 1)[0] not in unchanged and not any(lo_ <= p < hi_ for lo_, hi_ in pruned)
+    ]
+    conn.executemany("DELETE FROM search_docs WHERE id = ?", gone)
+    return len(gone)
+
+
+def purge_missing(conn: sqlite3.Connection) -> int:
+    """Drop file paths that no longer have any row in `files` (after compaction); returns rows removed."""
+    cur = conn.execute(
+        "DELETE FROM search_docs WHERE dataset_id IS NULL AND in_files = 1 "
+        "AND path NOT IN (SELECT path FROM files WHERE type = 'file')"
+    )
+    return cur.rowcount
+
+
+def _interpreters(ds: Dict[str, Any]) -> str:
+    ids = sorted((ds.get('interpretations') or {}).keys())
+    return f" {' '.join(ids)} " if ids else ''
+
+
+def index_datasets(conn: sqlite3.Connection, datasets: Iterable[Dict[str, Any]], reset: bool = False) -> int:
+    """Upsert graph datasets; reset=True first drops every dataset-derived entry."""
+    if reset:
+        conn.execute("DELETE FROM search_docs WHERE in_files = 0")
+        conn.execute("UPDATE search_docs SET dataset_id = NULL, interpreters = '' WHERE dataset_id IS NOT NULL")
+    last = _last_id(conn)
+    rows = [
+        (ds.get('path'), ds.get('filename'), ds.get('extension'), ds.get('size_bytes'), ds.get('modified'),
+         ds.get('id'), _interpreters(ds))
+        for ds in datasets if ds.get('path')
+    ]
+    conn.executemany(
+        "INSERT INTO search_docs(path, filename, extension, size, modified, dataset_id, interpreters) "
+        "VALUES (?,?,?,?,?,?,?) "
+        "ON CONFLICT(path) DO UPDATE SET dataset_id=excluded.dataset_id, interpreters=excluded.interpreters, "
+        "extension=coalesce(excluded.extension, extension), size=coalesce(excluded.size, size), "
+        "modified=coalesce(excluded.modified, modified) "
+        "WHERE dataset_id IS NOT excluded.dataset_id OR interpreters IS NOT excluded.interpreters "
+        "OR size IS NOT excluded.size OR modified IS NOT excluded.modified",
+        rows,
+    )
+    _index_new(conn, last)
+    return len(rows)
+
+
+def sync_graph(graph) -> int:
+    """Apply dataset changes the graph reports (search_changes/mark_search_synced); returns rows applied."""
+    changes = getattr(graph, 'search_changes', None)
+    if changes is None:
+        return 0
+    full, datasets = changes()
+    if not full and not datasets:
+        return 0
+    from . import path_index_sqlite as pix, sqlite_pool
+    pix.init_db()
+    with sqlite_pool.write(str(pix._db_path())) as conn:
+        n = index_datasets(conn, datasets, reset=full)
+    graph.mark_search_synced(full, [ds.get('checksum') for ds in datasets])
+    return n
+
+
+def max_candidates() -> int:
+    try:
+        return max(1, int(os.environ.get('SCIDK_SEARCH_MAX_CANDIDATES') or DEFAULT_MAX_CANDIDATES))
+    except Exception:
+        return DEFAULT_MAX_CANDIDATES
+
+
+def _escape_like(s: str) -> str:
+    return s.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search(conn: sqlite3.Connection, q: str, extensions: Optional[Sequence[str]] = None,
+           interpreter: Optional[str] = None, min_size: Optional[int] = None, max_size: Optional[int] = None,
+           modified_after: Optional[float] = None, modified_before: Optional[float] = None,
+           limit: int = 100, offset: int = 0) -> Tuple[List[Dict[str, Any]], bool, bool]:
+    """(results, has_more, truncated) for a substring query plus filters, ranked and paginated.
+
+    truncated means more than max_candidates() rows matched and only that many were ranked.
+    """
+    q = (q or '').strip()
+    q_lower = q.lower()
+    where: List[str] = []
+    params: List[Any] = []
+    if extensions:
+        exts = [e if e.startswith('.') else '.' + e for e in (x.strip().lower() for x in extensions) if e]
+        where.append(f"d.extension IN ({','.join('?' * len(exts))})")
+        params += exts
+    if interpreter:
+        where.append("instr(lower(d.interpreters), ?) > 0")
+        params.append(f" {interpreter.strip().lower()} ")
+    for cond, val in (("d.size >= ?", min_size), ("d.size <= ?", max_size),
+                      ("d.modified >= ?", modified_after), ("d.modified <= ?", modified_before)):
+        if val is not None:
+            where.append(cond)
+            params.append(val)
+
+    source = "search_docs d"
+    text_params: List[Any] = []
+    if q and len(q) >= MIN_FTS_QUERY and has_fts(conn):
+        source = "search_fts JOIN search_docs d ON d.id = search_fts.rowid"
+        where.insert(0, "search_fts MATCH ?")
+        text_params.append('"' + q.replace('"', '""') + '"')
+    elif q:
+        like = '%' + _escape_like(q) + '%'
+        where.insert(0, "(d.path LIKE ? ESCAPE '\\' OR d.interpreters LIKE ? ESCAPE '\\')")
+        text_params += [like, like]
+    window = max_candidates()
+    # Unordered inner query: stops after `window` matches instead of ranking every match
+    sql = (
+        "SELECT * FROM ("
+        "SELECT d.dataset_id, d.path, d.filename, d.extension, d.size, d.modified, d.interpreters, d.scan_id "
+        f"FROM {source} {'WHERE ' + ' AND '.join(where) if where else ''} LIMIT ?) c "
+        "ORDER BY CASE WHEN instr(lower(c.filename), ?) > 0 THEN 0 WHEN instr(lower(c.path), ?) > 0 THEN 1 ELSE 2 END, "
+        "instr(lower(c.filename), ?), length(c.filename), c.filename, c.path LIMIT ? OFFSET ?"
+    )
+    candidates = text_params + params + [window]
+    rows = conn.execute(sql, candidates + [q_lower] * 3 + [int(limit) + 1, int(offset)]).fetchall()
+    truncated = False
+    if offset + len(rows) >= window:
+        truncated = conn.execute(
+            f"SELECT count(*) FROM (SELECT 1 FROM {source} {'WHERE ' + ' AND '.join(where) if where else ''} LIMIT ?)",
+            text_params + params + [window + 1],
+        ).fetchone()[0] > window
+
+    results = []
+    for dataset_id, path, filename, ext, size, modified, interps, scan_id in rows[:limit]:
+        matched_on = []
+        if q_lower and (q_lower in (filename or '').lower() or q_lower in (path or '').lower()):
+            matched_on.append('filename')
+        if q_lower and any(q_lower in i.lower() for i in (interps or '').split()):
+            matched_on.append('interpreter_id')
+        results.append({
+            'id': dataset_id,
+            'path': path,
+            'filename': filename,
+            'extension': ext,
+            'size_bytes': size,
+            'modified': modified,
+            'interpreters': (interps or '').split(),
+            'scan_id': scan_id,
+            'matched_on': matched_on,
+        })
+    return results, len(rows) > limit, truncated
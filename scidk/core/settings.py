@@ -4,6 +4,8 @@ from datetime import datetime
 from typing import Set, Dict, Optional
 import os
 
+from . import sqlite_pool
+
 
 class InterpreterSettings:
     """Minimal settings persistence for interpreter toggles using SQLite.
@@ -69,7 +71,7 @@ def get_setting(key: str, default: Optional[str] = None) -> Optional[str]:
     """
     try:
         db_path = _get_db_path()
-        db = sqlite3.connect(db_path)
+        db = sqlite_pool.connect(db_path)
         cur = db.execute(
             "SELECT value FROM interpreter_settings WHERE key = ?",
             (key,)
@@ -91,7 +93,7 @@ def set_setting(key: str, value: str):
         value: Setting value
     """
     db_path = _get_db_path()
-    db = sqlite3.connect(db_path)
+    db = sqlite_pool.connect(db_path)
     # Ensure table exists
     db.execute(
         """
@@ -123,7 +125,7 @@ def get_settings_by_prefix(prefix: str) -> Dict[str, str]:
     """
     try:
         db_path = _get_db_path()
-        db = sqlite3.connect(db_path)
+        db = sqlite_pool.connect(db_path)
         cur = db.execute(
             "SELECT key, value FROM interpreter_settings WHERE key LIKE ?",
             (prefix + '%',)
@@ -0,0 +1,327 @@
+"""
+Process-wide SQLite connection manager.
+
+connect(path) hands out a PooledConnection from a per-thread free list for that database file;
+close() returns it to the list instead of closing it (rolling back anything left uncommitted and
+resetting row_factory/isolation_level, so callers see the same semantics as a fresh connection).
+Nested callers in one thread get distinct connections, and a connection that is never closed is
+simply dropped and closed by the GC, as before. PRAGMAs are applied once per physical connection
+and sqlite3's per-connection statement cache survives across checkouts.
+
+Read/write split for WAL: readonly=True connections set PRAGMA query_only and are pooled
+separately, so readers never queue behind a writer. write(path) is a context manager that
+serializes in-process writers on a per-file lock and runs the block in BEGIN IMMEDIATE, instead
+of letting concurrent writers spin on SQLITE_BUSY.
+
+run_once(conn, key, fn) runs schema setup (init_db, migrations) once per database file and
+process; the file is identified by (path, device, inode), so a deleted and recreated database is
+initialized again.
+
+Every statement run through a pooled connection is counted and timed per scope (the Flask
+endpoint, set by install_request_hooks, or 'background'); stats() reports query counts,
+statement time and lock-wait time per scope.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Idle connections kept per (thread, file, mode); extra ones are closed on return
+MAX_IDLE_PER_THREAD = 4
+# sqlite3's per-connection prepared statement cache (stdlib default is 128)
+CACHED_STATEMENTS = 256
+
+_PRAGMAS = (
+    'PRAGMA journal_mode=WAL;',
+    'PRAGMA synchronous=NORMAL;',
+    'PRAGMA temp_store=MEMORY;',
+)
+
+_local = threading.local()
+_lock = threading.Lock()
+_write_locks: Dict[str, threading.Lock] = {}
+_once_locks: Dict[Tuple, threading.RLock] = {}
+_once_done: Dict[Tuple, Any] = {}
+_stats: Dict[str, List[float]] = {}  # scope -> [queries, seconds, max_seconds, lock_wait_seconds, lock_errors]
+_counters = {'opened': 0, 'reused': 0, 'closed': 0}
+
+
+def _scope() -> str:
+    return getattr(_local, 'scope', None) or 'background'
+
+
+def set_scope(name: Optional[str]) -> None:
+    """Label statements run by this thread (e.g. the current endpoint) until reset with None."""
+    _local.scope = name
+
+
+def _record(seconds: float, lock_wait: float = 0.0, lock_error: bool = False, query: bool = True) -> None:
+    scope = _scope()
+    with _lock:
+        s = _stats.get(scope)
+        if s is None:
+            s = _stats[scope] = [0, 0.0, 0.0, 0.0, 0]
+        if query:
+            s[0] += 1
+            s[1] += seconds
+            if seconds > s[2]:
+                s[2] = seconds
+        s[3] += lock_wait
+        if lock_error:
+            s[4] += 1
+
+
+def _is_lock_error(e: Exception) -> bool:
+    return isinstance(e, sqlite3.OperationalError) and 'locked' in str(e).lower()
+
+
+class _TimedCursor(sqlite3.Cursor):
+    def _timed(self, fn, *args):
+        t0 = time.perf_counter()
+        try:
+            result = fn(*args)
+        except sqlite3.OperationalError as e:
+            dt = time.perf_counter() - t0
+            locked = _is_lock_error(e)
+            _record(dt, lock_wait=dt if locked else 0.0, lock_error=locked)
+            raise
+        _record(time.perf_counter() - t0)
+        return result
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._timed(super().executescript, sql_script)
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection whose close() returns it to the calling thread's pool."""
+
+    db_path = ''
+    readonly = False
+    file_id: Optional[Tuple[int, int]] = None
+    _owner: Optional[int] = None
+
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection.execute* create their cursor internally; route them through the timed one
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def close(self):
+        if self._owner != threading.get_ident() or not _release(self):
+            self.close_physical()
+
+    def close_physical(self):
+        self._owner = None
+        with _lock:
+            _counters['closed'] += 1
+        super().close()
+
+
+def _key(path: str) -> str:
+    return os.path.abspath(path) if path != ':memory:' else path
+
+
+def _free_list(path: str, readonly: bool) -> List[PooledConnection]:
+    pools = getattr(_local, 'pools', None)
+    if pools is None:
+        pools = _local.pools = {}
+    return pools.setdefault((path, readonly), [])
+
+
+def _release(conn: PooledConnection) -> bool:
+    """Put conn back on its thread's free list; False if it should be closed instead."""
+    free = _free_list(conn.db_path, conn.readonly)
+    if conn in free:
+        return True  # closed twice
+    if len(free) >= MAX_IDLE_PER_THREAD:
+        return False
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+        conn.isolation_level = ''
+    except sqlite3.Error:
+        return False
+    free.append(conn)
+    return True
+
+
+def _file_id(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def connect(path: str, readonly: bool = False, timeout: float = 5.0, pragmas: Tuple[str, ...] = ()) -> sqlite3.Connection:
+    """Check out a pooled connection to the database file at path.
+
+    pragmas are extra statements applied when a new physical connection is opened.
+    """
+    path = _key(str(path))
+    if path == ':memory:':
+        return sqlite3.connect(path, timeout=timeout)
+    free = _free_list(path, readonly)
+    file_id = _file_id(path) if free else None
+    while free:
+        conn = free.pop()
+        # A deleted or replaced file must not be served from a stale handle
+        if conn.file_id == file_id:
+            with _lock:
+                _counters['reused'] += 1
+            return conn
+        conn.close_physical()
+        forget_file(path)
+    if not os.path.exists(path):
+        # New database file (inode numbers are reused): schema setup must run again
+        forget_file(path)
+    conn = sqlite3.connect(path, timeout=timeout, factory=PooledConnection, cached_statements=CACHED_STATEMENTS)
+    conn.db_path = path
+    conn.readonly = readonly
+    conn._owner = threading.get_ident()
+    for pragma in _PRAGMAS + tuple(pragmas):
+        try:
+            conn.execute(pragma)
+        except sqlite3.Error:
+            pass
+    if readonly:
+        conn.execute('PRAGMA query_only=ON;')
+    conn.file_id = _file_id(path)
+    with _lock:
+        _counters['opened'] += 1
+    return conn
+
+
+@contextmanager
+def write(path: str, timeout: float = 5.0) -> Iterator[sqlite3.Connection]:
+    """Pooled connection holding the in-process writer lock for path, inside BEGIN IMMEDIATE.
+
+    Commits on success and rolls back on error. Time spent waiting for the lock is reported as
+    lock wait for the current scope.
+    """
+    key = _key(str(path))
+    with _lock:
+        lk = _write_locks.setdefault(key, threading.Lock())
+    t0 = time.perf_counter()
+    lk.acquire()
+    _record(0.0, lock_wait=time.perf_counter() - t0, query=False)
+    try:
+        conn = connect(key, timeout=timeout)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        finally:
+            conn.close()
+    finally:
+        lk.release()
+
+
+def _identity(conn: sqlite3.Connection) -> Optional[Tuple]:
+    path = getattr(conn, 'db_path', None)
+    if not path:
+        try:
+            row = conn.execute('PRAGMA database_list').fetchone()
+            path = row[2] if row else ''
+        except sqlite3.Error:
+            return None
+    if not path:
+        return None  # in-memory or temporary database
+    file_id = _file_id(path)
+    if file_id is None:
+        return None
+    return (os.path.abspath(path),) + file_id
+
+
+def run_once(conn: sqlite3.Connection, key: str, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+    """Run fn(conn) once per database file and process for key; later calls return its result."""
+    ident = _identity(conn)
+    if ident is None:
+        return fn(conn)
+    k = ident + (key,)
+    if k in _once_done:
+        return _once_done[k]
+    with _lock:
+        lk = _once_locks.setdefault(k, threading.RLock())
+    with lk:
+        if k in _once_done:
+            return _once_done[k]
+        if getattr(conn, 'readonly', False):
+            # Schema setup needs a writable connection to the same file
+            rw = connect(conn.db_path)
+            try:
+                result = fn(rw)
+            finally:
+                rw.close()
+        else:
+            result = fn(conn)
+        _once_done[k] = result
+        return result
+
+
+def forget_file(path: str) -> None:
+    """Drop run_once results for the database file at path (e.g. before creating it anew)."""
+    path = _key(str(path))
+    with _lock:
+        for k in [k for k in _once_done if k[0] == path]:
+            _once_done.pop(k, None)
+
+
+def forget(key: Optional[str] = None) -> None:
+    """Drop run_once results (all, or for one key) so schema setup runs again."""
+    with _lock:
+        for k in [k for k in _once_done if key is None or k[-1] == key]:
+            _once_done.pop(k, None)
+
+
+def stats(reset: bool = False) -> Dict[str, Any]:
+    with _lock:
+        scopes = {
+            scope: {
+                'queries': int(s[0]),
+                'seconds': round(s[1], 6),
+                'avg_ms': round(s[1] / s[0] * 1000.0, 3) if s[0] else None,
+                'max_ms': round(s[2] * 1000.0, 3),
+                'lock_wait_seconds': round(s[3], 6),
+                'lock_errors': int(s[4]),
+            }
+            for scope, s in _stats.items()
+        }
+        out = {'connections': dict(_counters), 'scopes': scopes,
+               'queries_total': sum(v['queries'] for v in scopes.values())}
+        if reset:
+            _stats.clear()
+    return out
+
+
+def install_request_hooks(app) -> None:
+    """Attribute statements to the Flask endpoint serving the request."""
+    from flask import request
+
+    @app.before_request
+    def _sqlite_scope_begin():
+        set_scope(request.endpoint or request.path)
+
+    @app.teardown_request
+    def _sqlite_scope_end(_exc=None):
+        set_scope(None)
@@ -12,6 +12,7 @@ from dataclasses import dataclass, asdict
 from typing import List, Optional, Dict, Any
 
 from ..core import path_index_sqlite as pix
+from ..core import sqlite_pool
 
 
 @dataclass
@@ -97,7 +98,7 @@ class ChatService:
     def _get_conn(self) -> sqlite3.Connection:
         """Get database connection."""
         if self.db_path:
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite_pool.connect(self.db_path)
         else:
             conn = pix.connect()
         conn.row_factory = sqlite3.Row
@@ -153,9 +153,10 @@ class CommitService:
             try:
                 cur = conn.cursor()
                 # Query all files in this scan that have interpretation data
+                scope, scope_params = pix.scan_scope(conn, scan_id)
                 cur.execute(
-                    "SELECT interpretation_json FROM files WHERE scan_id = ? AND interpretation_json IS NOT NULL",
-                    (scan_id,)
+                    f"SELECT interpretation_json FROM files WHERE {scope} AND interpretation_json IS NOT NULL",
+                    scope_params
                 )
 
                 for (interp_json,) in cur.fetchall():
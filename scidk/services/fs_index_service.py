@@ -1,5 +1,36 @@
 from __future__ import annotations
-from typing import Any, Dict, Optional
+import base64
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+_BROWSE_COLUMNS = (
+    "path, name, type, size, modified_time, file_extension, mime_type, interpreted_as, interpretation_json"
+)
+
+
+def _query(conn, where: List[str], params: List[Any], tail: str, tail_params: List[Any]) -> List[tuple]:
+    sql = f"SELECT {_BROWSE_COLUMNS} FROM files WHERE {' AND '.join(where)} {tail}"
+    return conn.execute(sql, [*params, *tail_params]).fetchall()
+
+
+def _encode_token(type_val: str, name_val: str) -> str:
+    raw = json.dumps([type_val, name_val], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_token(token: Optional[str]) -> Union[None, int, Tuple[str, str]]:
+    """Page cursor as (type, name) of the last entry served; bare integers are legacy offsets."""
+    raw = (token or '').strip()
+    if not raw:
+        return None
+    if raw.isdigit():
+        return int(raw)
+    try:
+        type_val, name_val = json.loads(base64.urlsafe_b64decode(raw + '=' * (-len(raw) % 4)))
+        return str(type_val), str(name_val)
+    except Exception:
+        return None
 
 
 class FSIndexService:
@@ -11,7 +42,8 @@ class FSIndexService:
 
     Contract:
       - Ordering: type DESC, name ASC
-      - Pagination token: opaque offset string (stable for MVP)
+      - Pagination token: opaque cursor encoding (type, name) of the last entry served;
+        pages are keyset seeks on idx_files_scan_browse, so deep pages cost the same as the first
       - Filters: type (file|folder), extension (normalized lowercase, includes leading dot if provided)
     """
 
@@ -84,38 +116,41 @@ class FSIndexService:
             limit = 100
         limit = max(1, min(limit, 1000))
 
-        token_raw = (next_page_token or '').strip()
-        try:
-            offset = int(token_raw) if token_raw else 0
-        except Exception:
-            offset = 0
+        cursor = _decode_token(next_page_token)
 
         # Normalize filters
         filters = filters or {}
         ext = (filters.get('extension') or filters.get('ext') or '').strip().lower()
         typ = (filters.get('type') or '').strip().lower()
 
-        where = ["scan_id = ?", "parent_path = ?"]
-        params: list[Any] = [scan_id, req_path]
-        if ext:
-            where.append("file_extension = ?")
-            params.append(ext)
-        if typ:
-            where.append("type = ?")
-            params.append(typ)
-        where_sql = " AND ".join(where)
-        sql = (
-            "SELECT path, name, type, size, modified_time, file_extension, mime_type, interpreted_as, interpretation_json "
-            f"FROM files WHERE {where_sql} "
-            "ORDER BY type DESC, name ASC "
-            "LIMIT ? OFFSET ?"
-        )
-        params.extend([limit + 1, offset])
-
+        t0 = time.time()
         try:
-            conn = pix.connect(); pix.init_db(conn)
-            cur = conn.execute(sql, params)
-            rows = cur.fetchall()
+            # Pooled query_only reader; init_db is a no-op after the first call per DB
+            conn = pix.connect(readonly=True)
+            pix.init_db(conn)
+            scope_sql, scope_params = pix.scan_scope(conn, scan_id)
+            where = [scope_sql, "parent_path = ?"]
+            params: list[Any] = [*scope_params, req_path]
+            if ext:
+                where.append("file_extension = ?")
+                params.append(ext)
+            if typ:
+                where.append("type = ?")
+                params.append(typ)
+            if isinstance(cursor, int):
+                # Legacy offset token from an older page
+                rows = _query(conn, where, params, "ORDER BY type DESC, name ASC LIMIT ? OFFSET ?", [limit + 1, cursor])
+            elif cursor is not None:
+                # Keyset: rest of the cursor's type group, then the following (smaller) types.
+                # Each part is a range seek on the (parent_path, type, name) index.
+                last_type, last_name = cursor
+                rows = _query(conn, where + ["type = ?", "name > ?"], params + [last_type, last_name],
+                              "ORDER BY name ASC LIMIT ?", [limit + 1])
+                if len(rows) <= limit:
+                    rows += _query(conn, where + ["type < ?"], params + [last_type],
+                                   "ORDER BY type DESC, name ASC LIMIT ?", [limit + 1 - len(rows)])
+            else:
+                rows = _query(conn, where, params, "ORDER BY type DESC, name ASC LIMIT ?", [limit + 1])
         except Exception as e:
             return jsonify({'error': str(e)}), 500
         finally:
@@ -123,6 +158,11 @@ class FSIndexService:
                 conn.close()  # type: ignore[name-defined]
             except Exception:
                 pass
+            try:
+                from .metrics import record_latency
+                record_latency(self.app, 'browse', time.time() - t0)
+            except Exception:
+                pass
 
         entries = []
         for r in rows[:limit]:
@@ -138,7 +178,9 @@ class FSIndexService:
                 'interpreted_as': interp_as,
                 'interpretation_json': interp_json,
             })
-        next_token = str(offset + limit) if len(rows) > limit else None
+        next_token = None
+        if len(rows) > limit and entries:
+            next_token = _encode_token(entries[-1]['type'], entries[-1]['name'])
 
         out = {
             'scan_id': scan_id,
@@ -0,0 +1,302 @@
+"""Streaming transfer engine for copying graph data from a source Neo4j database into the primary one.
+
+Used by LinkService._streaming_batch_import (triple import) and LabelService.transfer_to_primary
+(node and relationship transfer). A transfer is a read query over the source and an UNWIND write
+query over the primary:
+
+- Keyset pagination: pages are read with ``WHERE cursor > $after ORDER BY cursor LIMIT $limit``
+  on an elementId (see ``keyset_query``) instead of SKIP/LIMIT, so each page continues exactly
+  where the previous one stopped and the order is stable between pages.
+- UNWIND writes: each page is written in one ``UNWIND $rows`` query; its count column (``count_key``)
+  is the number of items written.
+- Pipeline: a reader thread fetches pages into a bounded queue (SCIDK_TRANSFER_QUEUE_DEPTH pages,
+  default 2) while the caller's thread writes, so source reads overlap primary writes without
+  buffering the whole result.
+- Checkpoints: after every written page the last cursor and running counts are saved in the SQLite
+  table ``transfer_checkpoints`` under the transfer's key. A transfer that is cancelled or fails
+  resumes from that cursor on its next run (writes are MERGEs, so replaying a page is harmless);
+  the checkpoint is removed when the transfer completes.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_QUEUE_DEPTH = 2
+_DONE = object()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name) or default))
+    except Exception:
+        return default
+
+
+def keyset_query(match: str, variables: str, key: str, returns: str) -> str:
+    """Page query for ``match``: rows after $after ordered by ``key`` (returned as ``cursor``), $limit per page."""
+    return (
+        f"{match}\n"
+        f"WITH {variables}, {key} AS cursor\n"
+        f"WHERE cursor > $after\n"
+        f"RETURN cursor, {returns}\n"
+        f"ORDER BY cursor\n"
+        f"LIMIT $limit"
+    )
+
+
+# -- checkpoints --------------------------------------------------------------------------------
+def ensure_table(conn) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS transfer_checkpoints (
+            key TEXT PRIMARY KEY,
+            cursor TEXT NOT NULL,
+            rows_read INTEGER DEFAULT 0,
+            written INTEGER DEFAULT 0,
+            batches INTEGER DEFAULT 0,
+            updated_at REAL
+        );
+        """
+    )
+
+
+def load_checkpoint(key: str) -> Optional[Dict[str, Any]]:
+    from ..core import path_index_sqlite as pix
+    conn = pix.connect()
+    try:
+        ensure_table(conn)
+        row = conn.execute(
+            "SELECT cursor, rows_read, written, batches, updated_at FROM transfer_checkpoints WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if not row:
+            return None
+        return {'cursor': row[0], 'rows_read': row[1] or 0, 'written': row[2] or 0,
+                'batches': row[3] or 0, 'updated_at': row[4]}
+    finally:
+        conn.close()
+
+
+def save_checkpoint(key: str, cursor: str, rows_read: int, written: int, batches: int) -> None:
+    from ..core import path_index_sqlite as pix
+    conn = pix.connect()
+    try:
+        ensure_table(conn)
+        conn.execute(
+            "INSERT INTO transfer_checkpoints(key, cursor, rows_read, written, batches, updated_at) "
+            "VALUES(?,?,?,?,?,?) "
+            "ON CONFLICT(key) DO UPDATE SET cursor=excluded.cursor, rows_read=excluded.rows_read, "
+            "written=excluded.written, batches=excluded.batches, updated_at=excluded.updated_at",
+            (key, cursor, int(rows_read), int(written), int(batches), time.time()),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def clear_checkpoint(key: str) -> None:
+    from ..core import path_index_sqlite as pix
+    conn = pix.connect()
+    try:
+        ensure_table(conn)
+        conn.execute("DELETE FROM transfer_checkpoints WHERE key = ?", (key,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# -- engine -------------------------------------------------------------------------------------
+class StreamingTransfer:
+    """Reads keyset pages from ``source_client`` and writes them to ``primary_client`` with UNWIND.
+
+    read_query must take $after / $limit and return rows ordered by a ``cursor`` column (build it
+    with ``keyset_query``). ``transform`` maps a source row to the dict sent in ``$rows`` (None skips
+    the row); write_query must return ``count_key``.
+    """
+
+    def __init__(
+        self,
+        source_client,
+        primary_client,
+        read_query: str,
+        write_query: str,
+        batch_size: int = 1000,
+        transform: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+        read_params: Optional[Dict[str, Any]] = None,
+        write_params: Optional[Dict[str, Any]] = None,
+        count_key: str = 'written',
+        checkpoint_key: Optional[str] = None,
+        resume: bool = True,
+        should_cancel: Optional[Callable[[], bool]] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        queue_depth: Optional[int] = None,
+        max_retries: int = 3,
+        app=None,
+    ):
+        self.source_client = source_client
+        self.primary_client = primary_client
+        self.read_query = read_query
+        self.write_query = write_query
+        self.batch_size = max(1, int(batch_size))
+        self.transform = transform
+        self.read_params = dict(read_params or {})
+        self.write_params = dict(write_params or {})
+        self.count_key = count_key
+        self.checkpoint_key = checkpoint_key
+        self.resume = resume
+        self.should_cancel = should_cancel
+        self.on_progress = on_progress
+        self.queue_depth = max(1, int(queue_depth or _env_int('SCIDK_TRANSFER_QUEUE_DEPTH', DEFAULT_QUEUE_DEPTH)))
+        self.max_retries = max(0, int(max_retries))
+        self.app = app
+        self._stop = threading.Event()
+
+    # -- helpers ------------------------------------------------------------------------------
+    def _cancelled(self) -> bool:
+        if self.should_cancel is None:
+            return False
+        try:
+            return bool(self.should_cancel())
+        except Exception:
+            return False
+
+    def _emit(self, payload: Dict[str, Any]) -> None:
+        if self.on_progress is None:
+            return
+        try:
+            self.on_progress(payload)
+        except Exception:
+            pass
+
+    def _put(self, q: 'queue.Queue', item) -> bool:
+        """Blocking put that gives up once the writer has stopped (so the reader never hangs)."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _reader(self, q: 'queue.Queue', after: str, stats: Dict[str, float]) -> None:
+        try:
+            while not self._stop.is_set():
+                t0 = time.perf_counter()
+                page = self.source_client.execute_read(
+                    self.read_query, {**self.read_params, 'after': after, 'limit': self.batch_size})
+                stats['read_sec'] += time.perf_counter() - t0
+                page = list(page or [])
+                if not page:
+                    break
+                last = page[-1].get('cursor')
+                full = len(page) >= self.batch_size
+                if full and last is None:
+                    raise ValueError("Transfer read query must return a 'cursor' column")
+                if not self._put(q, (page, last)):
+                    return
+                if not full:
+                    break
+                after = last
+        except BaseException as e:  # surfaced to the writer
+            self._put(q, e)
+            return
+        self._put(q, _DONE)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> int:
+        from .neo4j_commit import is_transient
+        attempt = 0
+        while True:
+            try:
+                result = self.primary_client.execute_write(self.write_query, {**self.write_params, 'rows': rows})
+                return int((result[0] or {}).get(self.count_key) or 0) if result else 0
+            except Exception as ex:
+                attempt += 1
+                if attempt > self.max_retries or not is_transient(ex):
+                    raise
+                time.sleep(min(0.25 * (2 ** (attempt - 1)) + random.random() * 0.25, 5.0))
+
+    # -- run ----------------------------------------------------------------------------------
+    def run(self) -> Dict[str, Any]:
+        """Run the transfer. Returns counts, cursor and timings; write errors propagate after checkpointing."""
+        result: Dict[str, Any] = {'count': 0, 'rows_read': 0, 'batches': 0, 'cursor': '', 'resumed_from': None,
+                                  'completed': False, 'cancelled': False}
+        if self.checkpoint_key and self.resume:
+            try:
+                cp = load_checkpoint(self.checkpoint_key)
+            except Exception:
+                cp = None
+            if cp:
+                result.update({'cursor': cp['cursor'], 'resumed_from': cp['cursor'], 'count': cp['written'],
+                               'rows_read': cp['rows_read'], 'batches': cp['batches']})
+        stats = {'read_sec': 0.0, 'write_sec': 0.0}
+        q: 'queue.Queue' = queue.Queue(maxsize=self.queue_depth)
+        t_start = time.perf_counter()
+        reader = threading.Thread(target=self._reader, args=(q, result['cursor'], stats),
+                                  name='scidk-graph-transfer-reader', daemon=True)
+        reader.start()
+        try:
+            while True:
+                if self._cancelled():
+                    result['cancelled'] = True
+                    break
+                item = q.get()
+                if item is _DONE:
+                    result['completed'] = True
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                page, last = item
+                rows = page if self.transform is None else [r for r in map(self.transform, page) if r is not None]
+                t0 = time.perf_counter()
+                written = self._write(rows) if rows else 0
+                sec = time.perf_counter() - t0
+                stats['write_sec'] += sec
+                result['count'] += written
+                result['rows_read'] += len(page)
+                result['batches'] += 1
+                if last is not None:
+                    result['cursor'] = last
+                if self.checkpoint_key:
+                    try:
+                        save_checkpoint(self.checkpoint_key, result['cursor'], result['rows_read'],
+                                        result['count'], result['batches'])
+                    except Exception:
+                        pass
+                if self.app is not None:
+                    try:
+                        from .metrics import record_latency
+                        record_latency(self.app, 'graph_transfer_batch', sec)
+                    except Exception:
+                        pass
+                self._emit({'batch': result['batches'], 'rows': len(page), 'written': written,
+                            'total_written': result['count'], 'total_read': result['rows_read'],
+                            'cursor': result['cursor'], 'sec': round(sec, 3)})
+        finally:
+            self._stop.set()
+            reader.join(timeout=5)
+        if result['completed'] and self.checkpoint_key:
+            try:
+                clear_checkpoint(self.checkpoint_key)
+            except Exception:
+                pass
+        total = time.perf_counter() - t_start
+        result['sec'] = round(total, 3)
+        result['read_sec'] = round(stats['read_sec'], 3)
+        result['write_sec'] = round(stats['write_sec'], 3)
+        result['rows_per_sec'] = round(result['rows_read'] / total, 1) if total > 0 else None
+        if self.app is not None:
+            try:
+                from .metrics import _telemetry
+                _telemetry(self.app)['last_graph_transfer'] = {
+                    'key': self.checkpoint_key, 'count': result['count'], 'batches': result['batches'],
+                    'sec': result['sec'], 'read_sec': result['read_sec'], 'write_sec': result['write_sec'],
+                    'completed': result['completed'],
+                }
+            except Exception:
+                pass
+        return result
@@ -0,0 +1,137 @@
+"""
+Long-lived GraphRAG engines, one per Neo4j database.
+
+Building a QueryEngine loads the query library YAML, runs db.labels()/db.relationshipTypes()
+through SciDKSchemaLoader and (on first question) prepares a Text2CypherRetriever. The chat
+routes keep one warm entry per (uri, database) instead: the shared driver lease, the filtered
+schema and the QueryEngine with its retriever.
+
+An entry is replaced when its connection fingerprint (user, credentials, auth mode, engine
+options) changes, and dropped by invalidate() — called from /api/chat/context/refresh and
+/api/chat/schema/refresh.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+import hashlib
+import threading
+import time
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable digest of connection and engine settings (never stores secrets in clear)."""
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(repr(p).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()[:16]
+
+
+class CachedEngine:
+    """Warm state for one database: driver lease, filtered schema and the QueryEngine."""
+
+    def __init__(self, key: Tuple[str, str], fp: str, driver: Any):
+        self.key = key
+        self.fingerprint = fp
+        self.driver = driver
+        self.schema: Optional[Dict[str, Any]] = None
+        self.schema_ts: Optional[int] = None
+        self.engine = None
+        self.engine_build_ms: Optional[float] = None
+        self.created = time.time()
+        self.last_used = self.created
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def set_schema(self, schema: Dict[str, Any]) -> None:
+        with self._lock:
+            self.schema = schema
+            self.schema_ts = int(time.time())
+            if self.engine is not None:
+                self.engine.set_schema(schema)
+
+    def get_engine(self, build: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(QueryEngine, built_now): builds it on first use with build()."""
+        with self._lock:
+            if self.engine is not None:
+                return self.engine, False
+            t0 = time.perf_counter()
+            self.engine = build()
+            self.engine_build_ms = round((time.perf_counter() - t0) * 1000, 1)
+            return self.engine, True
+
+    def close(self) -> None:
+        try:
+            self.driver.close()  # releases the shared driver lease
+        except Exception:
+            pass
+
+
+class GraphRAGEngineCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], CachedEngine] = {}
+        self.counters = {'hits': 0, 'misses': 0, 'replaced': 0, 'invalidations': 0}
+
+    def get(self, uri: str, database: Optional[str], fp: str,
+            open_driver: Callable[[], Any]) -> Tuple[CachedEngine, bool]:
+        """(entry, hit) for (uri, database); opens a driver with open_driver() on a miss."""
+        key = (uri, database or '')
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.fingerprint == fp:
+                entry.hits += 1
+                entry.last_used = time.time()
+                self.counters['hits'] += 1
+                return entry, True
+        driver = open_driver()
+        fresh = CachedEngine(key, fp, driver)
+        stale = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.fingerprint == fp:
+                # Another request built it meanwhile: keep theirs
+                entry.hits += 1
+                self.counters['hits'] += 1
+                stale, result = fresh, entry
+            else:
+                if entry is not None:
+                    self.counters['replaced'] += 1
+                    stale = entry
+                self._entries[key] = fresh
+                self.counters['misses'] += 1
+                result = fresh
+        if stale is not None:
+            stale.close()
+        return result, result is not fresh
+
+    def invalidate(self, uri: Optional[str] = None, database: Optional[str] = None) -> int:
+        """Drop entries for uri/database (all entries when both are None)."""
+        with self._lock:
+            victims = [k for k in self._entries
+                       if (uri is None or k[0] == uri) and (database is None or k[1] == (database or ''))]
+            entries = [self._entries.pop(k) for k in victims]
+            self.counters['invalidations'] += len(entries)
+        for e in entries:
+            e.close()
+        return len(entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            out: Dict[str, Any] = dict(self.counters)
+            out['entries'] = [
+                {
+                    'uri': e.key[0],
+                    'database': e.key[1] or None,
+                    'hits': e.hits,
+                    'age_sec': round(now - e.created, 1),
+                    'idle_sec': round(now - e.last_used, 1),
+                    'engine_ready': e.engine is not None,
+                    'engine_build_ms': e.engine_build_ms,
+                    'schema_labels': len((e.schema or {}).get('labels') or []),
+                    'schema_loaded_ts': e.schema_ts,
+                }
+                for e in self._entries.values()
+            ]
+            total = self.counters['hits'] + self.counters['misses']
+            out['hit_rate'] = round(self.counters['hits'] / total, 3) if total else None
+            return out
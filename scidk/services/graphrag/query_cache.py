@@ -0,0 +1,293 @@
+"""
+Cypher and result caches for the GraphRAG LOOKUP path.
+
+Repeated questions ("how many samples in project X") otherwise pay for LLM Cypher generation and
+a Neo4j round trip every time. Two LRU caches sit in front of QueryEngine:
+
+- Cypher cache: question (whitespace and trailing punctuation normalized) + schema version ->
+  generated Cypher. A schema change (new labels or relationship types) changes the version, so
+  stale Cypher is never reused.
+- Result cache: Cypher + parameters + graph write epoch -> formatted answer and items, with a short
+  TTL (SCIDK_GRAPHRAG_RESULT_CACHE_TTL_SEC, default 300). Writes through Neo4jClient.execute_write,
+  the commit engine and write queries sent to /api/graph/query bump the epoch, so results from
+  before those writes are not served; writes made outside this process only show once the TTL
+  expires. Only read-only Cypher is cached.
+
+Both are held in memory and written through to SQLite (graphrag_cypher_cache and
+graphrag_result_cache, in the same database as graphrag_feedback) so they survive restarts.
+Sizes: SCIDK_GRAPHRAG_CYPHER_CACHE_SIZE (default 1000), SCIDK_GRAPHRAG_RESULT_CACHE_SIZE (default 500);
+SCIDK_GRAPHRAG_CACHE=0 disables both. Negative feedback evicts the question's entries.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from ...core import sqlite_pool
+
+_WRITE_CLAUSES = re.compile(r'\b(CREATE|MERGE|SET|DELETE|DETACH|REMOVE|DROP|LOAD\s+CSV|CALL)\b', re.IGNORECASE)
+
+# Graph write epoch: bumped by every write path. Starts at the process start time so that persisted
+# results from an earlier process (which may predate writes made since) are never matched.
+_EPOCH_LOCK = threading.Lock()
+_GRAPH_EPOCH = int(time.time() * 1000)
+
+
+def graph_epoch() -> int:
+    return _GRAPH_EPOCH
+
+
+def bump_graph_epoch() -> int:
+    global _GRAPH_EPOCH
+    with _EPOCH_LOCK:
+        _GRAPH_EPOCH += 1
+        return _GRAPH_EPOCH
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.environ.get(name) or default))
+    except Exception:
+        return default
+
+
+def cache_enabled() -> bool:
+    return (os.environ.get('SCIDK_GRAPHRAG_CACHE') or '1').strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+
+
+def normalize_question(question: str) -> str:
+    """Collapse whitespace and drop trailing punctuation. Case is kept: generated Cypher embeds the
+    question's literals ('project X' vs 'project x')."""
+    q = re.sub(r'\s+', ' ', (question or '').strip())
+    return q.rstrip(' ?.!')
+
+
+def schema_version(schema: Optional[Dict[str, Any]]) -> str:
+    schema = schema or {}
+    payload = json.dumps({
+        'labels': sorted(schema.get('labels') or []),
+        'relationships': sorted(schema.get('relationships') or []),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def is_read_only(cypher: str) -> bool:
+    return bool(cypher) and not _WRITE_CLAUSES.search(cypher)
+
+
+def result_key(cypher: str, params: Optional[Dict[str, Any]], epoch: int) -> str:
+    payload = json.dumps({'c': cypher.strip(), 'p': params or {}, 'e': epoch}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _Counters:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def as_dict(self, size: int, capacity: int) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'size': size,
+            'capacity': capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else None,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+class GraphRAGQueryCache:
+    """LRU Cypher cache and TTL result cache, written through to SQLite."""
+
+    def __init__(self, db_path: Optional[str] = None, cypher_size: Optional[int] = None,
+                 result_size: Optional[int] = None, result_ttl_sec: Optional[float] = None):
+        self.db_path = db_path
+        self.cypher_size = cypher_size if cypher_size is not None else _env_int('SCIDK_GRAPHRAG_CYPHER_CACHE_SIZE', 1000)
+        self.result_size = result_size if result_size is not None else _env_int('SCIDK_GRAPHRAG_RESULT_CACHE_SIZE', 500)
+        self.result_ttl_sec = float(result_ttl_sec if result_ttl_sec is not None
+                                    else _env_int('SCIDK_GRAPHRAG_RESULT_CACHE_TTL_SEC', 300))
+        self._lock = threading.Lock()
+        self._cypher: 'OrderedDict[Tuple[str, str], Dict[str, Any]]' = OrderedDict()
+        self._results: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.cypher_stats = _Counters()
+        self.result_stats = _Counters()
+        self._load()
+
+    # -- persistence --------------------------------------------------------------------------
+    def _get_conn(self) -> sqlite3.Connection:
+        if self.db_path:
+            return sqlite_pool.connect(self.db_path)
+        from ...core import path_index_sqlite as pix
+        return pix.connect()
+
+    def _persist(self, sql: str, params: tuple = (), many: bool = False) -> None:
+        try:
+            conn = self._get_conn()
+            try:
+                if many:
+                    conn.executemany(sql, params)
+                else:
+                    conn.execute(sql, params)
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception:
+            pass
+
+    def _load(self) -> None:
+        """Warm the in-memory LRUs from SQLite (most recently used first, expired results purged)."""
+        try:
+            from ...core.migrations import migrate
+            conn = self._get_conn()
+            try:
+                migrate(conn)
+                now = time.time()
+                conn.execute("DELETE FROM graphrag_result_cache WHERE expires_at <= ?", (now,))
+                conn.commit()
+                rows = conn.execute(
+                    "SELECT question_key, schema_version, question, cypher, created_at FROM graphrag_cypher_cache "
+                    "ORDER BY last_used DESC LIMIT ?", (self.cypher_size,)).fetchall()
+                for qk, sv, q, cypher, created in reversed(rows):
+                    self._cypher[(qk, sv)] = {'cypher': cypher, 'question': q, 'created_at': created}
+                rows = conn.execute(
+                    "SELECT key, cypher, payload, expires_at FROM graphrag_result_cache "
+                    "ORDER BY last_used DESC LIMIT ?", (self.result_size,)).fetchall()
+                for key, cypher, payload, expires in reversed(rows):
+                    try:
+                        self._results[key] = {'cypher': cypher, 'value': json.loads(payload), 'expires_at': expires}
+                    except Exception:
+                        continue
+            finally:
+                conn.close()
+        except Exception:
+            pass
+
+    # -- Cypher cache -------------------------------------------------------------------------
+    def get_cypher(self, question: str, schema_ver: str) -> Optional[str]:
+        key = (normalize_question(question), schema_ver)
+        with self._lock:
+            entry = self._cypher.get(key)
+            if entry is None:
+                self.cypher_stats.misses += 1
+                return None
+            self._cypher.move_to_end(key)
+            self.cypher_stats.hits += 1
+            return entry['cypher']
+
+    def put_cypher(self, question: str, schema_ver: str, cypher: str) -> None:
+        if not cypher or self.cypher_size <= 0:
+            return
+        key = (normalize_question(question), schema_ver)
+        now = time.time()
+        evicted: List[Tuple[str, str]] = []
+        with self._lock:
+            self._cypher[key] = {'cypher': cypher, 'question': question, 'created_at': now}
+            self._cypher.move_to_end(key)
+            while len(self._cypher) > self.cypher_size:
+                evicted.append(self._cypher.popitem(last=False)[0])
+                self.cypher_stats.evictions += 1
+        self._persist(
+            "INSERT OR REPLACE INTO graphrag_cypher_cache(question_key, schema_version, question, cypher, created_at, last_used) "
+            "VALUES(?,?,?,?,?,?)", (key[0], key[1], question, cypher, now, now))
+        if evicted:
+            self._persist("DELETE FROM graphrag_cypher_cache WHERE question_key = ? AND schema_version = ?", evicted, many=True)
+
+    # -- result cache -------------------------------------------------------------------------
+    def get_result(self, cypher: str, params: Optional[Dict[str, Any]] = None,
+                   epoch: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        key = result_key(cypher, params, graph_epoch() if epoch is None else epoch)
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None and entry['expires_at'] <= time.time():
+                del self._results[key]
+                entry = None
+            if entry is None:
+                self.result_stats.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.result_stats.hits += 1
+            return entry['value']
+
+    def put_result(self, cypher: str, params: Optional[Dict[str, Any]], value: Dict[str, Any],
+                   epoch: Optional[int] = None) -> None:
+        if not is_read_only(cypher) or self.result_size <= 0 or self.result_ttl_sec <= 0:
+            return
+        try:
+            payload = json.dumps(value, default=str)
+        except Exception:
+            return
+        key = result_key(cypher, params, graph_epoch() if epoch is None else epoch)
+        now = time.time()
+        expires = now + self.result_ttl_sec
+        evicted: List[Tuple[str]] = []
+        with self._lock:
+            self._results[key] = {'cypher': cypher, 'value': json.loads(payload), 'expires_at': expires}
+            self._results.move_to_end(key)
+            while len(self._results) > self.result_size:
+                evicted.append((self._results.popitem(last=False)[0],))
+                self.result_stats.evictions += 1
+        self._persist(
+            "INSERT OR REPLACE INTO graphrag_result_cache(key, cypher, payload, epoch, created_at, expires_at, last_used) "
+            "VALUES(?,?,?,?,?,?,?)", (key, cypher, payload, graph_epoch() if epoch is None else epoch, now, expires, now))
+        if evicted:
+            self._persist("DELETE FROM graphrag_result_cache WHERE key = ?", evicted, many=True)
+
+    # -- invalidation -------------------------------------------------------------------------
+    def evict(self, question: Optional[str] = None, cypher: Optional[str] = None) -> int:
+        """Drop the question's cached Cypher (any schema version) and every result for that Cypher."""
+        qk = normalize_question(question) if question else None
+        cyphers = {cypher.strip()} if cypher else set()
+        with self._lock:
+            q_keys = [k for k in self._cypher if qk is not None and k[0] == qk]
+            for k in q_keys:
+                cyphers.add(self._cypher.pop(k)['cypher'].strip())
+            r_keys = [k for k, v in self._results.items() if v['cypher'].strip() in cyphers]
+            for k in r_keys:
+                del self._results[k]
+            self.cypher_stats.invalidations += len(q_keys)
+            self.result_stats.invalidations += len(r_keys)
+        if qk is not None:
+            self._persist("DELETE FROM graphrag_cypher_cache WHERE question_key = ?", (qk,))
+        if cyphers:
+            self._persist("DELETE FROM graphrag_result_cache WHERE TRIM(cypher) = ?", [(c,) for c in cyphers], many=True)
+        return len(q_keys) + len(r_keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cypher.clear()
+            self._results.clear()
+        self._persist("DELETE FROM graphrag_cypher_cache")
+        self._persist("DELETE FROM graphrag_result_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': cache_enabled(),
+                'cypher': self.cypher_stats.as_dict(len(self._cypher), self.cypher_size),
+                'results': dict(self.result_stats.as_dict(len(self._results), self.result_size),
+                                ttl_sec=self.result_ttl_sec),
+                'graph_epoch': graph_epoch(),
+            }
+
+
+_CACHES: Dict[str, GraphRAGQueryCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_query_cache(db_path: Optional[str] = None) -> GraphRAGQueryCache:
+    """Process-wide cache per database file (the one holding graphrag_feedback)."""
+    key = os.path.abspath(db_path) if db_path else ''
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = _CACHES[key] = GraphRAGQueryCache(db_path)
+        return cache
@@ -5,12 +5,41 @@ Combines entity extraction with neo4j-graphrag's Text2CypherRetriever.
 Enhanced with:
 - Dynamic schema loading from live Neo4j instance (SciDKSchemaLoader)
 - Curated query library for few-shot Cypher generation
+- A prepared Text2CypherRetriever reused across questions (engines are long-lived, see engine_cache)
+- Per-stage latency (entity extraction, Cypher generation, execution, formatting) in each result
+- Optional Cypher/result caches (query_cache.GraphRAGQueryCache) that skip generation and execution
+  for repeated questions
 """
 from typing import Dict, Any, Optional
+import threading
 import time
 import logging
 
 
+class _TimedLLM:
+    """Wraps the retriever's LLM to measure Cypher generation time per calling thread."""
+
+    def __init__(self, llm: Any):
+        self._llm = llm
+        self._local = threading.local()
+
+    def invoke(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return self._llm.invoke(*args, **kwargs)
+        finally:
+            self._local.sec = getattr(self._local, 'sec', 0.0) + (time.perf_counter() - t0)
+
+    def take(self) -> float:
+        """Generation seconds accumulated by this thread since the last take()."""
+        sec = getattr(self._local, 'sec', 0.0)
+        self._local.sec = 0.0
+        return sec
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+
 class QueryEngine:
     """
     High-level GraphRAG query interface.
@@ -30,7 +59,8 @@ class QueryEngine:
         examples: Optional[list] = None,
         verbose: bool = False,
         database: Optional[str] = None,
-        query_library_path: Optional[str] = None
+        query_library_path: Optional[str] = None,
+        query_cache: Optional[Any] = None
     ):
         """
         Initialize query engine.
@@ -43,12 +73,16 @@ class QueryEngine:
             verbose: If True, include extracted entities and Cypher in response
             database: Optional Neo4j database name for schema loader
             query_library_path: Optional path to query library YAML (defaults to query_library/scidk_queries.yaml)
+            query_cache: Optional GraphRAGQueryCache for generated Cypher and results
         """
         self.driver = driver
         self.neo4j_schema = neo4j_schema
         self.verbose = verbose
         self.database = database
+        self.query_cache = query_cache
         self.logger = logging.getLogger(__name__)
+        from .query_cache import schema_version
+        self._schema_version = schema_version(neo4j_schema)
 
         # Initialize schema loader for dynamic schema discovery
         from .schema_loader import SciDKSchemaLoader
@@ -73,6 +107,57 @@ class QueryEngine:
         # Store schema fragment for entity extraction
         self._schema_fragment = schema_fragment
 
+        # Text2CypherRetriever is built on first use and reused until the schema changes
+        self._retriever = None
+        self._timed_llm: Optional[_TimedLLM] = None
+        self._retriever_lock = threading.Lock()
+
+    def _get_retriever(self):
+        """Prepared Text2CypherRetriever for the current schema and examples (built once)."""
+        with self._retriever_lock:
+            if self._retriever is None:
+                from neo4j_graphrag.retrievers import Text2CypherRetriever
+
+                # Create simple LLM wrapper if we have API key
+                llm = None
+                if self.entity_extractor.use_llm:
+                    llm = self._create_llm_adapter()
+                self._timed_llm = _TimedLLM(llm) if llm is not None else None
+
+                # Create retriever with schema and query library examples
+                self._retriever = Text2CypherRetriever(
+                    driver=self.driver,
+                    neo4j_schema=self.neo4j_schema,
+                    examples=self.examples,
+                    llm=self._timed_llm
+                )
+            return self._retriever
+
+    def set_schema(self, neo4j_schema: Dict[str, Any]) -> None:
+        """Use a new (filtered) schema; the retriever is rebuilt on the next query if it changed."""
+        if neo4j_schema != self.neo4j_schema:
+            from .query_cache import schema_version
+            with self._retriever_lock:
+                self.neo4j_schema = neo4j_schema
+                self._schema_version = schema_version(neo4j_schema)
+                self._retriever = None
+
+    def _cache(self):
+        from .query_cache import cache_enabled
+        return self.query_cache if self.query_cache is not None and cache_enabled() else None
+
+    def _run_cypher(self, cypher: str) -> list:
+        """Execute cached (read-only) Cypher directly, skipping generation."""
+        with self.driver.session(database=self.database) if self.database else self.driver.session() as session:
+            return [record.data() for record in session.run(cypher)]
+
+    @staticmethod
+    def _cacheable_item(item: Any) -> Any:
+        if isinstance(item, dict):
+            return item
+        content = getattr(item, 'content', None)
+        return content if content is not None else str(item)
+
     def query(self, question: str) -> Dict[str, Any]:
         """
         Execute natural language query against Neo4j.
@@ -90,33 +175,41 @@ class QueryEngine:
                 - results: Raw results (if verbose)
                 - result_count: Number of results returned
                 - execution_time_ms: Query execution time
+                - stage_ms: Milliseconds per stage (entity_extraction, cypher_generation,
+                  execution, formatting); cypher_generation is None when no LLM is configured
+                  (generation then happens inside execution)
+                - cache: 'result' (answer served from the result cache), 'cypher' (cached Cypher
+                  executed directly), 'miss' or None (no cache)
         """
         start_time = time.time()
+        stage_ms: Dict[str, Any] = {}
 
         try:
             # Step 1: Extract entities (with schema context)
+            t0 = time.perf_counter()
             entities = self.entity_extractor.extract(question, self.neo4j_schema)
+            stage_ms['entity_extraction'] = round((time.perf_counter() - t0) * 1000, 1)
+
+            # Step 2a: Cypher generated earlier for the same question and schema
+            cache = self._cache()
+            cached_cypher = cache.get_cypher(question, self._schema_version) if cache is not None else None
+            if cached_cypher:
+                return self._answer_from_cached_cypher(cache, cached_cypher, question, entities, stage_ms, start_time)
 
             # Step 2: Use neo4j-graphrag's Text2CypherRetriever
             try:
-                from neo4j_graphrag.retrievers import Text2CypherRetriever
-                from neo4j_graphrag.llm import LLMInterface
-
-                # Create simple LLM wrapper if we have API key
-                llm = None
-                if self.entity_extractor.use_llm:
-                    llm = self._create_llm_adapter()
+                retriever = self._get_retriever()
+                timed_llm = self._timed_llm
 
-                # Create retriever with schema and query library examples
-                retriever = Text2CypherRetriever(
-                    driver=self.driver,
-                    neo4j_schema=self.neo4j_schema,
-                    examples=self.examples,
-                    llm=llm
-                )
-
-                # Execute query
+                # Execute query (Cypher generation by the LLM, then execution)
+                t0 = time.perf_counter()
+                if timed_llm is not None:
+                    timed_llm.take()
                 result = retriever.search(query_text=question)
+                search_sec = time.perf_counter() - t0
+                generation_sec = timed_llm.take() if timed_llm is not None else None
+                stage_ms['cypher_generation'] = round(generation_sec * 1000, 1) if generation_sec is not None else None
+                stage_ms['execution'] = round((search_sec - (generation_sec or 0.0)) * 1000, 1)
 
                 # Extract Cypher query from result (for feedback and UI citations)
                 cypher_query = None
@@ -128,17 +221,31 @@ class QueryEngine:
                 result_count = len(items)
 
                 # Format response
+                t0 = time.perf_counter()
+                answer = self._format_answer(result, question)
+                stage_ms['formatting'] = round((time.perf_counter() - t0) * 1000, 1)
                 execution_time = int((time.time() - start_time) * 1000)
 
                 response = {
                     'status': 'ok',
-                    'answer': self._format_answer(result, question),
+                    'answer': answer,
                     'engine': 'graph_query',  # Used by UI to show "📊 Graph Query" badge
                     'cypher_query': cypher_query,  # Always include for feedback and citations
                     'result_count': result_count,
-                    'execution_time_ms': execution_time
+                    'execution_time_ms': execution_time,
+                    'stage_ms': stage_ms,
+                    'cache': 'miss' if cache is not None else None
                 }
 
+                from .query_cache import is_read_only
+                if cache is not None and cypher_query and is_read_only(cypher_query):
+                    cache.put_cypher(question, self._schema_version, cypher_query)
+                    cache.put_result(cypher_query, None, {
+                        'answer': answer,
+                        'result_count': result_count,
+                        'items': [self._cacheable_item(i) for i in items]
+                    })
+
                 if self.verbose:
                     response['entities'] = entities
                     response['results'] = items
@@ -156,9 +263,44 @@ class QueryEngine:
             return {
                 'status': 'error',
                 'error': str(e),
-                'execution_time_ms': int((time.time() - start_time) * 1000)
+                'execution_time_ms': int((time.time() - start_time) * 1000),
+                'stage_ms': stage_ms
             }
 
+    def _answer_from_cached_cypher(self, cache, cypher_query: str, question: str, entities: Dict[str, Any],
+                                   stage_ms: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        """Serve a question whose Cypher is cached: from the result cache, else by running the Cypher."""
+        stage_ms['cypher_generation'] = 0.0
+        cached = cache.get_result(cypher_query)
+        if cached is not None:
+            stage_ms['execution'] = 0.0
+            stage_ms['formatting'] = 0.0
+            answer, items, result_count, state = cached.get('answer'), cached.get('items') or [], cached.get('result_count', 0), 'result'
+        else:
+            t0 = time.perf_counter()
+            items = self._run_cypher(cypher_query)
+            stage_ms['execution'] = round((time.perf_counter() - t0) * 1000, 1)
+            t0 = time.perf_counter()
+            answer = self._format_answer(items, question)
+            stage_ms['formatting'] = round((time.perf_counter() - t0) * 1000, 1)
+            result_count, state = len(items), 'cypher'
+            cache.put_result(cypher_query, None, {'answer': answer, 'result_count': result_count, 'items': items})
+
+        response = {
+            'status': 'ok',
+            'answer': answer,
+            'engine': 'graph_query',
+            'cypher_query': cypher_query,
+            'result_count': result_count,
+            'execution_time_ms': int((time.time() - start_time) * 1000),
+            'stage_ms': stage_ms,
+            'cache': state
+        }
+        if self.verbose:
+            response['entities'] = entities
+            response['results'] = items
+        return response
+
     def refresh_schema(self) -> Dict[str, Any]:
         """
         Force reload of schema from Neo4j.
@@ -170,7 +312,7 @@ class QueryEngine:
         """
         schema = self.schema_loader.refresh()
         self._schema_fragment = self.schema_loader.get_schema_fragment()
-        self.neo4j_schema = {"labels": schema["labels"], "relationships": schema["relationships"]}
+        self.set_schema({"labels": schema["labels"], "relationships": schema["relationships"]})
         self.logger.info("Schema refreshed")
         return schema
 
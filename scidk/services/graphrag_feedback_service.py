@@ -15,6 +15,7 @@ from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 
 from ..core import path_index_sqlite as pix
+from ..core import sqlite_pool
 
 
 @dataclass
@@ -58,7 +59,7 @@ class GraphRAGFeedbackService:
     def _get_conn(self) -> sqlite3.Connection:
         """Get database connection."""
         if self.db_path:
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite_pool.connect(self.db_path)
         else:
             conn = pix.connect()
         conn.row_factory = sqlite3.Row
@@ -100,6 +101,9 @@ class GraphRAGFeedbackService:
             message_id: Optional message ID
             cypher_generated: Optional Cypher query that was generated
 
+        Negative feedback (answered_question is False) evicts the question's cached Cypher and
+        results so the next ask generates a fresh query.
+
         Returns:
             Created GraphRAGFeedback object
         """
@@ -129,6 +133,9 @@ class GraphRAGFeedbackService:
             )
             conn.commit()
 
+            if feedback.get('answered_question') is False:
+                self._evict_cached_answer(query, cypher_generated)
+
             return GraphRAGFeedback(
                 id=feedback_id,
                 session_id=session_id,
@@ -142,6 +149,14 @@ class GraphRAGFeedbackService:
         finally:
             conn.close()
 
+    def _evict_cached_answer(self, query: str, cypher_generated: Optional[str]) -> None:
+        """Negative feedback: stop serving the cached Cypher/results for this question."""
+        try:
+            from .graphrag.query_cache import get_query_cache
+            get_query_cache(self.db_path).evict(question=query, cypher=cypher_generated)
+        except Exception:
+            pass
+
     def get_feedback(self, feedback_id: str) -> Optional[GraphRAGFeedback]:
         """Get feedback by ID.
 
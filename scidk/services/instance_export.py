@@ -0,0 +1,228 @@
+"""Streaming writers for the /api/graph/instances.{csv,xlsx,arrow,parquet,pkl} exports.
+
+Each writer takes the column list and a row iterator (a graph backend's iter_instances) and
+yields bytes, so a Flask response can send an export of any size without holding its rows:
+
+- CSV: one encoded chunk per SCIDK_EXPORT_CHUNK_ROWS rows (default 5000).
+- Arrow (IPC stream) and Parquet: one record batch / row group per chunk. Rows are first spooled
+  to a temporary file while each column's type is inferred over all chunks (int and float widen to
+  double, other mixes and all-null columns become strings), then written, so no value is nulled
+  or truncated to fit a type guessed from the first chunk.
+- XLSX: an openpyxl write-only workbook, which spools rows to disk; the finished file is then
+  streamed from a temporary file.
+- Pickle: the usual pickle of a list of dicts, emitted one chunk of list items at a time.
+
+Row keys that are not in the column list are dropped; missing keys are empty (CSV, XLSX) or null.
+Labels without fixed columns go through resolve_columns, which takes the columns from the first
+chunk and writes keys first seen later as JSON in a trailing extra_json column.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import pickle
+import tempfile
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_CHUNK_ROWS = 5000
+# Column holding the properties of a row that are not among the resolved columns
+EXTRA_COLUMN = 'extra_json'
+# Bytes read per chunk when streaming a finished file
+FILE_CHUNK_BYTES = 1 << 20
+
+
+def chunk_rows() -> int:
+    try:
+        return max(1, int(os.environ.get('SCIDK_EXPORT_CHUNK_ROWS') or DEFAULT_CHUNK_ROWS))
+    except Exception:
+        return DEFAULT_CHUNK_ROWS
+
+
+def chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def resolve_columns(columns: Optional[List[str]], rows: Iterable[Dict[str, Any]]) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """(columns, rows) for a writer. Fixed columns pass through; otherwise the first chunk is read ahead
+    and its keys (id first) become the columns, plus EXTRA_COLUMN for keys that only appear later."""
+    if columns is not None:
+        return columns, iter(rows)
+    it = iter(rows)
+    first = list(islice(it, chunk_rows()))
+    keys = [k for k in dict.fromkeys(k for r in first for k in r) if k not in ('id', EXTRA_COLUMN)]
+    columns = ['id'] + keys + [EXTRA_COLUMN]
+    known = set(columns)
+
+    def _rows() -> Iterator[Dict[str, Any]]:
+        for r in chain(first, it):
+            late = {k: v for k, v in r.items() if k not in known}
+            yield {**r, EXTRA_COLUMN: json.dumps(late, default=str)} if late else r
+
+    return columns, _rows()
+
+
+class _Sink:
+    """Write-only file object that buffers bytes until the caller drains them."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        b = bytes(data)
+        self._parts.append(b)
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b''.join(self._parts)
+        self._parts = []
+        return out
+
+
+def csv_stream(columns: List[str], rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=columns, extrasaction='ignore')
+    w.writeheader()
+    for chunk in chunks(rows, chunk_rows()):
+        for r in chunk:
+            w.writerow({k: r.get(k, '') for k in columns})
+        yield buf.getvalue().encode('utf-8')
+        buf.seek(0)
+        buf.truncate()
+    rest = buf.getvalue()
+    if rest:
+        yield rest.encode('utf-8')
+
+
+def xlsx_stream(columns: List[str], rows: Iterable[Dict[str, Any]], title: str = 'Sheet1') -> Iterator[bytes]:
+    from openpyxl import Workbook  # type: ignore
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=(title or 'Sheet1')[:31])
+    ws.append(columns)
+    for r in rows:
+        ws.append([r.get(k, '') for k in columns])
+    with tempfile.TemporaryFile() as fh:
+        wb.save(fh)
+        fh.seek(0)
+        while True:
+            data = fh.read(FILE_CHUNK_BYTES)
+            if not data:
+                return
+            yield data
+
+
+def _chunk_type(pa, values: List[Any]):
+    """Arrow type inferred for one chunk of a column; values that share no type make it a string column."""
+    try:
+        return pa.array(values).type
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError, OverflowError):
+        return pa.string()
+
+
+def _merge_type(pa, a, b):
+    """Smallest type holding both: null defers to the other, int and float widen to double, else string."""
+    if a is None or pa.types.is_null(a):
+        return b
+    if pa.types.is_null(b) or a == b:
+        return a
+    numeric = (pa.types.is_integer, pa.types.is_floating)
+    if any(f(a) for f in numeric) and any(f(b) for f in numeric):
+        return pa.float64()
+    return pa.string()
+
+
+def _arrow_batch(pa, schema, chunk: List[List[Any]]):
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [r[i] for r in chunk]
+        if pa.types.is_string(field.type):
+            values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _record_batches(pa, columns: List[str], rows: Iterable[Dict[str, Any]]) -> Iterator[Any]:
+    """Yield the Arrow schema, then each chunk's rows as value lists in column order.
+
+    Rows are spooled to a temporary file while each column's type is merged over every chunk, so
+    the schema covers all rows (like pa.Table.from_pylist) without holding them in memory.
+    """
+    types: Dict[str, Any] = {c: None for c in columns}
+    with tempfile.TemporaryFile() as fh:
+        n = 0
+        for chunk in chunks(rows, chunk_rows()):
+            for c in columns:
+                types[c] = _merge_type(pa, types[c], _chunk_type(pa, [r.get(c) for r in chunk]))
+            pickle.dump([[r.get(c) for c in columns] for r in chunk], fh, protocol=pickle.HIGHEST_PROTOCOL)
+            n += 1
+        # All-null (or empty) columns are exported as strings
+        yield pa.schema([pa.field(c, types[c] if types[c] is not None and not pa.types.is_null(types[c]) else pa.string())
+                         for c in columns])
+        fh.seek(0)
+        for _ in range(n):
+            yield pickle.load(fh)
+
+
+def arrow_stream(columns: List[str], rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.ipc as pa_ipc  # type: ignore
+    it = _record_batches(pa, columns, rows)
+    schema = next(it)
+    sink = _Sink()
+    writer = pa_ipc.new_stream(sink, schema)
+    for chunk in it:
+        writer.write_batch(_arrow_batch(pa, schema, chunk))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def parquet_stream(columns: List[str], rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+    it = _record_batches(pa, columns, rows)
+    schema = next(it)
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema)
+    for chunk in it:
+        writer.write_batch(_arrow_batch(pa, schema, chunk))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def _pickled_item(obj: Any) -> bytes:
+    # Protocol 2 without memo (fast mode): the body between PROTO and STOP can be spliced into
+    # another pickle, since it references no memo entries
+    buf = io.BytesIO()
+    p = pickle.Pickler(buf, protocol=2)
+    p.fast = True
+    p.dump(obj)
+    return buf.getvalue()[2:-1]
+
+
+def pickle_stream(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """A pickled list of the rows (pickle.loads returns the list), one APPENDS batch per chunk."""
+    yield pickle.PROTO + bytes([2]) + pickle.EMPTY_LIST
+    for chunk in chunks(rows, chunk_rows()):
+        yield pickle.MARK + b''.join(_pickled_item(r) for r in chunk) + pickle.APPENDS
+    yield pickle.STOP
@@ -1019,11 +1019,18 @@ class LabelService:
         source_matching_key: str,
         target_matching_key: str,
         batch_size: int = 100,
-        create_missing_targets: bool = False
+        create_missing_targets: bool = False,
+        source_uri: Optional[str] = None,
+        resume: bool = True,
+        on_progress=None
     ) -> int:
         """
         Transfer relationships in batches with proper per-label matching keys.
 
+        Reads keyset pages from the source and writes each page with one UNWIND query on a
+        shared streaming engine (services.graph_transfer); progress is checkpointed so a
+        cancelled transfer continues from the last written page.
+
         Args:
             source_client: Neo4j client for source database
             primary_client: Neo4j client for primary database
@@ -1034,124 +1041,101 @@ class LabelService:
             target_matching_key: Property to match target nodes on
             batch_size: Number of relationships per batch
             create_missing_targets: Create target nodes if they don't exist
+            source_uri: Source profile name recorded as provenance (looked up once when omitted)
+            resume: Continue from this relationship type's checkpoint, if any
+            on_progress: Optional callback receiving the running count after each batch
 
         Returns:
             Number of relationships transferred
         """
-        offset = 0
-        total_transferred = 0
-
-        while True:
-            # Query relationships from source in batches
-            rel_query = f"""
-            MATCH (source:{source_label})-[r:{rel_type}]->(target:{target_label})
-            RETURN properties(source) as source_props,
-                   properties(target) as target_props,
-                   properties(r) as rel_props
-            SKIP $offset
-            LIMIT $batch_size
+        import time
+        from .graph_transfer import StreamingTransfer, keyset_query
+
+        if source_uri is None:
+            source_uri = (self.get_label(source_label) or {}).get('neo4j_source_profile') or 'unknown'
+
+        rel_query = keyset_query(
+            f"MATCH (source:{source_label})-[r:{rel_type}]->(target:{target_label})",
+            "source, r, target",
+            "elementId(r)",
+            "properties(source) as source_props, properties(target) as target_props, properties(r) as rel_props",
+        )
+
+        if create_missing_targets:
+            # Use MERGE with actual label + provenance metadata for multi-source harmonization
+            # Metadata helps track which nodes came from which source and when they were created
+            create_rel_query = f"""
+            UNWIND $rows AS row
+            MATCH (source:{source_label} {{{source_matching_key}: row.source_key}})
+            MERGE (target:{target_label} {{{target_matching_key}: row.target_key}})
+            ON CREATE SET
+                target = row.target_props,
+                target.__created_via__ = 'relationship_forward_ref',
+                target.__source__ = $source_uri,
+                target.__created_at__ = $timestamp
+            ON MATCH SET
+                target = row.target_props
+            MERGE (source)-[r:{rel_type}]->(target)
+            ON CREATE SET
+                r = row.rel_props,
+                r.__source__ = $source_uri,
+                r.__created_at__ = $timestamp
+            ON MATCH SET
+                r = row.rel_props
+            RETURN count(r) AS transferred
+            """
+        else:
+            # Only create relationship if both nodes exist (with provenance)
+            create_rel_query = f"""
+            UNWIND $rows AS row
+            MATCH (source:{source_label} {{{source_matching_key}: row.source_key}})
+            MATCH (target:{target_label} {{{target_matching_key}: row.target_key}})
+            MERGE (source)-[r:{rel_type}]->(target)
+            ON CREATE SET
+                r = row.rel_props,
+                r.__source__ = $source_uri,
+                r.__created_at__ = $timestamp
+            ON MATCH SET
+                r = row.rel_props
+            RETURN count(r) AS transferred
             """
 
-            batch = source_client.execute_read(rel_query, {
-                'offset': offset,
-                'batch_size': batch_size
-            })
-
-            if not batch:
-                break
-
-            # Transfer each relationship in the batch
-            for rel_record in batch:
-                source_props = rel_record.get('source_props', {})
-                target_props = rel_record.get('target_props', {})
-                rel_props = rel_record.get('rel_props', {})
-
-                # Get matching keys for source and target
-                source_key_value = source_props.get(source_matching_key)
-                target_key_value = target_props.get(target_matching_key)
-
-                if not source_key_value or not target_key_value:
-                    continue
-
-                # Create relationship in primary with per-label matching
-                if create_missing_targets:
-                    # Use MERGE with actual label + provenance metadata for multi-source harmonization
-                    # Metadata helps track which nodes came from which source and when they were created
-                    import time
-                    create_rel_query = f"""
-                    MATCH (source:{source_label} {{{source_matching_key}: $source_key}})
-                    MERGE (target:{target_label} {{{target_matching_key}: $target_key}})
-                    ON CREATE SET
-                        target = $target_props,
-                        target.__created_via__ = 'relationship_forward_ref',
-                        target.__source__ = $source_uri,
-                        target.__created_at__ = $timestamp
-                    ON MATCH SET
-                        target = $target_props
-                    MERGE (source)-[r:{rel_type}]->(target)
-                    ON CREATE SET
-                        r = $rel_props,
-                        r.__source__ = $source_uri,
-                        r.__created_at__ = $timestamp
-                    ON MATCH SET
-                        r = $rel_props
-                    """
-                    try:
-                        # Get source URI for provenance tracking
-                        source_profile_name = self.get_label(source_label).get('neo4j_source_profile', 'unknown')
-
-                        primary_client.execute_write(create_rel_query, {
-                            'source_key': source_key_value,
-                            'target_key': target_key_value,
-                            'target_props': target_props,
-                            'rel_props': rel_props,
-                            'source_uri': source_profile_name,
-                            'timestamp': int(time.time() * 1000)
-                        })
-                        total_transferred += 1
-                    except Exception:
-                        # Skip if source node doesn't exist
-                        pass
-                else:
-                    # Only create relationship if both nodes exist (with provenance)
-                    import time
-                    create_rel_query = f"""
-                    MATCH (source:{source_label} {{{source_matching_key}: $source_key}})
-                    MATCH (target:{target_label} {{{target_matching_key}: $target_key}})
-                    MERGE (source)-[r:{rel_type}]->(target)
-                    ON CREATE SET
-                        r = $rel_props,
-                        r.__source__ = $source_uri,
-                        r.__created_at__ = $timestamp
-                    ON MATCH SET
-                        r = $rel_props
-                    """
-                    try:
-                        # Get source URI for provenance tracking
-                        source_profile_name = self.get_label(source_label).get('neo4j_source_profile', 'unknown')
-
-                        primary_client.execute_write(create_rel_query, {
-                            'source_key': source_key_value,
-                            'target_key': target_key_value,
-                            'rel_props': rel_props,
-                            'source_uri': source_profile_name,
-                            'timestamp': int(time.time() * 1000)
-                        })
-                        total_transferred += 1
-                    except Exception:
-                        # Skip if nodes don't exist
-                        pass
-
-            offset += batch_size
+        def to_row(rel_record):
+            source_props = rel_record.get('source_props') or {}
+            target_props = rel_record.get('target_props') or {}
+            source_key_value = source_props.get(source_matching_key)
+            target_key_value = target_props.get(target_matching_key)
+            if not source_key_value or not target_key_value:
+                return None
+            return {
+                'source_key': source_key_value,
+                'target_key': target_key_value,
+                'target_props': target_props,
+                'rel_props': rel_record.get('rel_props') or {},
+            }
 
-        return total_transferred
+        result = StreamingTransfer(
+            source_client, primary_client, rel_query, create_rel_query,
+            batch_size=batch_size,
+            transform=to_row,
+            write_params={'source_uri': source_uri, 'timestamp': int(time.time() * 1000)},
+            count_key='transferred',
+            checkpoint_key=f"label_transfer:{source_label}:{rel_type}:{target_label}",
+            resume=resume,
+            should_cancel=lambda: self._is_transfer_cancelled(source_label),
+            on_progress=(lambda p: on_progress(p['total_written'])) if on_progress else None,
+            app=self.app,
+        ).run()
+
+        return result['count']
 
     def transfer_to_primary(
         self,
         name: str,
         batch_size: int = 100,
         mode: str = 'nodes_and_outgoing',
-        create_missing_targets: bool = False
+        create_missing_targets: bool = False,
+        resume: bool = True
     ) -> Dict[str, Any]:
         """
         Transfer instances of a label from its source database to the primary database.
@@ -1166,12 +1150,14 @@ class LabelService:
         - Relationship preservation with proper matching
         - Optional automatic creation of missing target nodes
         - Progress logging to server logs
+        - Resumable: a cancelled transfer continues from its last written batch
 
         Args:
             name: Label name to transfer
             batch_size: Number of instances to process per batch (default 100)
             mode: Transfer mode - 'nodes_only' or 'nodes_and_outgoing' (default)
             create_missing_targets: Auto-create target nodes if they don't exist (default False)
+            resume: Continue from the checkpoints of a previously cancelled transfer (default True)
 
         Returns:
             Dict with status, counts, matching keys used, and any errors
@@ -1266,81 +1252,66 @@ class LabelService:
                     }
                 }
 
-                # Phase 1: Transfer nodes in batches
-                offset = 0
-                total_transferred = 0
-
-                while True:
-                    # Check for cancellation
-                    if self._is_transfer_cancelled(name):
-                        logger.info(f"Transfer cancelled by user at {total_transferred}/{total_nodes} nodes")
-                        return {
-                            'status': 'cancelled',
-                            'nodes_transferred': total_transferred,
-                            'message': f'Transfer cancelled after {total_transferred} nodes'
-                        }
-
-                    # Pull batch from source
-                    batch_query = f"""
-                    MATCH (n:{name})
-                    RETURN elementId(n) as source_id, properties(n) as props
-                    SKIP $offset
-                    LIMIT $batch_size
-                    """
-                    batch = source_client.execute_read(batch_query, {
-                        'offset': offset,
-                        'batch_size': batch_size
-                    })
-
-                    if not batch:
-                        break
-
-                    # Create nodes in primary
-                    for record in batch:
-                        source_id = record.get('source_id')
-                        props = record.get('props', {})
-
-                        # Merge node in primary using matching key with provenance tracking
-                        import time
-                        merge_query = f"""
-                        MERGE (n:{name} {{{matching_key}: $key_value}})
-                        ON CREATE SET
-                            n = $props,
-                            n.__source__ = $source_profile,
-                            n.__created_at__ = $timestamp,
-                            n.__created_via__ = 'direct_transfer'
-                        ON MATCH SET
-                            n = $props
-                        RETURN elementId(n) as primary_id
-                        """
-
-                        key_value = props.get(matching_key)
-                        if not key_value:
-                            # Skip nodes without matching key
-                            continue
-
-                        result = primary_client.execute_write(merge_query, {
-                            'key_value': key_value,
-                            'props': props,
-                            'source_profile': source_profile,
-                            'timestamp': int(time.time() * 1000)
-                        })
+                # Phase 1: Transfer nodes in batches (keyset pages, one UNWIND write per page)
+                from .graph_transfer import StreamingTransfer, keyset_query
 
-                        if result:
-                            total_transferred += 1
+                batch_query = keyset_query(
+                    f"MATCH (n:{name})", "n", "elementId(n)",
+                    "elementId(n) as source_id, properties(n) as props",
+                )
+                # Merge nodes in primary using matching key with provenance tracking
+                merge_query = f"""
+                UNWIND $rows AS row
+                MERGE (n:{name} {{{matching_key}: row.key_value}})
+                ON CREATE SET
+                    n = row.props,
+                    n.__source__ = $source_profile,
+                    n.__created_at__ = $timestamp,
+                    n.__created_via__ = 'direct_transfer'
+                ON MATCH SET
+                    n = row.props
+                RETURN count(n) as transferred
+                """
 
-                    offset += batch_size
+                def to_node(record):
+                    props = record.get('props') or {}
+                    key_value = props.get(matching_key)
+                    if not key_value:
+                        # Skip nodes without matching key
+                        return None
+                    return {'key_value': key_value, 'props': props}
 
-                    # Update Phase 1 progress tracking
-                    progress_pct = min(100, int((total_transferred / total_nodes * 100))) if total_nodes > 0 else 0
+                def phase_1_progress(p):
+                    progress_pct = min(100, int((p['total_written'] / total_nodes * 100))) if total_nodes > 0 else 0
                     if name in self._active_transfers:
                         self._active_transfers[name]['progress']['phase_1'].update({
-                            'completed': total_transferred,
+                            'completed': p['total_written'],
                             'percent': progress_pct
                         })
-
                     # Log progress every batch
-                    logger.info(f"Phase 1 progress: {total_transferred}/{total_nodes} nodes ({progress_pct}%)")
+                    logger.info(f"Phase 1 progress: {p['total_written']}/{total_nodes} nodes ({progress_pct}%)")
+
+                nodes_result = StreamingTransfer(
+                    source_client, primary_client, batch_query, merge_query,
+                    batch_size=batch_size,
+                    transform=to_node,
+                    write_params={'source_profile': source_profile, 'timestamp': int(time.time() * 1000)},
+                    count_key='transferred',
+                    checkpoint_key=f"label_transfer:{name}:nodes",
+                    resume=resume,
+                    should_cancel=lambda: self._is_transfer_cancelled(name),
+                    on_progress=phase_1_progress,
+                    app=self.app,
+                ).run()
+                total_transferred = nodes_result['count']
+
+                if nodes_result['cancelled']:
+                    logger.info(f"Transfer cancelled by user at {total_transferred}/{total_nodes} nodes")
+                    return {
+                        'status': 'cancelled',
+                        'nodes_transferred': total_transferred,
+                        'message': f'Transfer cancelled after {total_transferred} nodes; it resumes from there on the next transfer'
+                    }
 
                 # Phase 2: Transfer relationships (if mode includes them)
                 total_rels_transferred = 0
@@ -1391,6 +1362,13 @@ class LabelService:
 
                         logger.info(f"Transferring {rel_type} relationships to {target_label}")
 
+                        def phase_2_progress(count, done=total_rels_transferred):
+                            if name in self._active_transfers and total_rels > 0:
+                                self._active_transfers[name]['progress']['phase_2'].update({
+                                    'completed': done + count,
+                                    'percent': min(100, int(((done + count) / total_rels * 100)))
+                                })
+
                         # Use batched relationship transfer with per-label matching
                         rels_count = self._transfer_relationships_batch(
                             source_client,
@@ -1401,10 +1379,22 @@ class LabelService:
                             matching_key,
                             target_matching_key,
                             batch_size,
-                            create_missing_targets
+                            create_missing_targets,
+                            source_uri=source_profile,
+                            resume=resume,
+                            on_progress=phase_2_progress
                         )
                         total_rels_transferred += rels_count
 
+                        if self._is_transfer_cancelled(name):
+                            logger.info(f"Transfer cancelled by user at {total_rels_transferred}/{total_rels} relationships")
+                            return {
+                                'status': 'cancelled',
+                                'nodes_transferred': total_transferred,
+                                'relationships_transferred': total_rels_transferred,
+                                'message': f'Transfer cancelled after {total_rels_transferred} relationships; it resumes from there on the next transfer'
+                            }
+
                         # Update Phase 2 relationship progress
                         if name in self._active_transfers and total_rels > 0:
                             rel_pct = min(100, int((total_rels_transferred / total_rels * 100)))
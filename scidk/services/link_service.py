@@ -18,10 +18,30 @@ import csv
 import io
 import requests
 import re
+import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Source keys sent per UNWIND round-trip when matching link targets
+MATCH_BATCH_SIZE = 1000
+
+
+def _match_batch_size() -> int:
+    try:
+        return max(1, int(os.environ.get('SCIDK_LINK_MATCH_BATCH') or MATCH_BATCH_SIZE))
+    except Exception:
+        return MATCH_BATCH_SIZE
+
+
+def _value_key(value: Any) -> Any:
+    """Hashable stand-in for a match value (lists/dicts from graph sources are not hashable)."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return json.dumps(value, sort_keys=True, default=str)
+
 
 class LinkService:
     """Service for managing link definitions and executing relationship creation workflows."""
@@ -679,24 +699,35 @@ class LinkService:
             raise Exception(f"Failed to fetch API source: {str(e)}")
 
     def _match_with_targets(self, definition: Dict[str, Any], source_data: List[Dict[str, Any]],
-                           limit: int = 10) -> List[Dict[str, Any]]:
-        """Match source data with target nodes."""
+                           limit: int = 10, progress=None, check_index: bool = False) -> List[Dict[str, Any]]:
+        """Match source data with target nodes.
+
+        progress: optional callback(processed, total, matched) called after each matching batch.
+        check_index: look up whether the property strategy's target field is indexed first.
+        """
         target_type = definition.get('target_type')
         target_config = definition.get('target_config', {})
         match_strategy = definition.get('match_strategy')
         match_config = definition.get('match_config', {})
 
         if target_type == 'graph':
-            return self._match_graph_target(source_data, target_config, match_strategy, match_config, limit)
+            return self._match_graph_target(source_data, target_config, match_strategy, match_config, limit,
+                                            progress=progress, check_index=check_index)
         elif target_type == 'label':
-            return self._match_label_target(source_data, target_config, match_strategy, match_config, limit)
+            return self._match_label_target(source_data, target_config, match_strategy, match_config, limit,
+                                            progress=progress, check_index=check_index)
         else:
             raise ValueError(f"Unknown target_type: {target_type}")
 
     def _match_graph_target(self, source_data: List[Dict[str, Any]], target_config: Dict[str, Any],
                            match_strategy: str, match_config: Dict[str, Any],
-                           limit: int) -> List[Dict[str, Any]]:
-        """Match with existing graph nodes."""
+                           limit: int, progress=None, check_index: bool = False) -> List[Dict[str, Any]]:
+        """Match with existing graph nodes.
+
+        Source keys are sent in UNWIND batches (SCIDK_LINK_MATCH_BATCH, default 1000) so a job costs
+        one round-trip per batch instead of one per source row. Each source item gets at most one
+        target; matches are returned in source order with the target's node id as '_id'.
+        """
         try:
             from .neo4j_client import get_neo4j_client
             neo4j_client = get_neo4j_client()
@@ -704,58 +735,101 @@ class LinkService:
             if not neo4j_client:
                 raise Exception("Neo4j client not configured")
 
-            matches = []
-            for source_item in source_data[:limit]:
-                if match_strategy == 'property':
-                    source_field = match_config.get('source_field', '')
-                    target_field = match_config.get('target_field', '')
-                    target_label = target_config.get('label', '')
-
-                    source_value = source_item.get(source_field)
-                    if not source_value:
-                        continue
+            items = source_data[:limit]
+            if match_strategy == 'property':
+                source_field = match_config.get('source_field', '')
+                target_field = match_config.get('target_field', '')
+                target_label = target_config.get('label', '')
+                if check_index:
+                    self._check_target_index(neo4j_client, target_label, target_field)
+                query = (
+                    f"UNWIND $values AS value "
+                    f"MATCH (t:{target_label}) WHERE t.{target_field} = value "
+                    f"WITH value, head(collect(t)) AS t "
+                    f"RETURN value, id(t) AS node_id, t"
+                )
 
-                    query = f"MATCH (t:{target_label}) WHERE t.{target_field} = $value RETURN t LIMIT 1"
-                    results = neo4j_client.execute_read(query, {'value': source_value})
-
-                    if results:
-                        target_node = results[0].get('t')
-                        matches.append({
-                            'source': source_item,
-                            'target': dict(target_node) if target_node else None
-                        })
-                elif match_strategy == 'id':
-                    # Direct ID match
-                    target_id = source_item.get('target_id')
-                    if not target_id:
-                        continue
+                def key_of(item):
+                    value = item.get(source_field)
+                    return value if value else None
+            elif match_strategy == 'id':
+                query = "UNWIND $values AS value MATCH (t) WHERE id(t) = value RETURN value, id(t) AS node_id, t"
 
-                    query = "MATCH (t) WHERE id(t) = $id RETURN t"
-                    results = neo4j_client.execute_read(query, {'id': int(target_id)})
-
-                    if results:
-                        target_node = results[0].get('t')
-                        matches.append({
-                            'source': source_item,
-                            'target': dict(target_node) if target_node else None
-                        })
-                elif match_strategy == 'cypher':
-                    # Custom Cypher matching
-                    cypher_template = match_config.get('cypher', '')
-                    # Execute custom Cypher (with source_item parameters)
-                    # This is a simplified version - production would need proper parameter binding
-                    pass
+                def key_of(item):
+                    target_id = item.get('target_id')
+                    return int(target_id) if target_id else None
+            else:
+                # 'cypher': custom Cypher matching needs proper parameter binding; not supported yet
+                return []
 
-            return matches
+            return self._match_in_batches(neo4j_client, query, items, key_of, progress)
         except Exception as e:
             raise Exception(f"Failed to match graph target: {str(e)}")
 
+    def _match_in_batches(self, neo4j_client, query: str, items: List[Dict[str, Any]], key_of,
+                          progress=None) -> List[Dict[str, Any]]:
+        """Run a `UNWIND $values` lookup per batch of distinct source keys and pair results with items."""
+        batch_size = _match_batch_size()
+        total = len(items)
+        matches = []
+        for start in range(0, total, batch_size):
+            chunk = items[start:start + batch_size]
+            keyed = [(item, key_of(item)) for item in chunk]
+            values, seen = [], set()
+            for _item, value in keyed:
+                if value is None:
+                    continue
+                k = _value_key(value)
+                if k not in seen:
+                    seen.add(k)
+                    values.append(value)
+            found: Dict[Any, Dict[str, Any]] = {}
+            if values:
+                for record in neo4j_client.execute_read(query, {'values': values}):
+                    node = record.get('t')
+                    if node is None:
+                        continue
+                    target = dict(node)
+                    target['_id'] = record.get('node_id')
+                    found[_value_key(record.get('value'))] = target
+            for item, value in keyed:
+                if value is None:
+                    continue
+                target = found.get(_value_key(value))
+                if target is not None:
+                    matches.append({'source': item, 'target': dict(target)})
+            if progress is not None:
+                try:
+                    progress(min(start + batch_size, total), total, len(matches))
+                except Exception:
+                    pass
+        return matches
+
+    def _check_target_index(self, neo4j_client, label: str, field: str) -> bool:
+        """Warn when a property match would scan every node of the label (no index on label.field)."""
+        try:
+            rows = neo4j_client.execute_read(
+                "SHOW INDEXES YIELD labelsOrTypes, properties, state "
+                "WHERE $label IN labelsOrTypes AND properties[0] = $field RETURN state",
+                {'label': label, 'field': field},
+            )
+        except Exception:
+            return True  # SHOW INDEXES unavailable (older server or no privilege): don't guess
+        if rows:
+            return True
+        logger.warning(
+            f"No index on :{label}({field}); link matching will scan all :{label} nodes. "
+            f"Consider CREATE INDEX FOR (n:{label}) ON (n.{field})"
+        )
+        return False
+
     def _match_label_target(self, source_data: List[Dict[str, Any]], target_config: Dict[str, Any],
                            match_strategy: str, match_config: Dict[str, Any],
-                           limit: int) -> List[Dict[str, Any]]:
+                           limit: int, progress=None, check_index: bool = False) -> List[Dict[str, Any]]:
         """Match with nodes by label."""
         # Similar to _match_graph_target but filters by label
-        return self._match_graph_target(source_data, target_config, match_strategy, match_config, limit)
+        return self._match_graph_target(source_data, target_config, match_strategy, match_config, limit,
+                                        progress=progress, check_index=check_index)
 
     def _execute_job_impl(self, job_id: str, definition: Dict[str, Any]):
         """Execute the link job (create relationships in Neo4j)."""
@@ -894,9 +968,19 @@ class LinkService:
             source_data = self._fetch_source_data(definition)
             task['status_message'] = f'Found {len(source_data)} source items'
 
-            # Match with targets
+            # Match with targets (batched; progress reported per batch)
             task['status_message'] = 'Matching with targets...'
-            matches = self._match_with_targets(definition, source_data, limit=len(source_data))
+            match_started = time.time()
+
+            def _match_progress(processed, total, matched):
+                task['match_processed'] = processed
+                task['match_total'] = total
+                task['matched'] = matched
+                task['status_message'] = f'Matching with targets... {processed}/{total} ({matched} matched)'
+
+            matches = self._match_with_targets(definition, source_data, limit=len(source_data),
+                                               progress=_match_progress, check_index=True)
+            task['match_seconds'] = round(time.time() - match_started, 3)
 
             task['total'] = len(matches)
             task['status_message'] = f'Found {len(matches)} matches to process'
@@ -2097,13 +2181,15 @@ class LinkService:
                 'error': str(e)
             }
 
-    def commit_triple_import(self, source_database: str, rel_type: str, source_label: str, target_label: str, preview_hash: str) -> Dict[str, Any]:
+    def commit_triple_import(self, source_database: str, rel_type: str, source_label: str, target_label: str, preview_hash: str,
+                             resume: bool = True) -> Dict[str, Any]:
         """
         Import triples from external database to primary database.
 
         Optimization strategy:
         1. Try APOC-based direct copy (fastest, ~30s for 500K triples)
-        2. Fall back to streaming batches if APOC unavailable
+        2. Fall back to streaming batches if APOC unavailable (keyset pages, UNWIND writes,
+           resumable from the last checkpoint of an interrupted import)
         3. Use large batch size (10000) to minimize round trips
 
         Args:
@@ -2112,6 +2198,7 @@ class LinkService:
             source_label: Source node label
             target_label: Target node label
             preview_hash: Hash from preview to validate request hasn't changed
+            resume: Continue a previously interrupted streaming import from its checkpoint
 
         Returns:
             Dict with status, triples_imported count, duration, and method used
@@ -2149,6 +2236,11 @@ class LinkService:
                 )
 
                 if apoc_result['success']:
+                    try:
+                        from .graph_transfer import clear_checkpoint
+                        clear_checkpoint(self._triple_import_checkpoint_key(source_database, rel_type, source_label, target_label))
+                    except Exception:
+                        pass
                     duration = time.time() - start_time
                     return {
                         'status': 'success',
@@ -2160,7 +2252,7 @@ class LinkService:
                 # Strategy 2: Streaming batch import (fallback)
                 result = self._streaming_batch_import(
                     source_client, primary_client, source_database,
-                    rel_type, source_label, target_label, import_timestamp
+                    rel_type, source_label, target_label, import_timestamp, resume=resume
                 )
 
                 duration = time.time() - start_time
@@ -2170,7 +2262,8 @@ class LinkService:
                     'triples_imported': result['count'],
                     'duration_seconds': round(duration, 2),
                     'method': 'streaming_batch',
-                    'batches_processed': result.get('batches', 0)
+                    'batches_processed': result.get('batches', 0),
+                    'resumed': result.get('resumed', False)
                 }
 
             finally:
@@ -2264,83 +2357,81 @@ class LinkService:
 
     def _streaming_batch_import(self, source_client, primary_client, source_database: str,
                                 rel_type: str, source_label: str, target_label: str,
-                                import_timestamp: float) -> Dict[str, Any]:
+                                import_timestamp: float, resume: bool = True) -> Dict[str, Any]:
         """
-        Streaming batch import - fetch and write in chunks without loading all into memory.
+        Streaming batch import - keyset pages from the source, UNWIND batches into the primary.
+
+        Reads overlap writes (services.graph_transfer.StreamingTransfer) and progress is
+        checkpointed per triple pattern, so an interrupted import continues where it stopped.
         Uses batch size of 10000 for better performance.
         """
-        batch_size = 10000  # Increased from 1000
-        total_imported = 0
-        batch_count = 0
-        skip = 0
-
-        logger.info(f"[Import] Reading from source database '{source_database}', writing to PRIMARY")
-
-        while True:
-            # Fetch one batch from source with Neo4j element IDs
-            triples_query = f"""
-            MATCH (source:{source_label})-[r:{rel_type}]->(target:{target_label})
-            RETURN elementId(source) as source_id,
-                   properties(source) as source_props,
-                   properties(r) as rel_props,
-                   elementId(target) as target_id,
-                   properties(target) as target_props
-            SKIP {skip}
-            LIMIT {batch_size}
-            """
-
-            batch_triples = source_client.execute_read(triples_query)
+        from .graph_transfer import StreamingTransfer, keyset_query
 
-            if not batch_triples:
-                break  # No more triples to fetch
+        batch_size = 10000
 
-            # Write batch to primary
-            # Use prefixed elementId for unique identification across databases
-            import_query = f"""
-            UNWIND $triples as triple
-            MERGE (source:{source_label} {{__import_id__: triple.source_id}})
-            SET source += triple.source_props,
-                source.__source_db__ = $external_db
-            MERGE (target:{target_label} {{__import_id__: triple.target_id}})
-            SET target += triple.target_props,
-                target.__source_db__ = $external_db
-            MERGE (source)-[r:{rel_type}]->(target)
-            SET r += triple.rel_props,
-                r.__source__ = 'graph_import',
-                r.__external_db__ = $external_db,
-                r.__imported_at__ = $imported_at,
-                r.__imported_by__ = 'scidk'
-            RETURN count(r) as imported
-            """
-
-            batch_data = [
-                {
-                    'source_id': f"{source_database}::{triple.get('source_id')}",
-                    'source_props': triple.get('source_props', {}),
-                    'rel_props': triple.get('rel_props', {}),
-                    'target_id': f"{source_database}::{triple.get('target_id')}",
-                    'target_props': triple.get('target_props', {})
-                }
-                for triple in batch_triples
-            ]
+        logger.info(f"[Import] Reading from source database '{source_database}', writing to PRIMARY")
 
-            result = primary_client.execute_write(import_query, {
-                'triples': batch_data,
-                'external_db': source_database,
-                'imported_at': import_timestamp
-            })
+        # Page on the relationship's elementId: stable order, no SKIP re-scan per page
+        triples_query = keyset_query(
+            f"MATCH (source:{source_label})-[r:{rel_type}]->(target:{target_label})",
+            "source, r, target",
+            "elementId(r)",
+            "elementId(source) as source_id, properties(source) as source_props, properties(r) as rel_props, "
+            "elementId(target) as target_id, properties(target) as target_props",
+        )
 
-            if result:
-                total_imported += result[0].get('imported', 0)
+        # Use prefixed elementId for unique identification across databases
+        import_query = f"""
+        UNWIND $rows as triple
+        MERGE (source:{source_label} {{__import_id__: triple.source_id}})
+        SET source += triple.source_props,
+            source.__source_db__ = $external_db
+        MERGE (target:{target_label} {{__import_id__: triple.target_id}})
+        SET target += triple.target_props,
+            target.__source_db__ = $external_db
+        MERGE (source)-[r:{rel_type}]->(target)
+        SET r += triple.rel_props,
+            r.__source__ = 'graph_import',
+            r.__external_db__ = $external_db,
+            r.__imported_at__ = $imported_at,
+            r.__imported_by__ = 'scidk'
+        RETURN count(r) as imported
+        """
 
-            batch_count += 1
-            skip += batch_size
+        def to_triple(triple):
+            return {
+                'source_id': f"{source_database}::{triple.get('source_id')}",
+                'source_props': triple.get('source_props', {}),
+                'rel_props': triple.get('rel_props', {}),
+                'target_id': f"{source_database}::{triple.get('target_id')}",
+                'target_props': triple.get('target_props', {})
+            }
 
-            # If we got fewer results than batch_size, we're done
-            if len(batch_triples) < batch_size:
-                break
+        result = StreamingTransfer(
+            source_client, primary_client, triples_query, import_query,
+            batch_size=batch_size,
+            transform=to_triple,
+            write_params={'external_db': source_database, 'imported_at': import_timestamp},
+            count_key='imported',
+            checkpoint_key=self._triple_import_checkpoint_key(source_database, rel_type, source_label, target_label),
+            resume=resume,
+            app=self.app,
+        ).run()
+
+        if result.get('resumed_from'):
+            logger.info(f"[Import] Resumed from checkpoint after {result['rows_read']} triples")
+
+        return {
+            'count': result['count'],
+            'batches': result['batches'],
+            'resumed': bool(result.get('resumed_from')),
+            'read_seconds': result.get('read_sec'),
+            'write_seconds': result.get('write_sec'),
+        }
 
-        return {'count': total_imported, 'batches': batch_count}
+    @staticmethod
+    def _triple_import_checkpoint_key(source_database: str, rel_type: str, source_label: str, target_label: str) -> str:
+        return f"triple_import:{source_database}:{source_label}:{rel_type}:{target_label}"
 
     def _execute_data_import_with_progress(self, job_id: str, definition: Dict[str, Any], task: Dict[str, Any]):
         """
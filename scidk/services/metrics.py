@@ -65,10 +65,42 @@ def collect_metrics(app) -> Dict[str, Any]:
     outbox_lag = None
     if projection_enabled:
         outbox_lag = 0
+    # Interpretation result cache (cumulative across scans)
+    ic_hits = int(tel.get('interp_cache_hits') or 0)
+    ic_total = ic_hits + int(tel.get('interp_cache_misses') or 0)
+    # Neo4j commit engine: per-batch latency and throughput of the last commit
+    last_commit = tel.get('last_neo4j_commit') or {}
+    # Shared Neo4j driver registry (only if a driver was ever requested)
+    drivers = {}
+    try:
+        from . import neo4j_drivers
+        if neo4j_drivers._REGISTRY is not None:
+            drivers = neo4j_drivers._REGISTRY.stats()
+    except Exception:
+        drivers = {}
+    acquired = int(drivers.get('created') or 0) + int(drivers.get('reused') or 0)
+    # SQLite connection pool (per-endpoint detail at /api/admin/sqlite/stats)
+    try:
+        from ..core import sqlite_pool
+        sq = sqlite_pool.stats()
+    except Exception:
+        sq = {}
+    sq_scopes = (sq.get('scopes') or {}).values()
     return {
         'scan_throughput_per_min': per_min,
         'rows_ingested_total': rows_total,
         'browse_latency_p50': p50,
         'browse_latency_p95': p95,
         'outbox_lag': outbox_lag,
+        'interpretation_cache_hits': ic_hits,
+        'interpretation_cache_hit_rate': (ic_hits / ic_total) if ic_total else None,
+        'neo4j_commit_batch_p95': _percentile(tel.get('lat_neo4j_commit_batch') or [], 95.0),
+        'neo4j_commit_rows_per_sec': last_commit.get('rows_per_sec'),
+        'neo4j_drivers_open': int(drivers.get('drivers_open') or 0),
+        'neo4j_driver_leases_active': int(drivers.get('leases_active') or 0),
+        'neo4j_driver_reuse_rate': (int(drivers.get('reused') or 0) / acquired) if acquired else None,
+        'neo4j_pool_in_use': sum(int(d.get('pool_in_use') or 0) for d in drivers.get('drivers') or []),
+        'sqlite_queries_total': int(sq.get('queries_total') or 0),
+        'sqlite_lock_wait_seconds': sum(float(v.get('lock_wait_seconds') or 0.0) for v in sq_scopes),
+        'sqlite_connections_opened': int((sq.get('connections') or {}).get('opened') or 0),
     }
@@ -75,12 +75,15 @@ class Neo4jClient:
         self._driver = None
 
     def connect(self):
-        from neo4j import GraphDatabase  # type: ignore
-        auth = None if self._auth_mode == 'none' else (self._user, self._password)
-        self._driver = GraphDatabase.driver(self._uri, auth=auth)
+        # Shared per (uri, user, auth mode): reuses the pool instead of building a driver per client
+        from .neo4j_drivers import get_driver_registry
+        if self._driver is not None:
+            self._driver.close()
+        self._driver = get_driver_registry().acquire(self._uri, self._user, self._password, self._auth_mode, self._database)
         return self
 
     def close(self):
+        """Release this client's lease on the shared driver (the pool stays open for reuse)."""
         try:
             if self._driver is not None:
                 self._driver.close()
@@ -122,80 +125,38 @@ class Neo4jClient:
         with self._session() as session:
             result = session.run(query, parameters or {})
             records = [dict(record) for record in result]
-            return records
+        self._graph_written()
+        return records
 
-    # --- Operations ---
-    def ensure_constraints(self) -> None:
+    @staticmethod
+    def _graph_written() -> None:
+        """Advance the graph write epoch so cached GraphRAG results from before this write expire."""
         try:
-            with self._session() as s:
-                try:
-                    s.run("CREATE CONSTRAINT file_identity IF NOT EXISTS FOR (f:File) REQUIRE (f.path, f.host) IS UNIQUE").consume()
-                except Exception:
-                    pass
-                try:
-                    s.run("CREATE CONSTRAINT folder_identity IF NOT EXISTS FOR (d:Folder) REQUIRE (d.path, d.host) IS UNIQUE").consume()
-                except Exception:
-                    pass
+            from .graphrag.query_cache import bump_graph_epoch
+            bump_graph_epoch()
         except Exception:
-            # best-effort, ignore errors
             pass
 
-    def write_scan(self, rows: List[Dict[str, Any]], folder_rows: List[Dict[str, Any]], scan: Dict[str, Any]) -> Dict[str, Any]:
-        """Upsert Scan, Folders, Files and relationships for one scan in a single query."""
-        with self._session() as sess:
-            cypher = (
-                "MERGE (s:Scan {id: $scan_id}) "
-                "SET s.path = $scan_path, s.started = $scan_started, s.ended = $scan_ended, "
-                "    s.provider_id = $scan_provider, s.host_type = $scan_host_type, s.host_id = $scan_host_id, "
-                "    s.root_id = $scan_root_id, s.root_label = $scan_root_label, s.scan_source = $scan_source "
-                "WITH s "
-                "UNWIND $folders AS folder "
-                "MERGE (fo:Folder {path: folder.path, host: $node_host}) "
-                "  SET fo.name = folder.name, fo.provider_id = $scan_provider, fo.host_type = $scan_host_type, fo.host_id = $scan_host_id "
-                "MERGE (fo)-[:SCANNED_IN]->(s) "
-                "WITH s "
-                "UNWIND $folders AS folder "
-                "WITH s, folder WHERE folder.parent IS NOT NULL AND folder.parent <> '' AND folder.parent <> folder.path "
-                "MERGE (child:Folder {path: folder.path, host: $node_host}) "
-                "MERGE (parent:Folder {path: folder.parent, host: $node_host}) "
-                "MERGE (parent)-[:CONTAINS]->(child) "
-                "WITH s "
-                "UNWIND $rows AS r "
-                "MERGE (f:File {path: r.path, host: $node_host}) "
-                "  SET f.filename = r.filename, f.extension = r.extension, f.size_bytes = r.size_bytes, f.created = r.created, f.modified = r.modified, f.mime_type = r.mime_type, f.provider_id = $scan_provider, f.host_type = $scan_host_type, f.host_id = $scan_host_id "
-                "MERGE (f)-[:SCANNED_IN]->(s) "
-                "WITH r, f, s "
-                "FOREACH (iid IN coalesce(r.interps, []) | "
-                "  MERGE (i:Interpreter {id: iid}) "
-                "  MERGE (f)-[:INTERPRETED_AS]->(i) "
-                ") "
-                "WITH r, f, s "
-                "WHERE r.folder IS NOT NULL AND r.folder <> '' "
-                "MERGE (fo:Folder {path: r.folder, host: $node_host}) "
-                "MERGE (fo)-[:CONTAINS]->(f) "
-                "RETURN $scan_id AS scan_id"
-            )
-            params = dict(
-                rows=rows,
-                folders=folder_rows,
-                scan_id=scan.get('id'),
-                scan_path=scan.get('path'),
-                scan_started=scan.get('started'),
-                scan_ended=scan.get('ended'),
-                scan_provider=scan.get('provider_id'),
-                scan_host_type=scan.get('host_type'),
-                scan_host_id=scan.get('host_id'),
-                scan_root_id=scan.get('root_id'),
-                scan_root_label=scan.get('root_label'),
-                scan_source=scan.get('scan_source'),
-                node_host=scan.get('host_id'),
-                node_port=None,
-            )
-            _ = list(sess.run(cypher, **params))
-            return {
-                'written_files': len(rows),
-                'written_folders': len(folder_rows),
-            }
+    # --- Operations ---
+    def ensure_constraints(self) -> Dict[str, Any]:
+        """Check identity constraints per SCIDK_NEO4J_CONSTRAINTS (see neo4j_commit.ensure_constraints)."""
+        if self._driver is None:
+            return {'mode': None, 'missing': None, 'created': []}
+        from .neo4j_commit import ensure_constraints
+        return ensure_constraints(self._driver, self._database)
+
+    def write_scan(self, rows, folder_rows, scan: Dict[str, Any], on_progress=None, **engine_opts) -> Dict[str, Any]:
+        """Upsert Scan, Folders, Files and relationships for one scan via the batched commit engine.
+
+        rows/folder_rows are lists or zero-argument callables returning iterators (streamed sources,
+        e.g. IndexRowSource.files / IndexRowSource.folders). Returns the engine result
+        (written_files, written_folders, batches_*, errors, per-phase throughput).
+        """
+        if self._driver is None:
+            raise RuntimeError("Neo4jClient not connected")
+        from .neo4j_commit import CommitEngine
+        engine = CommitEngine(self._driver, database=self._database, on_progress=on_progress, **engine_opts)
+        return engine.commit(scan, rows, folder_rows)
 
     def verify(self, scan_id: str) -> Dict[str, Any]:
         verify_q = (
@@ -309,6 +270,7 @@ class Neo4jClient:
                 except Exception as e:
                     result['errors'].append(f"Failed to write relationship {rel_decl.get('type')}: {str(e)}")
 
+        self._graph_written()
         return result
 
     def push_label_constraints(self) -> Dict[str, Any]:
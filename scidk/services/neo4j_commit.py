@@ -0,0 +1,437 @@
+"""Streaming, concurrent Neo4j commit engine shared by every scan commit path.
+
+A commit runs in ordered phases; each phase is a stream of bounded UNWIND batches written over a
+small pool of sessions (one session per batch, SCIDK_NEO4J_COMMIT_CONCURRENCY threads, default 4):
+
+1. scan:    MERGE the Scan node once
+2. folders: MERGE each Folder once (deduplicated by path) plus its SCANNED_IN edge
+3. files:   MERGE File nodes plus SCANNED_IN and INTERPRETED_AS edges
+4. edges:   Folder-[:CONTAINS]->Folder and Folder-[:CONTAINS]->File between the nodes written above
+
+Sources are lists or zero-argument callables returning fresh iterators (e.g.
+``IndexRowSource.files``), so rows can be streamed straight from the SQLite index and read once
+per phase. At most 2 x concurrency batches are in flight, which keeps Python memory flat and every
+Neo4j transaction bounded by the batch size (SCIDK_NEO4J_FILE_BATCH / SCIDK_NEO4J_FOLDER_BATCH).
+Transient errors (deadlocks, leader switches, dropped connections) are retried with jittered
+backoff; per-batch and per-phase throughput is reported via on_progress and telemetry.
+
+Concurrent MERGEs only stay duplicate-free with identity constraints on File, Folder, Scan and
+Interpreter. SCIDK_NEO4J_CONSTRAINTS selects how commits treat them: 'check' (default) lists the
+existing constraints and, when some are missing, reports them and commits with one session;
+'create' creates the missing ones; 'off' skips the check.
+"""
+from __future__ import annotations
+
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+Source = Union[Iterable[Dict[str, Any]], Callable[[], Iterable[Dict[str, Any]]]]
+
+SCAN_CQL = (
+    "MERGE (s:Scan {id: $scan_id}) "
+    "SET s.path = $scan_path, s.started = $scan_started, s.ended = $scan_ended, "
+    "    s.provider_id = $scan_provider, s.host_type = $scan_host_type, s.host_id = $scan_host_id, "
+    "    s.root_id = $scan_root_id, s.root_label = $scan_root_label, s.scan_source = $scan_source "
+    "RETURN s.id AS scan_id"
+)
+
+FOLDERS_CQL = (
+    "UNWIND $folders AS folder "
+    "MERGE (fo:Folder {path: folder.path, host: $node_host}) "
+    "  SET fo.name = folder.name, fo.provider_id = $scan_provider, fo.host_type = $scan_host_type, fo.host_id = $scan_host_id "
+    "WITH fo "
+    "MATCH (s:Scan {id: $scan_id}) "
+    "MERGE (fo)-[:SCANNED_IN]->(s)"
+)
+
+FILES_CQL = (
+    "UNWIND $rows AS r "
+    "MERGE (f:File {path: r.path, host: $node_host}) "
+    "  SET f.filename = r.filename, f.extension = r.extension, f.size_bytes = r.size_bytes, "
+    "      f.created = r.created, f.modified = r.modified, f.mime_type = r.mime_type, "
+    "      f.provider_id = $scan_provider, f.host_type = $scan_host_type, f.host_id = $scan_host_id "
+    "WITH r, f "
+    "MATCH (s:Scan {id: $scan_id}) "
+    "MERGE (f)-[:SCANNED_IN]->(s) "
+    "FOREACH (iid IN coalesce(r.interps, []) | "
+    "  MERGE (i:Interpreter {id: iid}) "
+    "  MERGE (f)-[:INTERPRETED_AS]->(i) "
+    ")"
+)
+
+# Parents are MERGEd: a folder's parent may lie outside the scan (the scan base's own parent), and
+# streamed file rows may name folders that the folder rows do not list.
+FOLDER_EDGES_CQL = (
+    "UNWIND $folders AS folder "
+    "MATCH (child:Folder {path: folder.path, host: $node_host}) "
+    "MERGE (parent:Folder {path: folder.parent, host: $node_host}) "
+    "MERGE (parent)-[:CONTAINS]->(child)"
+)
+
+FILE_EDGES_CQL = (
+    "UNWIND $rows AS r "
+    "MATCH (f:File {path: r.path, host: $node_host}) "
+    "MERGE (fo:Folder {path: r.folder, host: $node_host}) "
+    "MERGE (fo)-[:CONTAINS]->(f)"
+)
+
+# (label, key properties) -> statement creating the identity constraint
+CONSTRAINTS = {
+    ('File', ('host', 'path')): "CREATE CONSTRAINT file_identity IF NOT EXISTS FOR (f:File) REQUIRE (f.path, f.host) IS UNIQUE",
+    ('Folder', ('host', 'path')): "CREATE CONSTRAINT folder_identity IF NOT EXISTS FOR (d:Folder) REQUIRE (d.path, d.host) IS UNIQUE",
+    ('Scan', ('id',)): "CREATE CONSTRAINT scan_identity IF NOT EXISTS FOR (s:Scan) REQUIRE s.id IS UNIQUE",
+    ('Interpreter', ('id',)): "CREATE CONSTRAINT interpreter_identity IF NOT EXISTS FOR (i:Interpreter) REQUIRE i.id IS UNIQUE",
+}
+CONSTRAINT_MODES = ('check', 'create', 'off')
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name) or default))
+    except Exception:
+        return default
+
+
+def _iterate(src: Optional[Source]) -> Iterator[Dict[str, Any]]:
+    if src is None:
+        return iter(())
+    return iter(src() if callable(src) else src)
+
+
+def _chunks(it: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parent_of(path: str) -> str:
+    from ..core.folder_hierarchy import _parent_of as _p
+    return _p(path)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for errors a retry can fix: deadlocks, lock timeouts, leader switches, lost connections."""
+    try:
+        from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError  # type: ignore
+        if isinstance(exc, (TransientError, ServiceUnavailable, SessionExpired)):
+            return True
+    except Exception:
+        pass
+    try:
+        if exc.is_retryable():  # type: ignore[attr-defined]
+            return True
+    except Exception:
+        pass
+    msg = f"{type(exc).__name__} {exc}".lower()
+    return any(k in msg for k in ('transient', 'deadlock', 'serviceunavailable', 'sessionexpired', 'connection reset'))
+
+
+def constraints_mode() -> str:
+    mode = (os.environ.get('SCIDK_NEO4J_CONSTRAINTS') or 'check').strip().lower()
+    return mode if mode in CONSTRAINT_MODES else 'check'
+
+
+def _existing_constraints(session) -> set:
+    """(label, sorted key properties) of the uniqueness / node key constraints in the database."""
+    found = set()
+    for rec in session.run("SHOW CONSTRAINTS YIELD labelsOrTypes, properties, type"):
+        ctype = str(rec['type'] or '').upper()
+        if 'UNIQUE' not in ctype and 'KEY' not in ctype:
+            continue
+        for label in rec['labelsOrTypes'] or []:
+            found.add((label, tuple(sorted(rec['properties'] or []))))
+    return found
+
+
+def ensure_constraints(driver, database: Optional[str] = None, mode: Optional[str] = None) -> Dict[str, Any]:
+    """Check (and in 'create' mode, create) the identity constraints commits rely on.
+
+    Returns {'mode', 'missing', 'created'}; missing is None when it could not be determined
+    (mode 'off', or a server without SHOW CONSTRAINTS), which single_session treats as missing
+    unless the mode is 'off'.
+    """
+    mode = mode if mode in CONSTRAINT_MODES else constraints_mode()
+    out: Dict[str, Any] = {'mode': mode, 'missing': None, 'created': []}
+    if mode == 'off':
+        return out
+    try:
+        with _open_session(driver, database) as s:
+            try:
+                existing = _existing_constraints(s)
+            except Exception:
+                existing = None
+            missing = [k for k in CONSTRAINTS if existing is None or k not in existing]
+            if mode == 'create':
+                for key in missing:
+                    try:
+                        s.run(CONSTRAINTS[key]).consume()
+                        out['created'].append(key[0])
+                    except Exception:
+                        pass
+                if existing is not None:
+                    missing = [k for k in missing if k[0] not in out['created']]
+            if existing is not None:
+                out['missing'] = [label for label, _props in missing]
+    except Exception:
+        pass
+    return out
+
+
+def _open_session(driver, database: Optional[str]):
+    return driver.session(database=database) if database else driver.session()
+
+
+def _current_app():
+    try:
+        from flask import current_app
+        return current_app._get_current_object()
+    except Exception:
+        return None
+
+
+class CommitEngine:
+    """Writes one scan's folders, files and edges to Neo4j in concurrent, bounded batches."""
+
+    def __init__(
+        self,
+        driver,
+        database: Optional[str] = None,
+        file_batch_size: Optional[int] = None,
+        folder_batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        max_retries: int = 3,
+        on_progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        app=None,
+    ):
+        self.driver = driver
+        self.database = database
+        self.file_batch_size = max(1, int(file_batch_size or _env_int('SCIDK_NEO4J_FILE_BATCH', 5000)))
+        self.folder_batch_size = max(1, int(folder_batch_size or _env_int('SCIDK_NEO4J_FOLDER_BATCH', 5000)))
+        self.concurrency = max(1, int(concurrency or _env_int('SCIDK_NEO4J_COMMIT_CONCURRENCY', 4)))
+        self.max_retries = max(0, int(max_retries))
+        self.on_progress = on_progress
+        self.app = app
+        self._fallback = (os.environ.get('SCIDK_FILES_COMPUTE_FOLDER_FALLBACK') or '').strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+
+    # -- helpers ------------------------------------------------------------------------------
+    def _emit(self, event: str, payload: Dict[str, Any]) -> None:
+        if self.on_progress is None:
+            return
+        try:
+            self.on_progress(event, payload)
+        except Exception:
+            pass
+
+    def _file_folder(self, r: Dict[str, Any]) -> str:
+        fld = r.get('folder') or ''
+        if not fld and self._fallback and r.get('path'):
+            fld = _parent_of(r['path'])
+        return fld
+
+    def _write_batch(self, kind: str, index: int, cql: str, params: Dict[str, Any], items: int) -> Dict[str, Any]:
+        attempt = 0
+        t0 = time.perf_counter()
+        while True:
+            try:
+                with _open_session(self.driver, self.database) as sess:
+                    sess.run(cql, **params).consume()
+                return {'kind': kind, 'index': index, 'items': items, 'ok': True, 'error': None,
+                        'sec': time.perf_counter() - t0, 'retries': attempt}
+            except Exception as ex:
+                attempt += 1
+                if attempt > self.max_retries or not is_transient(ex):
+                    return {'kind': kind, 'index': index, 'items': items, 'ok': False, 'error': str(ex),
+                            'sec': time.perf_counter() - t0, 'retries': attempt - 1}
+                sleep_s = min(0.25 * (2 ** (attempt - 1)) + random.random() * 0.25, 5.0)
+                self._emit('retry', {'batch_kind': kind, 'batch_index': index, 'attempt': attempt,
+                                     'sleep_s': round(sleep_s, 2), 'error': str(ex)[:200]})
+                time.sleep(sleep_s)
+
+    def _collect(self, res: Dict[str, Any], result: Dict[str, Any]) -> None:
+        ph = result['phases'].setdefault(res['kind'], {'batches': 0, 'items': 0, 'failed': 0, 'retries': 0, 'batch_sec': 0.0})
+        ph['batches'] += 1
+        ph['retries'] += res['retries']
+        ph['batch_sec'] += res['sec']
+        rate = res['items'] / res['sec'] if res['sec'] > 0 else None
+        if res['ok']:
+            ph['items'] += res['items']
+            result['batches_ok'] += 1
+            self._emit('batch_done', {'batch_kind': res['kind'], 'batch_index': res['index'], 'items': res['items'],
+                                      'sec': round(res['sec'], 3), 'rows_per_sec': round(rate, 1) if rate else None})
+        else:
+            ph['failed'] += 1
+            result['batches_failed'] += 1
+            result['errors'].append(f"{res['kind']} batch {res['index']}: {res['error']}")
+            self._emit('batch_error', {'batch_kind': res['kind'], 'batch_index': res['index'], 'items': res['items'],
+                                       'error': res['error']})
+        if self.app is not None:
+            try:
+                from .metrics import record_latency
+                record_latency(self.app, 'neo4j_commit_batch', res['sec'])
+            except Exception:
+                pass
+
+    def _run_phase(self, pool: ThreadPoolExecutor, phase: str, streams, common: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Run every (kind, cql, param_key, batches) stream of one phase; returns when all batches finished."""
+        t0 = time.perf_counter()
+        inflight = set()
+        limit = 2 * self.concurrency
+        for kind, cql, key, batches in streams:
+            for i, batch in enumerate(batches, start=1):
+                result['batches_total'] += 1
+                inflight.add(pool.submit(self._write_batch, kind, i, cql, {key: batch, **common}, len(batch)))
+                if len(inflight) >= limit:
+                    done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        self._collect(f.result(), result)
+        for f in wait(inflight).done:
+            self._collect(f.result(), result)
+        sec = time.perf_counter() - t0
+        items = sum(result['phases'].get(kind, {}).get('items', 0) for kind, *_ in streams)
+        result['phase_sec'][phase] = round(sec, 3)
+        self._emit('phase_done', {'phase': phase, 'items': items, 'sec': round(sec, 3),
+                                  'rows_per_sec': round(items / sec, 1) if sec > 0 else None})
+
+    # -- phases -------------------------------------------------------------------------------
+    def _unique_folders(self, folders: Source, files: Source, seen: set) -> Iterator[Dict[str, Any]]:
+        from ..core.folder_hierarchy import _name_of
+        for fr in _iterate(folders):
+            p = fr.get('path')
+            if p and p not in seen:
+                seen.add(p)
+                yield {'path': p, 'name': fr.get('name')}
+        if not callable(files):
+            # In-memory rows: make sure every file's folder exists before the edge phase MATCHes it
+            for r in _iterate(files):
+                p = self._file_folder(r)
+                if p and p not in seen:
+                    seen.add(p)
+                    yield {'path': p, 'name': _name_of(p)}
+
+    def _folder_edges(self, folders: Source) -> Iterator[Dict[str, Any]]:
+        for fr in _iterate(folders):
+            p, par = fr.get('path'), fr.get('parent')
+            if p and par and par != p:
+                yield {'path': p, 'parent': par}
+
+    def _file_edges(self, files: Source) -> Iterator[Dict[str, Any]]:
+        for r in _iterate(files):
+            fld = self._file_folder(r)
+            if r.get('path') and fld:
+                yield {'path': r['path'], 'folder': fld}
+
+    def _file_nodes(self, files: Source) -> Iterator[Dict[str, Any]]:
+        for r in _iterate(files):
+            if r.get('path'):
+                yield r
+
+    def commit(self, scan: Dict[str, Any], files: Source, folders: Source) -> Dict[str, Any]:
+        """Write scan, folders, files and edges. Raises only when the Scan node itself cannot be written."""
+        if self.app is None:
+            self.app = _current_app()
+        result: Dict[str, Any] = {
+            'written_files': 0, 'written_folders': 0, 'written_edges': 0,
+            'batches_total': 0, 'batches_ok': 0, 'batches_failed': 0,
+            'errors': [], 'error': None, 'phases': {}, 'phase_sec': {},
+            'concurrency': self.concurrency,
+            'batch_sizes': {'files': self.file_batch_size, 'folders': self.folder_batch_size},
+        }
+        t0 = time.perf_counter()
+        with _open_session(self.driver, self.database) as sess:
+            sess.run(
+                SCAN_CQL,
+                scan_id=scan.get('id'),
+                scan_path=scan.get('path'),
+                scan_started=scan.get('started'),
+                scan_ended=scan.get('ended'),
+                scan_provider=scan.get('provider_id'),
+                scan_host_type=scan.get('host_type'),
+                scan_host_id=scan.get('host_id'),
+                scan_root_id=scan.get('root_id'),
+                scan_root_label=scan.get('root_label'),
+                scan_source=scan.get('scan_source') or scan.get('source'),
+            ).consume()
+        common = {
+            'scan_id': scan.get('id'),
+            'node_host': scan.get('host_id'),
+            'scan_provider': scan.get('provider_id'),
+            'scan_host_type': scan.get('host_type'),
+            'scan_host_id': scan.get('host_id'),
+        }
+        self._emit('start', {'scan_id': scan.get('id'), 'concurrency': self.concurrency,
+                             'batch_sizes': result['batch_sizes']})
+        seen_folders: set = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='scidk-neo4j-commit') as pool:
+            self._run_phase(pool, 'folders', [
+                ('folders', FOLDERS_CQL, 'folders', _chunks(self._unique_folders(folders, files, seen_folders), self.folder_batch_size)),
+            ], common, result)
+            self._run_phase(pool, 'files', [
+                ('files', FILES_CQL, 'rows', _chunks(self._file_nodes(files), self.file_batch_size)),
+            ], common, result)
+            self._run_phase(pool, 'edges', [
+                ('folder_edges', FOLDER_EDGES_CQL, 'folders', _chunks(self._folder_edges(folders), self.folder_batch_size)),
+                ('file_edges', FILE_EDGES_CQL, 'rows', _chunks(self._file_edges(files), self.file_batch_size)),
+            ], common, result)
+        phases = result['phases']
+        result['written_folders'] = phases.get('folders', {}).get('items', 0)
+        result['written_files'] = phases.get('files', {}).get('items', 0)
+        result['written_edges'] = phases.get('folder_edges', {}).get('items', 0) + phases.get('file_edges', {}).get('items', 0)
+        for ph in phases.values():
+            ph['batch_sec'] = round(ph['batch_sec'], 3)
+        total_sec = time.perf_counter() - t0
+        result['sec'] = round(total_sec, 3)
+        written = result['written_files'] + result['written_folders']
+        result['rows_per_sec'] = round(written / total_sec, 1) if total_sec > 0 else None
+        if result['errors']:
+            result['error'] = result['errors'][0]
+        try:
+            from .graphrag.query_cache import bump_graph_epoch
+            bump_graph_epoch()
+        except Exception:
+            pass
+        if self.app is not None:
+            try:
+                from .metrics import inc_counter, _telemetry
+                inc_counter(self.app, 'neo4j_rows_committed', written)
+                _telemetry(self.app)['last_neo4j_commit'] = {
+                    'scan_id': scan.get('id'), 'sec': result['sec'], 'rows_per_sec': result['rows_per_sec'],
+                    'batches_failed': result['batches_failed'], 'phase_sec': dict(result['phase_sec']),
+                }
+            except Exception:
+                pass
+        self._emit('engine_done', {'scan_id': scan.get('id'), 'written_files': result['written_files'],
+                                   'written_folders': result['written_folders'], 'written_edges': result['written_edges'],
+                                   'sec': result['sec'], 'rows_per_sec': result['rows_per_sec'],
+                                   'batches_failed': result['batches_failed']})
+        return result
+
+
+def single_session(constraints: Dict[str, Any]) -> bool:
+    """True unless ensure_constraints confirmed every identity constraint (or checking is turned off):
+    without them concurrent MERGEs can create duplicate nodes."""
+    if constraints.get('mode') == 'off':
+        return False
+    return constraints.get('missing') is None or bool(constraints['missing'])
+
+
+def engine_options(constraints: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    """CommitEngine kwargs for a database whose constraint check returned constraints: missing or
+    undetermined identity constraints force a single session."""
+    if single_session(constraints):
+        kwargs['concurrency'] = 1
+    return kwargs
+
+
+def commit_scan_rows(driver, scan: Dict[str, Any], files: Source, folders: Source, database: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+    """Convenience wrapper: check constraints, then run one CommitEngine commit."""
+    constraints = ensure_constraints(driver, database)
+    result = CommitEngine(driver, database=database, **engine_options(constraints, **kwargs)).commit(scan, files, folders)
+    result['constraints'] = constraints
+    return result
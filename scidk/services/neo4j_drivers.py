@@ -0,0 +1,270 @@
+"""Process-wide registry of Neo4j drivers, one per (uri, user, auth mode).
+
+A neo4j ``Driver`` owns a connection pool (plus TLS sessions and the routing table), so building
+one per call is expensive and leaks pools when callers forget ``close()``. ``acquire()`` hands out
+a lease on a shared driver instead; the lease's ``close()`` only releases it. Databases are chosen
+per session, so every profile or database on the same server and account reuses one pool.
+
+- Credential change: a lease requested with a different password (e.g. after saving the Settings
+  page) retires the old driver and builds a new one. ``invalidate()`` drops drivers explicitly.
+- Health checks: a reused driver is checked with ``verify_connectivity()`` at most every
+  SCIDK_NEO4J_HEALTH_CHECK_SEC (default 30; 0 disables) and rebuilt when the check fails.
+- Retired drivers are closed once their last lease is released.
+- SCIDK_NEO4J_MAX_POOL_SIZE / SCIDK_NEO4J_CONNECTION_TIMEOUT_SEC are passed to new drivers when set.
+- ``stats()`` reports leases and pool usage per driver (surfaced in /api/metrics).
+"""
+import atexit
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except Exception:
+        return default
+
+
+def _fingerprint(password: Optional[str]) -> str:
+    return hashlib.sha256((password or '').encode('utf-8')).hexdigest()[:16]
+
+
+def _driver_options() -> Dict[str, Any]:
+    opts: Dict[str, Any] = {}
+    try:
+        if os.environ.get('SCIDK_NEO4J_MAX_POOL_SIZE'):
+            opts['max_connection_pool_size'] = int(os.environ['SCIDK_NEO4J_MAX_POOL_SIZE'])
+        if os.environ.get('SCIDK_NEO4J_CONNECTION_TIMEOUT_SEC'):
+            opts['connection_timeout'] = float(os.environ['SCIDK_NEO4J_CONNECTION_TIMEOUT_SEC'])
+    except Exception:
+        pass
+    return opts
+
+
+def _pool_usage(driver) -> Dict[str, Any]:
+    """Connections held by the driver's pool (best effort: relies on driver internals)."""
+    try:
+        pool = driver._pool
+        conns = pool.connections
+        with pool.lock:
+            addresses = list(conns.keys())
+            total = sum(len(conns[a]) for a in addresses)
+        in_use = sum(int(pool.in_use_connection_count(a)) for a in addresses)
+        return {
+            'pool_connections': total,
+            'pool_in_use': in_use,
+            'pool_max': getattr(pool.pool_config, 'max_connection_pool_size', None),
+        }
+    except Exception:
+        return {}
+
+
+class _Entry:
+    def __init__(self, key: Tuple[str, str, str], fingerprint: str, driver, factory):
+        self.key = key
+        self.fingerprint = fingerprint
+        self.driver = driver
+        self.factory = factory
+        self.leases = 0
+        self.acquires = 0
+        self.retired = False
+        self.created = time.time()
+        self.last_check = self.created
+        self.databases: set = set()
+
+
+class DriverLease:
+    """A borrowed shared driver. Behaves like the driver; ``close()`` releases the lease only."""
+
+    def __init__(self, registry: 'DriverRegistry', entry: _Entry, database: Optional[str] = None):
+        self._registry = registry
+        self._entry = entry
+        self._released = False
+        self.database = database
+
+    @property
+    def driver(self):
+        return self._entry.driver
+
+    def session(self, *args, **kwargs):
+        return self._entry.driver.session(*args, **kwargs)
+
+    def close(self) -> None:
+        if not self._released:
+            self._released = True
+            self._registry._release(self._entry)
+
+    def __getattr__(self, name):
+        return getattr(self._entry.driver, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __del__(self):
+        # Callers that never close() their driver still give the lease back
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class DriverRegistry:
+    def __init__(self, health_check_sec: Optional[float] = None):
+        self.health_check_sec = float(health_check_sec if health_check_sec is not None
+                                      else _env_float('SCIDK_NEO4J_HEALTH_CHECK_SEC', 30.0))
+        self._lock = threading.RLock()  # re-entrant: a lease may be released from __del__ under the lock
+        self._entries: Dict[Tuple[str, str, str], _Entry] = {}
+        self._retired: List[_Entry] = []
+        self.counters = {'created': 0, 'reused': 0, 'retired': 0, 'health_checks': 0, 'health_failures': 0,
+                         'credential_changes': 0}
+
+    def acquire(self, uri: str, user: Optional[str] = None, password: Optional[str] = None,
+                auth_mode: str = 'basic', database: Optional[str] = None) -> DriverLease:
+        """Lease the shared driver for (uri, user, auth_mode), creating or replacing it as needed."""
+        from neo4j import GraphDatabase  # type: ignore
+        factory = GraphDatabase.driver
+        auth_mode = (auth_mode or 'basic').lower()
+        key = (uri, user or '', auth_mode)
+        fp = _fingerprint(password) if auth_mode != 'none' else ''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.fingerprint != fp or entry.factory is not factory):
+                if entry.fingerprint != fp:
+                    self.counters['credential_changes'] += 1
+                self._retire(entry)
+                entry = None
+            check = entry is not None and self.health_check_sec > 0 and time.time() - entry.last_check >= self.health_check_sec
+            if entry is not None and not check:
+                return self._lease(entry, database, reused=True)
+        if check and not self._healthy(entry):
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._retire(entry)
+                entry = None
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current.fingerprint == fp and current.factory is factory:
+                return self._lease(current, database, reused=True)
+            if current is not None:
+                self._retire(current)
+            auth = None if auth_mode == 'none' else (user, password)
+            driver = factory(uri, auth=auth, **_driver_options())
+            entry = self._entries[key] = _Entry(key, fp, driver, factory)
+            self.counters['created'] += 1
+            return self._lease(entry, database, reused=False)
+
+    def _lease(self, entry: _Entry, database: Optional[str], reused: bool) -> DriverLease:
+        entry.leases += 1
+        entry.acquires += 1
+        if database:
+            entry.databases.add(database)
+        if reused:
+            self.counters['reused'] += 1
+        return DriverLease(self, entry, database)
+
+    def _healthy(self, entry: _Entry) -> bool:
+        entry.last_check = time.time()
+        self.counters['health_checks'] += 1
+        verify = getattr(entry.driver, 'verify_connectivity', None)
+        if verify is None:
+            return True
+        try:
+            verify()
+            return True
+        except Exception:
+            self.counters['health_failures'] += 1
+            return False
+
+    def _retire(self, entry: _Entry) -> None:
+        """Stop handing out entry; close it now if idle, else when its last lease is released."""
+        if self._entries.get(entry.key) is entry:
+            del self._entries[entry.key]
+        if entry.retired:
+            return
+        entry.retired = True
+        self.counters['retired'] += 1
+        if entry.leases <= 0:
+            self._close(entry)
+        else:
+            self._retired.append(entry)
+
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.leases = max(0, entry.leases - 1)
+            if entry.retired and entry.leases == 0 and entry in self._retired:
+                self._retired.remove(entry)
+                self._close(entry)
+
+    @staticmethod
+    def _close(entry: _Entry) -> None:
+        try:
+            entry.driver.close()
+        except Exception:
+            pass
+
+    def invalidate(self, uri: Optional[str] = None) -> int:
+        """Retire drivers for uri (all drivers when None); used when connection settings change."""
+        with self._lock:
+            victims = [e for e in self._entries.values() if uri is None or e.key[0] == uri]
+            for e in victims:
+                self._retire(e)
+        return len(victims)
+
+    def close_all(self) -> None:
+        with self._lock:
+            entries = list(self._entries.values()) + list(self._retired)
+            self._entries.clear()
+            self._retired.clear()
+        for e in entries:
+            e.retired = True
+            self._close(e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            drivers = []
+            for e in self._entries.values():
+                d = {
+                    'uri': e.key[0],
+                    'user': e.key[1],
+                    'auth_mode': e.key[2],
+                    'databases': sorted(e.databases),
+                    'leases_active': e.leases,
+                    'acquires': e.acquires,
+                    'age_sec': round(time.time() - e.created, 1),
+                }
+                d.update(_pool_usage(e.driver))
+                drivers.append(d)
+            out: Dict[str, Any] = dict(self.counters)
+            out['drivers'] = drivers
+            out['drivers_open'] = len(drivers)
+            out['drivers_retiring'] = len(self._retired)
+            out['leases_active'] = sum(e.leases for e in self._entries.values())
+            return out
+
+
+_REGISTRY: Optional[DriverRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_driver_registry() -> DriverRegistry:
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = DriverRegistry()
+            atexit.register(_REGISTRY.close_all)
+        return _REGISTRY
+
+
+def shared_driver(uri: str, auth: Optional[tuple] = None, database: Optional[str] = None) -> DriverLease:
+    """Drop-in for ``GraphDatabase.driver(uri, auth=auth)`` backed by the shared registry."""
+    if auth is None:
+        return get_driver_registry().acquire(uri, None, None, 'none', database)
+    user, password = (tuple(auth) + (None, None))[:2]
+    return get_driver_registry().acquire(uri, user, password, 'basic', database)
@@ -10,6 +10,8 @@ import uuid
 from dataclasses import dataclass, asdict
 from typing import Optional, List, Dict, Any
 
+from ..core import sqlite_pool
+
 try:
     from .. import path_index_sqlite as pix
 except (ImportError, ValueError):
@@ -80,7 +82,7 @@ class QueryService:
     def _get_conn(self) -> sqlite3.Connection:
         """Get database connection."""
         if self.db_path:
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite_pool.connect(self.db_path)
         else:
             conn = pix.connect()
         conn.row_factory = sqlite3.Row
@@ -13,6 +13,8 @@ import uuid
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
+from ..core import sqlite_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -61,7 +63,7 @@ class SavedMapsService:
         """Create saved_maps table if it doesn't exist."""
         import json
 
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite_pool.connect(self.db_path)
         try:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS saved_maps (
@@ -121,7 +123,7 @@ class SavedMapsService:
         filters = filters or {}
         visualization = visualization or {}
 
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite_pool.connect(self.db_path)
         try:
             conn.execute(
                 """
@@ -193,7 +195,7 @@ class SavedMapsService:
         if order.upper() not in ("ASC", "DESC"):
             order = "DESC"
 
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         try:
             cursor = conn.execute(
@@ -238,7 +240,7 @@ class SavedMapsService:
         """
         import json
 
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         try:
             cursor = conn.execute(
@@ -306,7 +308,7 @@ class SavedMapsService:
         set_clause = ", ".join(f"{k} = ?" for k in updates.keys())
         values = list(updates.values()) + [map_id]
 
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite_pool.connect(self.db_path)
         try:
             conn.execute(
                 f"UPDATE saved_maps SET {set_clause} WHERE id = ?", values
@@ -327,7 +329,7 @@ class SavedMapsService:
         Returns:
             True if deleted, False if not found
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite_pool.connect(self.db_path)
         try:
             cursor = conn.execute("DELETE FROM saved_maps WHERE id = ?", (map_id,))
             conn.commit()
@@ -348,7 +350,7 @@ class SavedMapsService:
             True if updated, False if map not found
         """
         now = time.time()
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite_pool.connect(self.db_path)
         try:
             cursor = conn.execute(
                 """
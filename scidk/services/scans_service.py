@@ -3,6 +3,7 @@ from typing import Dict, Any
 from pathlib import Path
 import os
 import json
+import sqlite3
 
 # This service encapsulates the scan orchestration that used to live inside app.api_scan
 # It is intentionally kept very close to the original logic to preserve behavior and payload.
@@ -16,6 +17,16 @@ class ScansService:
         self._skipped_files = 0
         self._skipped_dirs = 0
         self._walk_time_ms = 0.0
+        # Incremental rescan report from the directory digest tree (changed subtrees etc.)
+        self._incremental = None
+        # Staged pipeline stats for local scans (workers, queue depth, batches, errors)
+        self._pipeline_stats = None
+        # Filesystem syscalls issued by the local walk + dataset creation (scandir/stat/open)
+        self._syscalls = None
+        # Interpretation result cache hit/miss counters for the last local scan
+        self._interp_cache_stats = None
+        # Content-hash cache hit/miss counters for the last local scan
+        self._hash_cache_stats = None
 
     def run_scan(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -95,21 +106,13 @@ class ScansService:
 
         if provider_id in ('local_fs', 'mounted_fs'):
             base = Path(path)
-            items_files = []
             items_dirs = set()
-            # Source detection compatibility
-            try:
-                probe_ncdu = fs._list_files_with_ncdu(base, recursive=recursive)  # type: ignore
-                if probe_ncdu:
-                    fs.last_scan_source = 'ncdu'
-                else:
-                    probe_gdu = fs._list_files_with_gdu(base, recursive=recursive)  # type: ignore
-                    if probe_gdu:
-                        fs.last_scan_source = 'gdu'
-                    else:
-                        fs.last_scan_source = 'python'
-            except Exception:
-                fs.last_scan_source = 'python'
+            unchanged_dirs = set()  # directories whose immediate files were skipped as unchanged
+            # Enumerator backend, selectable per scan (data['enumerator'] or SCIDK_SCAN_ENUMERATOR).
+            # Non-recursive scans list a single directory, so they always use the in-process scandir backend.
+            from ..core.enumerators import get_enumerator
+            enumerator = get_enumerator(data.get('enumerator') if recursive else 'python')
+            fs.last_scan_source = enumerator.name
             # Optional ignore patterns from .scidkignore at base
             ignore_patterns = []
             if use_ignore:
@@ -122,313 +125,246 @@ class ScansService:
                                 ignore_patterns.append(s)
                 except Exception:
                     ignore_patterns = []
-            try:
-                import time as _t
-                t_walk0 = _t.time()
-                # Load previous scan id for this root (if any)
-                prev_scan_id = None
-                try:
-                    conn_prev = pix.connect()
-                    from ..core import migrations as _migs
-                    _migs.migrate(conn_prev)
-                    curp = conn_prev.cursor()
-                    curp.execute("SELECT id FROM scans WHERE root = ? ORDER BY COALESCE(completed, started) DESC LIMIT 1", (str(path),))
-                    rowp = curp.fetchone()
-                    if rowp:
-                        prev_scan_id = rowp[0]
-                except Exception:
-                    prev_scan_id = None
-                finally:
-                    try:
-                        conn_prev.close()
-                    except Exception:
-                        pass
-                # Helper: compute immediate dir signature (files only)
-                def _dir_signature(dir_path: Path):
-                    total = 0
-                    max_m = 0.0
-                    files_n = 0
+            t_walk0 = time.time()
+
+            # Single traversal via the selected enumerator: every directory is listed once and every file stat'ed once;
+            # the stat result travels with the file to row building and dataset creation.
+            from ..core.fs_walk import SyscallCounter, scandir_walk
+            from ..core.dir_digest import DirDigestTracker
+            syscalls = SyscallCounter()
+            base_r = os.path.realpath(str(base))
+            # Per-directory Merkle digests of the previous scan of this root drive the incremental rescan.
+            # data['incremental'] / SCIDK_SCAN_INCREMENTAL: 'digest' (default) or 'trust_mtime'.
+            digests = None
+            if recursive:
+                digests = DirDigestTracker(
+                    base_r, scan_id,
+                    mode=(data.get('incremental') or os.environ.get('SCIDK_SCAN_INCREMENTAL') or 'digest'),
+                    counter=syscalls,
+                    supports_prune=enumerator.supports_prune,
+                )
+                if digests.prune_unsupported:
                     try:
-                        with os.scandir(dir_path) as it:
-                            for ent in it:
-                                if ent.is_file(follow_symlinks=False):
-                                    files_n += 1
-                                    try:
-                                        st = ent.stat(follow_symlinks=False)
-                                        total += int(st.st_size)
-                                        if st.st_mtime and float(st.st_mtime) > max_m:
-                                            max_m = float(st.st_mtime)
-                                    except Exception:
-                                        pass
+                        app.logger.warning(
+                            f"scan {scan_id}: trust_mtime needs a top-down walk; the {enumerator.name} enumerator "
+                            f"lists subtrees before their parents, so this rescan runs in digest mode"
+                        )
                     except Exception:
                         pass
-                    return {'files': files_n, 'sum_size': int(total), 'max_mtime': float(max_m)}
-                # Load previous cache for quick compare
-                prev_cache = {}
-                if prev_scan_id:
-                    try:
-                        conn2 = pix.connect()
-                        cur2 = conn2.cursor()
-                        cur2.execute("SELECT path, children_json FROM directory_cache WHERE scan_id = ?", (prev_scan_id,))
-                        import json as _json
-                        for (pth, js) in cur2.fetchall() or []:
-                            try:
-                                prev_cache[pth] = _json.loads(js) if js else {}
-                            except Exception:
-                                prev_cache[pth] = {}
-                    except Exception:
-                        prev_cache = {}
-                    finally:
-                        try:
-                            conn2.close()
-                        except Exception:
-                            pass
-                # Current cache rows to persist
-                curr_cache_rows = []
-                if recursive:
-                    # Controlled walk with pruning
-                    # Folder-config cache for effective config per directory
-                    from ..core.folder_config import load_effective_config  # lazy import
-                    _conf_cache: dict[str, dict] = {}
-                    for dirpath, dirnames, filenames in os.walk(base, topdown=True, followlinks=False):
-                        dpath = Path(dirpath)
-                        # compute signature and compare
-                        sig = _dir_signature(dpath)
-                        prev_sig = prev_cache.get(str(dpath.resolve()))
-                        # If unchanged vs previous, consider pruning traversal
-                        if prev_sig and all(str(sig.get(k)) == str(prev_sig.get(k)) for k in ('files','sum_size','max_mtime')):
-                            # For the base (root) directory: skip files in this dir but still traverse subdirectories
-                            if dpath == base:
-                                try:
-                                    with os.scandir(dpath) as it2:
-                                        for ent2 in it2:
-                                            if ent2.is_file(follow_symlinks=False):
-                                                self._skipped_files += 1
-                                except Exception:
-                                    pass
-                                # Do not modify dirnames for root; we still want to descend
-                            else:
+            base_depth = len(base_r.rstrip('/').split('/'))
+
+            def _depth_of(dir_r: str) -> int:
+                return 0 if dir_r == base_r else max(0, len(dir_r.rstrip('/').split('/')) - base_depth)
+
+            def _iter_selected_files():
+                """Walker stage: stream (full, parent, name, depth, stat) for selected files; records dirs and directory digests as a side effect."""
+                try:
+                    if recursive:
+                        # Folder-config cache for effective config per directory
+                        from ..core.folder_config import load_effective_config  # lazy import
+                        _conf_cache: dict[str, dict] = {}
+                        for dirpath, dirnames, files in enumerator.walk(base_r, syscalls):
+                            items_dirs.add(dirpath)
+                            # Merkle digest bookkeeping; trust_mtime may prune unchanged child subtrees here
+                            if digests.visit(dirpath, dirnames, files):
+                                # Immediate files unchanged since the last scan of this root: skip them
+                                unchanged_dirs.add(dirpath)
                                 self._skipped_dirs += 1
-                                # estimate skipped files as current immediate files
-                                self._skipped_files += int(sig.get('files') or 0)
-                                dirnames[:] = []  # prune subdirs
-                                # still record base dir
-                                items_dirs.add(dpath)
-                                # persist current cache for this dir
-                                curr_cache_rows.append((scan_id, str(dpath.resolve()), json.dumps(sig), time.time()))
+                                self._skipped_files += len(files)
                                 continue
-                        # keep walking: record dir and files
-                        items_dirs.add(dpath)
-                        # persist cache row
-                        curr_cache_rows.append((scan_id, str(dpath.resolve()), json.dumps(sig), time.time()))
-                        # filter files by rules + folder-config include/exclude
-                        # Load effective folder-config for this directory (cached)
-                        key = str(dpath.resolve())
-                        conf = _conf_cache.get(key)
-                        if conf is None:
-                            # Use load_effective_config to properly honor per-folder precedence
-                            try:
-                                conf = load_effective_config(dpath, stop_at=base)
-                            except Exception:
-                                conf = {'include': [], 'exclude': [], 'interpreters': None}
-                            _conf_cache[key] = conf
-                        fc_includes = conf.get('include') or []
-                        fc_excludes = conf.get('exclude') or []
-                        from pathlib import Path as _P
-                        def _normalize_patterns(patterns: list[str]) -> list[str]:
-                            out = []
-                            for pat in patterns:
-                                if not pat:
-                                    continue
-                                norm_pat = pat.strip()
-                                if norm_pat.startswith('./'):
-                                    norm_pat = norm_pat[2:]
-                                if norm_pat.startswith('/'):
-                                    norm_pat = norm_pat[1:]
-                                out.append(norm_pat)
-                                # If pattern starts with '**/', also consider without that prefix
-                                if norm_pat.startswith('**/'):
-                                    out.append(norm_pat[3:])
-                                # If pattern contains path segments, add basename-only variant
-                                if '/' in norm_pat:
-                                    seg = norm_pat.split('/')[-1]
-                                    if seg and seg not in out:
-                                        out.append(seg)
-                            return out
-                        def _matches_any(rel_path: str, name: str, patterns: list[str]) -> bool:
-                            # Normalize cases for case-insensitive filesystems and user patterns
-                            rel_l = (rel_path or '').lower()
-                            name_l = (name or '').lower()
-                            pats = _normalize_patterns(patterns)
-                            p_rel = _P(rel_l)
-                            p_name = _P(name_l)
-                            for pat in pats:
-                                p = (pat or '').strip()
-                                if not p:
-                                    continue
-                                p_l = p.lower()
+                            # filter files by rules + folder-config include/exclude
+                            # Load effective folder-config for this directory (cached)
+                            conf = _conf_cache.get(dirpath)
+                            if conf is None:
+                                # Use load_effective_config to properly honor per-folder precedence
                                 try:
-                                    if p_rel.match(p_l) or p_name.match(p_l):
-                                        return True
+                                    conf = load_effective_config(Path(dirpath), stop_at=Path(base_r))
                                 except Exception:
-                                    pass
-                                # Suffix-based relaxed match for common patterns like '*.ext' or '**/*.ext'
-                                if p_l.startswith('**/*.') or p_l.startswith('*.'):
-                                    suf = p_l.split('*')[-1]
-                                    # Normalize suffix by removing any leading path separator introduced by '**/' patterns
-                                    if suf.startswith('/'):
-                                        suf = suf[1:]
-                                    if suf and name_l.endswith(suf):
-                                        return True
-                                # Always check basename-only equality as last resort
+                                    conf = {'include': [], 'exclude': [], 'interpreters': None}
+                                _conf_cache[dirpath] = conf
+                            fc_includes = conf.get('include') or []
+                            fc_excludes = conf.get('exclude') or []
+                            rel_dir = '' if dirpath == base_r else os.path.relpath(dirpath, base_r).replace(os.sep, '/')
+                            depth = _depth_of(dirpath) + 1
+                            for fname, st, _regular in files:
                                 try:
-                                    if '/' in p_l:
-                                        base = p_l.split('/')[-1]
-                                    else:
-                                        base = p_l
-                                    if base and name_l == base:
-                                        return True
+                                    rel_disp = (rel_dir + '/' + fname) if rel_dir else fname
+                                    # Folder-config include/exclude first (match against base-relative, dir-relative, and basename)
+                                    rel_local = fname
+                                    from fnmatch import fnmatch as _fn2
+                                    def _simple_match(patterns: list[str]) -> bool:
+                                        for pat in patterns or []:
+                                            p = (pat or '').strip()
+                                            if not p:
+                                                continue
+                                            p = p.lstrip('./')
+                                            p_l = p.lower()
+                                            if _fn2(rel_disp.lower(), p_l) or _fn2(rel_local.lower(), p_l):
+                                                return True
+                                            if p_l.startswith('**/*.') or p_l.startswith('*.'):
+                                                suf = p_l.split('*')[-1]
+                                                if suf.startswith('/'):
+                                                    suf = suf[1:]
+                                                if suf and rel_local.lower().endswith(suf):
+                                                    return True
+                                        return False
+                                    include_ok = True
+                                    if fc_includes:
+                                        include_ok = _simple_match(fc_includes)
+                                    if not include_ok:
+                                        continue
+                                    if fc_excludes and (_simple_match(fc_excludes)):
+                                        continue
+                                    # .scidkignore and explicit selection rules
+                                    ignored = any(fnmatch(rel_disp, pat) for pat in ignore_patterns)
+                                    ok, _ = _decide(rel_disp, ignored)
                                 except Exception:
-                                    pass
-                                # Fallback to fnmatch-like simple compare
-                                from fnmatch import fnmatch as _fn
-                                if _fn(rel_l, p_l) or _fn(name_l, p_l):
-                                    return True
-                            return False
-                        for fname in filenames:
-                            try:
-                                rel = str(Path(dirpath) / fname)
+                                    continue
+                                if ok:
+                                    yield (os.path.join(dirpath, fname), dirpath, fname, depth, st)
+                    else:
+                        # Non-recursive: list only base
+                        items_dirs.add(base_r)
+                        for dirpath, dirnames, files in scandir_walk(base_r, syscalls):
+                            for dname in dirnames:
+                                items_dirs.add(os.path.join(dirpath, dname))
+                            dirnames[:] = []
+                            for fname, st, _regular in files:
                                 try:
-                                    rel_disp = Path(rel).resolve().relative_to(base.resolve()).as_posix()
+                                    ignored = any(fnmatch(fname, pat) for pat in ignore_patterns)
+                                    ok, _ = _decide(fname, ignored)
                                 except Exception:
-                                    rel_disp = fname
-                                # Folder-config include/exclude first (match against base-relative, dir-relative, and basename)
-                                rel_local = fname
-                                from fnmatch import fnmatch as _fn2
-                                def _simple_match(patterns: list[str]) -> bool:
-                                    for pat in patterns or []:
-                                        p = (pat or '').strip()
-                                        if not p:
-                                            continue
-                                        p = p.lstrip('./')
-                                        p_l = p.lower()
-                                        if _fn2(rel_disp.lower(), p_l) or _fn2(rel_local.lower(), p_l):
-                                            return True
-                                        if p_l.startswith('**/*.') or p_l.startswith('*.'):
-                                            suf = p_l.split('*')[-1]
-                                            if suf.startswith('/'):
-                                                suf = suf[1:]
-                                            if suf and rel_local.lower().endswith(suf):
-                                                return True
-                                    return False
-                                include_ok = True
-                                if fc_includes:
-                                    include_ok = _simple_match(fc_includes)
-                                if not include_ok:
                                     continue
-                                if fc_excludes and (_simple_match(fc_excludes)):
-                                    continue
-                                # .scidkignore and explicit selection rules
-                                ignored = any(fnmatch(rel_disp, pat) for pat in ignore_patterns)
-                                ok, _ = _decide(rel_disp, ignored)
                                 if ok:
-                                    items_files.append(Path(dirpath) / fname)
-                            except Exception:
-                                continue
-                else:
-                    # Non-recursive: list only base
-                    items_dirs.add(base)
-                    sig = _dir_signature(base)
-                    curr_cache_rows.append((scan_id, str(base.resolve()), json.dumps(sig), time.time()))
-                    for p in base.iterdir():
-                        try:
-                            if p.is_dir():
-                                items_dirs.add(p)
-                            else:
-                                rel = p.name
-                                ignored = any(fnmatch(rel, pat) for pat in ignore_patterns)
-                                ok, _ = _decide(rel, ignored)
-                                if ok:
-                                    items_files.append(p)
-                        except Exception:
-                            continue
-                # Persist directory_cache rows (best-effort)
+                                    yield (os.path.join(dirpath, fname), dirpath, fname, 1, st)
+                finally:
+                    self._walk_time_ms = (time.time() - t_walk0) * 1000.0
+
+            remote = f"local:{os.uname().nodename}" if provider_id == 'local_fs' else f"mounted:{root_id}"
+            def _file_row(entry) -> tuple:
+                full, parent, name, depth, st = entry
+                size = int(st.st_size) if st is not None else 0
+                mtime = float(st.st_mtime) if st is not None else None
+                ext = os.path.splitext(name)[1].lower()
+                return (full, parent, name, depth, 'file', size, mtime, ext, None, None, None, remote, scan_id, None)
+            def _folder_row(dir_r: str) -> tuple:
+                parent = os.path.dirname(dir_r) if dir_r != '/' else ''
+                name = os.path.basename(dir_r) or dir_r
+                return (dir_r, parent, name, _depth_of(dir_r), 'folder', 0, None, '', None, None, None, remote, scan_id, None)
+
+            # Persistent content-hash cache: unchanged (size, mtime_ns, inode, dev) reuses the stored digest.
+            # 'verify' (request flag or SCIDK_HASH_VERIFY) forces a full rehash.
+            from ..core.hash_cache import HashCache
+            verify = bool(data.get('verify')) or (os.environ.get('SCIDK_HASH_VERIFY') or '').strip().lower() in ('1','true','yes','y','on')
+            hash_cache = HashCache(verify=verify)
+            # Interpretation cache: unchanged content + interpreter version/config reuses the stored result.
+            # 'reinterpret' forces interpreters to run (results are still stored).
+            from ..core.interpretation_cache import InterpretationCache
+            interp_cache = InterpretationCache()
+            interp_cache.invalidate_stale_versions(registry)
+            reinterpret = bool(data.get('reinterpret'))
+
+            # Worker stage: index row + dataset (checksum) + interpretations; no shared state is touched here
+            def _process_file(entry):
+                row = _file_row(entry)
+                fpath = Path(entry[0])
                 try:
-                    connc = pix.connect()
-                    curc = connc.cursor()
-                    curc.executemany("INSERT OR REPLACE INTO directory_cache(scan_id, path, children_json, created) VALUES(?,?,?,?)", curr_cache_rows)
-                    connc.commit()
+                    ds = fs.create_dataset_node(fpath, stat_result=entry[4], hash_cache=hash_cache)
                 except Exception:
-                    pass
-                finally:
+                    return row, None
+                # Interpreters run in the process pool (time/RSS limits, usage recorded); collect as they finish
+                from ..core.interpreter_pool import submit_interpretation
+                pending = []
+                for interp in registry.select_for_dataset(ds):
+                    cached = None if reinterpret else interp_cache.get(ds.get('checksum'), interp)
+                    pending.append((interp, cached, None if cached is not None else submit_interpretation(interp, fpath, registry)))
+                results = []
+                for interp, cached, fut in pending:
                     try:
-                        connc.close()
-                    except Exception:
-                        pass
-                self._walk_time_ms = ( _t.time() - t_walk0 ) * 1000.0
-                items_dirs.add(base)
-            except Exception:
-                items_files = []
-                items_dirs = set()
+                        if cached is not None:
+                            result = cached
+                        else:
+                            result = fut.result()
+                            interp_cache.put(ds.get('checksum'), interp, result)
+                        results.append((interp.id, {
+                            'status': result.get('status', 'success'),
+                            'data': result.get('data', result),
+                            'interpreter_version': getattr(interp, 'version', '0.0.1'),
+                        }))
+                    except Exception as e:
+                        results.append((interp.id, {
+                            'status': 'error',
+                            'data': {'error': str(e)},
+                            'interpreter_version': getattr(interp, 'version', '0.0.1'),
+                        }))
+                return row, (ds, results)
 
-            rows = []
-            def _row_from_local(pth: Path, typ: str) -> tuple:
-                full = str(pth.resolve())
-                parent = str(pth.parent.resolve()) if pth != pth.parent else ''
-                name = pth.name or full
-                depth = 0 if pth == base else max(0, len(str(pth.resolve()).rstrip('/').split('/')) - len(str(base.resolve()).rstrip('/').split('/')))
-                size = 0
-                mtime = None
-                ext = ''
-                mime = None
-                if typ == 'file':
-                    try:
-                        st = pth.stat()
-                        size = int(st.st_size)
-                        mtime = float(st.st_mtime)
-                    except Exception:
-                        size = 0
-                        mtime = None
-                    ext = pth.suffix.lower()
-                remote = f"local:{os.uname().nodename}" if provider_id == 'local_fs' else f"mounted:{root_id}"
-                return (full, parent, name, depth, typ, size, mtime, ext, mime, None, None, remote, scan_id, None)
-            for d in sorted(items_dirs, key=lambda x: str(x)):
-                rows.append(_row_from_local(d, 'folder'))
-            for fpath in items_files:
-                rows.append(_row_from_local(fpath, 'file'))
-            ingested = pix.batch_insert_files(rows)
+            # Writer stage: the only place that mutates the in-memory graph
+            graph = app.extensions['scidk']['graph']
+            def _sink(payload):
+                nonlocal count
+                ds, results = payload
+                graph.upsert_dataset(ds)
+                for interp_id, res in results:
+                    graph.add_interpretation(ds['checksum'], interp_id, res)
+                count += 1
 
-            # Legacy: create in-memory datasets and run interpreters
+            from ..core.scan_pipeline import ScanPipeline, PipelineConfig
+            pipeline = ScanPipeline(PipelineConfig.from_env(data.get('pipeline') or {}))
             count = 0
-            for fpath in items_files:
+            try:
+                pipeline.run(
+                    _iter_selected_files(),
+                    _process_file,
+                    write_rows=lambda batch: pix.batch_insert_files(batch, batch_size=pipeline.config.batch_size),
+                    sink=_sink,
+                )
+            except sqlite3.Error as _e:
+                # Index write failures are reported in telemetry; the scan itself still completes
+                app.extensions['scidk'].setdefault('telemetry', {})['last_sqlite_error'] = str(_e)
+            finally:
+                hash_cache.close()
+                interp_cache.close()
+            self._pipeline_stats = pipeline.stats
+            ingested = int(pipeline.stats.get('rows_written') or 0)
+            incomplete = bool(pipeline.stats.get('walk_error') or pipeline.stats.get('canceled') or pipeline.stats.get('write_error'))
+            # Roll up and persist directory digests; report which subtrees changed
+            self._incremental = None
+            if digests is not None:
+                if incomplete:
+                    digests.discard()
+                else:
+                    self._incremental = digests.finalize()
+                items_dirs.update(digests.trusted())
+            self._hash_cache_stats = hash_cache.stats()
+            self._interp_cache_stats = interp_cache.stats()
+            try:
+                from .metrics import inc_counter
+                inc_counter(app, 'interp_cache_hits', interp_cache.hits)
+                inc_counter(app, 'interp_cache_misses', interp_cache.misses)
+            except Exception:
+                pass
+            # Content is only opened for hashing on cache misses
+            syscalls.inc('open', hash_cache.misses)
+            self._syscalls = syscalls.as_dict()
+            items_dirs.add(base_r)
+            # Folder rows (bounded by directory count, not file count)
+            ingested += pix.batch_insert_files(_folder_row(d) for d in sorted(items_dirs))
+            # Versioned index: close entries this scan no longer saw (no-op in append mode)
+            if not incomplete:
                 try:
-                    ds = fs.create_dataset_node(fpath)
-                    app.extensions['scidk']['graph'].upsert_dataset(ds)
-                    interps = registry.select_for_dataset(ds)
-                    for interp in interps:
-                        try:
-                            result = interp.interpret(fpath)
-                            app.extensions['scidk']['graph'].add_interpretation(ds['checksum'], interp.id, {
-                                'status': result.get('status', 'success'),
-                                'data': result.get('data', result),
-                                'interpreter_version': getattr(interp, 'version', '0.0.1'),
-                            })
-                        except Exception as e:
-                            app.extensions['scidk']['graph'].add_interpretation(ds['checksum'], interp.id, {
-                                'status': 'error',
-                                'data': {'error': str(e)},
-                                'interpreter_version': getattr(interp, 'version', '0.0.1'),
-                            })
-                    count += 1
-                except Exception:
-                    continue
+                    _chg = pix.finalize_versioned_scan(
+                        scan_id, base_r, recursive=bool(recursive), unchanged_dirs=unchanged_dirs,
+                        skip_subtrees=(digests.trusted() if digests is not None else None),
+                    )
+                    if _chg is not None:
+                        app.extensions['scidk'].setdefault('telemetry', {})['last_change_counts'] = _chg
+                except Exception as __e:
+                    app.extensions['scidk'].setdefault('telemetry', {})['last_change_error'] = str(__e)
             # Build folders metadata
             for d in items_dirs:
-                try:
-                    parent = str(d.parent.resolve()) if d != d.parent else ''
-                    folders.append({'path': str(d.resolve()), 'name': d.name, 'parent': parent, 'parent_name': Path(parent).name if parent else ''})
-                except Exception:
-                    continue
+                parent = os.path.dirname(d) if d != '/' else ''
+                folders.append({'path': d, 'name': os.path.basename(d), 'parent': parent, 'parent_name': os.path.basename(parent) if parent else ''})
         elif provider_id == 'rclone':
             provs = app.extensions['scidk'].get('providers')
             prov = provs.get('rclone') if provs else None
@@ -547,7 +483,7 @@ class ScansService:
             try:
                 ingested = pix.batch_insert_files(rows, batch_size=10000)
                 try:
-                    _chg = pix.apply_basic_change_history(scan_id, path)
+                    _chg = pix.apply_basic_change_history(scan_id, path, recursive=bool(recursive))
                     app.extensions['scidk'].setdefault('telemetry', {})['last_change_counts'] = _chg
                 except Exception as __e:
                     app.extensions['scidk'].setdefault('telemetry', {})['last_change_error'] = str(__e)
@@ -568,7 +504,8 @@ class ScansService:
             try:
                 conn = pix.connect(); pix.init_db(conn)
                 cur = conn.cursor()
-                cur.execute("SELECT file_extension FROM files WHERE scan_id = ? AND type='file'", (scan_id,))
+                scope, scope_params = pix.scan_scope(conn, scan_id)
+                cur.execute(f"SELECT file_extension FROM files WHERE {scope} AND type='file'", scope_params)
                 for (ext,) in cur.fetchall():
                     ext = ext or ''
                     by_ext[ext] = by_ext.get(ext, 0) + 1
@@ -668,6 +605,11 @@ class ScansService:
             'source': getattr(fs, 'last_scan_source', 'python') if provider_id in ('local_fs','mounted_fs') else f"provider:{provider_id}",
             'provider_id': provider_id,
             'root_id': root_id,
+            'pipeline': getattr(self, '_pipeline_stats', None),
+            'syscalls': getattr(self, '_syscalls', None),
+            'hash_cache': getattr(self, '_hash_cache_stats', None),
+            'interpretation_cache': getattr(self, '_interp_cache_stats', None),
+            'incremental': getattr(self, '_incremental', None),
         }
         dirs = app.extensions['scidk'].setdefault('directories', {})
         drec = dirs.setdefault(str(path), {
@@ -696,37 +638,34 @@ class ScansService:
             conn = pix.connect()
             try:
                 from ..core import migrations as _migs
-                import json as _json
+                from ..core import scan_members as _scan_members
                 _migs.migrate(conn)
-                cur = conn.cursor()
-                cur.execute(
-                    "INSERT OR REPLACE INTO scans(id, root, started, completed, status, extra_json) VALUES(?,?,?,?,?,?)",
-                    (
-                        scan_id,
-                        str(path),
-                        float(started or 0.0),
-                        float(ended or 0.0),
-                        'completed',
-                        _json.dumps({
-                            'recursive': bool(recursive),
-                            'duration_sec': duration,
-                            'file_count': int(count),
-                            'by_ext': by_ext,
-                            'source': scan.get('source'),
-                            'checksums': new_checksums,
-                            'committed': False,
-                            'committed_at': None,
-                            'provider_id': provider_id,
-                            'root_id': root_id,
-                            'host_type': host_type,
-                            'host_id': host_id,
-                            'root_label': root_label,
-                            'selection': (selection or {}),
-                            'skipped_dirs': int(getattr(self, '_skipped_dirs', 0)),
-                            'skipped_files': int(getattr(self, '_skipped_files', 0)),
-                            'walk_time_ms': float(getattr(self, '_walk_time_ms', 0.0)),
-                        })
-                    )
+                _scan_members.save_scan(
+                    conn, scan_id, str(path), started, ended, 'completed',
+                    {
+                        'recursive': bool(recursive),
+                        'duration_sec': duration,
+                        'file_count': int(count),
+                        'by_ext': by_ext,
+                        'source': scan.get('source'),
+                        'committed': False,
+                        'committed_at': None,
+                        'provider_id': provider_id,
+                        'root_id': root_id,
+                        'host_type': host_type,
+                        'host_id': host_id,
+                        'root_label': root_label,
+                        'selection': (selection or {}),
+                        'skipped_dirs': int(getattr(self, '_skipped_dirs', 0)),
+                        'skipped_files': int(getattr(self, '_skipped_files', 0)),
+                        'walk_time_ms': float(getattr(self, '_walk_time_ms', 0.0)),
+                        'pipeline': getattr(self, '_pipeline_stats', None),
+                        'syscalls': getattr(self, '_syscalls', None),
+                        'hash_cache': getattr(self, '_hash_cache_stats', None),
+                        'interpretation_cache': getattr(self, '_interp_cache_stats', None),
+                        'incremental': getattr(self, '_incremental', None),
+                    },
+                    new_checksums,
                 )
                 conn.commit()
             finally:
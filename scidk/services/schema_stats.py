@@ -0,0 +1,307 @@
+"""
+Cached Neo4j schema statistics for /api/graph/schema/combined.
+
+Counting labels and (start label, type, end label) triples with MATCH (n)/MATCH (s)-[r]->(t)
+scans the whole graph, so the endpoint serves a per-database snapshot instead:
+
+- Label and relationship-type counts come from the count store: apoc.meta.stats() when APOC is
+  installed, otherwise db.labels()/db.relationshipTypes() plus one count-store lookup per
+  label/type. Counts are per label (a node with two labels counts under both).
+- Triple counts need the full aggregation; it runs on a background thread, never on a request,
+  except once per database while the cache is cold (bounded by SCIDK_SCHEMA_STATS_COLD_WAIT_SEC,
+  default 10). SCIDK_SCHEMA_STATS_TRIPLE_LIMIT (default 0 = all) caps the relationships scanned,
+  in which case triple counts are sample counts.
+
+Snapshots are stamped with the graph write epoch (graphrag.query_cache.graph_epoch), which the
+commit engine and Neo4jClient writes (link jobs included) bump. A request that finds the stamp
+behind the current epoch gets the cached snapshot marked stale; only the scheduler thread refreshes
+snapshots that are behind or older than SCIDK_SCHEMA_STATS_MAX_AGE_SEC (default 3600), checking
+every SCIDK_SCHEMA_STATS_INTERVAL_SEC (default 300), so a stream of writes costs at most one triple
+aggregation per interval. With the scheduler off (interval 0) a request that finds the snapshot
+stale starts the refresh instead.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import os
+import threading
+import time
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.environ.get(name) or default))
+    except Exception:
+        return default
+
+
+def _current_version() -> int:
+    from .graphrag.query_cache import graph_epoch
+    return graph_epoch()
+
+
+def _quote(name: str) -> str:
+    return '`' + str(name).replace('`', '``') + '`'
+
+
+def read_counts(session) -> Tuple[List[Dict[str, Any]], Dict[str, int], str]:
+    """(label counts as [{'label', 'c'}], relationship type counts, source) from the count store."""
+    try:
+        rec = session.run(
+            "CALL apoc.meta.stats() YIELD labels, relTypesCount RETURN labels, relTypesCount"
+        ).single()
+        labels = dict(rec['labels'] or {})
+        rel_types = {k: int(v) for k, v in dict(rec['relTypesCount'] or {}).items()}
+        source = 'apoc.meta.stats'
+    except Exception:
+        labels = {}
+        for rec in session.run("CALL db.labels() YIELD label RETURN label"):
+            label = rec['label']
+            labels[label] = session.run(f"MATCH (n:{_quote(label)}) RETURN count(n) AS c").single()['c']
+        rel_types = {}
+        for rec in session.run("CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType"):
+            rt = rec['relationshipType']
+            rel_types[rt] = int(session.run(f"MATCH ()-[r:{_quote(rt)}]->() RETURN count(r) AS c").single()['c'])
+        source = 'count_store'
+    nodes = [{'label': k, 'c': int(v or 0)} for k, v in labels.items()]
+    nodes.sort(key=lambda n: -n['c'])
+    return nodes, rel_types, source
+
+
+def read_triples(session, limit: int = 0) -> List[Dict[str, Any]]:
+    """Triple counts as [{'start_label', 'rel_type', 'end_label', 'c'}]; limit > 0 samples that many relationships."""
+    match = "MATCH (s)-[r]->(t) "
+    if limit > 0:
+        match += f"WITH s, r, t LIMIT {int(limit)} "
+    q = (
+        match
+        + "WITH head(labels(s)) AS sl, type(r) AS rt, head(labels(t)) AS tl, count(*) AS c "
+        "RETURN sl AS start_label, rt AS rel_type, tl AS end_label, c ORDER BY c DESC"
+    )
+    return [dict(record) for record in session.run(q)]
+
+
+class SchemaStatsEntry:
+    """Snapshot and refresh state for one database."""
+
+    def __init__(self, key: Tuple[str, str], fp: str, driver: Any, triple_limit: int = 0):
+        self.key = key
+        self.fingerprint = fp
+        self.driver = driver
+        self.triple_limit = triple_limit
+        self.nodes: Optional[List[Dict[str, Any]]] = None
+        self.rel_types: Dict[str, int] = {}
+        self.counts_source: Optional[str] = None
+        self.counts_at: Optional[float] = None
+        self.edges: Optional[List[Dict[str, Any]]] = None
+        self.version: Optional[int] = None
+        self.computed_at: Optional[float] = None
+        self.compute_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.refreshes = 0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def _session(self):
+        database = self.key[1] or None
+        return self.driver.session(database=database) if database else self.driver.session()
+
+    def refresh_counts(self) -> None:
+        with self._session() as sess:
+            nodes, rel_types, source = read_counts(sess)
+        self.nodes, self.rel_types, self.counts_source = nodes, rel_types, source
+        self.counts_at = time.time()
+
+    def refresh(self) -> None:
+        """Recompute counts and triples; the stamp is the epoch read before reading the graph."""
+        version = _current_version()
+        t0 = time.perf_counter()
+        try:
+            self.refresh_counts()
+            with self._session() as sess:
+                edges = read_triples(sess, self.triple_limit)
+            self.edges = edges
+            self.version = version
+            self.computed_at = time.time()
+            self.compute_ms = round((time.perf_counter() - t0) * 1000, 1)
+            self.error = None
+            self.refreshes += 1
+        except Exception as e:
+            self.error = str(e)
+
+    def start_refresh(self) -> bool:
+        """Refresh on a background thread unless one is already running. Returns True if started."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            self._idle.clear()
+        threading.Thread(target=self._run_refresh, name=f'schema-stats-{self.key[1] or "default"}', daemon=True).start()
+        return True
+
+    def _run_refresh(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._idle.set()
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        return self._idle.wait(timeout)
+
+    @property
+    def refreshing(self) -> bool:
+        return self._refreshing
+
+    def is_stale(self, max_age_sec: float, version: Optional[int] = None) -> bool:
+        if self.edges is None or self.computed_at is None:
+            return True
+        if self.version != (version if version is not None else _current_version()):
+            return True
+        return max_age_sec > 0 and (time.time() - self.computed_at) > max_age_sec
+
+    def snapshot(self, max_age_sec: float) -> Dict[str, Any]:
+        version = _current_version()
+        now = time.time()
+        return {
+            'nodes': list(self.nodes or []),
+            'edges': list(self.edges or []),
+            'stats': {
+                'version': self.version,
+                'current_version': version,
+                'computed_at': self.computed_at,
+                'age_sec': round(now - self.computed_at, 1) if self.computed_at else None,
+                'stale': self.is_stale(max_age_sec, version),
+                'refreshing': self.refreshing,
+                'edges_pending': self.edges is None,
+                'edges_sampled': bool(self.triple_limit),
+                'counts_source': self.counts_source,
+                'counts_age_sec': round(now - self.counts_at, 1) if self.counts_at else None,
+                'compute_ms': self.compute_ms,
+                'error': self.error,
+            },
+        }
+
+    def close(self) -> None:
+        try:
+            self.driver.close()  # releases the shared driver lease
+        except Exception:
+            pass
+
+
+class SchemaStatsService:
+    """Per-database schema statistics snapshots with a background refresh scheduler."""
+
+    def __init__(self, interval_sec: Optional[float] = None, max_age_sec: Optional[float] = None,
+                 cold_wait_sec: Optional[float] = None, triple_limit: Optional[int] = None):
+        self.interval_sec = interval_sec if interval_sec is not None else _env_float('SCIDK_SCHEMA_STATS_INTERVAL_SEC', 300)
+        self.max_age_sec = max_age_sec if max_age_sec is not None else _env_float('SCIDK_SCHEMA_STATS_MAX_AGE_SEC', 3600)
+        self.cold_wait_sec = cold_wait_sec if cold_wait_sec is not None else _env_float('SCIDK_SCHEMA_STATS_COLD_WAIT_SEC', 10)
+        self.triple_limit = int(triple_limit if triple_limit is not None else _env_float('SCIDK_SCHEMA_STATS_TRIPLE_LIMIT', 0))
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], SchemaStatsEntry] = {}
+        self._scheduler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.counters = {'hits': 0, 'cold': 0, 'refreshes_started': 0}
+
+    def _entry(self, uri: str, database: Optional[str], fp: str, open_driver: Callable[[], Any]) -> Tuple[SchemaStatsEntry, bool]:
+        key = (uri, database or '')
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.fingerprint == fp:
+                return entry, False
+        fresh = SchemaStatsEntry(key, fp, open_driver(), self.triple_limit)
+        stale = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.fingerprint == fp:
+                stale, result = fresh, entry
+            else:
+                stale = entry
+                self._entries[key] = result = fresh
+        if stale is not None:
+            stale.close()
+        return result, result is fresh
+
+    def get(self, uri: str, database: Optional[str], fp: str, open_driver: Callable[[], Any],
+            refresh: bool = False) -> Dict[str, Any]:
+        """Snapshot for (uri, database): {'nodes', 'edges', 'stats'} in the shape of the Cypher records."""
+        entry, _ = self._entry(uri, database, fp, open_driver)
+        self._ensure_scheduler()
+        if refresh:
+            entry.start_refresh()
+            entry.wait(self.cold_wait_sec)
+        elif entry.edges is None:
+            # Cold cache: wait (bounded) for the first refresh; count-store counts are served regardless
+            self.counters['cold'] += 1
+            if entry.start_refresh():
+                self.counters['refreshes_started'] += 1
+            if not entry.wait(self.cold_wait_sec) and entry.nodes is None:
+                entry.refresh_counts()
+        else:
+            self.counters['hits'] += 1
+            snap = entry.snapshot(self.max_age_sec)
+            # Stale snapshots are rebuilt by the scheduler; requests only refresh when it is off
+            if snap['stats']['stale'] and self.interval_sec <= 0 and entry.start_refresh():
+                self.counters['refreshes_started'] += 1
+                snap['stats']['refreshing'] = True
+            return snap
+        return entry.snapshot(self.max_age_sec)
+
+    def _ensure_scheduler(self) -> None:
+        if self.interval_sec <= 0:
+            return
+        with self._lock:
+            if self._scheduler is not None and self._scheduler.is_alive():
+                return
+            self._scheduler = threading.Thread(target=self._loop, name='schema-stats-scheduler', daemon=True)
+            self._scheduler.start()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            self.refresh_stale()
+
+    def refresh_stale(self) -> int:
+        """Refresh every snapshot that is behind the graph epoch or too old; returns how many ran."""
+        with self._lock:
+            entries = list(self._entries.values())
+        ran = 0
+        for entry in entries:
+            if entry.is_stale(self.max_age_sec) and entry.start_refresh():
+                entry.wait(None)
+                ran += 1
+        return ran
+
+    def invalidate(self, uri: Optional[str] = None) -> int:
+        with self._lock:
+            victims = [k for k in self._entries if uri is None or k[0] == uri]
+            entries = [self._entries.pop(k) for k in victims]
+        for e in entries:
+            e.close()
+        return len(entries)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.counters)
+            out['entries'] = [
+                dict(e.snapshot(self.max_age_sec)['stats'], uri=e.key[0], database=e.key[1] or None,
+                     refreshes=e.refreshes)
+                for e in self._entries.values()
+            ]
+        return out
+
+
+_SERVICE: Optional[SchemaStatsService] = None
+_SERVICE_LOCK = threading.Lock()
+
+
+def get_schema_stats_service() -> SchemaStatsService:
+    global _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = SchemaStatsService()
+        return _SERVICE
@@ -6,8 +6,7 @@ from flask import current_app
 from pathlib import Path as _P
 import os
 import time as _time
-import random as _random
-from typing import Dict, Any, List, Tuple, Optional, Iterable, Callable
+from typing import Dict, Any, List, Tuple, Optional, Callable
 
 
 def get_neo4j_params() -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str], str]:
@@ -78,14 +77,13 @@ def build_commit_rows(scan: Dict[str, Any], ds_map: Dict[str, Any]) -> Tuple[Lis
         return [], []
 
 
-def commit_to_neo4j(rows: List[Dict[str, Any]], folder_rows: List[Dict[str, Any]],
-                   scan: Dict[str, Any], neo4j_params: Tuple) -> Dict[str, Any]:
+def commit_to_neo4j(rows, folder_rows, scan: Dict[str, Any], neo4j_params: Tuple) -> Dict[str, Any]:
     """
-    Execute Neo4j commit using simplified, idempotent Cypher.
+    Execute Neo4j commit through the shared batched commit engine (services.neo4j_commit).
 
     Args:
-        rows: File rows to commit
-        folder_rows: Folder rows to commit
+        rows: File rows to commit (list, or callable returning an iterator of rows)
+        folder_rows: Folder rows to commit (list, or callable returning an iterator of rows)
         scan: Scan metadata
         neo4j_params: Tuple of (uri, user, pwd, database, auth_mode)
 
@@ -119,10 +117,17 @@ def commit_to_neo4j(rows: List[Dict[str, Any]], folder_rows: List[Dict[str, Any]
         from ..services.neo4j_client import Neo4jClient
         client = Neo4jClient(uri, user, pwd, database, auth_mode).connect()
         try:
-            client.ensure_constraints()
-            wres = client.write_scan(rows, folder_rows, scan)
+            from ..services.neo4j_commit import engine_options
+            constraints = client.ensure_constraints()
+            result['constraints'] = constraints
+            wres = client.write_scan(rows, folder_rows, scan, **engine_options(constraints))
             result['written_files'] = wres.get('written_files', 0)
             result['written_folders'] = wres.get('written_folders', 0)
+            result['batches_failed'] = wres.get('batches_failed', 0)
+            for k in ('phase_sec', 'sec', 'rows_per_sec'):
+                result[k] = wres.get(k)
+            if wres.get('error'):
+                result['error'] = wres['error']
             vres = client.verify(scan.get('id'))
             result.update(vres)
 
@@ -317,12 +322,6 @@ def get_or_build_scan_index(scan_id: str) -> Optional[Dict[str, Any]]:
     }
     cache[scan_id] = idx
     return idx
-def _chunked_list(seq: List[Dict[str, Any]], size: int) -> Iterable[List[Dict[str, Any]]]:
-    size = max(1, int(size or 1))
-    for i in range(0, len(seq), size):
-        yield seq[i:i + size]
-
-
 def _neo4j_progress_default(event: str, payload: Dict[str, Any]) -> None:
     try:
         print(f"[neo4j:{event}] {payload}")
@@ -331,17 +330,21 @@ def _neo4j_progress_default(event: str, payload: Dict[str, Any]) -> None:
 
 
 def commit_to_neo4j_batched(
-    rows: List[Dict[str, Any]],
-    folder_rows: List[Dict[str, Any]],
+    rows,
+    folder_rows,
     scan: Dict[str, Any],
     neo4j_params: Tuple[str, str, str, str, Optional[str]],
     file_batch_size: int = 5000,
     folder_batch_size: int = 5000,
     max_retries: int = 2,
     on_progress: Callable[[str, Dict[str, Any]], None] = _neo4j_progress_default,
+    concurrency: Optional[int] = None,
 ):
     """
     Batched Neo4j commit with per-batch retries and progress reporting.
+    Runs the shared streaming commit engine (services.neo4j_commit.CommitEngine): folders, then files,
+    then edges, each in bounded UNWIND batches over a few concurrent sessions.
+    rows/folder_rows are lists or callables returning iterators (e.g. IndexRowSource.files/.folders).
     Expects rows to include keys: path, filename, extension, size_bytes, created, modified, mime_type, folder
     Expects folder_rows to include keys: path, name, parent
     """
@@ -375,8 +378,10 @@ def commit_to_neo4j_batched(
         return result
 
     # Backoff state
+    app = None
     try:
         from flask import current_app as _cap
+        app = _cap._get_current_object()
         st = _cap.extensions["scidk"].setdefault("neo4j_state", {})
     except Exception:
         st = {"next_connect_after": 0}
@@ -391,193 +396,66 @@ def commit_to_neo4j_batched(
 
     result["attempted"] = True
 
-    # Derive host id for composite identity
-    node_host = scan.get("host_id")
-
     from neo4j import GraphDatabase  # type: ignore  # noqa
+    from ..services.neo4j_drivers import shared_driver
+    from ..services.neo4j_commit import CommitEngine, engine_options, ensure_constraints, single_session
     driver = None
     try:
-        driver = GraphDatabase.driver(uri, auth=None if auth_mode == "none" else (user, pwd))
-        with driver.session(database=database) as sess:
-            # Emit non-secret connection info for diagnostics
+        driver = shared_driver(uri, auth=None if auth_mode == "none" else (user, pwd))
+        # Emit non-secret connection info for diagnostics
+        try:
+            on_progress("neo4j_params", {
+                "uri": (uri.split("@")[-1] if uri else None),
+                "auth_mode": auth_mode,
+                "database": database or None,
+            })
+        except Exception:
+            pass
+        # Identity constraints: checked (or created) per SCIDK_NEO4J_CONSTRAINTS
+        constraints = ensure_constraints(driver, database)
+        result["constraints"] = constraints
+        if single_session(constraints):
             try:
-                on_progress("neo4j_params", {
-                    "uri": (uri.split("@")[-1] if uri else None),
-                    "auth_mode": auth_mode,
-                    "database": database or None,
+                on_progress("constraints_missing", {
+                    "missing": constraints["missing"],
+                    "hint": ("set SCIDK_NEO4J_CONSTRAINTS=create to add them; committing with one session"
+                             if constraints["missing"] is not None else
+                             "could not list constraints; committing with one session (SCIDK_NEO4J_CONSTRAINTS=off skips the check)"),
                 })
             except Exception:
                 pass
-            # Constraints (safe on 5.x; ignore errors otherwise)
-            for cql in (
-                "CREATE CONSTRAINT file_identity IF NOT EXISTS FOR (f:File) REQUIRE (f.path, f.host) IS UNIQUE",
-                "CREATE CONSTRAINT folder_identity IF NOT EXISTS FOR (d:Folder) REQUIRE (d.path, d.host) IS UNIQUE",
-            ):
-                try:
-                    sess.run(cql).consume()
-                except Exception:
-                    pass
-
-            # Upsert Scan once
-            scan_upsert = (
-                "MERGE (s:Scan {id: $scan_id}) "
-                "SET s.path = $scan_path, s.started = $scan_started, s.ended = $scan_ended, "
-                "    s.provider_id = $scan_provider, s.host_type = $scan_host_type, s.host_id = $scan_host_id, "
-                "    s.root_id = $scan_root_id, s.root_label = $scan_root_label, s.scan_source = $scan_source "
-                "RETURN s.id AS scan_id"
-            )
-            sess.run(
-                scan_upsert,
-                scan_id=scan.get("id"),
-                scan_path=scan.get("path"),
-                scan_started=scan.get("started"),
-                scan_ended=scan.get("ended"),
-                scan_provider=scan.get("provider_id"),
-                scan_host_type=scan.get("host_type"),
-                scan_host_id=scan.get("host_id"),
-                scan_root_id=scan.get("root_id"),
-                scan_root_label=scan.get("root_label"),
-                scan_source=scan.get("scan_source") or scan.get("source"),
-            ).consume()
-
-            # Cypher templates
-            folders_upsert_cql = (
-                "WITH $folders AS folders, $node_host AS node_host, $scan AS scan_id, $scan_provider AS scan_provider, $scan_host_type AS scan_host_type, $scan_host_id AS scan_host_id "
-                "UNWIND folders AS folder "
-                "MERGE (fo:Folder {path: folder.path, host: node_host}) "
-                "  SET fo.name = folder.name, fo.provider_id = scan_provider, fo.host_type = scan_host_type, fo.host_id = scan_host_id "
-                "WITH fo, scan_id "
-                "OPTIONAL MATCH (s:Scan {id: scan_id}) "
-                "MERGE (fo)-[:SCANNED_IN]->(s)"
-            )
 
-            folders_link_cql = (
-                "WITH $folders AS folders, $node_host AS node_host "
-                "UNWIND folders AS folder "
-                "WITH folder, node_host "
-                "WHERE folder.parent IS NOT NULL AND folder.parent <> '' AND folder.parent <> folder.path "
-                "MERGE (parent:Folder {path: folder.parent, host: node_host}) "
-                "MERGE (child:Folder {path: folder.path, host: node_host}) "
-                "MERGE (parent)-[:CONTAINS]->(child)"
-            )
-
-            # Optional safety net to compute folder from file path when missing (feature-flagged)
-            _files_fallback = (os.environ.get('SCIDK_FILES_COMPUTE_FOLDER_FALLBACK') or '').strip().lower() in ('1','true','yes','y','on')
-            if _files_fallback:
-                files_cql = (
-                    "WITH $rows AS rows, $node_host AS node_host, $scan AS scan_id, $scan_provider AS scan_provider, $scan_host_type AS scan_host_type, $scan_host_id AS scan_host_id "
-                    "UNWIND rows AS r "
-                    "MERGE (f:File {path: r.path, host: node_host}) "
-                    "  SET f.filename = r.filename, f.extension = r.extension, f.size_bytes = r.size_bytes, "
-                    "      f.created = r.created, f.modified = r.modified, f.mime_type = r.mime_type, "
-                    "      f.provider_id = scan_provider, f.host_type = scan_host_type, f.host_id = scan_host_id "
-                    "WITH r, f, scan_id, node_host, CASE WHEN r.folder IS NOT NULL AND r.folder <> '' THEN r.folder ELSE substring(r.path, 0, size(r.path) - size(last(split(r.path, '/'))) - 1) END AS folder_path "
-                    "OPTIONAL MATCH (s:Scan {id: scan_id}) "
-                    "MERGE (f)-[:SCANNED_IN]->(s) "
-                    "WITH folder_path, f, node_host WHERE folder_path IS NOT NULL AND folder_path <> '' "
-                    "MERGE (fo:Folder {path: folder_path, host: node_host}) "
-                    "MERGE (fo)-[:CONTAINS]->(f)"
-                )
-            else:
-                files_cql = (
-                    "WITH $rows AS rows, $node_host AS node_host, $scan AS scan_id, $scan_provider AS scan_provider, $scan_host_type AS scan_host_type, $scan_host_id AS scan_host_id "
-                    "UNWIND rows AS r "
-                    "MERGE (f:File {path: r.path, host: node_host}) "
-                    "  SET f.filename = r.filename, f.extension = r.extension, f.size_bytes = r.size_bytes, "
-                    "      f.created = r.created, f.modified = r.modified, f.mime_type = r.mime_type, "
-                    "      f.provider_id = scan_provider, f.host_type = scan_host_type, f.host_id = scan_host_id "
-                    "WITH r, f, scan_id, node_host "
-                    "OPTIONAL MATCH (s:Scan {id: scan_id}) "
-                    "MERGE (f)-[:SCANNED_IN]->(s) "
-                    "WITH r, f, node_host "
-                    "WHERE r.folder IS NOT NULL AND r.folder <> '' "
-                    "MERGE (fo:Folder {path: r.folder, host: node_host}) "
-                    "MERGE (fo)-[:CONTAINS]->(f)"
-                )
-
-            def _run_with_retry(cql: str, params: Dict[str, Any], kind: str, index: int):
-                attempt = 0
-                while True:
-                    try:
-                        sess.run(cql, **params).consume()
-                        return True, None
-                    except Exception as ex:
-                        attempt += 1
-                        if attempt > max_retries:
-                            return False, str(ex)
-                        sleep_s = min(1.5 * attempt + _random.random(), 5.0)
-                        on_progress("retry", {"batch_kind": kind, "batch_index": index, "attempt": attempt, "sleep_s": round(sleep_s, 2), "error": str(ex)[:200]})
-                        _time.sleep(sleep_s)
-
-            folder_batches = list(_chunked_list(folder_rows, folder_batch_size))
-            file_batches = list(_chunked_list(rows, file_batch_size))
-            result["batches_total"] = len(folder_batches) + len(file_batches)
-
-            # Debug first 10 examples of folder/file mappings
-            try:
-                sample_files = [{"path": r.get("path"), "folder": r.get("folder")} for r in (rows[:10] if rows else [])]
-                sample_folders = [{"path": r.get("path"), "parent": r.get("parent")} for r in (folder_rows[:10] if folder_rows else [])]
+        # Debug first 10 examples of folder/file mappings (in-memory rows only; streams are not re-read)
+        try:
+            if isinstance(rows, list) and isinstance(folder_rows, list):
+                sample_files = [{"path": r.get("path"), "folder": r.get("folder")} for r in rows[:10]]
+                sample_folders = [{"path": r.get("path"), "parent": r.get("parent")} for r in folder_rows[:10]]
                 on_progress("debug_rows", {"sample_files": sample_files, "sample_folders": sample_folders})
-            except Exception:
-                pass
-
-            on_progress("start", {
-                "scan_id": scan.get("id"),
-                "folders": len(folder_rows),
-                "files": len(rows),
-                "folder_batches": len(folder_batches),
-                "file_batches": len(file_batches),
-                "batch_sizes": {"folders": folder_batch_size, "files": file_batch_size},
-            })
+        except Exception:
+            pass
 
-            common = {
-                "scan": scan.get("id"),
-                "node_host": node_host,
-                "scan_provider": scan.get("provider_id"),
-                "scan_host_type": scan.get("host_type"),
-                "scan_host_id": scan.get("host_id"),
-            }
-
-            # Folders first: upsert nodes and attach to scan
-            for i, batch in enumerate(folder_batches, start=1):
-                t0 = _time.time()
-                ok, err = _run_with_retry(folders_upsert_cql, {"folders": batch, **common}, kind="folders_upsert", index=i)
-                dt = _time.time() - t0
-                if not ok:
-                    result["batches_failed"] += 1
-                    result["errors"].append(f"folders upsert batch {i}: {err}")
-                    on_progress("batch_error", {"batch_kind": "folders_upsert", "batch_index": i, "items": len(batch), "error": err})
-                    continue
-                # Link parent-child hierarchy in a second step
-                t1 = _time.time()
-                ok2, err2 = _run_with_retry(folders_link_cql, {"folders": batch, **common}, kind="folders_link", index=i)
-                dt2 = _time.time() - t1
-                if ok2:
-                    result["batches_ok"] += 2  # count both successful sub-steps
-                    result["written_folders"] += len(batch)
-                    on_progress("batch_done", {"batch_kind": "folders_upsert", "batch_index": i, "items": len(batch), "sec": round(dt, 3)})
-                    on_progress("batch_done", {"batch_kind": "folders_link", "batch_index": i, "items": len(batch), "sec": round(dt2, 3)})
-                else:
-                    result["batches_ok"] += 1  # upsert ok
-                    result["batches_failed"] += 1
-                    result["errors"].append(f"folders link batch {i}: {err2}")
-                    on_progress("batch_done", {"batch_kind": "folders_upsert", "batch_index": i, "items": len(batch), "sec": round(dt, 3)})
-                    on_progress("batch_error", {"batch_kind": "folders_link", "batch_index": i, "items": len(batch), "error": err2})
-
-            # Files
-            for i, batch in enumerate(file_batches, start=1):
-                t0 = _time.time()
-                ok, err = _run_with_retry(files_cql, {"rows": batch, **common}, kind="files", index=i)
-                dt = _time.time() - t0
-                if ok:
-                    result["batches_ok"] += 1
-                    result["written_files"] += len(batch)
-                    on_progress("batch_done", {"batch_kind": "files", "batch_index": i, "items": len(batch), "sec": round(dt, 3)})
-                else:
-                    result["batches_failed"] += 1
-                    result["errors"].append(f"files batch {i}: {err}")
-                    on_progress("batch_error", {"batch_kind": "files", "batch_index": i, "items": len(batch), "error": err})
+        engine = CommitEngine(
+            driver,
+            database=database,
+            **engine_options(
+                constraints,
+                file_batch_size=file_batch_size,
+                folder_batch_size=folder_batch_size,
+                concurrency=concurrency,
+                max_retries=max_retries,
+                on_progress=on_progress,
+                app=app,
+            ),
+        )
+        wres = engine.commit(scan, rows, folder_rows)
+        for k in ("written_files", "written_folders", "written_edges", "batches_total", "batches_ok",
+                  "batches_failed", "phases", "phase_sec", "sec", "rows_per_sec"):
+            result[k] = wres.get(k)
+        result["errors"].extend(wres.get("errors") or [])
+        if wres.get("error"):
+            result["error"] = wres["error"]
 
+        with driver.session(database=database) as sess:
             # Verify
             verify_q = (
                 "OPTIONAL MATCH (s:Scan {id: $scan_id}) "
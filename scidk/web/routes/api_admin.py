@@ -9,6 +9,7 @@ import time
 
 from ..helpers import get_neo4j_params, build_commit_rows, commit_to_neo4j, get_or_build_scan_index
 from ..decorators import require_admin
+from ...core import sqlite_pool
 bp = Blueprint('admin', __name__, url_prefix='/api')
 
 def _get_ext():
@@ -65,6 +66,7 @@ def api_health_graph():
             info['neo4j']['configured'] = True
             try:
                 from neo4j import GraphDatabase  # type: ignore
+                from ...services.neo4j_drivers import shared_driver
             except Exception as e:
                 info['neo4j']['error'] = f"neo4j driver not installed: {e}"
                 return jsonify(info), 200
@@ -79,7 +81,7 @@ def api_health_graph():
             try:
                 driver = None
                 try:
-                    driver = GraphDatabase.driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
+                    driver = shared_driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
                     with driver.session(database=database) as sess:
                         rec = sess.run("RETURN 1 AS ok").single()
                         if rec and rec.get('ok') == 1:
@@ -273,9 +275,10 @@ def api_health_comprehensive():
             neo4j_start = time.time()
             try:
                 from neo4j import GraphDatabase
+                from ...services.neo4j_drivers import shared_driver
                 driver = None
                 try:
-                    driver = GraphDatabase.driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
+                    driver = shared_driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
                     with driver.session(database=database) as sess:
                         result = sess.run("MATCH (n) RETURN count(n) AS count")
                         rec = result.single()
@@ -411,6 +414,18 @@ def api_metrics():
             return jsonify({'error': str(e)}), 500
 
 
+@bp.get('/admin/sqlite/stats')
+@require_admin
+def api_admin_sqlite_stats():
+    """SQLite connection pool counters and per-endpoint query count, statement time and lock wait.
+
+    Query params:
+      - reset (optional): clear the per-endpoint counters after reading
+    """
+    reset = (request.args.get('reset') or '').strip().lower() in ('1', 'true', 'yes', 'on')
+    return jsonify(sqlite_pool.stats(reset=reset)), 200
+
+
 @bp.get('/logs')
 def api_logs():
         """
@@ -529,6 +544,12 @@ def api_admin_cleanup_test_scans():
             cur.execute(f"DELETE FROM scan_items WHERE scan_id IN ({placeholders})", test_scan_ids)
             deleted_items = cur.rowcount
 
+            # Delete scan_members (if exists)
+            try:
+                cur.execute(f"DELETE FROM scan_members WHERE scan_id IN ({placeholders})", test_scan_ids)
+            except Exception:
+                pass
+
             # Delete scan_progress
             cur.execute(f"DELETE FROM scan_progress WHERE scan_id IN ({placeholders})", test_scan_ids)
             deleted_progress = cur.rowcount
@@ -574,6 +595,41 @@ def api_admin_cleanup_test_scans():
         return jsonify({'error': str(e)}), 500
 
 
+@bp.post('/admin/files/compact')
+@require_admin
+def api_admin_files_compact():
+    """Compact the file index: drop row versions and per-scan copies only old scans can see, then VACUUM.
+
+    Body (optional): {"keep_scans": 3, "vacuum": true}
+
+    Returns:
+        JSON with removed row counts
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        keep = int(data.get('keep_scans', 3))
+    except Exception:
+        return jsonify({'error': 'keep_scans must be an integer'}), 400
+    try:
+        from ...core import path_index_sqlite as pix
+        from ...core.file_versions import compact
+
+        conn = pix.connect()
+        try:
+            pix.init_db(conn)
+            result = compact(conn, keep_scans=keep, vacuum=bool(data.get('vacuum', True)))
+        finally:
+            conn.close()
+        # Cached per-scan indexes may reference removed rows; dropped scans leave the registry too
+        _get_ext().get('scan_fs', {}).clear()
+        scans = _get_ext().get('scans', {})
+        for sid in result.get('dropped_scan_ids') or []:
+            scans.pop(sid, None)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @bp.post('/admin/cleanup-test-labels')
 def api_admin_cleanup_test_labels():
     """Remove test labels from the database (labels with test prefixes like E2E*, Test*, etc).
@@ -679,7 +735,7 @@ def api_admin_cleanup_test_endpoints():
 
         # Use settings DB (where API endpoints are stored, not path_index)
         settings_db = current_app.config.get('SCIDK_SETTINGS_DB', 'scidk_settings.db')
-        conn = sqlite3.connect(settings_db)
+        conn = sqlite_pool.connect(settings_db)
         conn.execute('PRAGMA journal_mode=WAL')
         try:
             cur = conn.cursor()
@@ -25,6 +25,32 @@ def _get_feedback_service():
     db_path = current_app.config.get('SCIDK_SETTINGS_DB', 'scidk_settings.db')
     return get_graphrag_feedback_service(db_path=db_path)
 
+def _graphrag_engine_cache():
+    """Per-app cache of warm GraphRAG engines (driver, schema, QueryEngine) per database."""
+    from ...services.graphrag.engine_cache import GraphRAGEngineCache
+    ext = _get_ext()
+    cache = ext.get('graphrag_engines')
+    if cache is None:
+        cache = ext['graphrag_engines'] = GraphRAGEngineCache()
+    return cache
+
+def _graphrag_query_cache():
+    """Cypher/result cache persisted in the settings DB, next to graphrag_feedback."""
+    from ...services.graphrag.query_cache import get_query_cache
+    return get_query_cache(current_app.config.get('SCIDK_SETTINGS_DB', 'scidk_settings.db'))
+
+def _load_graphrag_schema(driver, database):
+    """Labels and relationship types from Neo4j, filtered by the SCIDK_GRAPHRAG_* allow/deny lists."""
+    from ...services.graphrag_schema import filter_schema
+    with driver.session(database=database) if database else driver.session() as s:
+        labels = [r[0] for r in s.run("CALL db.labels()").values()]
+        rels = [r[0] for r in s.run("CALL db.relationshipTypes()").values()]
+    raw_schema = {"labels": labels, "relationships": rels}
+    allow_labels = [x.strip() for x in (os.environ.get('SCIDK_GRAPHRAG_ALLOW_LABELS') or '').split(',') if x.strip()]
+    deny_labels = [x.strip() for x in (os.environ.get('SCIDK_GRAPHRAG_DENY_LABELS') or '').split(',') if x.strip()]
+    prop_excl = [x.strip() for x in (os.environ.get('SCIDK_GRAPHRAG_EXCLUDE_PROPERTIES') or '').split(',') if x.strip()]
+    return filter_schema(raw_schema, allow_labels or None, deny_labels or None, prop_excl or None)
+
 @bp.post('/chat')
 def api_chat():
         data = request.get_json(force=True, silent=True) or {}
@@ -68,6 +94,7 @@ def api_chat_graphrag():
         # Attempt lazy import and minimal flow
         try:
             from neo4j import GraphDatabase  # type: ignore
+            from ...services.neo4j_drivers import shared_driver
             # Soft optional import for graphrag; if missing, report capability
             try:
                 from neo4j_graphrag.retrievers import Text2CypherRetriever  # type: ignore
@@ -98,29 +125,29 @@ def api_chat_graphrag():
             else:
                 return jsonify({"status": "error", "error": f"Unknown provider: {provider}"}), 400
             auth = None if (auth_mode or 'basic').lower() == 'none' else (user, pwd)
-            driver = GraphDatabase.driver(uri, auth=auth)
-            # Schema cache with privacy filtering
-            from ...services.graphrag_schema import parse_ttl, filter_schema
-            from ...services.graphrag_examples import examples as t2c_examples
+            anthropic_key = os.environ.get('SCIDK_ANTHROPIC_API_KEY')
+            verbose = (os.environ.get('SCIDK_GRAPHRAG_VERBOSE') or '').strip().lower() in ('1','true','yes')
+            # Warm per-database state: driver, filtered schema, QueryEngine + prepared retriever
+            from ...services.graphrag.engine_cache import fingerprint
+            cached, cache_hit = _graphrag_engine_cache().get(
+                uri, database,
+                fingerprint(user, pwd, auth_mode, anthropic_key, verbose, os.environ.get('SCIDK_QUERY_LIBRARY_PATH')),
+                lambda: shared_driver(uri, auth=auth, database=database),
+            )
+            driver = cached.driver
+            # Schema cache with privacy filtering: kept until a refresh endpoint runs or the TTL expires
+            from ...services.graphrag_schema import parse_ttl
             schema_cache = _get_ext().setdefault('graphrag_schema', {})
-            last = schema_cache.get('last_loaded_ts') or 0
             ttl = 0
             ttl_env = os.environ.get('SCIDK_GRAPHRAG_SCHEMA_CACHE_TTL_SEC') or os.environ.get('SCIDK_GRAPHRAG_SCHEMA_CACHE_TTL')
             if ttl_env:
                 ttl = parse_ttl(ttl_env)
             now = int(time.time())
-            if (now - last) > max(0, ttl):
-                with driver.session(database=database) if database else driver.session() as s:
-                    labels = [r[0] for r in s.run("CALL db.labels()").values()]
-                    rels = [r[0] for r in s.run("CALL db.relationshipTypes()").values()]
-                raw_schema = {"labels": labels, "relationships": rels}
-                allow_labels = [x.strip() for x in (os.environ.get('SCIDK_GRAPHRAG_ALLOW_LABELS') or '').split(',') if x.strip()]
-                deny_labels = [x.strip() for x in (os.environ.get('SCIDK_GRAPHRAG_DENY_LABELS') or '').split(',') if x.strip()]
-                prop_excl = [x.strip() for x in (os.environ.get('SCIDK_GRAPHRAG_EXCLUDE_PROPERTIES') or '').split(',') if x.strip()]
-                filtered = filter_schema(raw_schema, allow_labels or None, deny_labels or None, prop_excl or None)
-                schema_cache['schema'] = filtered
-                schema_cache['last_loaded_ts'] = now
-            neo4j_schema = schema_cache.get('schema') or {"labels": [], "relationships": []}
+            if cached.schema is None or (ttl > 0 and (now - (cached.schema_ts or 0)) > ttl):
+                cached.set_schema(_load_graphrag_schema(driver, database))
+            schema_cache['schema'] = cached.schema
+            schema_cache['last_loaded_ts'] = cached.schema_ts
+            neo4j_schema = cached.schema or {"labels": [], "relationships": []}
 
             # Classify intent for routing (LOOKUP vs REASONING)
             from ...services.graphrag.intent_classifier import classify, Intent
@@ -130,16 +157,15 @@ def api_chat_graphrag():
             if intent == Intent.LOOKUP:
                 # LOOKUP path: Fast Text2Cypher via QueryEngine
                 from ...services.graphrag.query_engine import QueryEngine
-                anthropic_key = os.environ.get('SCIDK_ANTHROPIC_API_KEY')
-                verbose = (os.environ.get('SCIDK_GRAPHRAG_VERBOSE') or '').strip().lower() in ('1','true','yes')
 
-                query_engine = QueryEngine(
+                query_engine, engine_built = cached.get_engine(lambda: QueryEngine(
                     driver=driver,
                     neo4j_schema=neo4j_schema,
                     anthropic_api_key=anthropic_key,
                     database=database,
-                    verbose=verbose
-                )
+                    verbose=verbose,
+                    query_cache=_graphrag_query_cache()
+                ))
 
                 # Execute query
                 result = query_engine.query(message)
@@ -161,8 +187,19 @@ def api_chat_graphrag():
                 response_data["metadata"] = {
                     "entities": result.get('entities', {}),
                     "execution_time_ms": result.get('execution_time_ms', 0),
-                    "result_count": result.get('result_count', 0)
+                    "result_count": result.get('result_count', 0),
+                    "stages_ms": result.get('stage_ms', {}),
+                    "engine_cache": "hit" if (cache_hit and not engine_built) else "miss",
+                    "engine_init_ms": cached.engine_build_ms if engine_built else 0,
+                    "query_cache": result.get('cache')
                 }
+                try:
+                    from ...services.metrics import record_latency
+                    for stage, ms in (result.get('stage_ms') or {}).items():
+                        if ms is not None:
+                            record_latency(current_app, f'graphrag_{stage}', ms / 1000.0)
+                except Exception:
+                    pass
 
                 if verbose and 'results' in result:
                     response_data["metadata"]["results"] = result['results']
@@ -173,7 +210,7 @@ def api_chat_graphrag():
                 from ...ai.schema_context import get_schema_context
                 from ...ai.provider_factory import LLMProviderFactory
 
-                schema_context = get_schema_context(driver, database=database or "neo4j")
+                schema_context = get_schema_context(driver, database=database or "neo4j", uri=uri)
 
                 # Build settings dict from environment/config
                 settings = {
@@ -253,25 +290,23 @@ def api_chat_context_refresh():
         try:
             from ...services.neo4j_client import get_neo4j_params
             from neo4j import GraphDatabase  # type: ignore
+            from ...services.neo4j_drivers import shared_driver
             uri, user, pwd, database, auth_mode = get_neo4j_params(current_app)
             if not uri:
                 from ...services.graphrag_schema import normalize_error
                 return jsonify(normalize_error(status="error", error="Neo4j not configured", code="NEO4J_CONFIG_MISSING", hint="Set NEO4J_URI and credentials or NEO4J_AUTH=none")), 500
             auth = None if (auth_mode or 'basic').lower() == 'none' else (user, pwd)
-            driver = GraphDatabase.driver(uri, auth=auth)
-            with driver.session(database=database) if database else driver.session() as s:
-                labels = [r[0] for r in s.run("CALL db.labels()").values()]
-                rels = [r[0] for r in s.run("CALL db.relationshipTypes()").values()]
-            from ...services.graphrag_schema import filter_schema
-            raw_schema = {"labels": labels, "relationships": rels}
-            allow_labels = [x.strip() for x in (os.environ.get('SCIDK_GRAPHRAG_ALLOW_LABELS') or '').split(',') if x.strip()]
-            deny_labels = [x.strip() for x in (os.environ.get('SCIDK_GRAPHRAG_DENY_LABELS') or '').split(',') if x.strip()]
-            prop_excl = [x.strip() for x in (os.environ.get('SCIDK_GRAPHRAG_EXCLUDE_PROPERTIES') or '').split(',') if x.strip()]
-            filtered = filter_schema(raw_schema, allow_labels or None, deny_labels or None, prop_excl or None)
+            # Drop the warm engine for this database: the next question rebuilds schema, examples and retriever
+            invalidated = _graphrag_engine_cache().invalidate(uri=uri, database=database)
+            driver = shared_driver(uri, auth=auth)
+            try:
+                filtered = _load_graphrag_schema(driver, database)
+            finally:
+                driver.close()
             schema_cache = _get_ext().setdefault('graphrag_schema', {})
             schema_cache['schema'] = filtered
             schema_cache['last_loaded_ts'] = int(time.time())
-            return jsonify({"status": "ok", "schema": schema_cache['schema']}), 200
+            return jsonify({"status": "ok", "schema": schema_cache['schema'], "engines_invalidated": invalidated}), 200
         except Exception as e:
             return jsonify({"status": "error", "error": str(e)}), 500
 
@@ -323,6 +358,8 @@ def api_chat_observability_graphrag():
                 'cache_ttl_sec': ttl,
             },
             'audit': recent,
+            'engines': _graphrag_engine_cache().stats(),
+            'cache': _graphrag_query_cache().stats(),
         }), 200
 
 
@@ -1050,6 +1087,7 @@ def api_chat_graphrag_v2():
         # Get Neo4j connection
         from ...services.neo4j_client import get_neo4j_params
         from neo4j import GraphDatabase
+        from ...services.neo4j_drivers import shared_driver
         uri, user, pwd, database, auth_mode = get_neo4j_params(current_app)
 
         if not uri:
@@ -1060,11 +1098,11 @@ def api_chat_graphrag_v2():
             }), 500
 
         auth = None if (auth_mode or 'basic').lower() == 'none' else (user, pwd)
-        driver = GraphDatabase.driver(uri, auth=auth)
+        driver = shared_driver(uri, auth=auth)
 
         # Get schema context for grounding (provider integrates it)
         from ...ai.schema_context import get_schema_context
-        schema_context = get_schema_context(driver, database=database or "neo4j")
+        schema_context = get_schema_context(driver, database=database or "neo4j", uri=uri)
 
         # Get provider (allow override via request body)
         from ...ai.provider_factory import LLMProviderFactory
@@ -1151,6 +1189,7 @@ def api_chat_graphrag_v2_stream():
             # Get Neo4j connection and schema
             from ...services.neo4j_client import get_neo4j_params
             from neo4j import GraphDatabase
+            from ...services.neo4j_drivers import shared_driver
             uri, user, pwd, database, auth_mode = get_neo4j_params(current_app)
 
             if not uri:
@@ -1158,11 +1197,11 @@ def api_chat_graphrag_v2_stream():
                 return
 
             auth = None if (auth_mode or 'basic').lower() == 'none' else (user, pwd)
-            driver = GraphDatabase.driver(uri, auth=auth)
+            driver = shared_driver(uri, auth=auth)
 
             # Get schema context for grounding
             from ...ai.schema_context import get_schema_context
-            schema_context = get_schema_context(driver, database=database or "neo4j")
+            schema_context = get_schema_context(driver, database=database or "neo4j", uri=uri)
 
             # Get provider
             from ...ai.provider_factory import LLMProviderFactory
@@ -1249,6 +1288,7 @@ def api_chat_schema_refresh():
     """
     from ...ai.schema_context import refresh_schema_cache
     refresh_schema_cache()
+    _graphrag_engine_cache().invalidate()
 
     return jsonify({"status": "ok", "message": "Schema cache cleared"}), 200
 
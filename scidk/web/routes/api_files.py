@@ -172,6 +172,10 @@ def api_scan():
                 'recursive': recursive,
                 'fast_list': fast_list,
                 'selection': data.get('selection') or {},
+                'pipeline': data.get('pipeline') or {},
+                'verify': bool(data.get('verify', False)),
+                'enumerator': data.get('enumerator'),
+                'reinterpret': bool(data.get('reinterpret', False)),
             })
             if isinstance(result, dict) and result.get('status') == 'ok':
                 # Persist selection, if provided
@@ -247,17 +251,10 @@ def api_scan():
                 # Build list of files and folders
                 items_files = []
                 items_dirs = set()
-                # Preserve source detection semantics (ncdu > gdu > python)
+                # Report the enumerator backend selected for this scan
                 try:
-                    probe_ncdu = _get_ext()['fs']._list_files_with_ncdu(base, recursive=recursive)  # type: ignore
-                    if probe_ncdu:
-                        _get_ext()['fs'].last_scan_source = 'ncdu'
-                    else:
-                        probe_gdu = _get_ext()['fs']._list_files_with_gdu(base, recursive=recursive)  # type: ignore
-                        if probe_gdu:
-                            _get_ext()['fs'].last_scan_source = 'gdu'
-                        else:
-                            _get_ext()['fs'].last_scan_source = 'python'
+                    from ...core.enumerators import get_enumerator
+                    _get_ext()['fs'].last_scan_source = get_enumerator(data.get('enumerator') if recursive else 'python').name
                 except Exception:
                     _get_ext()['fs'].last_scan_source = 'python'
                 try:
@@ -343,6 +340,10 @@ def api_scan():
                 for fpath in items_files:
                     rows.append(_row_from_local(fpath, 'file'))
                 ingested = pix.batch_insert_files(rows)
+                try:
+                    pix.finalize_versioned_scan(scan_id, str(base.resolve()), recursive=bool(recursive))
+                except Exception:
+                    pass
                 # Also create in-memory datasets (keep legacy behavior)
                 count = 0
                 for fpath in items_files:
@@ -377,9 +378,10 @@ def api_scan():
                                         if not key_path:
                                             # Fallback to absolute local path for local filesystem scans
                                             key_path = str(fpath.resolve())
+                                        scope, scope_params = pix.scan_scope(conn_i, scan_id)
                                         cur_i.execute(
-                                            "UPDATE files SET interpreted_as = ?, interpretation_json = ? WHERE path = ? AND type = 'file' AND scan_id = ?",
-                                            (interp.id, _json.dumps(payload.get('data')), key_path, scan_id)
+                                            f"UPDATE files SET interpreted_as = ?, interpretation_json = ? WHERE path = ? AND type = 'file' AND {scope}",
+                                            (interp.id, _json.dumps(payload.get('data')), key_path, *scope_params)
                                         )
                                         conn_i.commit()
                                     finally:
@@ -407,9 +409,10 @@ def api_scan():
                                             key_path = None
                                         if not key_path:
                                             key_path = str(fpath.resolve())
+                                        scope, scope_params = pix.scan_scope(conn_i, scan_id)
                                         cur_i.execute(
-                                            "UPDATE files SET interpreted_as = ?, interpretation_json = ? WHERE path = ? AND type = 'file' AND scan_id = ?",
-                                            (interp.id, _json.dumps(err_payload.get('data')), key_path, scan_id)
+                                            f"UPDATE files SET interpreted_as = ?, interpretation_json = ? WHERE path = ? AND type = 'file' AND {scope}",
+                                            (interp.id, _json.dumps(err_payload.get('data')), key_path, *scope_params)
                                         )
                                         conn_i.commit()
                                     finally:
@@ -572,7 +575,7 @@ def api_scan():
                     ingested = pix.batch_insert_files(rows, batch_size=10000)
                     # Minimal change detection to populate file_history
                     try:
-                        _chg = pix.apply_basic_change_history(scan_id, path)
+                        _chg = pix.apply_basic_change_history(scan_id, path, recursive=bool(recursive))
                         _get_ext().setdefault('telemetry', {})['last_change_counts'] = _chg
                     except Exception as __e:
                         _get_ext().setdefault('telemetry', {})['last_change_error'] = str(__e)
@@ -594,7 +597,8 @@ def api_scan():
                     from ...core import path_index_sqlite as pix
                     conn = pix.connect(); pix.init_db(conn)
                     cur = conn.cursor()
-                    cur.execute("SELECT file_extension FROM files WHERE scan_id = ? AND type='file'", (scan_id,))
+                    scope, scope_params = pix.scan_scope(conn, scan_id)
+                    cur.execute(f"SELECT file_extension FROM files WHERE {scope} AND type='file'", scope_params)
                     for (ext,) in cur.fetchall():
                         ext = ext or ''
                         by_ext[ext] = by_ext.get(ext, 0) + 1
@@ -682,35 +686,27 @@ def api_scan():
             try:
                 from ...core import path_index_sqlite as pix
                 from ...core import migrations as _migs
+                from ...core import scan_members as _scan_members
                 conn = pix.connect()
-                import json as _json
                 try:
                     _migs.migrate(conn)
-                    cur = conn.cursor()
-                    cur.execute(
-                        "INSERT OR REPLACE INTO scans(id, root, started, completed, status, extra_json) VALUES(?,?,?,?,?,?)",
-                        (
-                            scan_id,
-                            str(path),
-                            float(started or 0.0),
-                            float(ended or 0.0),
-                            'completed',
-                            _json.dumps({
-                                'recursive': bool(recursive),
-                                'duration_sec': duration,
-                                'file_count': int(count),
-                                'by_ext': by_ext,
-                                'source': scan.get('source'),
-                                'checksums': new_checksums,
-                                'committed': False,
-                                'committed_at': None,
-                                'provider_id': provider_id,
-                                'root_id': root_id,
-                                'host_type': host_type,
-                                'host_id': host_id,
-                                'root_label': root_label,
-                            })
-                        )
+                    _scan_members.save_scan(
+                        conn, scan_id, str(path), started, ended, 'completed',
+                        {
+                            'recursive': bool(recursive),
+                            'duration_sec': duration,
+                            'file_count': int(count),
+                            'by_ext': by_ext,
+                            'source': scan.get('source'),
+                            'committed': False,
+                            'committed_at': None,
+                            'provider_id': provider_id,
+                            'root_id': root_id,
+                            'host_type': host_type,
+                            'host_id': host_id,
+                            'root_label': root_label,
+                        },
+                        new_checksums,
                     )
                     conn.commit()
                 finally:
@@ -824,27 +820,19 @@ def api_interpret():
             if not interps:
                 return jsonify({"status": "error", "error": "no interpreters available"}), 400
         results = []
-        for interp in interps:
+        # Execution engine enforces per-interpreter limits and records usage timings
+        from ...core.interpreter_pool import submit_interpretation
+        pending = [(interp, submit_interpretation(interp, file_path, _get_ext()['registry'])) for interp in interps]
+        for interp, fut in pending:
             try:
-                _t0 = time.time()
-                result = interp.interpret(file_path)
-                _t1 = time.time()
+                result = fut.result()
                 _get_ext()['graph'].add_interpretation(ds['checksum'], interp.id, {
                     'status': result.get('status', 'success'),
                     'data': result.get('data', result),
                     'interpreter_version': getattr(interp, 'version', '0.0.1'),
                 })
-                # Record success
-                try:
-                    _get_ext()['registry'].record_usage(interp.id, success=True, execution_time_ms=int((_t1 - _t0)*1000))
-                except Exception:
-                    pass
                 results.append({'interpreter_id': interp.id, 'status': 'ok'})
             except Exception as e:
-                try:
-                    _get_ext()['registry'].record_usage(interp.id, success=False, execution_time_ms=0)
-                except Exception:
-                    pass
                 _get_ext()['graph'].add_interpretation(ds['checksum'], interp.id, {
                     'status': 'error',
                     'data': {'error': str(e)},
@@ -1378,9 +1366,10 @@ def api_scans():
                 from ...core import migrations as _migs
                 _migs.migrate(conn)
                 cur = conn.cursor()
-                cur.execute("SELECT id, root, started, completed, status, extra_json FROM scans ORDER BY coalesce(completed, started) DESC LIMIT 500")
+                # Summary columns only: checksum lists live in scan_members, so extra_json stays small
+                cur.execute("SELECT id, root, started, completed, status, extra_json, file_count, checksum_count FROM scans ORDER BY coalesce(completed, started) DESC LIMIT 500")
                 rows = cur.fetchall()
-                for (sid, root, started, completed, status, extra) in rows:
+                for (sid, root, started, completed, status, extra, file_count, checksum_count) in rows:
                     extra_obj = {}
                     try:
                         if extra:
@@ -1394,10 +1383,10 @@ def api_scans():
                         'started': started,
                         'ended': completed,
                         'duration_sec': (extra_obj or {}).get('duration_sec'),
-                        'file_count': (extra_obj or {}).get('file_count'),
+                        'file_count': file_count if file_count is not None else (extra_obj or {}).get('file_count'),
                         'by_ext': (extra_obj or {}).get('by_ext') or {},
                         'source': (extra_obj or {}).get('source'),
-                        'checksum_count': len((extra_obj or {}).get('checksums') or []),
+                        'checksum_count': int(checksum_count or 0),
                         'committed': bool((extra_obj or {}).get('committed', False)),
                         'committed_at': (extra_obj or {}).get('committed_at'),
                         'status': status,
@@ -1455,6 +1444,7 @@ def api_scan_detail(scan_id):
         try:
             from ...core import path_index_sqlite as pix
             from ...core import migrations as _migs
+            from ...core import scan_members as _scan_members
             import json as _json
             conn = pix.connect()
             try:
@@ -1480,7 +1470,7 @@ def api_scan_detail(scan_id):
                         'file_count': (extra_obj or {}).get('file_count'),
                         'by_ext': (extra_obj or {}).get('by_ext') or {},
                         'source': (extra_obj or {}).get('source'),
-                        'checksums': (extra_obj or {}).get('checksums') or [],
+                        'checksums': _scan_members.load_checksums(conn, sid),
                         'committed': bool((extra_obj or {}).get('committed', False)),
                         'committed_at': (extra_obj or {}).get('committed_at'),
                         'provider_id': (extra_obj or {}).get('provider_id'),
@@ -1817,6 +1807,10 @@ def api_scan_delete(scan_id):
                     cur.execute("DELETE FROM scan_selection_rules WHERE scan_id = ?", (scan_id,))
                 except Exception:
                     pass  # Table might not exist
+                try:
+                    cur.execute("DELETE FROM scan_members WHERE scan_id = ?", (scan_id,))
+                except Exception:
+                    pass
                 # Delete the scan itself
                 cur.execute("DELETE FROM scans WHERE id = ?", (scan_id,))
                 conn.commit()
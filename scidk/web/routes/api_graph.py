@@ -175,71 +175,67 @@ def api_graph_schema_combined():
         try:
             uri, user, pwd, database, auth_mode = get_neo4j_params()
             if uri:
-                from neo4j import GraphDatabase
-                driver = None
-                try:
-                    driver = GraphDatabase.driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
-                    with driver.session(database=database) as sess:
-                        # Get node label counts
-                        q_nodes = "MATCH (n) WITH head(labels(n)) AS l, count(*) AS c RETURN l AS label, c ORDER BY c DESC"
-                        neo4j_nodes = [dict(record) for record in sess.run(q_nodes)]
-
-                        # Get relationship triples counts
-                        q_edges = (
-                            "MATCH (s)-[r]->(t) "
-                            "WITH head(labels(s)) AS sl, type(r) AS rt, head(labels(t)) AS tl, count(*) AS c "
-                            "RETURN sl AS start_label, rt AS rel_type, tl AS end_label, c ORDER BY c DESC"
-                        )
-                        neo4j_edges = [dict(record) for record in sess.run(q_edges)]
-
-                        # Add nodes from Neo4j (prefer Neo4j counts if already seen from labels)
-                        for n in neo4j_nodes:
-                            label_name = n.get('label')
-                            if label_name:
-                                if label_name in seen_nodes:
-                                    # Update existing node with Neo4j count
-                                    for node in result['nodes']:
-                                        if node['label'] == label_name:
-                                            node['count'] = n.get('c', 0)
-                                            node['source'] = 'neo4j+labels' if node['source'] == 'labels' else 'neo4j'
-                                            break
-                                    seen_nodes[label_name] = 'neo4j'
-                                else:
-                                    result['nodes'].append({
-                                        'label': label_name,
-                                        'count': n.get('c', 0),
-                                        'source': 'neo4j'
-                                    })
-                                    seen_nodes[label_name] = 'neo4j'
-
-                        # Add edges from Neo4j
-                        for e in neo4j_edges:
-                            edge_key = (e.get('start_label'), e.get('rel_type'), e.get('end_label'))
-                            if edge_key in seen_edges:
-                                # Update existing edge with Neo4j count
-                                for edge in result['edges']:
-                                    if (edge['start_label'], edge['rel_type'], edge['end_label']) == edge_key:
-                                        edge['count'] = e.get('c', 0)
-                                        edge['source'] = 'neo4j+labels' if edge['source'] == 'labels' else 'neo4j'
-                                        break
-                            else:
-                                result['edges'].append({
-                                    'start_label': e.get('start_label'),
-                                    'rel_type': e.get('rel_type'),
-                                    'end_label': e.get('end_label'),
-                                    'count': e.get('c', 0),
-                                    'source': 'neo4j'
-                                })
-                                seen_edges[edge_key] = 'neo4j'
-
-                        result['sources']['neo4j'] = {
-                            'count': len(neo4j_nodes),
-                            'enabled': True,
-                            'connected': True
-                        }
-                finally:
-                    if driver:
-                        driver.close()
+                from ...services.neo4j_drivers import shared_driver
+                from ...services.graphrag.engine_cache import fingerprint
+                from ...services.schema_stats import get_schema_stats_service
+                # Cached count-store counts and background-computed triples (see services/schema_stats)
+                auth = None if auth_mode == 'none' else (user, pwd)
+                snap = get_schema_stats_service().get(
+                    uri, database, fingerprint(user, pwd, auth_mode),
+                    lambda: shared_driver(uri, auth=auth, database=database),
+                    refresh=(request.args.get('refresh') or '').strip().lower() in ('1', 'true', 'yes'),
+                )
+                if snap['stats'].get('error') and not snap['nodes']:
+                    raise RuntimeError(snap['stats']['error'])
+                neo4j_nodes = snap['nodes']
+                neo4j_edges = snap['edges']
+
+                # Add nodes from Neo4j (prefer Neo4j counts if already seen from labels)
+                for n in neo4j_nodes:
+                    label_name = n.get('label')
+                    if label_name:
+                        if label_name in seen_nodes:
+                            # Update existing node with Neo4j count
+                            for node in result['nodes']:
+                                if node['label'] == label_name:
+                                    node['count'] = n.get('c', 0)
+                                    node['source'] = 'neo4j+labels' if node['source'] == 'labels' else 'neo4j'
+                                    break
+                            seen_nodes[label_name] = 'neo4j'
+                        else:
+                            result['nodes'].append({
+                                'label': label_name,
+                                'count': n.get('c', 0),
+                                'source': 'neo4j'
+                            })
+                            seen_nodes[label_name] = 'neo4j'
+
+                # Add edges from Neo4j
+                for e in neo4j_edges:
+                    edge_key = (e.get('start_label'), e.get('rel_type'), e.get('end_label'))
+                    if edge_key in seen_edges:
+                        # Update existing edge with Neo4j count
+                        for edge in result['edges']:
+                            if (edge['start_label'], edge['rel_type'], edge['end_label']) == edge_key:
+                                edge['count'] = e.get('c', 0)
+                                edge['source'] = 'neo4j+labels' if edge['source'] == 'labels' else 'neo4j'
+                                break
+                    else:
+                        result['edges'].append({
+                            'start_label': e.get('start_label'),
+                            'rel_type': e.get('rel_type'),
+                            'end_label': e.get('end_label'),
+                            'count': e.get('c', 0),
+                            'source': 'neo4j'
+                        })
+                        seen_edges[edge_key] = 'neo4j'
+
+                result['sources']['neo4j'] = {
+                    'count': len(neo4j_nodes),
+                    'enabled': True,
+                    'connected': True,
+                    'stats': snap['stats'],
+                }
             else:
                 result['sources']['neo4j'] = {'count': 0, 'enabled': False, 'connected': False}
         except Exception as e:
@@ -445,9 +441,11 @@ def api_graph_query():
         client.connect()
 
         try:
-            # Use execute_read for queries that don't modify data
-            # (In production, you might want to detect write queries and use execute_write)
-            results = client.execute_read(query, parameters)
+            # Queries with write clauses go through execute_write, which bumps the graph write epoch
+            # so cached GraphRAG results and schema snapshots from before the write expire
+            from ...services.graphrag.query_cache import is_read_only
+            run = client.execute_read if is_read_only(query) else client.execute_write
+            results = run(query, parameters)
 
             execution_time_ms = int((time.time() - start_time) * 1000)
 
@@ -546,29 +544,30 @@ def api_graph_instances():
         }), 200
 
 
-@bp.get('/graph/instances.csv')
-def api_graph_instances_csv():
+def _instance_export(fmt: str, mimetype: str, stream):
+        """Stream graph.iter_instances(label) through stream(columns, rows) as an attachment."""
         label = (request.args.get('label') or '').strip()
         if not label:
             return jsonify({"error": "missing label"}), 400
-        rows = _get_ext()['graph'].list_instances(label)
-        # Build CSV
-        if not rows:
-            headers = ['id']
-        else:
-            # union columns
-            cols = set()
-            for r in rows:
-                cols.update(r.keys())
-            headers = sorted(list(cols))
-        import io, csv
-        buf = io.StringIO()
-        w = csv.DictWriter(buf, fieldnames=headers)
-        w.writeheader()
-        for r in rows:
-            w.writerow({k: r.get(k, '') for k in headers})
-        from flask import Response
-        return Response(buf.getvalue(), mimetype='text/csv', headers={'Content-Disposition': f'attachment; filename="instances_{label}.csv"'})
+        graph = _get_ext()['graph']
+        from flask import stream_with_context
+        from ...services.instance_export import resolve_columns
+
+        def _body():
+            columns, rows = resolve_columns(graph.instance_columns(label), graph.iter_instances(label))
+            yield from stream(label, columns, rows)
+
+        return current_app.response_class(
+            stream_with_context(_body()),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="instances_{label}.{fmt}"'},
+        )
+
+
+@bp.get('/graph/instances.csv')
+def api_graph_instances_csv():
+        from ...services.instance_export import csv_stream
+        return _instance_export('csv', 'text/csv', lambda label, cols, rows: csv_stream(cols, rows))
 
 
 @bp.get('/graph/instances.xlsx')
@@ -577,43 +576,15 @@ def api_graph_instances_xlsx():
             import openpyxl  # type: ignore
         except Exception:
             return jsonify({"error": "xlsx export requires openpyxl"}), 501
-        label = (request.args.get('label') or '').strip()
-        if not label:
-            return jsonify({"error": "missing label"}), 400
-        rows = _get_ext()['graph'].list_instances(label)
-        # Determine headers
-        if not rows:
-            headers = ['id']
-        else:
-            cols = set()
-            for r in rows:
-                cols.update(r.keys())
-            headers = sorted(list(cols))
-        from openpyxl import Workbook  # type: ignore
-        wb = Workbook()
-        ws = wb.active
-        ws.title = label or 'Sheet1'
-        ws.append(headers)
-        for r in rows:
-            ws.append([r.get(k, '') for k in headers])
-        import io
-        bio = io.BytesIO()
-        wb.save(bio)
-        bio.seek(0)
-        from flask import Response
-        return Response(bio.read(), mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', headers={'Content-Disposition': f'attachment; filename="instances_{label}.xlsx"'})
+        from ...services.instance_export import xlsx_stream
+        return _instance_export('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                                lambda label, cols, rows: xlsx_stream(cols, rows, title=label))
 
 
 @bp.get('/graph/instances.pkl')
 def api_graph_instances_pickle():
-        import pickle
-        label = (request.args.get('label') or '').strip()
-        if not label:
-            return jsonify({"error": "missing label"}), 400
-        rows = _get_ext()['graph'].list_instances(label)
-        payload = pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
-        from flask import Response
-        return Response(payload, mimetype='application/octet-stream', headers={'Content-Disposition': f'attachment; filename="instances_{label}.pkl"'})
+        from ...services.instance_export import pickle_stream
+        return _instance_export('pkl', 'application/octet-stream', lambda label, cols, rows: pickle_stream(rows))
 
 
 @bp.get('/graph/instances.arrow')
@@ -623,26 +594,20 @@ def api_graph_instances_arrow():
             import pyarrow.ipc as pa_ipc  # type: ignore
         except Exception:
             return jsonify({"error": "arrow export requires pyarrow"}), 501
-        label = (request.args.get('label') or '').strip()
-        if not label:
-            return jsonify({"error": "missing label"}), 400
-        rows = _get_ext()['graph'].list_instances(label)
-        # Normalize rows to a table (handle missing keys by union of columns)
-        cols = set()
-        for r in rows:
-            cols.update(r.keys())
-        cols = sorted(list(cols)) if rows else ['id']
-        arrays = {c: [] for c in cols}
-        for r in rows:
-            for c in cols:
-                arrays[c].append(r.get(c))
-        table = pa.table({c: pa.array(arrays[c]) for c in cols})
-        sink = pa.BufferOutputStream()
-        with pa_ipc.new_stream(sink, table.schema) as writer:
-            writer.write_table(table)
-        buf = sink.getvalue()
-        from flask import Response
-        return Response(buf.to_pybytes(), mimetype='application/vnd.apache.arrow.stream', headers={'Content-Disposition': f'attachment; filename="instances_{label}.arrow"'})
+        from ...services.instance_export import arrow_stream
+        return _instance_export('arrow', 'application/vnd.apache.arrow.stream',
+                                lambda label, cols, rows: arrow_stream(cols, rows))
+
+
+@bp.get('/graph/instances.parquet')
+def api_graph_instances_parquet():
+        try:
+            import pyarrow.parquet as pq  # type: ignore
+        except Exception:
+            return jsonify({"error": "parquet export requires pyarrow"}), 501
+        from ...services.instance_export import parquet_stream
+        return _instance_export('parquet', 'application/vnd.apache.parquet',
+                                lambda label, cols, rows: parquet_stream(cols, rows))
 
 
 @bp.get('/graph/schema.neo4j')
@@ -653,12 +618,13 @@ def api_graph_schema_neo4j():
             return jsonify({"error": "neo4j not configured (set in Settings or env: NEO4J_URI, and NEO4J_USER/NEO4J_PASSWORD or NEO4J_AUTH=none)"}), 501
         try:
             from neo4j import GraphDatabase  # type: ignore
+            from ...services.neo4j_drivers import shared_driver
         except Exception:
             return jsonify({"error": "neo4j driver not installed"}), 501
         try:
             driver = None
             try:
-                driver = GraphDatabase.driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
+                driver = shared_driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
                 with driver.session(database=database) as sess:
                     # Node label counts
                     q_nodes = "MATCH (n) WITH head(labels(n)) AS l, count(*) AS c RETURN l AS label, c ORDER BY c DESC"
@@ -689,12 +655,13 @@ def api_graph_schema_apoc():
             return jsonify({"error": "neo4j not configured (set in Settings or env: NEO4J_URI, and NEO4J_USER/NEO4J_PASSWORD or NEO4J_AUTH=none)"}), 501
         try:
             from neo4j import GraphDatabase  # type: ignore
+            from ...services.neo4j_drivers import shared_driver
         except Exception:
             return jsonify({"error": "neo4j driver not installed"}), 501
         try:
             driver = None
             try:
-                driver = GraphDatabase.driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
+                driver = shared_driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
                 with driver.session(database=database) as sess:
                     # Use apoc.meta.data() to derive nodes and edges
                     # Relationship triples aggregation
@@ -834,37 +801,62 @@ def api_files():
             return jsonify({'error': str(e)}), 500
 
 
+def _float_arg(name: str) -> Optional[float]:
+        v = request.args.get(name)
+        if v is None or v == '':
+            return None
+        return float(v)
+
+
 @bp.get('/search')
 def api_search():
+        """Dataset search (see core.search_index).
+
+        Query params: q (substring of filename, path or interpreter id), ext (comma-separated),
+        interpreter, min_size, max_size, modified_after, modified_before (epoch seconds),
+        limit (default 100, max 1000), offset. Returns a list of results; X-Next-Offset is set
+        when more results follow, X-Search-Truncated when only the first
+        SCIDK_SEARCH_MAX_CANDIDATES matches were ranked.
+        """
         q = (request.args.get('q') or '').strip()
-        if not q:
+        exts = [e for e in (request.args.get('ext') or '').split(',') if e.strip()]
+        interpreter = (request.args.get('interpreter') or '').strip() or None
+        try:
+            min_size = _float_arg('min_size')
+            max_size = _float_arg('max_size')
+            modified_after = _float_arg('modified_after')
+            modified_before = _float_arg('modified_before')
+            limit = max(1, min(int(request.args.get('limit') or 100), 1000))
+            offset = max(0, int(request.args.get('offset') or 0))
+        except ValueError:
+            return jsonify({'error': 'invalid numeric parameter'}), 400
+        if not q and not (exts or interpreter or min_size is not None or max_size is not None
+                          or modified_after is not None or modified_before is not None):
             return jsonify([]), 200
-        q_lower = q.lower()
-        results = []
-        for ds in _get_ext()['graph'].list_datasets():
-            matched_on = []
-            # Match filename
-            if q_lower in (ds.get('filename') or '').lower() or q_lower in (ds.get('path') or '').lower():
-                matched_on.append('filename')
-            # Match interpreter ids present
-            interps = (ds.get('interpretations') or {})
-            for interp_id in interps.keys():
-                if q_lower in interp_id.lower():
-                    if 'interpreter_id' not in matched_on:
-                        matched_on.append('interpreter_id')
-            if matched_on:
-                results.append({
-                    'id': ds.get('id'),
-                    'path': ds.get('path'),
-                    'filename': ds.get('filename'),
-                    'extension': ds.get('extension'),
-                    'matched_on': matched_on,
-                })
-        # Simple ordering: filename matches first, then interpreter_id
-        def score(r):
-            return (0 if 'filename' in r['matched_on'] else 1, r['filename'] or '')
-        results.sort(key=score)
-        return jsonify(results), 200
+        import time as _t
+        from ...core import path_index_sqlite as pix, search_index
+        t0 = _t.perf_counter()
+        search_index.sync_graph(_get_ext()['graph'])
+        conn = pix.connect(readonly=True)
+        try:
+            pix.init_db(conn)
+            results, more, truncated = search_index.search(
+                conn, q, extensions=exts, interpreter=interpreter, min_size=min_size, max_size=max_size,
+                modified_after=modified_after, modified_before=modified_before, limit=limit, offset=offset,
+            )
+        finally:
+            conn.close()
+        try:
+            from ...services.metrics import record_latency
+            record_latency(current_app, 'search', _t.perf_counter() - t0)
+        except Exception:
+            pass
+        resp = jsonify(results)
+        if more:
+            resp.headers['X-Next-Offset'] = str(offset + limit)
+        if truncated:
+            resp.headers['X-Search-Truncated'] = '1'
+        return resp, 200
 
 
 @bp.post('/ro-crates/referenced')
@@ -1025,6 +1025,7 @@ def transfer_label_to_primary(name):
     - batch_size: Number of instances to process per batch (default: 100)
     - mode: Transfer mode - 'nodes_only' or 'nodes_and_outgoing' (default: 'nodes_and_outgoing')
     - create_missing_targets: Auto-create target nodes if they don't exist (default: false)
+    - resume: Continue a cancelled transfer from its last checkpoint (default: true)
 
     Returns:
     {
@@ -1041,12 +1042,14 @@ def transfer_label_to_primary(name):
         batch_size = int(request.args.get('batch_size', 100))
         mode = request.args.get('mode', 'nodes_and_outgoing')
         create_missing_targets = request.args.get('create_missing_targets', 'false').lower() == 'true'
+        resume = request.args.get('resume', 'true').lower() != 'false'
 
         result = service.transfer_to_primary(
             name,
             batch_size=batch_size,
             mode=mode,
-            create_missing_targets=create_missing_targets
+            create_missing_targets=create_missing_targets,
+            resume=resume
         )
 
         if result.get('status') == 'error':
@@ -75,25 +75,18 @@ def api_scan_commit(scan_id):
             use_index = (os.environ.get('SCIDK_COMMIT_FROM_INDEX') or '').strip().lower() in ('1','true','yes','y','on')
             g = _get_ext()['graph']
             if use_index:
-                # Build rows directly from SQLite index for this scan using shared builder
-                from ...core.commit_rows_from_index import build_rows_for_scan_from_index
-                rows, folder_rows = build_rows_for_scan_from_index(scan_id, s, include_hierarchy=True)
-                # Debug: first 10 mappings from index
-                try:
-                    current_app.logger.debug({
-                        "event": "index_mapping_debug",
-                        "sample_files": [{"path": r.get("path"), "folder": r.get("folder")} for r in (rows[:10] if rows else [])],
-                        "sample_folders": [{"path": r.get("path"), "parent": r.get("parent")} for r in (folder_rows[:10] if folder_rows else [])]
-                    })
-                except Exception:
-                    pass
+                # Stream rows directly from the SQLite index for this scan (read in chunks per commit phase)
+                from ...core.commit_rows_from_index import IndexRowSource
+                source = IndexRowSource(scan_id, s, include_hierarchy=True,
+                                        chunk_size=int(os.environ.get('SCIDK_NEO4J_FILE_BATCH') or 5000))
+                rows, folder_rows = source.files, source.folders
                 # For compatibility with schema endpoint, still add a Scan node to in-memory graph
                 try:
                     g.commit_scan(s)
                 except Exception:
                     pass
                 # Totals for reporting
-                total = len([r for r in rows if r.get('path')])
+                total = source.count_files()
                 present = total  # index-driven commit considers all indexed files as present
                 missing = 0
                 s['committed'] = True
@@ -122,6 +115,7 @@ def api_scan_commit(scan_id):
             db_verified = None
             db_files = 0
             db_folders = 0
+            neo_result = None
             uri, user, pwd, database, auth_mode = get_neo4j_params()
             if uri and ((auth_mode == 'none') or (user and pwd)):
                 neo_attempted = True
@@ -159,6 +153,7 @@ def api_scan_commit(scan_id):
                             max_retries=2,
                             on_progress=_neo4j_progress_default,
                         )
+                    neo_result = result
                     neo_written = int(result.get('written_files', 0)) + int(result.get('written_folders', 0))
                     # Capture DB verification if provided
                     if 'db_verified' in result:
@@ -195,11 +190,13 @@ def api_scan_commit(scan_id):
             }
             # Diagnostics about commit path and row counts
             if use_index:
-                try:
-                    payload["neo4j_rows_files"] = len(rows)
-                    payload["neo4j_rows_folders"] = len(folder_rows)
-                except Exception:
-                    pass
+                payload["neo4j_rows_files"] = total
+                if neo_result:
+                    payload["neo4j_rows_folders"] = int(neo_result.get('written_folders') or 0)
+                    if neo_result.get('phase_sec'):
+                        payload["neo4j_commit_sec"] = neo_result.get('sec')
+                        payload["neo4j_commit_rows_per_sec"] = neo_result.get('rows_per_sec')
+                        payload["neo4j_commit_phase_sec"] = neo_result.get('phase_sec')
             if neo_error:
                 payload["neo4j_error"] = neo_error
             # Add user-facing warnings
@@ -243,6 +240,7 @@ def api_settings_neo4j_get():
 def api_settings_neo4j_set():
         data = request.get_json(force=True, silent=True) or {}
         cfg = _get_ext().setdefault('neo4j_config', {})
+        previous = (cfg.get('uri'), cfg.get('user'), cfg.get('password'))
 
         # Accept free text fields for uri, user, database
         for k in ['uri','user','database']:
@@ -280,6 +278,18 @@ def api_settings_neo4j_set():
         except Exception as e:
             current_app.logger.warning(f"Failed to persist Neo4j settings: {e}")
 
+        # Drop pooled drivers built with the old connection settings
+        if previous != (cfg.get('uri'), cfg.get('user'), cfg.get('password')) and previous[0]:
+            try:
+                from ...services.neo4j_drivers import get_driver_registry
+                from ...services.schema_stats import get_schema_stats_service
+                from ...ai.schema_context import invalidate_schema_cache
+                get_driver_registry().invalidate(previous[0])
+                get_schema_stats_service().invalidate(previous[0])
+                invalidate_schema_cache(uri=previous[0])
+            except Exception:
+                pass
+
         # Reset state error on change
         st = _get_ext().setdefault('neo4j_state', {})
         st['last_error'] = None
@@ -297,6 +307,7 @@ def api_settings_neo4j_connect():
             return jsonify({'connected': False, 'error': st['last_error']}), 400
         try:
             from neo4j import GraphDatabase  # type: ignore
+            from ...services.neo4j_drivers import shared_driver
         except Exception as e:
             st['last_error'] = f'neo4j driver not installed: {e}'
             return jsonify({'connected': False, 'error': st['last_error']}), 501
@@ -310,7 +321,7 @@ def api_settings_neo4j_connect():
         try:
             driver = None
             try:
-                driver = GraphDatabase.driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
+                driver = shared_driver(uri, auth=None if auth_mode == 'none' else (user, pwd))
                 with driver.session(database=database) as sess:
                     rec = sess.run('RETURN 1 AS ok').single()
                     ok = bool(rec and rec.get('ok') == 1)
@@ -350,6 +361,17 @@ def api_settings_neo4j_connect():
 def api_settings_neo4j_disconnect():
         st = _get_ext().setdefault('neo4j_state', {})
         st['connected'] = False
+        try:
+            from ...services.neo4j_drivers import get_driver_registry
+            uri = (_get_ext().get('neo4j_config') or {}).get('uri')
+            if uri:
+                from ...services.schema_stats import get_schema_stats_service
+                from ...ai.schema_context import invalidate_schema_cache
+                get_driver_registry().invalidate(uri)
+                get_schema_stats_service().invalidate(uri)
+                invalidate_schema_cache(uri=uri)
+        except Exception:
+            pass
         return jsonify({'connected': False}), 200
 
 
@@ -390,6 +412,18 @@ def api_neo4j_profiles_list():
         return jsonify({'status': 'error', 'error': str(e)}), 500
 
 
+def _invalidate_profile_drivers(profile_key):
+    """Retire pooled drivers for a profile's currently saved URI before it is changed or removed."""
+    try:
+        from ...core.settings import get_setting
+        from ...services.neo4j_drivers import get_driver_registry
+        old = json.loads(get_setting(profile_key) or '{}')
+        if old.get('uri'):
+            get_driver_registry().invalidate(old['uri'])
+    except Exception:
+        pass
+
+
 @bp.post('/settings/neo4j/profiles')
 def api_neo4j_profile_save():
     """Save a Neo4j connection profile with role."""
@@ -417,6 +451,7 @@ def api_neo4j_profile_save():
 
         # Use underscores in key to make it a valid setting key
         profile_key = f'neo4j_profile_{name.replace(" ", "_")}'
+        _invalidate_profile_drivers(profile_key)
         set_setting(profile_key, json.dumps(profile_data))
 
         # Store password separately if provided
@@ -437,6 +472,7 @@ def api_neo4j_profile_delete(name):
 
         # Delete profile data
         profile_key = f'neo4j_profile_{name.replace(" ", "_")}'
+        _invalidate_profile_drivers(profile_key)
         set_setting(profile_key, '')
 
         # Delete password
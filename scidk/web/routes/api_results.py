@@ -33,6 +33,7 @@ def get_schema_summary():
     try:
         from scidk.services.neo4j_client import get_neo4j_params
         from neo4j import GraphDatabase
+        from ...services.neo4j_drivers import shared_driver
 
         # Get Neo4j connection
         uri, user, pwd, database, auth_mode = get_neo4j_params(current_app)
@@ -49,7 +50,7 @@ def get_schema_summary():
             })
 
         auth = None if auth_mode == 'none' else (user, pwd)
-        driver = GraphDatabase.driver(uri, auth=auth)
+        driver = shared_driver(uri, auth=auth)
 
         try:
             with driver.session(database=database) as session:
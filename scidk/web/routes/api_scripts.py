@@ -51,6 +51,7 @@ def _get_neo4j_driver_and_database():
     try:
         from scidk.services.neo4j_client import get_neo4j_params
         from neo4j import GraphDatabase
+        from ...services.neo4j_drivers import shared_driver
 
         uri, user, pwd, database, auth_mode = get_neo4j_params(current_app)
 
@@ -61,7 +62,7 @@ def _get_neo4j_driver_and_database():
         auth = None if auth_mode == 'none' else (user, pwd)
 
         # Create and return driver
-        driver = GraphDatabase.driver(uri, auth=auth)
+        driver = shared_driver(uri, auth=auth)
         return driver, database
 
     except Exception as e:
@@ -11,6 +11,8 @@ import requests
 import os
 from jsonpath_ng import parse as jsonpath_parse
 
+from ...core import sqlite_pool
+
 bp = Blueprint('settings', __name__, url_prefix='/api')
 
 
@@ -903,7 +905,7 @@ def get_auto_lock_config():
     try:
         settings_db = current_app.config.get('SCIDK_SETTINGS_DB', 'scidk_settings.db')
         import sqlite3
-        conn = sqlite3.connect(settings_db)
+        conn = sqlite_pool.connect(settings_db)
         cur = conn.execute(
             """
             SELECT value FROM settings
@@ -920,7 +922,7 @@ def get_auto_lock_config():
 
         # Parse settings (stored as key-value pairs)
         settings_dict = {}
-        conn = sqlite3.connect(settings_db)
+        conn = sqlite_pool.connect(settings_db)
         cur = conn.execute("SELECT key, value FROM settings")
         for row in cur.fetchall():
             settings_dict[row[0]] = row[1]
@@ -1001,7 +1003,7 @@ def update_auto_lock_config():
         # Save settings
         settings_db = current_app.config.get('SCIDK_SETTINGS_DB', 'scidk_settings.db')
         import sqlite3
-        conn = sqlite3.connect(settings_db)
+        conn = sqlite_pool.connect(settings_db)
 
         # Create settings table if it doesn't exist
         conn.execute(
@@ -1626,7 +1628,7 @@ def get_security_overview():
             try:
                 import sqlite3
                 settings_db = current_app.config.get('SCIDK_SETTINGS_DB', 'scidk_settings.db')
-                conn = sqlite3.connect(settings_db)
+                conn = sqlite_pool.connect(settings_db)
                 cur = conn.execute("SELECT COUNT(*) FROM auth_audit_log")
                 audit_event_count = cur.fetchone()[0]
                 conn.close()
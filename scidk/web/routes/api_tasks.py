@@ -18,7 +18,7 @@ def _get_ext():
 
 @bp.post('/tasks')
 def api_tasks_create():
-    """Create a background task. Supports type=scan and type=commit."""
+    """Create a background task. Supports type=scan, type=commit and type=rehash."""
     data = request.get_json(force=True, silent=True) or {}
     ttype = (data.get('type') or 'scan').strip().lower()
     import time, hashlib, threading
@@ -87,11 +87,6 @@ def api_tasks_create():
 
                     if provider_id in ('local_fs', 'mounted_fs'):
                         base = Path(path)
-                        # Estimate total: Python traversal
-                        task['status_message'] = 'Counting files...'
-                        files_list = [p for p in _get_ext()['fs']._iter_files_python(base, recursive=recursive)]
-                        task['total'] = len(files_list)
-                        task['status_message'] = f'Processing {task["total"]} files...'
                         # Build rows like api_scan, apply selection rules when provided
                         sel = (task.get('selection') or {})
                         rules = sel.get('rules') or []
@@ -130,85 +125,70 @@ def api_tasks_create():
                                         if s and not s.startswith('#'): ignore_patterns.append(s)
                             except Exception:
                                 ignore_patterns = []
-                        items_files = []
+                        # Single traversal via the selected enumerator: one listing per directory, one stat per file.
+                        # The stat result is reused for rows and dataset creation (no resolve()/stat() later).
+                        from ...core.fs_walk import SyscallCounter
+                        from ...core.enumerators import get_enumerator
+                        enumerator = get_enumerator(data.get('enumerator') if recursive else 'python')
+                        _get_ext()['fs'].last_scan_source = enumerator.name
+                        syscalls = SyscallCounter()
+                        base_r = os.path.realpath(str(base))
+                        base_depth = len(base_r.rstrip('/').split('/'))
+                        def _depth_of(dir_r: str) -> int:
+                            return 0 if dir_r == base_r else max(0, len(dir_r.rstrip('/').split('/')) - base_depth)
+                        task['status_message'] = 'Scanning directories...'
+                        items_files = []  # (full, parent, name, depth, stat)
                         items_dirs = set()
-                        if recursive:
-                            for p in base.rglob('*'):
+                        try:
+                            for dirpath, dirnames, files in enumerator.walk(base_r, syscalls):
                                 if task.get('cancel_requested'):
                                     task['status'] = 'canceled'; task['ended'] = time.time(); return
-                                try:
-                                    if p.is_dir():
-                                        items_dirs.add(p)
-                                    else:
-                                        # selection filter on files
-                                        try:
-                                            rel = p.resolve().relative_to(base.resolve()).as_posix()
-                                        except Exception:
-                                            rel = str(p)
-                                        ignored = any(_fn(rel, pat) for pat in ignore_patterns)
-                                        ok, _ = _decide(rel, ignored)
-                                        if ok:
-                                            items_files.append(p)
-                                        parent = p.parent
-                                        while parent and parent != parent.parent and str(parent).startswith(str(base)):
-                                            items_dirs.add(parent)
-                                            if parent == base:
-                                                break
-                                            parent = parent.parent
-                                except Exception:
-                                    continue
-                            items_dirs.add(base)
-                        else:
-                            try:
-                                for p in base.iterdir():
-                                    if p.is_dir(): items_dirs.add(p)
-                                    else:
-                                        rel = p.name
-                                        ignored = any(_fn(rel, pat) for pat in ignore_patterns)
-                                        ok, _ = _decide(rel, ignored)
-                                        if ok: items_files.append(p)
-                            except Exception:
-                                pass
-                            items_dirs.add(base)
+                                items_dirs.add(dirpath)
+                                if not recursive:
+                                    for dname in dirnames:
+                                        items_dirs.add(os.path.join(dirpath, dname))
+                                    dirnames[:] = []
+                                rel_dir = '' if dirpath == base_r else os.path.relpath(dirpath, base_r).replace(os.sep, '/')
+                                depth = _depth_of(dirpath) + 1
+                                for fname, st, _regular in files:
+                                    rel = (rel_dir + '/' + fname) if rel_dir else fname
+                                    ignored = any(_fn(rel, pat) for pat in ignore_patterns)
+                                    ok, _ = _decide(rel, ignored)
+                                    if ok:
+                                        items_files.append((os.path.join(dirpath, fname), dirpath, fname, depth, st))
+                        except Exception:
+                            pass
+                        items_dirs.add(base_r)
+                        task['total'] = len(items_files)
+                        task['status_message'] = f'Processing {task["total"]} files...'
                         # Map to rows
-                        def _row_from_local(pth: Path, typ: str) -> tuple:
-                            full = str(pth.resolve())
-                            parent = str(pth.parent.resolve()) if pth != pth.parent else ''
-                            name = pth.name or full
-                            depth = 0 if pth == base else max(0, len(str(pth.resolve()).rstrip('/').split('/')) - len(str(base.resolve()).rstrip('/').split('/')))
-                            size = 0; mtime = None; ext = ''; mime = None
-                            if typ == 'file':
-                                try:
-                                    st = pth.stat(); size = int(st.st_size); mtime = float(st.st_mtime)
-                                except Exception:
-                                    size = 0; mtime = None
-                                ext = pth.suffix.lower()
-                            remote = f"local:{os.uname().nodename}" if provider_id == 'local_fs' else f"mounted:{root_id}"
-                            return (full, parent, name, depth, typ, size, mtime, ext, mime, None, None, remote, scan_id, None)
+                        remote = f"local:{os.uname().nodename}" if provider_id == 'local_fs' else f"mounted:{root_id}"
+                        rows = []
+                        for d in sorted(items_dirs):
+                            parent = os.path.dirname(d) if d != '/' else ''
+                            rows.append((d, parent, os.path.basename(d) or d, _depth_of(d), 'folder', 0, None, '', None, None, None, remote, scan_id, None))
+                        for full, parent, fname, depth, st in items_files:
+                            size = int(st.st_size) if st is not None else 0
+                            mtime = float(st.st_mtime) if st is not None else None
+                            rows.append((full, parent, fname, depth, 'file', size, mtime, os.path.splitext(fname)[1].lower(), None, None, None, remote, scan_id, None))
+                        ingested = pix.batch_insert_files(rows)
                         rows = []
-                        for d in sorted(items_dirs, key=lambda x: str(x)):
-                            rows.append(_row_from_local(d, 'folder'))
-                        for fpath in items_files:
-                            rows.append(_row_from_local(fpath, 'file'))
-                        # dedupe
                         try:
-                            seen = set(); uniq = []
-                            for r in rows:
-                                key = (r[0], r[4])
-                                if key in seen: continue
-                                seen.add(key); uniq.append(r)
-                            rows = uniq
+                            pix.finalize_versioned_scan(scan_id, base_r, recursive=bool(recursive))
                         except Exception:
                             pass
-                        ingested = pix.batch_insert_files(rows)
-                        # In-memory datasets and progress
+                        # In-memory datasets and progress; unchanged files reuse their cached digest
+                        from ...core.hash_cache import HashCache
+                        verify = bool(data.get('verify')) or (os.environ.get('SCIDK_HASH_VERIFY') or '').strip().lower() in ('1','true','yes','y','on')
+                        hash_cache = HashCache(verify=verify)
                         processed = 0
                         eta_window_start = time.time()
-                        for fpath in items_files:
+                        for full, _parent, _fname, _depth, st in items_files:
                             if task.get('cancel_requested'):
+                                hash_cache.close()
                                 task['status'] = 'canceled'; task['ended'] = time.time(); return
                             try:
-                                ds = _get_ext()['fs'].create_dataset_node(fpath)
+                                ds = _get_ext()['fs'].create_dataset_node(Path(full), stat_result=st, hash_cache=hash_cache)
                                 current_app.extensions['scidk']['graph'].upsert_dataset(ds)
                             except Exception:
                                 pass
@@ -224,13 +204,14 @@ def api_tasks_create():
                                         task['eta_seconds'] = int(remaining / rate) if rate > 0 else None
                                         task['status_message'] = f'Processing {processed}/{task["total"]} files... ({int(rate)}/s)'
                         file_count = len(items_files)
+                        hash_cache.close()
+                        task['hash_cache'] = hash_cache.stats()
+                        syscalls.inc('open', hash_cache.misses)
+                        task['syscalls'] = syscalls.as_dict()
                         # Folders meta
                         for d in items_dirs:
-                            try:
-                                parent = str(d.parent.resolve()) if d != d.parent else ''
-                                folders_meta.append({'path': str(d.resolve()), 'name': d.name, 'parent': parent, 'parent_name': Path(parent).name if parent else ''})
-                            except Exception:
-                                continue
+                            parent = os.path.dirname(d) if d != '/' else ''
+                            folders_meta.append({'path': d, 'name': os.path.basename(d), 'parent': parent, 'parent_name': os.path.basename(parent) if parent else ''})
                         folder_count = len(items_dirs)
 
                     elif provider_id == 'rclone':
@@ -331,6 +312,10 @@ def api_tasks_create():
                                     _add_folder(full, parts[i], parent)
                         folder_count = len(seen_folders)
                         ingested = pix.batch_insert_files(rows)
+                        try:
+                            pix.finalize_versioned_scan(scan_id, path, recursive=bool(recursive))
+                        except Exception:
+                            pass
                     else:
                         raise RuntimeError(f"provider {provider_id} not supported for background scan")
 
@@ -378,6 +363,8 @@ def api_tasks_create():
                         'root_label': Path(root_id).name if root_id else None,
                         'scan_source': f"provider:{provider_id}",
                         'ingested_rows': int(ingested),
+                        'syscalls': task.get('syscalls'),
+                        'hash_cache': task.get('hash_cache'),
                         'config_json': {
                             'interpreters': {
                                 'effective_enabled': sorted(list(current_app.extensions['scidk'].get('interpreters', {}).get('effective_enabled', []))),
@@ -390,36 +377,30 @@ def api_tasks_create():
                     try:
                         from ...core import path_index_sqlite as pix
                         from ...core import migrations as _migs
-                        import json as _json
+                        from ...core import scan_members as _scan_members
                         conn = pix.connect()
                         try:
                             _migs.migrate(conn)
-                            cur = conn.cursor()
-                            cur.execute(
-                                "INSERT OR REPLACE INTO scans(id, root, started, completed, status, extra_json) VALUES(?,?,?,?,?,?)",
-                                (
-                                    scan_id,
-                                    str(path),
-                                    float(started_ts or 0.0),
-                                    float(ended or 0.0),
-                                    'completed',
-                                    _json.dumps({
-                                        'recursive': bool(recursive),
-                                        'duration_sec': ended - started_ts,
-                                        'file_count': int(file_count),
-                                        'by_ext': by_ext,
-                                        'source': scan.get('source'),
-                                        'checksums': new_checksums,
-                                        'committed': False,
-                                        'committed_at': None,
-                                        'provider_id': provider_id,
-                                        'root_id': root_id,
-                                        'host_type': host_type,
-                                        'host_id': host_id,
-                                        'root_label': scan.get('root_label'),
-                                        'selection': (task.get('selection') or {}),
-                                    })
-                                )
+                            _scan_members.save_scan(
+                                conn, scan_id, str(path), started_ts, ended, 'completed',
+                                {
+                                    'recursive': bool(recursive),
+                                    'duration_sec': ended - started_ts,
+                                    'file_count': int(file_count),
+                                    'by_ext': by_ext,
+                                    'source': scan.get('source'),
+                                    'committed': False,
+                                    'committed_at': None,
+                                    'provider_id': provider_id,
+                                    'root_id': root_id,
+                                    'host_type': host_type,
+                                    'host_id': host_id,
+                                    'root_label': scan.get('root_label'),
+                                    'selection': (task.get('selection') or {}),
+                                    'syscalls': task.get('syscalls'),
+                                    'hash_cache': task.get('hash_cache'),
+                                },
+                                new_checksums,
                             )
                             conn.commit()
                         finally:
@@ -553,16 +534,24 @@ def api_tasks_create():
                     task['status_message'] = 'Building commit rows...'
                     use_index = (os.environ.get('SCIDK_COMMIT_FROM_INDEX') or '').strip().lower() in ('1','true','yes','y','on')
                     if use_index:
-                        from ...core.commit_rows_from_index import build_rows_for_scan_from_index
-                        rows, folder_rows = build_rows_for_scan_from_index(scan_id, s, include_hierarchy=True)
+                        # Stream rows from the SQLite index in chunks, once per commit phase
+                        from ...core.commit_rows_from_index import IndexRowSource
+                        source = IndexRowSource(scan_id, s, include_hierarchy=True,
+                                                chunk_size=int(os.environ.get('SCIDK_NEO4J_FILE_BATCH') or 5000))
+                        rows, folder_rows = source.files, source.folders
+                        n_files, n_folders = source.count_files(), None
                     else:
                         ds_map = getattr(g, 'datasets', {})
                         rows, folder_rows = build_commit_rows(s, ds_map)
+                        n_files, n_folders = len(rows), len(folder_rows)
                     # Update progress for the file-processing phase
                     task['processed'] = total
                     if total:
                         task['progress'] = total / (task.get('total') or (total + 1))
-                    task['status_message'] = f'Built commit rows: {len(rows)} files, {len(folder_rows)} folders'
+                    if n_folders is None:
+                        task['status_message'] = f'Streaming commit rows from index: {n_files} files'
+                    else:
+                        task['status_message'] = f'Built commit rows: {n_files} files, {n_folders} folders'
                     # Allow cancel before Neo4j step
                     if task.get('cancel_requested'):
                         task['status'] = 'canceled'
@@ -576,6 +565,8 @@ def api_tasks_create():
                             current_app.logger.info(f"neo4j {e}: {p}")
                         except Exception:
                             pass
+                        if e == 'phase_done':
+                            task['status_message'] = f"Writing to Neo4j: {p.get('phase')} done ({p.get('items')} in {p.get('sec')}s)"
                     if current_app.config.get('TESTING'):
                         result = commit_to_neo4j(rows, folder_rows, s, (uri, user, pwd, database, auth_mode))
                     else:
@@ -594,6 +585,13 @@ def api_tasks_create():
                     if result['error']:
                         task['neo4j_error'] = result['error']
                     task['neo4j_written'] = int(result.get('written_files', 0)) + int(result.get('written_folders', 0))
+                    if result.get('phase_sec'):
+                        task['neo4j_commit'] = {
+                            'sec': result.get('sec'),
+                            'rows_per_sec': result.get('rows_per_sec'),
+                            'phase_sec': result.get('phase_sec'),
+                            'batches_failed': result.get('batches_failed', 0),
+                        }
                     # Include DB verification results if available
                     if 'db_verified' in result:
                         task['neo4j_db_verified'] = bool(result.get('db_verified'))
@@ -614,6 +612,66 @@ def api_tasks_create():
         threading.Thread(target=_worker_commit, daemon=True).start()
         return jsonify({'task_id': task_id, 'status': 'running'}), 202
 
+    elif ttype == 'rehash':
+        # Lazily complete full SHA-256 digests for datasets identified by a sampled fingerprint
+        scan_id = (data.get('scan_id') or '').strip()
+        g = current_app.extensions['scidk']['graph']
+        if scan_id:
+            s = current_app.extensions['scidk'].setdefault('scans', {}).get(scan_id)
+            if not s:
+                return jsonify({'error': 'scan not found'}), 404
+            wanted = set(s.get('checksums') or [])
+            targets = [ds for ch, ds in g.datasets.items() if ch in wanted]
+        else:
+            targets = list(g.datasets.values())
+        targets = [ds for ds in targets if ds.get('checksum_mode') == 'sampled' and not ds.get('full_checksum')]
+        tid_src = f"rehash|{scan_id}|{started}"
+        task_id = hashlib.sha1(tid_src.encode()).hexdigest()[:12]
+        task = {
+            'id': task_id,
+            'type': 'rehash',
+            'status': 'running',
+            'scan_id': scan_id or None,
+            'started': started,
+            'ended': None,
+            'total': len(targets),
+            'processed': 0,
+            'progress': 0.0,
+            'failed': 0,
+            'error': None,
+            'cancel_requested': False,
+            'status_message': f'Hashing {len(targets)} sampled datasets...',
+        }
+        current_app.extensions['scidk'].setdefault('tasks', {})[task_id] = task
+        app = current_app._get_current_object()
+
+        def _worker_rehash():
+            with app.app_context():
+                try:
+                    from ...core.hash_cache import HashCache
+                    fs = _get_ext()['fs']
+                    hash_cache = HashCache()
+                    try:
+                        for ds in targets:
+                            if task.get('cancel_requested'):
+                                task['status'] = 'canceled'; task['ended'] = time.time(); return
+                            if not fs.complete_sampled_checksum(ds, hash_cache=hash_cache):
+                                task['failed'] += 1
+                            task['processed'] += 1
+                            task['progress'] = task['processed'] / (task['total'] or 1)
+                    finally:
+                        hash_cache.close()
+                    task['ended'] = time.time()
+                    task['status'] = 'completed'
+                    task['progress'] = 1.0
+                    task['status_message'] = f"Completed {task['processed'] - task['failed']}/{task['total']} full hashes"
+                except Exception as e:
+                    task['ended'] = time.time()
+                    task['status'] = 'error'
+                    task['error'] = str(e)
+        threading.Thread(target=_worker_rehash, daemon=True).start()
+        return jsonify({'task_id': task_id, 'status': 'running'}), 202
+
     else:
         return jsonify({"error": "unsupported task type"}), 400
 
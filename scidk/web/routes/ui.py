@@ -269,30 +269,22 @@ def ui_scan():
     try:
         from ...core import path_index_sqlite as pix
         from ...core import migrations as _migs
-        import json as _json
+        from ...core import scan_members as _scan_members
         conn = pix.connect()
         try:
             _migs.migrate(conn)
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT OR REPLACE INTO scans(id, root, started, completed, status, extra_json) VALUES(?,?,?,?,?,?)",
-                (
-                    scan_id,
-                    str(path),
-                    float(started or 0.0),
-                    float(ended or 0.0),
-                    'completed',
-                    _json.dumps({
-                        'recursive': bool(recursive),
-                        'duration_sec': duration,
-                        'file_count': int(count),
-                        'by_ext': by_ext,
-                        'source': getattr(fs, 'last_scan_source', 'python'),
-                        'checksums': new_checksums,
-                        'committed': bool(scan.get('committed', False)),
-                        'committed_at': scan.get('committed_at'),
-                    })
-                )
+            _scan_members.save_scan(
+                conn, scan_id, str(path), started, ended, 'completed',
+                {
+                    'recursive': bool(recursive),
+                    'duration_sec': duration,
+                    'file_count': int(count),
+                    'by_ext': by_ext,
+                    'source': getattr(fs, 'last_scan_source', 'python'),
+                    'committed': bool(scan.get('committed', False)),
+                    'committed_at': scan.get('committed_at'),
+                },
+                new_checksums,
             )
             conn.commit()
         finally:
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local scan enumerator backends (scidk.core.enumerators).
+
+This script:
+- Builds a synthetic tree (--dirs directories x --files files each) in a temp dir, or uses --path
+- Times the python (os.scandir) backend walking the tree
+- Writes an ncdu-format export of the same tree and times the streaming JSON parser on it
+  (the parse cost every ncdu/gdu scan pays on top of the tool's own walk)
+- Times the real ncdu/gdu backends end-to-end when the binaries are on PATH
+
+Usage examples:
+  python scripts/bench_enumerators.py
+  python scripts/bench_enumerators.py --dirs 500 --files 200
+  python scripts/bench_enumerators.py --path /data/project --repeat 3
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Ensure project root on sys.path
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from scidk.core.enumerators import ENUMERATORS, parse_ncdu_export
+
+
+def build_tree(base: str, dirs: int, files: int) -> None:
+    for d in range(dirs):
+        sub = os.path.join(base, f"d{d // 50:03d}", f"s{d:05d}")
+        os.makedirs(sub, exist_ok=True)
+        for f in range(files):
+            with open(os.path.join(sub, f"f{f:05d}.dat"), 'wb') as fh:
+                fh.write(b'x' * (f % 64))
+
+
+def write_ncdu_export(root: str, out_path: str) -> None:
+    """Write an ncdu-format export of root (same shape ncdu -e -o / gdu -o produce)."""
+    def node(path: str, name: str):
+        st = os.stat(path)
+        entry = [{'name': name, 'asize': st.st_size, 'dev': st.st_dev, 'ino': st.st_ino, 'mtime': int(st.st_mtime)}]
+        with os.scandir(path) as it:
+            for ent in it:
+                if ent.is_dir(follow_symlinks=False):
+                    entry.append(node(ent.path, ent.name))
+                else:
+                    s = ent.stat(follow_symlinks=False)
+                    entry.append({'name': ent.name, 'asize': s.st_size, 'ino': s.st_ino, 'mtime': int(s.st_mtime)})
+        return entry
+    with open(out_path, 'w', encoding='utf-8') as fh:
+        json.dump([1, 2, {'progname': 'scidk-bench', 'progver': '1'}, node(root, root)], fh)
+
+
+def _time(fn, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def _count(frames) -> int:
+    return sum(len(files) for _, _, files in frames)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--path', help='Existing directory to enumerate (default: synthetic tree)')
+    ap.add_argument('--dirs', type=int, default=200)
+    ap.add_argument('--files', type=int, default=100)
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='scidk-enum-bench-') as tmp:
+        root = os.path.realpath(args.path) if args.path else os.path.join(tmp, 'tree')
+        if not args.path:
+            build_tree(root, args.dirs, args.files)
+        export = os.path.join(tmp, 'export.json')
+        write_ncdu_export(root, export)
+
+        results = []
+        dt, n = _time(lambda: _count(ENUMERATORS['python'].walk(root)), args.repeat)
+        results.append(('python (scandir walk)', n, dt))
+
+        def _parse():
+            with open(export, 'rb') as fh:
+                return _count(parse_ncdu_export(fh))
+        dt, n = _time(_parse, args.repeat)
+        results.append(('ncdu/gdu export parse only', n, dt))
+
+        for name in ('ncdu', 'gdu'):
+            enum = ENUMERATORS[name]
+            if enum.available():
+                dt, n = _time(lambda: _count(enum.walk(root)), args.repeat)
+                results.append((f"{name} (end-to-end)", n, dt))
+            else:
+                results.append((f"{name} (end-to-end)", None, None))
+
+    print(f"{'backend':<30} {'files':>10} {'seconds':>10} {'files/s':>12}")
+    for label, n, dt in results:
+        if dt is None:
+            print(f"{label:<30} {'-':>10} {'-':>10} {'not installed':>12}")
+        else:
+            print(f"{label:<30} {n:>10} {dt:>10.3f} {n / dt if dt else 0:>12.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark client-side fuzzy matching (FuzzyMatchingService.match_external_data).
+
+This script:
+- Generates synthetic sample IDs (--targets existing nodes) and external records (--records),
+  most of them copies of existing IDs with 0-3 random edits, the rest unrelated IDs
+- Times match_external_data (indexed candidate generation + cdist scoring)
+- Times the pairwise reference scorer on a subsample (--check records) against all targets,
+  reports its projected full runtime and verifies the indexed matcher finds the same
+  matches (recall@threshold) with the same confidence on that subsample
+
+Usage examples:
+  python scripts/bench_fuzzy_matching.py
+  python scripts/bench_fuzzy_matching.py --targets 500000 --records 50000 --check 100
+  python scripts/bench_fuzzy_matching.py --algorithm jaro_winkler --threshold 0.9
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Ensure project root on sys.path
+ROOT = os.path.dirname(os.path.dirname(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from scidk.core.fuzzy_matching import FuzzyMatchingService, FuzzyMatchSettings
+
+ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ0123456789'
+
+
+def sample_id(rng: random.Random) -> str:
+    prefix = rng.choice(['SAMPLE', 'SMP', 'S', 'PATIENT', 'BIOPSY'])
+    return f"{prefix}-{rng.randint(0, 999999):06d}-{''.join(rng.choice(ALPHABET) for _ in range(rng.randint(2, 5)))}"
+
+
+def mutate(value: str, rng: random.Random) -> str:
+    chars = list(value)
+    for _ in range(rng.randint(0, 3)):
+        op = rng.random()
+        i = rng.randrange(len(chars))
+        if op < 0.33 and len(chars) > 1:
+            del chars[i]
+        elif op < 0.66:
+            chars.insert(i, rng.choice(ALPHABET))
+        else:
+            chars[i] = rng.choice(ALPHABET)
+    return ''.join(chars)
+
+
+def reference_match(service, value, targets, nodes, settings):
+    """The pairwise scan match_external_data performed before the candidate index."""
+    from rapidfuzz import fuzz
+    best, best_conf = None, 0.0
+    for i, t in enumerate(targets):
+        conf = service._compute_similarity(value, t, settings.algorithm, fuzz)
+        if conf > best_conf:
+            best, best_conf = i, conf
+    return (nodes[best], best_conf) if best is not None and best_conf >= settings.threshold else (None, None)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--targets', type=int, default=100000)
+    ap.add_argument('--records', type=int, default=10000)
+    ap.add_argument('--noise', type=float, default=0.2, help='fraction of records unrelated to any target')
+    ap.add_argument('--algorithm', default='levenshtein', choices=['levenshtein', 'jaro_winkler'])
+    ap.add_argument('--threshold', type=float, default=0.85)
+    ap.add_argument('--max-comparisons', type=int, default=0, help='per-value candidate cap (0 = unlimited)')
+    ap.add_argument('--check', type=int, default=50, help='records verified against the pairwise scan')
+    ap.add_argument('--seed', type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    ids = list(dict.fromkeys(sample_id(rng) for _ in range(args.targets)))
+    nodes = [{'sample_id': v, 'id': i} for i, v in enumerate(ids)]
+    records = [
+        {'sample_id': sample_id(rng) if rng.random() < args.noise else mutate(rng.choice(ids), rng)}
+        for _ in range(args.records)
+    ]
+    settings = FuzzyMatchSettings(algorithm=args.algorithm, threshold=args.threshold,
+                                  max_comparisons=args.max_comparisons, strip_punctuation=False)
+
+    with tempfile.TemporaryDirectory(prefix='scidk-fuzzy-bench-') as tmp:
+        service = FuzzyMatchingService(os.path.join(tmp, 'settings.db'))
+        t0 = time.perf_counter()
+        matches = service.match_external_data(records, nodes, 'sample_id', settings)
+        indexed_sec = time.perf_counter() - t0
+        stats = service.last_match_stats
+
+        targets = [service._normalize_string(n['sample_id'], settings) for n in nodes]
+        checked = rng.sample(range(len(records)), min(args.check, len(records)))
+        t0 = time.perf_counter()
+        mismatches = 0
+        for pos in checked:
+            value = service._normalize_string(records[pos]['sample_id'], settings)
+            node, conf = reference_match(service, value, targets, nodes, settings)
+            got = matches[pos]
+            if (node is None) != (not got['is_match']) or (node is not None and (got['matched_node'] is not node or abs(conf - got['confidence']) > 1e-9)):
+                mismatches += 1
+        ref_sec = (time.perf_counter() - t0) / max(1, len(checked)) * len(records)
+
+    pairs = len(records) * len(nodes)
+    print(f"targets={len(nodes)} records={len(records)} algorithm={args.algorithm} threshold={args.threshold}")
+    print(f"{'matcher':<28} {'seconds':>10} {'comparisons':>14}")
+    print(f"{'indexed (candidates+cdist)':<28} {indexed_sec:>10.2f} {stats.get('comparisons', 0):>14}")
+    print(f"{'pairwise scan (projected)':<28} {ref_sec:>10.2f} {pairs:>14}")
+    print(f"matched={sum(1 for m in matches if m['is_match'])} truncated={stats.get('truncated', 0)} "
+          f"verified={len(checked)} mismatches={mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Tests for the shared AuthManager instance, auth state cache and batched last_activity writes."""
+import sqlite3
+
+import pytest
+
+from scidk.core import auth as auth_mod
+from scidk.core.auth import AuthManager, get_auth_manager
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.setenv('SCIDK_AUTH_CACHE_TTL_SEC', '300')
+    monkeypatch.setenv('SCIDK_AUTH_ACTIVITY_FLUSH_SEC', '300')
+    path = str(tmp_path / 'settings.db')
+    yield path
+    mgr = auth_mod._MANAGERS.pop(auth_mod._db_key(path), None)
+    if mgr is not None:
+        mgr.close()
+    auth_mod._CACHES.pop(auth_mod._db_key(path), None)
+
+
+class _CountingConnection:
+    """Wraps a sqlite3 connection and counts statements executed through it."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.calls = 0
+
+    def execute(self, *args, **kwargs):
+        self.calls += 1
+        return self.conn.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+def _last_activity(db_path, token):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT last_activity FROM auth_sessions WHERE token = ?", (token,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_get_auth_manager_is_a_singleton_per_database(db_path):
+    first = get_auth_manager(db_path=db_path)
+    assert get_auth_manager(db_path=db_path) is first
+    first.close()
+    second = get_auth_manager(db_path=db_path)
+    assert second is not first and not second._closed
+
+
+def test_cached_request_does_no_sqlite_io(db_path):
+    auth = get_auth_manager(db_path=db_path)
+    uid = auth.create_user('alice', 'pw', role='admin')
+    token = auth.create_user_session(uid, 'alice')
+
+    # Warm the cache, then count statements for a typical authenticated request
+    assert auth.is_enabled()
+    assert auth.get_session_user(token)['username'] == 'alice'
+    counting = _CountingConnection(auth.db)
+    auth.db = counting
+    for _ in range(5):
+        assert auth.is_enabled()
+        assert auth.get_session_user(token)['role'] == 'admin'
+        assert not auth.is_session_locked(token)
+    assert counting.calls == 0
+    assert auth.cache_stats()['hits'] >= 15
+
+
+def test_logout_lock_and_user_changes_invalidate(db_path):
+    auth = get_auth_manager(db_path=db_path)
+    uid = auth.create_user('bob', 'pw', role='user')
+    token = auth.create_user_session(uid, 'bob')
+    assert auth.get_session_user(token) is not None
+
+    assert auth.lock_session(token)
+    assert auth.is_session_locked(token)
+    assert auth.get_session_lock_info(token)['locked']
+    assert auth.unlock_session(token, 'pw')
+    assert not auth.is_session_locked(token)
+
+    # A change made through another manager on the same file is visible immediately
+    other = AuthManager(db_path=db_path)
+    other.update_user(uid, enabled=False)
+    other.close()
+    assert auth.get_session_user(token) is None
+
+    auth.update_user(uid, enabled=True)
+    assert auth.get_session_user(token) is not None
+    auth.delete_session(token)
+    assert auth.get_session_user(token) is None
+
+
+def test_last_activity_writes_are_batched(db_path):
+    auth = get_auth_manager(db_path=db_path)
+    uid = auth.create_user('carol', 'pw')
+    tokens = [auth.create_user_session(uid, 'carol') for _ in range(3)]
+    before = {t: _last_activity(db_path, t) for t in tokens}
+
+    for t in tokens:
+        assert auth.get_session_user(t) is not None
+    assert {t: _last_activity(db_path, t) for t in tokens} == before
+    assert auth.cache_stats()['pending_activity'] == 3
+
+    assert auth.flush_activity() == 3
+    assert all(_last_activity(db_path, t) >= before[t] for t in tokens)
+    assert auth.cache_stats()['pending_activity'] == 0
+
+
+def test_write_through_when_flush_interval_is_zero(db_path, monkeypatch):
+    monkeypatch.setenv('SCIDK_AUTH_ACTIVITY_FLUSH_SEC', '0')
+    auth = get_auth_manager(db_path=db_path)
+    uid = auth.create_user('dave', 'pw')
+    token = auth.create_user_session(uid, 'dave')
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE auth_sessions SET last_activity = 0 WHERE token = ?", (token,))
+    conn.commit()
+    conn.close()
+    assert auth.get_session_user(token) is not None
+    assert _last_activity(db_path, token) > 0
@@ -53,9 +53,11 @@ def test_commit_from_index_synthesizes_folder_chain(monkeypatch, tmp_path):
         def __exit__(self, *exc):
             return False
         def run(self, cypher, **params):
-            # capture rows/folders used in commit
-            captured['rows'] = params.get('rows')
-            captured['folders'] = params.get('folders')
+            # capture rows/folders used in commit (accumulated across batches)
+            if params.get('rows'):
+                captured.setdefault('rows', []).extend(params['rows'])
+            if params.get('folders'):
+                captured.setdefault('folders', []).extend(params['folders'])
             class R:
                 def consume(self_inner):
                     return None
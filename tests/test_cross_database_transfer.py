@@ -272,30 +272,27 @@ class TestTransferToPrimary:
         mock_source_client.execute_read.side_effect = [
             # Count query
             [{'total': 2}],
-            # Batch 1: nodes
+            # Batch 1: nodes (short page ends the keyset scan)
             [
-                {'source_id': 's1', 'props': {'id': 'obj1', 'name': 'Node 1'}},
-                {'source_id': 's2', 'props': {'id': 'obj2', 'name': 'Node 2'}}
+                {'cursor': 's1', 'source_id': 's1', 'props': {'id': 'obj1', 'name': 'Node 1'}},
+                {'cursor': 's2', 'source_id': 's2', 'props': {'id': 'obj2', 'name': 'Node 2'}}
             ],
-            # Batch 2: empty (end of nodes)
-            [],
             # Relationship count query (Phase 2)
             [{'count': 1}],
             # Relationships query batch 1
             [
                 {
+                    'cursor': 'r1',
                     'source_props': {'id': 'obj1'},
                     'target_props': {'id': 'obj2'},
                     'rel_props': {'since': '2024'}
                 }
-            ],
-            # Relationships query batch 2 (empty - end)
-            []
+            ]
         ]
 
-        # Mock primary client
+        # Mock primary client: one UNWIND write per batch
         mock_primary_client = MagicMock()
-        mock_primary_client.execute_write.return_value = [{'primary_id': 'p1'}]
+        mock_primary_client.execute_write.side_effect = [[{'transferred': 2}], [{'transferred': 1}]]
 
         mock_neo4j_client_class.return_value = mock_source_client
         mock_get_primary_client.return_value = mock_primary_client
@@ -310,6 +307,9 @@ class TestTransferToPrimary:
         assert result['source_profile'] == 'Read-Only Source'
         assert result['matching_keys']['TestSourceLabel'] == 'id'  # First required property
         assert result['mode'] == 'nodes_and_outgoing'
+        node_write, rel_write = mock_primary_client.execute_write.call_args_list
+        assert [r['key_value'] for r in node_write.args[1]['rows']] == ['obj1', 'obj2']
+        assert rel_write.args[1]['rows'][0]['target_key'] == 'obj2'
 
         # Verify source client was closed
         mock_source_client.close.assert_called_once()
@@ -373,7 +373,8 @@ class TestAPIEndpoints:
             'TestSourceLabel',
             batch_size=50,
             mode='nodes_and_outgoing',
-            create_missing_targets=False
+            create_missing_targets=False,
+            resume=True
         )
 
     def test_get_label_instances_returns_source_profile(self, client, sample_label_with_source):
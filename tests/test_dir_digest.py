@@ -0,0 +1,117 @@
+import os
+from pathlib import Path
+
+from scidk.core.dir_digest import DirDigestTracker
+from scidk.core.fs_walk import scandir_walk
+
+
+def _tree(tmp_path: Path) -> Path:
+    base = tmp_path / 'archive'
+    for sub in ('a/b/c', 'd'):
+        (base / sub).mkdir(parents=True)
+    (base / 'top.txt').write_text('t', encoding='utf-8')
+    (base / 'a' / 'b' / 'c' / 'deep.csv').write_text('1,2', encoding='utf-8')
+    (base / 'd' / 'x.bin').write_bytes(b'\0' * 8)
+    return base
+
+
+def _walk(root: Path, scan_id: str, mode: str = 'digest'):
+    t = DirDigestTracker(str(root), scan_id, mode=mode)
+    unchanged = []
+    for dirpath, dirnames, files in scandir_walk(str(root)):
+        if t.visit(dirpath, dirnames, files):
+            unchanged.append(dirpath)
+    return t.finalize(), unchanged
+
+
+def test_first_walk_reports_root_added_and_rescan_is_unchanged(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    base = _tree(tmp_path)
+    rep, unchanged = _walk(base, 's1')
+    assert rep['changed_subtrees'] == [{'path': str(base), 'change': 'added'}]
+    assert unchanged == []
+    rep2, unchanged2 = _walk(base, 's2')
+    assert rep2['unchanged'] is True
+    assert rep2['changed_count'] == 0
+    assert rep2['root_digest'] == rep['root_digest']
+    assert len(unchanged2) == rep2['dirs_walked'] == 5
+
+
+def test_deep_change_is_reported_at_its_subtree_only(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    base = _tree(tmp_path)
+    _walk(base, 's1')
+    (base / 'a' / 'b' / 'c' / 'deep.csv').write_text('1,2,3', encoding='utf-8')
+    (base / 'd' / 'new').mkdir()
+    (base / 'd' / 'new' / 'n.txt').write_text('n', encoding='utf-8')
+    rep, unchanged = _walk(base, 's2')
+    assert rep['changed_subtrees'] == [
+        {'path': str(base / 'a' / 'b' / 'c'), 'change': 'modified'},
+        {'path': str(base / 'd' / 'new'), 'change': 'added'},
+    ]
+    assert rep['unchanged'] is False
+    assert str(base / 'a' / 'b' / 'c') not in unchanged
+
+    import shutil
+    shutil.rmtree(base / 'a' / 'b')
+    rep, _ = _walk(base, 's3')
+    assert rep['changed_subtrees'] == [{'path': str(base / 'a' / 'b'), 'change': 'removed'}]
+    rep, _ = _walk(base, 's4')
+    assert rep['changed_count'] == 0
+
+
+def test_trust_mtime_skips_unchanged_subtrees_in_one_lookup(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    base = _tree(tmp_path)
+    first, _ = _walk(base, 's1', mode='trust_mtime')
+    rep, _ = _walk(base, 's2', mode='trust_mtime')
+    assert rep['dirs_walked'] == 1
+    assert rep['subtrees_skipped'] == 2
+    assert rep['dirs_skipped'] == 4
+    assert rep['files_skipped'] == 2
+    assert rep['root_digest'] == first['root_digest']
+    # A new entry directly under d changes d's mtime, so only d is walked again
+    (base / 'd' / 'y.bin').write_bytes(b'1')
+    rep, _ = _walk(base, 's3', mode='trust_mtime')
+    assert rep['subtrees_skipped'] == 1
+    assert rep['changed_subtrees'] == [{'path': str(base / 'd'), 'change': 'modified'}]
+
+
+def test_trust_mtime_walks_down_to_a_deep_change(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    base = _tree(tmp_path)
+    _walk(base, 's1', mode='trust_mtime')
+    # A new file three levels down leaves a's own mtime unchanged
+    a_mtime = os.stat(base / 'a').st_mtime_ns
+    (base / 'a' / 'b' / 'c' / 'late.csv').write_text('3', encoding='utf-8')
+    assert os.stat(base / 'a').st_mtime_ns == a_mtime
+    rep, _ = _walk(base, 's2', mode='trust_mtime')
+    assert rep['dirs_walked'] == 4
+    assert rep['subtrees_skipped'] == 1
+    assert rep['changed_subtrees'] == [{'path': str(base / 'a' / 'b' / 'c'), 'change': 'modified'}]
+    rep, _ = _walk(base, 's3', mode='trust_mtime')
+    assert (rep['dirs_walked'], rep['changed_count']) == (1, 0)
+
+
+def test_rescan_skips_unchanged_dirs_and_reports_changes(client, tmp_path: Path):
+    base = _tree(tmp_path)
+    assert client.post('/api/scan', json={'path': str(base), 'recursive': True}).status_code == 200
+    deep = base / 'a' / 'b' / 'c' / 'deep.csv'
+    deep.write_text('1,2,3,4', encoding='utf-8')
+    r = client.post('/api/scan', json={'path': str(base), 'recursive': True})
+    assert r.status_code == 200
+    assert r.get_json()['scanned'] == 1
+    inc = client.application.extensions['scidk']['telemetry']['last_scan']['incremental']
+    assert inc['changed_subtrees'] == [{'path': os.path.realpath(str(deep.parent)), 'change': 'modified'}]
+
+
+def test_trust_mtime_falls_back_to_digest_without_pruning_support(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    base = _tree(tmp_path)
+    t = DirDigestTracker(str(base), 's1', mode='trust_mtime', supports_prune=False)
+    assert t.mode == 'digest'
+    for dirpath, dirnames, files in scandir_walk(str(base)):
+        t.visit(dirpath, dirnames, files)
+    rep = t.finalize()
+    assert (rep['mode'], rep['requested_mode'], rep['prune_unsupported']) == ('digest', 'trust_mtime', True)
+    assert rep['subtrees_skipped'] == 0
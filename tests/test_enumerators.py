@@ -0,0 +1,58 @@
+import io
+import json
+import os
+from pathlib import Path
+
+from scidk.core.enumerators import ENUMERATORS, get_enumerator, parse_ncdu_export
+
+
+def _export(tree) -> io.BytesIO:
+    return io.BytesIO(json.dumps([1, 2, {'progname': 'ncdu', 'progver': '1.19'}, tree]).encode('utf-8'))
+
+
+def test_parse_ncdu_export_yields_dirs_post_order_with_stat_metadata():
+    tree = [
+        {'name': '/data', 'asize': 4096, 'dev': 42},
+        {'name': 'a.csv', 'asize': 10, 'ino': 7, 'mtime': 1700000000},
+        [
+            {'name': 'sub', 'asize': 4096},
+            {'name': 'b.bin', 'asize': 20, 'ino': 8, 'mtime': 1700000001},
+            {'name': 'link', 'asize': 5, 'notreg': True},
+        ],
+        [{'name': 'other', 'excluded': 'otherfs'}],
+        {'name': 'skip.tmp', 'excluded': 'pattern'},
+    ]
+    frames = list(parse_ncdu_export(_export(tree)))
+    assert [f[0] for f in frames] == ['/data/sub', '/data']
+    sub_path, sub_dirs, sub_files = frames[0]
+    assert sub_dirs == []
+    name, st, regular = sub_files[0]
+    assert (name, st.st_size, st.st_ino, st.st_dev, regular) == ('b.bin', 20, 8, 42, True)
+    assert st.st_mtime_ns == 1700000001 * 1_000_000_000
+    assert sub_files[1][0] == 'link' and sub_files[1][2] is False
+    root_path, root_dirs, root_files = frames[1]
+    assert root_dirs == ['sub']
+    assert [f[0] for f in root_files] == ['a.csv']
+
+
+def test_parse_ncdu_export_handles_nested_values_in_entries():
+    tree = [{'name': '/r', 'extra': {'x': [1, 2]}}, {'name': 'f', 'asize': 1, 'xattrs': [{'k': 'v'}]}]
+    frames = list(parse_ncdu_export(_export(tree)))
+    assert frames == [('/r', [], [('f', frames[0][2][0][1], True)])]
+    assert frames[0][2][0][1].st_size == 1
+
+
+def test_get_enumerator_selection(monkeypatch):
+    assert get_enumerator().name == 'python'
+    assert get_enumerator('bogus').name == 'python'
+    monkeypatch.setattr(ENUMERATORS['ncdu'], 'available', lambda: True)
+    assert get_enumerator('ncdu').name == 'ncdu'
+    monkeypatch.setenv('SCIDK_SCAN_ENUMERATOR', 'ncdu')
+    assert get_enumerator('auto').name == 'ncdu'
+
+
+def test_python_enumerator_matches_stat(tmp_path: Path):
+    (tmp_path / 'x.txt').write_text('abc', encoding='utf-8')
+    (dirpath, dirnames, files), = list(ENUMERATORS['python'].walk(str(tmp_path)))
+    assert dirpath == str(tmp_path)
+    assert files[0][1].st_size == os.stat(tmp_path / 'x.txt').st_size
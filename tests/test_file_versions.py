@@ -0,0 +1,140 @@
+import sqlite3
+
+import pytest
+
+from scidk.core import migrations
+from scidk.core import path_index_sqlite as pix
+from scidk.core import scan_members
+from scidk.core.commit_rows_from_index import IndexRowSource
+from scidk.core.file_versions import compact
+
+
+def _row(path, size, scan_id, typ='file'):
+    parent, name = path.rsplit('/', 1)
+    return (path, parent, name, path.count('/') - 1, typ, size, 1.0, '.txt', None, None, None, 'local:h', scan_id, None)
+
+
+def _scan(scan_id, files):
+    rows = [_row('/data', 0, scan_id, 'folder')] + [_row(p, s, scan_id) for p, s in files]
+    pix.batch_insert_files(rows)
+    return pix.apply_basic_change_history(scan_id, '/data', recursive=True)
+
+
+def _view(scan_id):
+    return sorted((r['path'], r['size_bytes']) for r in IndexRowSource(scan_id, {'path': '/data'}).files())
+
+
+@pytest.fixture
+def versioned(monkeypatch, tmp_path):
+    db = tmp_path / 'files.db'
+    monkeypatch.setenv('SCIDK_DB_PATH', str(db))
+    monkeypatch.setenv('SCIDK_FILES_STORAGE', 'versioned')
+    return db
+
+
+def test_rescan_stores_only_changes_and_keeps_per_scan_views(versioned):
+    assert _scan('s1', [('/data/a.txt', 1), ('/data/b.txt', 2), ('/data/c.txt', 3)]) == {'created': 4, 'modified': 0, 'deleted': 0}
+    # b modified, c deleted, d created; a unchanged
+    assert _scan('s2', [('/data/a.txt', 1), ('/data/b.txt', 20), ('/data/d.txt', 4)]) == {'created': 1, 'modified': 1, 'deleted': 1}
+    assert _scan('s3', [('/data/a.txt', 1), ('/data/b.txt', 20), ('/data/d.txt', 4)]) == {'created': 0, 'modified': 0, 'deleted': 0}
+
+    conn = sqlite3.connect(str(versioned))
+    total, current = conn.execute("SELECT COUNT(*), SUM(valid_to IS NULL) FROM files").fetchone()
+    changes = conn.execute("SELECT change_type, path FROM file_history WHERE scan_id = 's2' ORDER BY path").fetchall()
+    conn.close()
+    assert (total, current) == (6, 4)  # 4 current + the old b and c versions; s3 added nothing
+    assert changes == [('modified', '/data/b.txt'), ('deleted', '/data/c.txt'), ('created', '/data/d.txt')]
+
+    assert _view('s1') == [('/data/a.txt', 1), ('/data/b.txt', 2), ('/data/c.txt', 3)]
+    assert _view('s3') == [('/data/a.txt', 1), ('/data/b.txt', 20), ('/data/d.txt', 4)]
+
+
+def test_compaction_drops_versions_no_retained_scan_sees(versioned):
+    _scan('s1', [('/data/a.txt', 1), ('/data/b.txt', 2)])
+    _scan('s2', [('/data/a.txt', 1), ('/data/b.txt', 3)])
+    _scan('s3', [('/data/a.txt', 1)])
+
+    conn = pix.connect()
+    try:
+        result = compact(conn, keep_scans=1, vacuum=False)
+    finally:
+        conn.close()
+    assert result['versions_removed'] == 2 and result['scans_dropped'] == 2
+    assert _view('s3') == [('/data/a.txt', 1)]
+
+
+def test_compaction_keeps_the_newest_scans_of_each_root(versioned):
+    pix.batch_insert_files([_row('/other', 0, 'o1', 'folder'), _row('/other/x.txt', 9, 'o1')])
+    pix.apply_basic_change_history('o1', '/other', recursive=True)
+    _scan('s1', [('/data/a.txt', 1)])
+    _scan('s2', [('/data/a.txt', 2)])
+
+    conn = pix.connect()
+    try:
+        result = compact(conn, keep_scans=1, vacuum=False)
+    finally:
+        conn.close()
+    # Rescans of /data do not push out the only scan of /other
+    assert result['dropped_scan_ids'] == ['s1'] and result['versions_removed'] == 1
+    assert sorted((r['path'], r['size_bytes']) for r in IndexRowSource('o1', {'path': '/other'}).files()) == [('/other/x.txt', 9)]
+    assert _view('s2') == [('/data/a.txt', 2)]
+
+
+def test_unchanged_rows_are_not_rewritten_and_duplicates_in_a_batch_keep_the_last(versioned):
+    _scan('s1', [('/data/a.txt', 1), ('/data/b.txt', 2)])
+    conn = sqlite3.connect(str(versioned))
+    before = conn.execute("SELECT rowid, valid_from FROM files ORDER BY path").fetchall()
+    conn.close()
+    rows = [_row('/data', 0, 's2', 'folder'), _row('/data/a.txt', 1, 's2'), _row('/data/b.txt', 2, 's2'),
+            _row('/data/c.txt', 3, 's2'), _row('/data/c.txt', 30, 's2')]
+    pix.batch_insert_files(rows, batch_size=3)
+    assert pix.apply_basic_change_history('s2', '/data') == {'created': 1, 'modified': 0, 'deleted': 0}
+
+    conn = sqlite3.connect(str(versioned))
+    try:
+        assert conn.execute("SELECT rowid, valid_from FROM files WHERE path <> '/data/c.txt' ORDER BY path").fetchall() == before
+        assert conn.execute("SELECT COUNT(*) FROM file_scan_seen").fetchone()[0] == 0
+    finally:
+        conn.close()
+    assert _view('s2') == [('/data/a.txt', 1), ('/data/b.txt', 2), ('/data/c.txt', 30)]
+
+
+def test_unchanged_directories_are_not_treated_as_deleted(versioned):
+    _scan('s1', [('/data/a.txt', 1), ('/data/sub/x.txt', 5)])
+    pix.batch_insert_files([_row('/data', 0, 's2', 'folder'), _row('/data/sub', 0, 's2', 'folder'), _row('/data/a.txt', 1, 's2')])
+    counts = pix.finalize_versioned_scan('s2', '/data', unchanged_dirs={'/data/sub'})
+    assert counts['deleted'] == 0
+    assert ('/data/sub/x.txt', 5) in _view('s2')
+
+
+def test_append_mode_is_unchanged(monkeypatch, tmp_path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    monkeypatch.delenv('SCIDK_FILES_STORAGE', raising=False)
+    _scan('s1', [('/data/a.txt', 1)])
+    _scan('s2', [('/data/a.txt', 1)])
+    conn = pix.connect()
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 4
+        assert pix.scan_scope(conn, 's2') == ("scan_id = ?", ['s2'])
+    finally:
+        conn.close()
+
+
+def test_compacted_append_scans_no_longer_list(monkeypatch, tmp_path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    monkeypatch.delenv('SCIDK_FILES_STORAGE', raising=False)
+    _scan('s1', [('/data/a.txt', 1)])
+    _scan('s2', [('/data/a.txt', 1)])
+    conn = pix.connect()
+    try:
+        migrations.migrate(conn)
+        for i, sid in enumerate(('s1', 's2')):
+            scan_members.save_scan(conn, sid, '/data', float(i), float(i), 'completed', {}, ['c1'])
+        conn.commit()
+        result = compact(conn, keep_scans=1, vacuum=False)
+        assert result['dropped_scan_ids'] == ['s1'] and result['scans_dropped'] == 1
+        assert [r[0] for r in conn.execute("SELECT id FROM scans")] == ['s2']
+        assert conn.execute("SELECT COUNT(*) FROM scan_members WHERE scan_id = 's1'").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM files WHERE scan_id = 's1'").fetchone()[0] == 0
+    finally:
+        conn.close()
@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+
+from scidk.core.fs_walk import SyscallCounter, dir_signature, scandir_walk
+
+
+def _tree(tmp_path: Path) -> Path:
+    base = tmp_path / 'root'
+    (base / 'a' / 'b').mkdir(parents=True)
+    (base / 'c').mkdir()
+    (base / 'top.txt').write_text('123', encoding='utf-8')
+    (base / 'a' / 'x.csv').write_text('1,2', encoding='utf-8')
+    (base / 'a' / 'b' / 'y.bin').write_bytes(b'\0' * 10)
+    return base
+
+
+def test_scandir_walk_lists_each_dir_once_and_stats_each_file_once(tmp_path: Path):
+    base = _tree(tmp_path)
+    counter = SyscallCounter()
+    seen = {}
+    for dirpath, dirnames, files in scandir_walk(str(base), counter):
+        seen[dirpath] = (sorted(dirnames), sorted(f[0] for f in files))
+    assert set(seen) == {str(base), str(base / 'a'), str(base / 'a' / 'b'), str(base / 'c')}
+    assert seen[str(base)] == (['a', 'c'], ['top.txt'])
+    assert counter.get('scandir') == 4
+    assert counter.get('stat') == 3
+
+
+def test_scandir_walk_prunes_and_skips_symlinked_dirs(tmp_path: Path):
+    base = _tree(tmp_path)
+    os.symlink(base / 'a', base / 'link_to_a')
+    visited = []
+    for dirpath, dirnames, files in scandir_walk(str(base)):
+        visited.append(dirpath)
+        if dirpath == str(base):
+            assert 'link_to_a' in dirnames
+            dirnames[:] = [d for d in dirnames if d != 'c']
+    assert str(base / 'c') not in visited
+    assert str(base / 'link_to_a') not in visited
+    assert str(base / 'a' / 'b') in visited
+
+
+def test_dir_signature_uses_collected_stats(tmp_path: Path):
+    base = _tree(tmp_path)
+    _, _, files = next(iter(scandir_walk(str(base / 'a' / 'b'))))
+    sig = dir_signature(files)
+    assert sig['files'] == 1
+    assert sig['sum_size'] == 10
+    assert sig['max_mtime'] > 0
+
+
+def test_scan_reports_syscalls_with_single_stat_per_file(client, tmp_path: Path):
+    base = _tree(tmp_path)
+    r = client.post('/api/scan', json={'path': str(base), 'recursive': True})
+    assert r.status_code == 200
+    sc = client.application.extensions['scidk']['telemetry']['last_scan']['syscalls']
+    assert sc['scandir'] == 4
+    assert sc['stat'] == 3
+    assert sc['open'] == 3
@@ -161,6 +161,64 @@ def test_match_external_data_levenshtein(service):
     assert matches[2]['is_match'] is False
 
 
+def _pairwise_reference(service, records, nodes, key, settings):
+    """The unindexed all-pairs scan: best match per record at or above the threshold."""
+    from rapidfuzz import fuzz
+    targets = {}
+    for node in nodes:
+        targets[service._normalize_string(node[key], settings)] = node
+    out = []
+    for record in records:
+        value = service._normalize_string(record[key], settings)
+        best, best_conf = None, 0.0
+        for norm, node in targets.items():
+            conf = service._compute_similarity(value, norm, settings.algorithm, fuzz)
+            if conf > best_conf:
+                best, best_conf = node, conf
+        out.append((best, best_conf) if best_conf >= settings.threshold else (None, None))
+    return out
+
+
+@requires_rapidfuzz
+@pytest.mark.parametrize('algorithm,threshold', [('levenshtein', 0.8), ('levenshtein', 0.6), ('jaro_winkler', 0.9)])
+def test_indexed_matching_keeps_pairwise_recall(service, algorithm, threshold):
+    """Candidate generation must not lose any match the all-pairs scan finds."""
+    import random
+    rng = random.Random(42)
+    alphabet = 'abcdefgh-0123456789'
+    ids = list(dict.fromkeys(''.join(rng.choice(alphabet) for _ in range(rng.randint(3, 16))) for _ in range(300)))
+    nodes = [{'sid': v, 'id': i} for i, v in enumerate(ids)]
+    records = []
+    for _ in range(200):
+        chars = list(rng.choice(ids))
+        for _ in range(rng.randint(0, 3)):
+            i = rng.randrange(len(chars))
+            chars[i] = rng.choice(alphabet)
+        records.append({'sid': ''.join(chars)})
+
+    settings = FuzzyMatchSettings(algorithm=algorithm, threshold=threshold, strip_punctuation=False,
+                                  min_string_length=1, max_comparisons=0)
+    matches = service.match_external_data(records, nodes, 'sid', settings)
+    expected = _pairwise_reference(service, records, nodes, 'sid', settings)
+
+    for got, (node, conf) in zip(matches, expected):
+        assert got['is_match'] is (node is not None)
+        if node is not None:
+            assert got['matched_node'] is node
+            assert got['confidence'] == pytest.approx(conf, abs=1e-12)
+    assert service.last_match_stats['comparisons'] < len(records) * len(nodes)
+
+
+@requires_rapidfuzz
+def test_max_comparisons_caps_candidates_per_value(service):
+    nodes = [{'name': f'sample_{i:04d}'} for i in range(500)]
+    settings = FuzzyMatchSettings(threshold=0.5, max_comparisons=20, strip_punctuation=False)
+    matches = service.match_external_data([{'name': 'sample_0042'}], nodes, 'name', settings)
+    assert matches[0]['truncated'] is True
+    assert matches[0]['matched_node']['name'] == 'sample_0042'
+    assert service.last_match_stats['comparisons'] == 20
+
+
 def test_normalize_string_case_insensitive(service):
     """Test string normalization with case insensitivity."""
     settings = FuzzyMatchSettings(case_sensitive=False)
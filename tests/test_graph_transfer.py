@@ -0,0 +1,80 @@
+import uuid
+
+from scidk.services.graph_transfer import StreamingTransfer, keyset_query, load_checkpoint
+
+
+class _Source:
+    """Serves keyset pages ($after / $limit) over rows sorted by cursor."""
+
+    def __init__(self, n):
+        self.rows = [{'cursor': f'4:db:{i:04d}', 'props': {'id': i}} for i in range(n)]
+        self.calls = []
+
+    def execute_read(self, query, params=None):
+        self.calls.append(params)
+        page = [r for r in self.rows if r['cursor'] > params['after']]
+        return page[:params['limit']]
+
+
+class _Primary:
+    def __init__(self):
+        self.rows = []
+
+    def execute_write(self, query, params=None):
+        self.rows.extend(params['rows'])
+        return [{'written': len(params['rows'])}]
+
+
+def _transfer(source, primary, key, **kw):
+    query = keyset_query('MATCH (n:Sample)', 'n', 'elementId(n)', 'properties(n) as props')
+    return StreamingTransfer(source, primary, query, 'UNWIND $rows AS row RETURN count(*) AS written',
+                             batch_size=10, transform=lambda r: r['props'], checkpoint_key=key, **kw)
+
+
+def test_keyset_pages_are_written_in_unwind_batches():
+    source, primary = _Source(35), _Primary()
+    key = f'test:{uuid.uuid4().hex}'
+    result = _transfer(source, primary, key).run()
+
+    assert result['completed'] and result['count'] == 35 and result['batches'] == 4
+    assert [c['after'] for c in source.calls] == ['', '4:db:0009', '4:db:0019', '4:db:0029']
+    assert [r['id'] for r in primary.rows] == list(range(35))
+    assert load_checkpoint(key) is None  # cleared once complete
+
+    query = keyset_query('MATCH (n:Sample)', 'n', 'elementId(n)', 'properties(n) as props')
+    assert 'SKIP' not in query and 'WHERE cursor > $after' in query and 'ORDER BY cursor' in query
+
+
+def test_cancelled_transfer_resumes_from_checkpoint():
+    source, primary = _Source(50), _Primary()
+    key = f'test:{uuid.uuid4().hex}'
+    first = _transfer(source, primary, key, should_cancel=lambda: len(primary.rows) >= 20, queue_depth=1).run()
+
+    assert first['cancelled'] and not first['completed'] and first['count'] == 20
+    cp = load_checkpoint(key)
+    assert cp['cursor'] == '4:db:0019' and cp['written'] == 20
+
+    source.calls.clear()
+    second = _transfer(source, primary, key).run()
+    assert second['resumed_from'] == '4:db:0019' and second['completed']
+    assert second['count'] == 50
+    assert source.calls[0]['after'] == '4:db:0019'
+    assert [r['id'] for r in primary.rows] == list(range(50))  # nothing written twice
+    assert load_checkpoint(key) is None
+
+
+def test_read_errors_surface_to_the_caller():
+    class _Failing(_Source):
+        def execute_read(self, query, params=None):
+            if params['after']:
+                raise RuntimeError('source went away')
+            return super().execute_read(query, params)
+
+    key = f'test:{uuid.uuid4().hex}'
+    primary = _Primary()
+    try:
+        _transfer(_Failing(30), primary, key).run()
+        raise AssertionError('expected the read error to propagate')
+    except RuntimeError as e:
+        assert 'source went away' in str(e)
+    assert len(primary.rows) == 10 and load_checkpoint(key)['cursor'] == '4:db:0009'
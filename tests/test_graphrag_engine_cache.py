@@ -0,0 +1,75 @@
+import sys
+import types
+from unittest.mock import Mock
+
+import pytest
+
+from scidk.services.graphrag.engine_cache import GraphRAGEngineCache
+from scidk.services.graphrag.query_engine import QueryEngine
+
+
+@pytest.fixture
+def retrievers(monkeypatch):
+    built = []
+
+    class Text2CypherRetriever:
+        def __init__(self, driver, neo4j_schema, examples, llm):
+            self.schema = neo4j_schema
+            built.append(self)
+
+        def search(self, query_text):
+            return types.SimpleNamespace(items=[{'name': query_text}], metadata={'cypher': 'MATCH (n) RETURN n'})
+
+    pkg = types.ModuleType('neo4j_graphrag')
+    mod = types.ModuleType('neo4j_graphrag.retrievers')
+    mod.Text2CypherRetriever = Text2CypherRetriever
+    monkeypatch.setitem(sys.modules, 'neo4j_graphrag', pkg)
+    monkeypatch.setitem(sys.modules, 'neo4j_graphrag.retrievers', mod)
+    return built
+
+
+def test_query_engine_reuses_prepared_retriever(retrievers):
+    engine = QueryEngine(Mock(), {'labels': ['File'], 'relationships': []}, examples=[])
+
+    first = engine.query('a.txt')
+    second = engine.query('b.txt')
+    assert first['status'] == second['status'] == 'ok'
+    assert len(retrievers) == 1
+    assert set(second['stage_ms']) == {'entity_extraction', 'cypher_generation', 'execution', 'formatting'}
+
+    engine.set_schema({'labels': ['File', 'Folder'], 'relationships': []})
+    engine.query('c.txt')
+    assert len(retrievers) == 2 and retrievers[-1].schema['labels'] == ['File', 'Folder']
+
+
+def test_engine_cache_hits_replaces_and_invalidates():
+    cache = GraphRAGEngineCache()
+    drivers = []
+
+    def open_driver():
+        drivers.append(Mock())
+        return drivers[-1]
+
+    a, hit_a = cache.get('bolt://h', 'neo4j', 'fp1', open_driver)
+    b, hit_b = cache.get('bolt://h', 'neo4j', 'fp1', open_driver)
+    other, _ = cache.get('bolt://h', 'other', 'fp1', open_driver)
+    assert not hit_a and hit_b and a is b and other is not a
+    assert a.get_engine(lambda: 'engine')[1] and not a.get_engine(lambda: 'engine2')[1]
+
+    c, hit_c = cache.get('bolt://h', 'neo4j', 'fp2', open_driver)  # credentials changed
+    assert not hit_c and c is not a and drivers[0].close.called
+
+    assert cache.invalidate(database='neo4j') == 1 and drivers[2].close.called
+    st = cache.stats()
+    assert st['hits'] == 1 and st['misses'] == 3 and [e['database'] for e in st['entries']] == ['other']
+
+
+def test_schema_refresh_endpoint_drops_warm_engines(app, client):
+    from scidk.web.routes.api_chat import _graphrag_engine_cache
+
+    with app.app_context():
+        cache = _graphrag_engine_cache()
+        cache.get('bolt://h', None, 'fp', Mock)
+    assert client.post('/api/chat/schema/refresh').status_code == 200
+    assert cache.stats()['entries'] == []
+    assert 'engines' in client.get('/api/chat/observability/graphrag').get_json()
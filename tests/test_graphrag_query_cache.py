@@ -0,0 +1,103 @@
+import sys
+import types
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from scidk.services.graphrag import query_cache as qc
+from scidk.services.graphrag.query_cache import GraphRAGQueryCache
+from scidk.services.graphrag.query_engine import QueryEngine
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / 'settings.db')
+
+
+def test_cypher_cache_normalizes_lru_evicts_and_persists(db):
+    cache = GraphRAGQueryCache(db, cypher_size=2)
+    cache.put_cypher('How many samples in project X?', 'v1', 'MATCH (s:Sample) RETURN count(s)')
+    assert cache.get_cypher('  How many   samples in project X ', 'v1') == 'MATCH (s:Sample) RETURN count(s)'
+    assert cache.get_cypher('How many samples in project x', 'v1') is None  # literals keep their case
+    assert cache.get_cypher('How many samples in project X', 'v2') is None  # schema changed
+
+    cache.put_cypher('q2', 'v1', 'MATCH (a) RETURN a')
+    cache.get_cypher('How many samples in project X', 'v1')  # touch: q2 is now least recent
+    cache.put_cypher('q3', 'v1', 'MATCH (b) RETURN b')
+    assert cache.get_cypher('q2', 'v1') is None and cache.stats()['cypher']['evictions'] == 1
+
+    reloaded = GraphRAGQueryCache(db, cypher_size=2)
+    assert reloaded.get_cypher('q3', 'v1') == 'MATCH (b) RETURN b'
+    assert reloaded.get_cypher('How many samples in project X', 'v1')
+    assert reloaded.get_cypher('q2', 'v1') is None
+
+
+def test_result_cache_respects_epoch_ttl_and_read_only(db):
+    cache = GraphRAGQueryCache(db, result_size=10, result_ttl_sec=60)
+    cache.put_result('MATCH (n) RETURN count(n)', None, {'answer': '3', 'result_count': 1, 'items': []})
+    cache.put_result('MATCH (n) SET n.x = 1 RETURN n', None, {'answer': 'w'})
+    assert cache.get_result('MATCH (n) RETURN count(n)')['answer'] == '3'
+    assert cache.get_result('MATCH (n) SET n.x = 1 RETURN n') is None
+
+    qc.bump_graph_epoch()  # a write happened
+    assert cache.get_result('MATCH (n) RETURN count(n)') is None
+
+    expiring = GraphRAGQueryCache(db, result_ttl_sec=60)
+    expiring.put_result('MATCH (m) RETURN m', None, {'answer': 'm'})
+    expiring._results[next(reversed(expiring._results))]['expires_at'] = 0
+    assert expiring.get_result('MATCH (m) RETURN m') is None
+
+
+@pytest.fixture
+def retriever_calls(monkeypatch):
+    calls = []
+
+    class Text2CypherRetriever:
+        def __init__(self, **kwargs):
+            pass
+
+        def search(self, query_text):
+            calls.append(query_text)
+            return types.SimpleNamespace(items=[{'name': 'S1'}, {'name': 'S2'}], metadata={'cypher': 'MATCH (s:Sample) RETURN s.name AS name'})
+
+    mod = types.ModuleType('neo4j_graphrag.retrievers')
+    mod.Text2CypherRetriever = Text2CypherRetriever
+    monkeypatch.setitem(sys.modules, 'neo4j_graphrag', types.ModuleType('neo4j_graphrag'))
+    monkeypatch.setitem(sys.modules, 'neo4j_graphrag.retrievers', mod)
+    return calls
+
+
+def test_repeated_question_skips_generation_and_execution(db, retriever_calls):
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    session.run.return_value = [Mock(data=lambda: {'name': 'S1'})]
+    cache = GraphRAGQueryCache(db)
+    engine = QueryEngine(driver, {'labels': ['Sample'], 'relationships': []}, examples=[], query_cache=cache)
+
+    first = engine.query('List samples')
+    second = engine.query('List  samples?')
+    assert (first['cache'], second['cache']) == ('miss', 'result')
+    assert second['answer'] == first['answer'] and len(retriever_calls) == 1
+
+    qc.bump_graph_epoch()
+    third = engine.query('List samples')
+    assert third['cache'] == 'cypher' and third['result_count'] == 1
+    session.run.assert_called_with('MATCH (s:Sample) RETURN s.name AS name')
+    assert len(retriever_calls) == 1
+    assert cache.stats()['results']['hits'] == 1
+
+
+def test_negative_feedback_evicts_cached_answer(db):
+    from scidk.services.graphrag_feedback_service import GraphRAGFeedbackService
+
+    cache = qc.get_query_cache(db)
+    cache.put_cypher('count samples', 'v1', 'MATCH (s:Sample) RETURN count(s)')
+    cache.put_result('MATCH (s:Sample) RETURN count(s)', None, {'answer': 'wrong'})
+
+    svc = GraphRAGFeedbackService(db_path=db)
+    svc.add_feedback('count samples', {}, {'answered_question': True}, cypher_generated='MATCH (s:Sample) RETURN count(s)')
+    assert cache.get_cypher('count samples', 'v1')
+    svc.add_feedback('count  samples?', {}, {'answered_question': False}, cypher_generated='MATCH (s:Sample) RETURN count(s)')
+    assert cache.get_cypher('count samples', 'v1') is None
+    assert cache.get_result('MATCH (s:Sample) RETURN count(s)') is None
+    assert GraphRAGQueryCache(db).get_cypher('count samples', 'v1') is None  # evicted on disk too
@@ -0,0 +1,112 @@
+import os
+from pathlib import Path
+
+from scidk.core.filesystem import FilesystemManager
+from scidk.core.hash_cache import HashCache
+
+
+def test_hash_cache_reuses_digest_until_metadata_changes(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    f = tmp_path / 'a.bin'
+    f.write_bytes(b'hello')
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return FilesystemManager.calculate_checksum(f)
+
+    c1 = HashCache()
+    d1 = c1.get_or_compute(str(f), os.stat(f), compute)
+    c1.close()
+    assert c1.stats()['misses'] == 1 and c1.stats()['stored'] == 1
+
+    c2 = HashCache()
+    assert c2.get_or_compute(str(f), os.stat(f), compute) == d1
+    assert len(calls) == 1
+    assert c2.stats()['hits'] == 1
+
+    # Content + mtime change -> rehash
+    f.write_bytes(b'hello world')
+    os.utime(f, ns=(os.stat(f).st_atime_ns, os.stat(f).st_mtime_ns + 10_000_000))
+    d2 = c2.get_or_compute(str(f), os.stat(f), compute)
+    c2.close()
+    assert d2 != d1
+    assert len(calls) == 2
+
+
+def test_hash_cache_verify_mode_forces_rehash_and_counts_mismatch(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    f = tmp_path / 'a.bin'
+    f.write_bytes(b'one')
+    st = os.stat(f)
+    seed = HashCache()
+    seed.store(str(f), st, 'stale-digest')
+    seed.close()
+
+    plain = HashCache()
+    assert plain.get_or_compute(str(f), st, lambda: 'fresh') == 'stale-digest'
+    plain.close()
+
+    v = HashCache(verify=True)
+    assert v.get_or_compute(str(f), st, lambda: 'fresh') == 'fresh'
+    v.close()
+    assert v.stats()['misses'] == 1
+    assert v.stats()['mismatches'] == 1
+    assert HashCache().lookup(str(f), st) == 'fresh'
+
+
+def test_rescan_reports_hash_cache_hits(client, tmp_path: Path):
+    base = tmp_path / 'data'
+    base.mkdir()
+    for i in range(3):
+        (base / f'f{i}.dat').write_bytes(os.urandom(64))
+    assert client.post('/api/scan', json={'path': str(base), 'recursive': True}).status_code == 200
+    assert client.post('/api/scan', json={'path': str(base), 'recursive': False}).status_code == 200
+    tel = client.application.extensions['scidk']['telemetry']['last_scan']
+    assert tel['hash_cache']['hits'] == 3
+    assert tel['hash_cache']['misses'] == 0
+    assert tel['syscalls'].get('open', 0) == 0
+
+    assert client.post('/api/scan', json={'path': str(base), 'recursive': False, 'verify': True}).status_code == 200
+    tel = client.application.extensions['scidk']['telemetry']['last_scan']
+    assert tel['hash_cache']['verify'] is True
+    assert tel['hash_cache']['misses'] == 3
+    assert tel['hash_cache']['mismatches'] == 0
+
+
+def test_hash_cache_is_shared_with_coarse_enumerator_metadata(monkeypatch, tmp_path: Path):
+    from scidk.core.enumerators import EntryStat
+
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    f = tmp_path / 'a.bin'
+    f.write_bytes(b'hello')
+    os.utime(f, ns=(0, 1_700_000_000_123_456_789))
+    st = os.stat(f)
+    # ncdu/gdu: whole-second mtime, no inode for files that are not hardlinked
+    coarse = EntryStat(st.st_size, 1_700_000_000.0, 1_700_000_000 * 1_000_000_000, 1_700_000_000.0, 0, st.st_dev)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return FilesystemManager.calculate_checksum(f)
+
+    c = HashCache()
+    d = c.get_or_compute(str(f), st, compute)
+    c.flush()
+    assert c.get_or_compute(str(f), coarse, compute) == d
+    c.close()
+    assert len(calls) == 1
+
+    # Stored from the coarse listing, then looked up with full stat metadata
+    f2 = tmp_path / 'b.bin'
+    f2.write_bytes(b'world')
+    os.utime(f2, ns=(0, 1_700_000_000_500_000_000))
+    st2 = os.stat(f2)
+    c = HashCache()
+    c.get_or_compute(str(f2), coarse._replace(st_size=st2.st_size), compute)
+    c.flush()
+    assert c.get_or_compute(str(f2), st2, compute)
+    # A change in the whole seconds is still a change
+    assert c.lookup(str(f2), coarse._replace(st_size=st2.st_size, st_mtime_ns=1_700_000_001 * 1_000_000_000)) is None
+    c.close()
+    assert len(calls) == 2
@@ -0,0 +1,69 @@
+import csv
+import io
+import pickle
+
+import pytest
+
+from scidk.core.graph import InMemoryGraph
+from scidk.services import instance_export
+
+
+def _rows(n):
+    for i in range(n):
+        row = {'id': i, 'name': f'n{i}'}
+        if i % 2:
+            row['extra'] = 'x'
+        yield row
+
+
+def test_csv_stream_is_chunked(monkeypatch):
+    monkeypatch.setenv('SCIDK_EXPORT_CHUNK_ROWS', '3')
+    parts = list(instance_export.csv_stream(['id', 'name'], _rows(7)))
+    assert len(parts) == 3
+    rows = list(csv.DictReader(io.StringIO(b''.join(parts).decode('utf-8'))))
+    assert [r['name'] for r in rows] == [f'n{i}' for i in range(7)]
+    assert set(rows[0]) == {'id', 'name'}
+
+
+def test_pickle_stream_loads_as_list(monkeypatch):
+    monkeypatch.setenv('SCIDK_EXPORT_CHUNK_ROWS', '4')
+    data = b''.join(instance_export.pickle_stream(_rows(10)))
+    assert pickle.loads(data) == list(_rows(10))
+    assert pickle.loads(b''.join(instance_export.pickle_stream(iter(())))) == []
+
+
+def test_in_memory_graph_iter_instances_matches_list():
+    g = InMemoryGraph()
+    for i in range(3):
+        g.upsert_dataset({'path': f'/d/f{i}.txt', 'filename': f'f{i}.txt', 'size_bytes': i, 'checksum': f'c{i}'})
+    rows = g.list_instances('File')
+    assert list(g.iter_instances('File')) == rows
+    assert len(list(g.iter_instances('File', limit=2))) == 2
+    assert set(rows[0]) == set(g.instance_columns('File'))
+    assert [r['file_count'] for r in g.iter_instances('Folder')] == [3]
+
+
+def test_resolve_columns_from_first_chunk_with_late_keys(monkeypatch):
+    monkeypatch.setenv('SCIDK_EXPORT_CHUNK_ROWS', '2')
+    assert instance_export.resolve_columns(['id'], _rows(1))[0] == ['id']
+    # Rows 0-1 set the columns; 'extra' first appears in row 1, 'late' only in row 3
+    rows = list(_rows(4))
+    rows[3]['late'] = 7
+    columns, out = instance_export.resolve_columns(None, iter(rows))
+    assert columns == ['id', 'name', 'extra', 'extra_json']
+    out = list(out)
+    assert [r.get('extra_json') for r in out] == [None, None, None, '{"late": 7}']
+    parsed = list(csv.DictReader(io.StringIO(b''.join(instance_export.csv_stream(columns, iter(out))).decode('utf-8'))))
+    assert parsed[3]['extra_json'] == '{"late": 7}' and parsed[0]['extra'] == ''
+
+
+def test_arrow_and_parquet_types_span_all_chunks(monkeypatch):
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    monkeypatch.setenv('SCIDK_EXPORT_CHUNK_ROWS', '2')
+    rows = [{'s': v, 'f': w} for v, w in zip([1, 2, 3, 'n/a'], [1, 2, 4.5, None])]
+    arrow = pa.ipc.open_stream(b''.join(instance_export.arrow_stream(['s', 'f'], iter(rows)))).read_all()
+    parquet = pq.read_table(io.BytesIO(b''.join(instance_export.parquet_stream(['s', 'f'], iter(rows)))))
+    for table in (arrow, parquet):
+        assert table.column('s').to_pylist() == ['1', '2', '3', 'n/a']
+        assert table.column('f').to_pylist() == [1.0, 2.0, 4.5, None]
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+from scidk.core.interpretation_cache import InterpretationCache, config_hash
+from scidk.core.registry import InterpreterRegistry
+
+
+class Interp:
+    id = 'demo'
+
+    def __init__(self, version='1.0', max_rows=10):
+        self.version = version
+        self.max_rows = max_rows
+
+
+def test_cache_hits_by_checksum_version_and_config(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    c = InterpretationCache()
+    assert c.get('abc', Interp()) is None
+    c.put('abc', Interp(), {'status': 'success', 'data': {'rows': 3}})
+    c.put('err', Interp(), {'status': 'error', 'data': {'error': 'timeout'}})
+    c.close()
+
+    c2 = InterpretationCache()
+    assert c2.get('abc', Interp()) == {'status': 'success', 'data': {'rows': 3}}
+    assert c2.get('abc', Interp(version='2.0')) is None
+    assert c2.get('abc', Interp(max_rows=99)) is None
+    assert c2.get('err', Interp()) is None
+    st = c2.stats()
+    assert (st['hits'], st['misses']) == (1, 3)
+    assert st['hit_rate'] == 0.25
+    assert config_hash(Interp()) != config_hash(Interp(max_rows=99))
+
+
+def test_version_change_invalidates_and_size_bound_evicts(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    c = InterpretationCache()
+    c.put('a', Interp('1.0'), {'status': 'success', 'data': {}})
+    c.put('a', Interp('2.0'), {'status': 'success', 'data': {}})
+    c.flush()
+    reg = InterpreterRegistry()
+    reg.register_extension('.x', Interp('2.0'))
+    assert c.invalidate_stale_versions(reg) == 1
+    assert c.get('a', Interp('1.0')) is None
+    assert c.get('a', Interp('2.0')) is not None
+    c.close()
+
+    small = InterpretationCache(max_bytes=2000, flush_every=1)
+    payload = {'status': 'success', 'data': {'blob': 'x' * 400}}
+    for i in range(10):
+        small.put(f'k{i}', Interp(), payload)
+    small.close()
+    assert small.stats()['evicted'] >= 5
+    assert small.get('k9', Interp()) is not None
+    assert small.get('k0', Interp()) is None
+
+
+def test_stored_size_is_summed_once_and_kept_as_a_running_total(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    c = InterpretationCache(max_bytes=2000, flush_every=1)
+    sums = []
+    c._conn().set_trace_callback(lambda sql: sums.append(sql) if 'SUM(size_bytes)' in sql else None)
+    for i in range(6):
+        c.put(f'k{i}', Interp(), {'status': 'success', 'data': {'blob': 'x' * 400}})
+    c.put('k5', Interp(), {'status': 'success', 'data': {'blob': 'y' * 100}})  # replaced, not added
+    assert len(sums) == 1
+    actual = c._conn().execute("SELECT SUM(size_bytes) FROM interpretation_cache").fetchone()[0]
+    assert c._total == actual <= 2000
+    assert c.stats()['evicted'] >= 1
+    c.close()
+
+
+def test_rescan_reuses_interpretations(client, tmp_path: Path):
+    base = tmp_path / 'data'
+    base.mkdir()
+    # Content is unique per test run: the cache is content-addressed and outlives the app
+    (base / 'a.csv').write_text(f'x,y\n1,{base}\n', encoding='utf-8')
+    (base / 'b.json').write_text(f'{{"k": "{base}"}}', encoding='utf-8')
+    assert client.post('/api/scan', json={'path': str(base), 'recursive': False}).status_code == 200
+    tel = client.application.extensions['scidk']['telemetry']
+    assert tel['last_scan']['interpretation_cache']['misses'] == 2
+    reg = client.application.extensions['scidk']['registry']
+    uses = sum(s['total_uses'] for s in reg.usage_stats.values())
+
+    assert client.post('/api/scan', json={'path': str(base), 'recursive': False}).status_code == 200
+    assert tel['last_scan']['interpretation_cache']['hits'] == 2
+    assert sum(s['total_uses'] for s in reg.usage_stats.values()) == uses
+    m = client.get('/api/metrics').get_json()
+    assert m['interpretation_cache_hits'] >= 2
+    assert m['interpretation_cache_hit_rate'] > 0
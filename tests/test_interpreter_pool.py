@@ -0,0 +1,127 @@
+import os
+import time
+from concurrent.futures import as_completed
+from pathlib import Path
+
+import pytest
+
+from scidk.core.interpreter_pool import (
+    InterpreterMemoryExceeded,
+    InterpreterPool,
+    InterpreterTimeout,
+    run_inline,
+)
+from scidk.core.registry import InterpreterRegistry
+
+
+class PidInterpreter:
+    id = 'pid'
+    tag = ''
+
+    def interpret(self, path: Path):
+        return {'status': 'success', 'data': {'pid': os.getpid(), 'name': path.name, 'tag': self.tag}}
+
+
+class SleepyInterpreter:
+    id = 'sleepy'
+    timeout_sec = 2
+
+    def interpret(self, path: Path):
+        time.sleep(float(path.name))
+        return {'status': 'success', 'data': {}}
+
+
+class HungryInterpreter:
+    id = 'hungry'
+    max_rss_mb = 150
+
+    def interpret(self, path: Path):
+        blob = bytearray(400 * 1024 * 1024)
+        time.sleep(5)
+        return {'status': 'success', 'data': {'n': len(blob)}}
+
+
+class FailingInterpreter:
+    id = 'failing'
+
+    def interpret(self, path: Path):
+        raise ValueError('bad file')
+
+
+@pytest.fixture
+def pool():
+    p = InterpreterPool(workers=2)
+    yield p
+    p.close()
+
+
+def test_pool_runs_in_worker_processes_and_records_usage(pool):
+    reg = InterpreterRegistry()
+    futs = [pool.submit(PidInterpreter(), f'/tmp/f{i}.txt', reg) for i in range(6)]
+    results = [f.result(timeout=60) for f in futs]
+    assert {r['data']['name'] for r in results} == {f'f{i}.txt' for i in range(6)}
+    assert all(r['data']['pid'] != os.getpid() for r in results)
+    assert reg.usage_stats['pid']['total_uses'] == 6
+    assert reg.usage_stats['pid']['successes'] == 6
+
+    with pytest.raises(RuntimeError, match='bad file'):
+        pool.submit(FailingInterpreter(), '/tmp/x', reg).result(timeout=60)
+    assert reg.usage_stats['failing']['failures'] == 1
+
+
+def test_results_arrive_as_they_finish_and_timeouts_kill_the_worker(pool):
+    reg = InterpreterRegistry()
+    # Start both workers first so process start-up does not decide which task finishes first
+    for f in [pool.submit(PidInterpreter(), f'/tmp/warm{i}', None) for i in range(2)]:
+        f.result(timeout=60)
+    slow = pool.submit(SleepyInterpreter(), '/tmp/0.3', reg)
+    fast = pool.submit(PidInterpreter(), '/tmp/fast', reg)
+    assert next(as_completed([slow, fast], timeout=60)) is fast
+    assert slow.result(timeout=60)['status'] == 'success'
+
+    hung = pool.submit(SleepyInterpreter(), '/tmp/60', reg)
+    with pytest.raises(InterpreterTimeout):
+        hung.result(timeout=60)
+    assert pool.stats['timeouts'] == 1
+    assert reg.usage_stats['sleepy']['failures'] == 1
+    # The pool keeps serving after replacing the killed worker
+    assert pool.submit(PidInterpreter(), '/tmp/after', reg).result(timeout=60)['data']['name'] == 'after'
+
+
+def test_reconfigured_interpreter_is_not_served_from_a_stale_pickle(pool):
+    interp = PidInterpreter()
+    interp.tag = 'v1'
+    assert pool.submit(interp, '/tmp/a', None).result(timeout=60)['data']['tag'] == 'v1'
+    interp.tag = 'v2'
+    assert pool.submit(interp, '/tmp/b', None).result(timeout=60)['data']['tag'] == 'v2'
+    assert pool.submit(PidInterpreter(), '/tmp/c', None).result(timeout=60)['data']['tag'] == ''
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason='RSS polling needs /proc')
+def test_rss_cap_kills_worker(pool):
+    with pytest.raises(InterpreterMemoryExceeded):
+        pool.submit(HungryInterpreter(), '/tmp/big', None).result(timeout=60)
+    assert pool.stats['memory_kills'] == 1
+
+
+def test_limit_overrides_from_env(monkeypatch):
+    monkeypatch.setenv('SCIDK_INTERP_LIMITS', '{"sleepy": {"timeout_sec": 7}}')
+    p = InterpreterPool(workers=1, timeout_sec=60)
+    assert p.limits_for(SleepyInterpreter()) == (7.0, 0.0)
+    assert p.limits_for(HungryInterpreter()) == (60.0, 150.0)
+    p.close()
+
+
+def test_unpicklable_interpreter_runs_inline(pool):
+    class Local:
+        id = 'local'
+        fn = staticmethod(lambda: None)
+
+        def interpret(self, path):
+            return {'status': 'success', 'data': {'pid': os.getpid()}}
+
+    reg = InterpreterRegistry()
+    assert pool.submit(Local(), '/tmp/x', reg).result()['data']['pid'] == os.getpid()
+    assert pool.stats['inline'] == 1
+    assert run_inline(Local(), '/tmp/y', reg).result()['status'] == 'success'
+    assert reg.usage_stats['local']['total_uses'] == 2
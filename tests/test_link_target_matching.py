@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+from scidk.services.link_service import LinkService
+
+
+class _FakeClient:
+    """Answers UNWIND $values lookups from an in-memory node table: node id -> properties."""
+
+    def __init__(self, nodes, key='sample_id'):
+        self.nodes = nodes
+        self.key = key
+        self.queries = []
+
+    def execute_read(self, query, params=None):
+        self.queries.append((query, params))
+        if query.startswith('SHOW INDEXES'):
+            return []
+        out = []
+        for value in params['values']:
+            for nid, props in self.nodes.items():
+                if ('id(t) = value' in query and nid == value) or ('id(t) = value' not in query and props.get(self.key) == value):
+                    out.append({'value': value, 'node_id': nid, 't': props})
+                    break
+        return out
+
+
+def _definition(strategy='property'):
+    return {
+        'target_type': 'label',
+        'target_config': {'label': 'Sample'},
+        'match_strategy': strategy,
+        'match_config': {'source_field': 'sid', 'target_field': 'sample_id'},
+    }
+
+
+def test_property_matching_is_batched_and_keeps_source_order(monkeypatch):
+    monkeypatch.setenv('SCIDK_LINK_MATCH_BATCH', '4')
+    nodes = {i: {'sample_id': f's{i}'} for i in range(6)}
+    client = _FakeClient(nodes)
+    source = [{'sid': f's{i % 7}', 'row': i} for i in range(10)] + [{'sid': ''}]
+    progress = []
+
+    with patch('scidk.services.neo4j_client.get_neo4j_client', return_value=client):
+        matches = LinkService(None)._match_with_targets(
+            _definition(), source, limit=len(source), progress=lambda *a: progress.append(a), check_index=True)
+
+    lookups = [q for q in client.queries if 'UNWIND $values' in q[0]]
+    assert len(lookups) == 3  # ceil(11 / 4) round-trips instead of one per row
+    assert all(len(p['values']) == len(set(p['values'])) for _, p in lookups)
+    assert [m['source']['row'] for m in matches] == [0, 1, 2, 3, 4, 5, 7, 8, 9]  # s6 has no target
+    assert all(m['target']['_id'] == int(m['source']['sid'][1:]) for m in matches)
+    assert progress[-1] == (11, 11, 9)
+    assert client.queries[0][0].startswith('SHOW INDEXES')
+
+
+def test_id_strategy_uses_the_same_batched_lookup():
+    client = _FakeClient({10: {'name': 'a'}, 11: {'name': 'b'}})
+    source = [{'target_id': '10'}, {'target_id': '11'}, {'target_id': '12'}, {'target_id': None}]
+
+    with patch('scidk.services.neo4j_client.get_neo4j_client', return_value=client):
+        matches = LinkService(None)._match_with_targets(_definition('id'), source, limit=len(source))
+
+    assert len(client.queries) == 1 and client.queries[0][1]['values'] == [10, 11, 12]
+    assert [(m['target']['name'], m['target']['_id']) for m in matches] == [('a', 10), ('b', 11)]
@@ -247,11 +247,11 @@ class TestTripleImportCommit:
             source_mock = MagicMock()
             call_count = [0]
 
-            def mock_read(query):
+            def mock_read(query, params=None):
                 call_count[0] += 1
                 if call_count[0] == 1:
-                    # First call should have LIMIT 10000
-                    assert 'LIMIT 10000' in query
+                    # First call should page 10000 triples
+                    assert params['limit'] == 10000
                     return [{'source_props': {'id': str(i)}, 'rel_props': {}, 'target_props': {'id': str(i+1)}}
                             for i in range(100)]  # Return less than batch_size to end
                 return []
@@ -313,7 +313,7 @@ class TestStreamingOptimization:
     """Tests for streaming batch optimization."""
 
     def test_streaming_fetches_incrementally(self, link_service):
-        """Should fetch batches incrementally with SKIP/LIMIT."""
+        """Should fetch batches incrementally with keyset pagination on elementId."""
         with patch('scidk.services.neo4j_client.get_neo4j_client_for_profile') as mock_profile, \
              patch('scidk.services.neo4j_client.get_neo4j_client') as mock_primary:
 
@@ -326,11 +326,11 @@ class TestStreamingOptimization:
             source_mock = MagicMock()
             queries = []
 
-            def capture_query(query):
-                queries.append(query)
+            def capture_query(query, params=None):
+                queries.append((query, params))
                 # Return exactly batch_size (10000) on first call to trigger second batch
                 if len(queries) == 1:
-                    return [{'source_id': f'{i}', 'source_props': {'id': f'{i}'}, 'rel_props': {},
+                    return [{'cursor': f'r{i:05d}', 'source_id': f'{i}', 'source_props': {'id': f'{i}'}, 'rel_props': {},
                              'target_id': f'{i+1}', 'target_props': {'id': f'{i+1}'}}
                             for i in range(10000)]
                 # Return empty on second call to end loop
@@ -344,10 +344,11 @@ class TestStreamingOptimization:
                 'TestDB', 'LINKS_TO', 'Source', 'Target', 'hash123'
             )
 
-            # Verify queries used SKIP (should have made at least 2 calls with incrementing SKIP)
+            # Second page continues after the last cursor of the first (no SKIP re-scan)
             assert len(queries) >= 2, f"Expected 2+ queries but got {len(queries)}"
-            assert 'SKIP 0' in queries[0]
-            assert 'SKIP 10000' in queries[1]
+            assert all('SKIP' not in q and 'ORDER BY cursor' in q for q, _ in queries)
+            assert queries[0][1]['after'] == ''
+            assert queries[1][1]['after'] == 'r09999'
 
     def test_streaming_stops_at_end(self, link_service):
         """Should stop streaming when fewer results than batch_size returned."""
@@ -363,7 +364,7 @@ class TestStreamingOptimization:
             source_mock = MagicMock()
             call_count = [0]
 
-            def limited_results(query):
+            def limited_results(query, params=None):
                 call_count[0] += 1
                 if call_count[0] == 1:
                     # Return less than batch_size to signal end
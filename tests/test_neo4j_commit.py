@@ -18,6 +18,8 @@ class _FakeSingle:
 class _FakeIterable:
     def __iter__(self):
         return iter([{}])
+    def consume(self):
+        return None
 
 
 class _Recorder:
@@ -93,13 +95,12 @@ def test_standard_scan_and_commit_with_mock_neo4j(app, client, tmp_path, monkeyp
     assert (payload.get('neo4j_db_files') or 0) >= 1
     assert (payload.get('neo4j_db_folders') or 0) >= 0
 
-    # Inspect the recorded Cypher for the correct SET ... WITH ... CALL shape
-    commit_cyphers = [c for c in _Recorder.cyphers if isinstance(c, str) and 'MERGE (s:Scan' in c]
-    assert commit_cyphers, "Expected commit Cypher to be executed"
-    cy = commit_cyphers[-1]
-    # Ensure simplified multi-pass Cypher structure
-    assert 'UNWIND $folders AS folder' in cy
-    assert 'UNWIND $rows AS r' in cy
+    # Inspect the recorded Cypher: Scan once, then batched folder, file and edge phases
+    assert any('MERGE (s:Scan' in c for c in _Recorder.cyphers if isinstance(c, str)), "Expected Scan upsert"
+    folder_cy = [c for c in _Recorder.cyphers if isinstance(c, str) and 'UNWIND $folders AS folder' in c and 'MERGE (fo:Folder' in c]
+    assert folder_cy
+    # No statement mixes the whole scan into one transaction any more
+    assert not any('UNWIND $folders' in c and 'UNWIND $rows' in c for c in _Recorder.cyphers if isinstance(c, str))
 
     # Cleanup env
     os.environ.pop('NEO4J_URI', None)
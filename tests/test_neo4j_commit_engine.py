@@ -0,0 +1,229 @@
+import threading
+import time
+import uuid
+
+from scidk.services.neo4j_commit import (
+    CommitEngine, FILE_EDGES_CQL, FILES_CQL, FOLDER_EDGES_CQL, FOLDERS_CQL, SCAN_CQL, commit_scan_rows,
+    ensure_constraints, is_transient,
+)
+
+
+class TransientError(Exception):
+    pass
+
+
+class _Result:
+    def consume(self):
+        return None
+
+
+class _Driver:
+    """Records every statement; optionally fails or slows down selected statements."""
+
+    def __init__(self, fail=None, delay=0.0):
+        self.calls = []
+        self.fail = fail or (lambda cypher, params, n: None)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def session(self, database=None):
+        return _Session(self)
+
+    def close(self):
+        pass
+
+
+class _Session:
+    def __init__(self, driver):
+        self.d = driver
+
+    def __enter__(self):
+        with self.d.lock:
+            self.d.active += 1
+            self.d.max_active = max(self.d.max_active, self.d.active)
+        return self
+
+    def __exit__(self, *exc):
+        with self.d.lock:
+            self.d.active -= 1
+        return False
+
+    def run(self, cypher, **params):
+        with self.d.lock:
+            n = sum(1 for c, _ in self.d.calls if c == cypher)
+            self.d.calls.append((cypher, params))
+        if self.d.delay:
+            time.sleep(self.d.delay)
+        exc = self.d.fail(cypher, params, n)
+        if exc is not None:
+            raise exc
+        return _Result()
+
+
+SCAN = {'id': 'engine-scan', 'path': '/data', 'host_id': 'h1', 'provider_id': 'local_fs', 'host_type': 'local'}
+
+
+def _rows(n_dirs=5, per_dir=7):
+    files, folders = [], [{'path': '/data', 'name': 'data', 'parent': '/'}]
+    for d in range(n_dirs):
+        folders.append({'path': f'/data/d{d}', 'name': f'd{d}', 'parent': '/data'})
+        folders.append({'path': f'/data/d{d}', 'name': f'd{d}', 'parent': '/data'})  # duplicate row
+        for i in range(per_dir):
+            files.append({'path': f'/data/d{d}/f{i}.txt', 'filename': f'f{i}.txt', 'folder': f'/data/d{d}', 'interps': []})
+    return files, folders
+
+
+def test_phases_run_in_order_with_bounded_batches():
+    files, folders = _rows()
+    drv = _Driver()
+    res = CommitEngine(drv, file_batch_size=10, folder_batch_size=4, concurrency=3).commit(SCAN, files, folders)
+
+    kinds = [c for c, _ in drv.calls]
+    assert kinds[0] == SCAN_CQL
+    last_folder = max(i for i, c in enumerate(kinds) if c == FOLDERS_CQL)
+    first_file = min(i for i, c in enumerate(kinds) if c == FILES_CQL)
+    last_file = max(i for i, c in enumerate(kinds) if c == FILES_CQL)
+    first_edge = min(i for i, c in enumerate(kinds) if c in (FOLDER_EDGES_CQL, FILE_EDGES_CQL))
+    assert last_folder < first_file and last_file < first_edge
+
+    merged = [f['path'] for c, p in drv.calls if c == FOLDERS_CQL for f in p['folders']]
+    assert sorted(merged) == sorted(set(merged)) and len(merged) == 6  # each Folder MERGEd once
+    assert all(len(p['rows']) <= 10 for c, p in drv.calls if c == FILES_CQL)
+    assert all(len(p['folders']) <= 4 for c, p in drv.calls if c == FOLDERS_CQL)
+    assert all(p['node_host'] == 'h1' for c, p in drv.calls if c != SCAN_CQL)
+    assert res['written_files'] == 35 and res['written_folders'] == 6
+    assert res['batches_failed'] == 0 and res['error'] is None
+    assert set(res['phase_sec']) == {'folders', 'files', 'edges'}
+    assert res['phases']['file_edges']['items'] == 35
+
+
+def test_sources_are_streamed_and_concurrency_is_bounded():
+    files, folders = _rows(n_dirs=10, per_dir=20)
+    drv = _Driver(delay=0.005)
+    opened = []
+
+    def files_src():
+        opened.append('files')
+        return iter(files)
+
+    res = CommitEngine(drv, file_batch_size=8, folder_batch_size=8, concurrency=2).commit(SCAN, files_src, lambda: iter(folders))
+    assert opened == ['files', 'files']  # read once for nodes, once for edges
+    assert drv.max_active <= 2
+    assert res['written_files'] == 200
+
+
+def test_transient_errors_are_retried_and_permanent_errors_reported():
+    files, folders = _rows(n_dirs=2, per_dir=3)
+
+    def fail(cypher, params, n):
+        if cypher == FILES_CQL and n == 0:
+            return TransientError('DeadlockDetected')
+        if cypher == FILE_EDGES_CQL:
+            return ValueError('syntax error')
+        return None
+
+    events = []
+    drv = _Driver(fail=fail)
+    res = CommitEngine(drv, file_batch_size=100, concurrency=1, max_retries=2,
+                       on_progress=lambda e, p: events.append(e)).commit(SCAN, files, folders)
+    assert res['written_files'] == 6
+    assert res['phases']['files']['retries'] == 1
+    assert 'retry' in events
+    assert res['batches_failed'] == 1
+    assert 'file_edges batch 1' in res['error']
+    assert sum(1 for c, _ in drv.calls if c == FILE_EDGES_CQL) == 1  # permanent errors are not retried
+
+
+class _ConstraintDriver(_Driver):
+    """Answers SHOW CONSTRAINTS with the given (label, properties) uniqueness constraints (fails for None)."""
+
+    def __init__(self, existing):
+        super().__init__()
+        self.existing = existing
+
+    def session(self, database=None):
+        drv = self
+
+        class _S(_Session):
+            def run(self, cypher, **params):
+                if cypher.startswith('SHOW CONSTRAINTS'):
+                    with drv.lock:
+                        drv.calls.append((cypher, params))
+                    if drv.existing is None:
+                        raise RuntimeError('Invalid input: SHOW CONSTRAINTS')
+                    return [{'labelsOrTypes': [label], 'properties': list(props), 'type': 'UNIQUENESS'}
+                            for label, props in drv.existing]
+                return super().run(cypher, **params)
+
+        return _S(self)
+
+
+def test_constraints_are_checked_not_created_by_default(monkeypatch):
+    monkeypatch.delenv('SCIDK_NEO4J_CONSTRAINTS', raising=False)
+    files, folders = _rows(n_dirs=2, per_dir=3)
+    drv = _ConstraintDriver([('File', ('path', 'host')), ('Scan', ('id',))])
+    res = commit_scan_rows(drv, SCAN, files, folders, concurrency=4)
+    assert not any(c.startswith('CREATE CONSTRAINT') for c, _ in drv.calls)
+    assert res['constraints']['missing'] == ['Folder', 'Interpreter']
+    assert res['concurrency'] == 1  # concurrent MERGEs need the constraints
+
+    drv = _ConstraintDriver([('File', ('path', 'host')), ('Folder', ('host', 'path')), ('Scan', ('id',)), ('Interpreter', ('id',))])
+    res = commit_scan_rows(drv, SCAN, files, folders, concurrency=4)
+    assert res['constraints']['missing'] == [] and res['concurrency'] == 4
+
+    drv = _ConstraintDriver([])
+    assert ensure_constraints(drv, mode='create')['created'] == ['File', 'Folder', 'Scan', 'Interpreter']
+    assert sum(1 for c, _ in drv.calls if c.startswith('CREATE CONSTRAINT')) == 4
+    drv = _ConstraintDriver([])
+    assert ensure_constraints(drv, mode='off') == {'mode': 'off', 'missing': None, 'created': []}
+    assert drv.calls == []
+
+
+def test_undetermined_constraints_force_one_session(monkeypatch):
+    files, folders = _rows(n_dirs=2, per_dir=3)
+    drv = _ConstraintDriver(None)
+    monkeypatch.setenv('SCIDK_NEO4J_CONSTRAINTS', 'check')
+    res = commit_scan_rows(drv, SCAN, files, folders, concurrency=4)
+    assert res['constraints']['missing'] is None and res['concurrency'] == 1
+    monkeypatch.setenv('SCIDK_NEO4J_CONSTRAINTS', 'off')
+    assert commit_scan_rows(_Driver(), SCAN, files, folders, concurrency=4)['concurrency'] == 4
+
+
+def test_file_edges_merge_folders_missing_from_the_folder_rows():
+    assert 'MERGE (fo:Folder {path: r.folder, host: $node_host})' in FILE_EDGES_CQL
+    files = [{'path': '/data/new/f.txt', 'filename': 'f.txt', 'folder': '/data/new', 'interps': []}]
+    drv = _Driver()
+    res = CommitEngine(drv, concurrency=1).commit(SCAN, lambda: iter(files), [{'path': '/data', 'name': 'data', 'parent': '/'}])
+    assert [p['rows'] for c, p in drv.calls if c == FILE_EDGES_CQL] == [[{'path': '/data/new/f.txt', 'folder': '/data/new'}]]
+    assert res['phases']['file_edges']['items'] == 1
+
+
+def test_is_transient_by_type_name_and_message():
+    assert is_transient(TransientError('x'))
+    assert is_transient(RuntimeError('Neo.TransientError.Transaction.DeadlockDetected'))
+    assert not is_transient(ValueError('Invalid input'))
+
+
+def test_index_row_source_matches_materialized_builder():
+    from scidk.core import path_index_sqlite as pix
+    from scidk.core.commit_rows_from_index import IndexRowSource, build_rows_for_scan_from_index
+
+    scan_id = f"engine-{uuid.uuid4().hex[:8]}"
+    base = f"/idx/{scan_id}"
+    items = [(base + '/a', base, 'a', 1, 'folder', 0, 0.0, '', None, None, None, 0, scan_id, None)]
+    for d in ('a', 'a/b', 'c/d'):
+        for i in range(3):
+            p = f"{base}/{d}/f{i}.csv"
+            items.append((p, p.rsplit('/', 1)[0], f"f{i}.csv", 2, 'file', 10, 1.0, '.csv', 'text/csv', None, None, 0, scan_id, None))
+    pix.batch_insert_files(items)
+    scan = {'id': scan_id, 'path': base}
+
+    rows, folder_rows = build_rows_for_scan_from_index(scan_id, scan)
+    src = IndexRowSource(scan_id, scan, chunk_size=2)
+    assert sorted(r['path'] for r in src.files()) == sorted(r['path'] for r in rows)
+    assert src.count_files() == len(rows) == 9
+    streamed = {(f['path'], f['parent']) for f in src.folders()}
+    assert streamed == {(f['path'], f['parent']) for f in folder_rows}
+    assert {(f'{base}/c', f'{base}/c/d')} <= {(p, c) for c, p in streamed}
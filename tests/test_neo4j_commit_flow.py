@@ -122,7 +122,7 @@ def test_commit_executes_folder_upsert_and_link_with_node_host(monkeypatch):
 
     # Find queries by distinctive substrings
     upsert_calls = [c for c in _Recorder.calls if 'MERGE (fo:Folder' in c['cypher'] and ':SCANNED_IN' in c['cypher']]
-    link_calls = [c for c in _Recorder.calls if 'MERGE (child:Folder' in c['cypher'] and '(parent)-[:CONTAINS]->(child)' in c['cypher']]
+    link_calls = [c for c in _Recorder.calls if 'MATCH (child:Folder' in c['cypher'] and '(parent)-[:CONTAINS]->(child)' in c['cypher']]
     file_calls = [c for c in _Recorder.calls if 'MERGE (f:File' in c['cypher']]
 
     assert upsert_calls, "Expected folder upsert cypher to be executed"
@@ -1,13 +1,12 @@
-import inspect
-import scidk.web.helpers as helpers_mod
+from scidk.services import neo4j_commit
 
 
-def test_commit_neo4j_uses_two_stage_folder_queries():
-    # Ensure the function contains both upsert and link Cypher templates
-    src = inspect.getsource(helpers_mod.commit_to_neo4j_batched)
-    assert "folders_upsert_cql" in src
-    assert "folders_link_cql" in src
-    # Upsert CQL must set Folder with host and attach SCANNED_IN
-    assert "MERGE (fo:Folder" in src and ":SCANNED_IN" in src
-    # Link CQL must connect parent->child
-    assert "MERGE (child:Folder" in src and "(parent)-[:CONTAINS]->(child)" in src
+def test_commit_engine_uses_two_stage_folder_queries():
+    # Folder nodes are upserted (with SCANNED_IN) once, then linked parent->child in the edge phase
+    assert "MERGE (fo:Folder" in neo4j_commit.FOLDERS_CQL and ":SCANNED_IN" in neo4j_commit.FOLDERS_CQL
+    assert "MATCH (child:Folder" in neo4j_commit.FOLDER_EDGES_CQL
+    assert "(parent)-[:CONTAINS]->(child)" in neo4j_commit.FOLDER_EDGES_CQL
+    # File nodes carry no folder logic; file edges MERGE their folder like the pre-engine commit did
+    assert neo4j_commit.FOLDERS_CQL.count("MERGE (fo:Folder") == 1
+    assert "MERGE (fo:Folder" not in neo4j_commit.FILES_CQL
+    assert "MERGE (fo:Folder" in neo4j_commit.FILE_EDGES_CQL
@@ -0,0 +1,93 @@
+import sys
+import time
+import types
+
+import pytest
+
+from scidk.services.neo4j_drivers import DriverRegistry
+
+
+class _FakeDriver:
+    def __init__(self, uri, auth=None):
+        self.uri = uri
+        self.auth = auth
+        self.closed = False
+        self.healthy = True
+
+    def session(self, database=None):
+        return types.SimpleNamespace(database=database)
+
+    def verify_connectivity(self):
+        if not self.healthy:
+            raise RuntimeError('ServiceUnavailable')
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def created(monkeypatch):
+    drivers = []
+
+    def driver(uri, auth=None, **opts):
+        d = _FakeDriver(uri, auth)
+        drivers.append(d)
+        return d
+
+    monkeypatch.setitem(sys.modules, 'neo4j', types.SimpleNamespace(GraphDatabase=types.SimpleNamespace(driver=driver)))
+    return drivers
+
+
+def test_leases_share_one_driver_per_uri_and_user(created):
+    reg = DriverRegistry(health_check_sec=0)
+    a = reg.acquire('bolt://h:7687', 'neo4j', 'pw', database='db1')
+    b = reg.acquire('bolt://h:7687', 'neo4j', 'pw', database='db2')
+    c = reg.acquire('bolt://h:7687', 'reader', 'pw')
+    assert a.driver is b.driver and c.driver is not a.driver
+    assert len(created) == 2
+    assert b.session(database='db2').database == 'db2'
+
+    a.close()
+    a.close()  # idempotent
+    b.close()
+    assert not created[0].closed  # released, pool kept for reuse
+    st = reg.stats()
+    assert st['created'] == 2 and st['reused'] == 1 and st['leases_active'] == 1
+    assert {d['user']: d['databases'] for d in st['drivers']}['neo4j'] == ['db1', 'db2']
+
+
+def test_credential_change_replaces_driver_after_last_lease(created):
+    reg = DriverRegistry(health_check_sec=0)
+    old = reg.acquire('bolt://h', 'neo4j', 'old')
+    new = reg.acquire('bolt://h', 'neo4j', 'new')
+    assert new.driver is not old.driver and new.driver.auth == ('neo4j', 'new')
+    assert not created[0].closed  # still leased by an in-flight caller
+    old.close()
+    assert created[0].closed
+    assert reg.stats()['credential_changes'] == 1
+
+
+def test_failed_health_check_rebuilds_driver(created):
+    reg = DriverRegistry(health_check_sec=0.01)
+    reg.acquire('bolt://h', 'neo4j', 'pw').close()
+    created[0].healthy = False
+    time.sleep(0.02)
+    lease = reg.acquire('bolt://h', 'neo4j', 'pw')
+    assert lease.driver is created[1] and created[0].closed
+    assert reg.stats()['health_failures'] == 1
+
+
+def test_invalidate_and_client_lifecycle(created, monkeypatch):
+    import scidk.services.neo4j_drivers as nd
+    from scidk.services.neo4j_client import Neo4jClient
+
+    reg = DriverRegistry(health_check_sec=0)
+    monkeypatch.setattr(nd, '_REGISTRY', reg)
+    clients = [Neo4jClient('bolt://h', 'neo4j', 'pw', 'neo4j').connect() for _ in range(5)]
+    assert len(created) == 1
+    for c in clients:
+        c.close()
+    assert reg.stats()['leases_active'] == 0 and not created[0].closed
+
+    assert reg.invalidate('bolt://h') == 1
+    assert created[0].closed and reg.stats()['drivers_open'] == 0
@@ -0,0 +1,97 @@
+import random
+from pathlib import Path
+
+from scidk.core.pattern_matcher import PatternMatcher, Rule, RuleEngine
+from scidk.core.registry import InterpreterRegistry
+
+
+class DummyInterpreter:
+    def __init__(self, id_: str):
+        self.id = id_
+
+
+def _naive(rules, path: str, dataset):
+    pm = PatternMatcher()
+    p = Path(path)
+    return sorted([r for r in rules if pm.matches(r, p, dataset)], key=lambda r: r.priority, reverse=True)
+
+
+def _rules(n: int, exts):
+    rng = random.Random(7)
+    rules = []
+    for i in range(n):
+        ext = exts[i % len(exts)]
+        kind = i % 5
+        if kind == 0:
+            pat, cond = f'*{ext}', {'ext': ext}
+        elif kind == 1:
+            pat, cond = f'*_run{i % 7}{ext}', None
+        elif kind == 2:
+            pat, cond = f'/data/proj{i % 9}/*', {'min_size': rng.randint(0, 500)}
+        elif kind == 3:
+            pat, cond = f'sample_[0-9]*{ext}', {'max_size': rng.randint(100, 900)}
+        else:
+            pat, cond = '*', {'ext': ext, 'min_size': 10, 'max_size': rng.randint(10, 1000)}
+        rules.append(Rule(id=f'r{i}', interpreter_id=f'i{i % 40}', pattern=pat, priority=rng.randint(0, 20), conditions=cond))
+    return rules
+
+
+def _paths(n: int, exts):
+    rng = random.Random(11)
+    out = []
+    for i in range(n):
+        ext = rng.choice(exts + ['.dat', ''])
+        stem = rng.choice(['sample_3', 'x_run2', 'sample_a', 'file', 'Sample_9'])
+        out.append((f'/data/proj{rng.randint(0, 12)}/sub{i % 13}/{stem}{ext}', ext, rng.randint(0, 1200)))
+    return out
+
+
+EXTS = ['.csv', '.tif', '.fastq.gz', '.json', '.h5', '.py', '.CSV']
+
+
+def test_compiled_rules_match_naive_evaluation():
+    rules = _rules(150, EXTS)
+    eng = RuleEngine()
+    for r in rules:
+        eng.add_rule(r)
+    for path, ext, size in _paths(1500, EXTS):
+        for ds in ({'extension': ext.lower(), 'size_bytes': size}, {'extension': ext.lower()}):
+            got = [r.id for r in eng.applicable(Path(path), ds)]
+            want = [r.id for r in _naive(rules, path, ds)]
+            assert got == want, path
+
+
+def test_adding_a_rule_recompiles():
+    eng = RuleEngine()
+    eng.add_rule(Rule(id='a', interpreter_id='x', pattern='*.csv'))
+    assert [r.id for r in eng.applicable('/t/a.csv', {})] == ['a']
+    eng.add_rule(Rule(id='b', interpreter_id='y', pattern='*.csv', priority=5))
+    assert [r.id for r in eng.applicable('/t/a.csv', {})] == ['b', 'a']
+
+
+def test_select_batch_matches_select_for_dataset():
+    reg = InterpreterRegistry()
+    interps = {f'i{i}': DummyInterpreter(f'i{i}') for i in range(40)}
+    for i, it in interps.items():
+        reg.register_extension(EXTS[int(i[1:]) % len(EXTS)], it)
+    for r in _rules(120, EXTS):
+        reg.register_rule(r)
+    reg.enable_interpreter('i3')
+    reg.enable_interpreter('i7')
+    paths = _paths(800, EXTS)
+    batch = reg.select_batch([p for p, _, _ in paths], [e.lower() for _, e, _ in paths], [s for _, _, s in paths])
+    for (path, ext, size), sel in zip(paths, batch):
+        assert sel == reg.select_for_dataset({'path': path, 'extension': ext.lower(), 'size_bytes': size})
+
+
+def test_match_masks_match_naive_evaluation():
+    # Timing lives in scripts/bench_rule_matching.py; this only checks the batch API selects the same rules
+    rules = _rules(100, EXTS)
+    eng = RuleEngine()
+    for r in rules:
+        eng.add_rule(r)
+    paths = _paths(500, EXTS)
+    masks = eng.match_masks([p for p, _, _ in paths], [e.lower() for _, e, _ in paths], [s for _, _, s in paths])
+    for (path, ext, size), mask in zip(paths, masks):
+        want = [r.id for r in _naive(rules, path, {'extension': ext.lower(), 'size_bytes': size})]
+        assert [r.id for r in eng.compiled().rules_for(mask)] == want, path
@@ -0,0 +1,89 @@
+import hashlib
+import time
+from pathlib import Path
+
+from scidk.core import path_index_sqlite as pix
+from scidk.core.filesystem import FilesystemManager
+from scidk.core.graph import InMemoryGraph
+from scidk.core.registry import InterpreterRegistry
+
+BS = 4096
+
+
+def _big(tmp_path: Path, name: str = 'stack.raw', blocks: int = 100) -> Path:
+    f = tmp_path / name
+    f.write_bytes(bytes(range(256)) * (BS * blocks // 256))
+    return f
+
+
+def test_sampled_fingerprint_covers_size_head_tail_and_sampled_blocks(tmp_path: Path):
+    f = _big(tmp_path)
+    base = pix.compute_sampled_fingerprint(str(f), block_size=BS, blocks=4)
+    assert base and len(base) == 64
+
+    data = bytearray(f.read_bytes())
+    # Tail change is detected
+    data[-1] ^= 0xFF
+    f.write_bytes(bytes(data))
+    assert pix.compute_sampled_fingerprint(str(f), block_size=BS, blocks=4) != base
+    data[-1] ^= 0xFF
+    # A byte between sampled blocks is (by design) not covered
+    data[2 * BS] ^= 0xFF
+    f.write_bytes(bytes(data))
+    assert pix.compute_sampled_fingerprint(str(f), block_size=BS, blocks=4) == base
+    # Size change is always detected
+    f.write_bytes(bytes(data) + b'x')
+    assert pix.compute_sampled_fingerprint(str(f), block_size=BS, blocks=4) != base
+
+
+def test_sampled_policy_in_compute_content_hash(tmp_path: Path):
+    small = tmp_path / 'small.txt'
+    small.write_bytes(b'')
+    assert pix.compute_content_hash(str(small), 'sampled') == pix.compute_sampled_fingerprint(str(small))
+    assert pix.compute_content_hash(str(tmp_path / 'missing'), 'sampled') is None
+
+
+def test_large_files_get_sampled_identity_and_lazy_full_hash(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv('SCIDK_SAMPLED_HASH_MIN_BYTES', str(BS * 10))
+    fs = FilesystemManager(InMemoryGraph(), InterpreterRegistry())
+    big = _big(tmp_path)
+    small = tmp_path / 'note.txt'
+    small.write_text('hi', encoding='utf-8')
+
+    ds_big = fs.create_dataset_node(big)
+    ds_small = fs.create_dataset_node(small)
+    assert ds_big['checksum_mode'] == 'sampled'
+    assert ds_small['checksum_mode'] == 'full'
+    assert ds_small['checksum'] == hashlib.sha256(b'hi').hexdigest()
+
+    full = fs.complete_sampled_checksum(ds_big)
+    assert full == hashlib.sha256(big.read_bytes()).hexdigest()
+    assert ds_big['full_checksum'] == full
+    assert ds_big['checksum'] != full
+
+
+def test_rehash_task_completes_sampled_datasets(app, client, tmp_path: Path):
+    fs = app.extensions['scidk']['fs']
+    fs.sampled_min_bytes = BS * 10
+    try:
+        big = _big(tmp_path)
+        r = client.post('/api/scan', json={'path': str(tmp_path), 'recursive': False})
+        assert r.status_code == 200
+        graph = app.extensions['scidk']['graph']
+        ds = next(d for d in graph.list_datasets() if d['path'] == str(big))
+        assert ds['checksum_mode'] == 'sampled'
+
+        r = client.post('/api/tasks', json={'type': 'rehash', 'scan_id': r.get_json()['scan_id']})
+        assert r.status_code == 202
+        task_id = r.get_json()['task_id']
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            tj = client.get(f'/api/tasks/{task_id}').get_json()
+            if tj['status'] != 'running':
+                break
+            time.sleep(0.05)
+        assert tj['status'] == 'completed'
+        assert tj['total'] == 1
+        assert ds['full_checksum'] == hashlib.sha256(big.read_bytes()).hexdigest()
+    finally:
+        fs.sampled_min_bytes = 0
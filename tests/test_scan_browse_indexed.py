@@ -89,3 +89,67 @@ def test_scan_browse_index_listing_sort_filter_pagination(monkeypatch, tmp_path)
     # 5) 404 when scan not found
     r = client.get('/api/scans/doesnotexist/browse', query_string={'path': parent})
     assert r.status_code == 404
+
+
+def test_scan_browse_keyset_pages_cover_all_entries(monkeypatch, tmp_path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    scan_id = 'scan_keyset'
+    parent = '/data'
+    rows = [(f'{parent}/d{i:02d}', parent, f'd{i:02d}', 1, 'folder', 0, None, None, None, None, None, None, scan_id, None) for i in range(3)]
+    rows += [(f'{parent}/f{i:02d}.txt', parent, f'f{i:02d}.txt', 1, 'file', i, None, '.txt', None, None, None, None, scan_id, None) for i in range(6)]
+    conn = pix.connect()
+    try:
+        pix.init_db(conn)
+        _insert_rows(conn, rows)
+    finally:
+        conn.close()
+
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        app.extensions['scidk'].setdefault('scans', {})[scan_id] = {'id': scan_id, 'path': parent}
+    client = authenticate_test_client(app.test_client(), app)
+
+    names, token, pages = [], None, 0
+    while True:
+        qs = {'path': parent, 'page_size': 2}
+        if token:
+            qs['next_page_token'] = token
+        d = client.get(f'/api/scans/{scan_id}/browse', query_string=qs).get_json()
+        names += [e['name'] for e in d['entries']]
+        pages += 1
+        token = d.get('next_page_token')
+        if not token:
+            break
+        assert not token.isdigit()  # opaque cursor, not an offset
+    assert pages == 5
+    assert names == ['d00', 'd01', 'd02'] + [f'f{i:02d}.txt' for i in range(6)]
+
+    # Legacy offset tokens keep working
+    d = client.get(f'/api/scans/{scan_id}/browse', query_string={'path': parent, 'page_size': 2, 'next_page_token': '3'}).get_json()
+    assert [e['name'] for e in d['entries']] == ['f00.txt', 'f01.txt']
+
+    assert len(app.extensions['scidk']['telemetry']['lat_browse']) == 6
+
+
+def test_browse_queries_seek_the_browse_index_without_sorting(monkeypatch, tmp_path):
+    from scidk.services.fs_index_service import _BROWSE_COLUMNS
+
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    conn = pix.connect()
+    try:
+        pix.init_db(conn)
+        where = "scan_id = ? AND parent_path = ? AND file_extension = ?"
+        queries = [
+            f"{where} ORDER BY type DESC, name ASC LIMIT 51",
+            f"{where} AND type = ? AND name > ? ORDER BY name ASC LIMIT 51",
+            f"{where} AND type < ? ORDER BY type DESC, name ASC LIMIT 51",
+        ]
+        params = ['scan1', '/data', '.txt', 'file', 'a.txt']
+        for q in queries:
+            sql = f"EXPLAIN QUERY PLAN SELECT {_BROWSE_COLUMNS} FROM files WHERE {q}"
+            plan = ' '.join(r[-1] for r in conn.execute(sql, params[:q.count('?')]))
+            assert 'USING INDEX idx_files_scan_browse' in plan, plan
+            assert 'TEMP B-TREE' not in plan, plan
+    finally:
+        conn.close()
@@ -0,0 +1,54 @@
+import json
+import sqlite3
+
+import pytest
+
+from scidk.app import create_app
+from scidk.core import scan_members
+from scidk.core.migrations import migrate
+from tests.conftest import authenticate_test_client
+
+
+def test_backfill_moves_legacy_checksum_blobs(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'legacy.db'))
+    migrate(conn)
+    legacy = {'file_count': 3, 'by_ext': {'.txt': 3}, 'checksums': ['c', 'a', 'b']}
+    conn.execute("INSERT INTO scans(id, root, started, completed, status, extra_json) VALUES(?,?,?,?,?,?)",
+                 ('old', '/data', 1.0, 2.0, 'completed', json.dumps(legacy)))
+
+    assert scan_members.backfill_from_extra_json(conn) == 1
+    extra, file_count, checksum_count = conn.execute(
+        "SELECT extra_json, file_count, checksum_count FROM scans WHERE id = 'old'").fetchone()
+    assert 'checksums' not in json.loads(extra) and json.loads(extra)['by_ext'] == {'.txt': 3}
+    assert (file_count, checksum_count) == (3, 3)
+    assert scan_members.load_checksums(conn, 'old') == ['a', 'b', 'c']
+    assert scan_members.backfill_from_extra_json(conn) == 0  # one-time
+    conn.close()
+
+
+@pytest.mark.integration
+def test_scan_listing_reads_counts_and_detail_reads_members(monkeypatch, tmp_path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'members.db'))
+    monkeypatch.setenv('SCIDK_STATE_BACKEND', 'sqlite')
+    app = create_app()
+    app.config['state.backend'] = 'sqlite'
+    client = authenticate_test_client(app.test_client(), app)
+
+    root = tmp_path / 'root'
+    root.mkdir()
+    (root / 'a.txt').write_text('a')
+    (root / 'b.txt').write_text('b')
+    r = client.post('/api/scan', json={'path': str(root), 'recursive': False})
+    assert r.status_code == 200, r.get_json()
+    sid = r.get_json()['scan_id']
+    expected = sorted(app.extensions['scidk']['scans'][sid]['checksums'])
+    app.extensions['scidk']['scans'].clear()
+
+    conn = sqlite3.connect(str(tmp_path / 'members.db'))
+    extra, count = conn.execute("SELECT extra_json, checksum_count FROM scans WHERE id = ?", (sid,)).fetchone()
+    conn.close()
+    assert 'checksums' not in json.loads(extra) and count == len(expected) == 2
+
+    listed = {s['id']: s for s in client.get('/api/scans').get_json()}
+    assert listed[sid]['checksum_count'] == 2
+    assert client.get(f'/api/scans/{sid}').get_json()['checksums'] == expected
@@ -0,0 +1,87 @@
+import threading
+import time
+from pathlib import Path
+
+from scidk.core.scan_pipeline import PipelineConfig, ScanPipeline
+
+
+def test_pipeline_batches_rows_and_applies_sink_on_writer_thread():
+    written = []
+    sunk = []
+    sink_threads = set()
+
+    def process(i):
+        return (('row', i), i * 2)
+
+    def sink(payload):
+        sink_threads.add(threading.current_thread().name)
+        sunk.append(payload)
+
+    pipeline = ScanPipeline(PipelineConfig(workers=4, queue_size=8, batch_size=10))
+    stats = pipeline.run(range(95), process, write_rows=lambda b: written.append(len(b)) or len(b), sink=sink)
+
+    assert stats['submitted'] == 95
+    assert stats['processed'] == 95
+    assert stats['rows_written'] == 95
+    assert stats['batches'] == 10
+    assert max(written) <= 10
+    assert sorted(sunk) == [i * 2 for i in range(95)]
+    assert sink_threads == {'scidk-scan-writer'}
+
+
+def test_pipeline_backpressure_bounds_queue_depth():
+    def slow(i):
+        time.sleep(0.001)
+        return (None, None)
+
+    pipeline = ScanPipeline(PipelineConfig(workers=2, queue_size=4, batch_size=100))
+    stats = pipeline.run(iter(range(200)), slow)
+    assert stats['processed'] == 200
+    assert stats['max_queue_depth'] <= 4
+
+
+def test_pipeline_counts_errors_and_honors_cancel():
+    def flaky(i):
+        if i % 5 == 0:
+            raise ValueError('boom')
+        return (('r', i), None)
+
+    stats = ScanPipeline(PipelineConfig(workers=2, queue_size=4, batch_size=3)).run(range(20), flaky, write_rows=len)
+    assert stats['errors'] == 4
+    assert stats['rows_written'] == 16
+
+    seen = []
+    stats = ScanPipeline(PipelineConfig(workers=1, queue_size=2, batch_size=3)).run(
+        range(1000), lambda i: seen.append(i) or (None, None), should_cancel=lambda: len(seen) >= 5
+    )
+    assert stats['canceled'] is True
+    assert stats['submitted'] < 1000
+
+
+def test_pipeline_config_env_and_overrides(monkeypatch):
+    monkeypatch.setenv('SCIDK_SCAN_WORKERS', '3')
+    monkeypatch.setenv('SCIDK_SCAN_QUEUE_SIZE', '50')
+    cfg = PipelineConfig.from_env({'batch_size': 7})
+    assert (cfg.workers, cfg.queue_size, cfg.batch_size) == (3, 50, 7)
+
+
+def test_scan_uses_pipeline_and_indexes_all_files(client, tmp_path: Path):
+    base = tmp_path / 'tree'
+    for d in range(3):
+        sub = base / f'd{d}'
+        sub.mkdir(parents=True)
+        for f in range(7):
+            (sub / f'f{f}.txt').write_text(f'{d}-{f}', encoding='utf-8')
+
+    r = client.post('/api/scan', json={
+        'path': str(base), 'recursive': True,
+        'pipeline': {'workers': 2, 'queue_size': 4, 'batch_size': 5},
+    })
+    assert r.status_code == 200
+    payload = r.get_json()
+    assert payload['scanned'] == 21
+    # 21 file rows + base + 3 subfolders
+    assert payload['ingested_rows'] == 25
+    last = client.application.extensions['scidk']['telemetry']['last_scan']
+    assert last['pipeline']['workers'] == 2
+    assert last['pipeline']['batches'] >= 5
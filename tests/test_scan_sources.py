@@ -1,3 +1,5 @@
+import io
+import json
 from pathlib import Path
 from unittest import mock
 
@@ -20,37 +22,56 @@ def test_scan_source_python_when_no_tools(client, tmp_path: Path):
     assert entry.get('source') == 'python'
 
 
-def test_scan_source_ncdu_preferred_when_output_contains_paths(client, tmp_path: Path):
+def _ncdu_export(root: Path, files) -> bytes:
+    """Minimal ncdu-format export of a flat directory."""
+    entries = [{'name': str(root), 'asize': 0, 'dev': 1}]
+    for f in files:
+        st = f.stat()
+        entries.append({'name': f.name, 'asize': st.st_size, 'ino': st.st_ino, 'mtime': int(st.st_mtime)})
+    return json.dumps([1, 2, {'progname': 'ncdu'}, entries]).encode('utf-8')
+
+
+def _fake_popen(stdout: bytes):
+    proc = mock.Mock(stdout=io.BytesIO(stdout), returncode=0)
+    proc.poll.return_value = 0
+    proc.wait.return_value = 0
+    return proc
+
+
+def test_scan_source_ncdu_when_selected(client, tmp_path: Path):
     f = _make_file(tmp_path, 'b.txt')
-    # Simulate ncdu present and returns stdout containing absolute path
     def which(name):
         return '/usr/bin/ncdu' if name == 'ncdu' else None
-    fake_stdout = (str(f.resolve()) + "\n").encode('utf-8')
-    completed = mock.Mock(stdout=fake_stdout, stderr=b'', returncode=0)
     with mock.patch('shutil.which', side_effect=which):
-        with mock.patch('subprocess.run', return_value=completed):
-            resp = client.post('/api/scan', json={'path': str(tmp_path), 'recursive': False})
+        with mock.patch('subprocess.Popen', return_value=_fake_popen(_ncdu_export(tmp_path.resolve(), [f]))) as popen:
+            resp = client.post('/api/scan', json={'path': str(tmp_path), 'recursive': True, 'enumerator': 'ncdu'})
             assert resp.status_code == 200
+            assert popen.call_args[0][0][:2] == ['/usr/bin/ncdu', '-q']
+    assert resp.get_json()['scanned'] == 1
     # Directory source should be ncdu
     d_resp = client.get('/api/directories')
     entry = next(d for d in d_resp.get_json() if d.get('path') == str(tmp_path))
     assert entry.get('source') == 'ncdu'
 
 
-def test_scan_source_gdu_when_ncdu_absent_and_output_contains_paths(client, tmp_path: Path):
+def test_scan_source_gdu_when_selected(client, tmp_path: Path):
     f = _make_file(tmp_path, 'c.txt')
     def which(name):
-        if name == 'ncdu':
-            return None
-        if name == 'gdu':
-            return '/usr/bin/gdu'
-        return None
-    fake_stdout = (str(f.resolve()) + "\n").encode('utf-8')
-    completed = mock.Mock(stdout=fake_stdout, stderr=b'', returncode=0)
+        return '/usr/bin/gdu' if name == 'gdu' else None
     with mock.patch('shutil.which', side_effect=which):
-        with mock.patch('subprocess.run', return_value=completed):
-            resp = client.post('/api/scan', json={'path': str(tmp_path), 'recursive': False})
+        with mock.patch('subprocess.Popen', return_value=_fake_popen(_ncdu_export(tmp_path.resolve(), [f]))):
+            resp = client.post('/api/scan', json={'path': str(tmp_path), 'recursive': True, 'enumerator': 'gdu'})
             assert resp.status_code == 200
+    assert resp.get_json()['scanned'] == 1
     d_resp = client.get('/api/directories')
     entry = next(d for d in d_resp.get_json() if d.get('path') == str(tmp_path))
     assert entry.get('source') == 'gdu'
+
+
+def test_scan_source_falls_back_to_python_when_tool_missing(client, tmp_path: Path):
+    _make_file(tmp_path, 'd.txt')
+    with mock.patch('shutil.which', return_value=None):
+        resp = client.post('/api/scan', json={'path': str(tmp_path), 'recursive': True, 'enumerator': 'ncdu'})
+        assert resp.status_code == 200
+    entry = next(d for d in client.get('/api/directories').get_json() if d.get('path') == str(tmp_path))
+    assert entry.get('source') == 'python'
@@ -0,0 +1,87 @@
+import time
+
+from scidk.ai import schema_context
+from scidk.ai.schema_context import get_schema_context, invalidate_schema_cache
+
+
+class _Result(list):
+    def single(self):
+        return self[0] if self else None
+
+
+class _Session:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        self.driver.queries.append(query)
+        d = self.driver
+        if 'db.labels' in query:
+            return _Result([{'labels': list(d.counts), 'relationships': ['CONTAINS']}])
+        if 'count(n) AS c' in query:
+            return _Result([{'i': i, 'c': c} for i, c in enumerate(d.counts.values())])
+        if 'keys(n)' in query:
+            assert params['sample'] > 0
+            return _Result([{'i': i, 'key': k, 'freq': f} for i, props in enumerate(d.props) for k, f in props.items()])
+        raise AssertionError(query)
+
+
+class _Driver:
+    def __init__(self):
+        self.counts = {'Folder': 2, 'File': 7}
+        self.props = [{'path': 7, 'size': 3, 'name': 5}, {'path': 2}]  # File, Folder (ranked)
+        self.queries = []
+
+    def session(self, database=None):
+        return _Session(self)
+
+
+def test_schema_context_reads_all_labels_in_three_round_trips():
+    invalidate_schema_cache()
+    driver = _Driver()
+    schema = get_schema_context(driver, database='neo4j', uri='bolt://a', max_props_per_label=2)
+    assert schema['cached'] is False
+    assert schema['labels'] == ['File', 'Folder']
+    assert schema['relationships'] == ['CONTAINS']
+    assert schema['label_counts'] == {'File': 7, 'Folder': 2}
+    assert schema['properties']['File'] == ['path', 'name']
+    assert len(driver.queries) == 3
+
+    again = get_schema_context(driver, database='neo4j', uri='bolt://a')
+    assert again['cached'] is True and again['stale'] is False
+    assert len(driver.queries) == 3
+    # Keyed per (uri, database)
+    get_schema_context(driver, database='other', uri='bolt://a')
+    assert len(driver.queries) == 6
+    assert invalidate_schema_cache(uri='bolt://a', database='other') == 1
+    invalidate_schema_cache()
+
+
+def test_expired_schema_is_served_while_refreshing(monkeypatch):
+    invalidate_schema_cache()
+    monkeypatch.setattr(schema_context._schema_cache, 'ttl_seconds', 0)
+    driver = _Driver()
+    get_schema_context(driver, uri='bolt://b')
+    driver.counts = {'Folder': 2, 'File': 7, 'Sample': 1}
+    driver.props = driver.props + [{'id': 1}]  # Sample ranks last
+    time.sleep(0.01)
+
+    stale = get_schema_context(driver, uri='bolt://b')
+    assert stale['cached'] is True and stale['stale'] is True
+    assert 'Sample' not in stale['labels']
+
+    deadline = time.time() + 5
+    while schema_context._schema_cache._refreshing or len(driver.queries) < 6:
+        assert time.time() < deadline
+        time.sleep(0.01)
+    monkeypatch.setattr(schema_context._schema_cache, 'ttl_seconds', 300)
+    fresh = get_schema_context(driver, uri='bolt://b')
+    assert 'Sample' in fresh['labels']
+    assert fresh['properties']['Sample'] == ['id']
+    invalidate_schema_cache()
@@ -0,0 +1,110 @@
+from scidk.services.graphrag.query_cache import bump_graph_epoch, graph_epoch
+from scidk.services.schema_stats import SchemaStatsService
+
+
+class _Result(list):
+    def single(self):
+        return self[0] if self else None
+
+
+class _Session:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, params=None):
+        self.driver.queries.append(query)
+        if 'apoc.meta.stats' in query:
+            if not self.driver.apoc:
+                raise RuntimeError('There is no procedure with the name `apoc.meta.stats`')
+            return _Result([{'labels': {'File': 7, 'Folder': 2}, 'relTypesCount': {'CONTAINS': 7}}])
+        if 'db.labels' in query:
+            return _Result([{'label': 'File'}, {'label': 'Folder'}])
+        if 'db.relationshipTypes' in query:
+            return _Result([{'relationshipType': 'CONTAINS'}])
+        if query.startswith('MATCH (n:`File`)'):
+            return _Result([{'c': 7}])
+        if query.startswith('MATCH (n:`Folder`)'):
+            return _Result([{'c': 2}])
+        if query.startswith('MATCH ()-[r:`CONTAINS`]'):
+            return _Result([{'c': 7}])
+        if query.startswith('MATCH (s)-[r]->(t)'):
+            return _Result([{'start_label': 'Folder', 'rel_type': 'CONTAINS', 'end_label': 'File', 'c': self.driver.edges}])
+        raise AssertionError(query)
+
+
+class _Driver:
+    def __init__(self, apoc=True):
+        self.apoc = apoc
+        self.edges = 7
+        self.queries = []
+        self.closed = False
+
+    def session(self, database=None):
+        return _Session(self)
+
+    def close(self):
+        self.closed = True
+
+
+def _triple_scans(driver):
+    return sum(1 for q in driver.queries if q.startswith('MATCH (s)-[r]->(t)'))
+
+
+def test_snapshot_is_cached_and_refreshed_after_a_write():
+    driver = _Driver()
+    svc = SchemaStatsService(interval_sec=0, max_age_sec=0, cold_wait_sec=5)
+
+    snap = svc.get('bolt://h', 'neo4j', 'fp', lambda: driver)
+    assert snap['nodes'] == [{'label': 'File', 'c': 7}, {'label': 'Folder', 'c': 2}]
+    assert snap['edges'][0]['c'] == 7
+    assert snap['stats']['counts_source'] == 'apoc.meta.stats'
+    assert snap['stats']['version'] == graph_epoch() and not snap['stats']['stale']
+
+    again = svc.get('bolt://h', 'neo4j', 'fp', lambda: driver)
+    assert again['edges'] == snap['edges'] and _triple_scans(driver) == 1
+
+    # A commit bumps the epoch: the cached snapshot is served, marked stale, and refreshed in the background
+    driver.edges = 9
+    bump_graph_epoch()
+    stale = svc.get('bolt://h', 'neo4j', 'fp', lambda: driver)
+    assert stale['stats']['stale'] and stale['edges'][0]['c'] == 7
+    entry = svc._entries[('bolt://h', 'neo4j')]
+    assert entry.wait(5)
+    fresh = svc.get('bolt://h', 'neo4j', 'fp', lambda: driver)
+    assert fresh['edges'][0]['c'] == 9 and not fresh['stats']['stale']
+    assert _triple_scans(driver) == 2
+
+    assert svc.invalidate('bolt://h') == 1 and driver.closed
+
+
+def test_writes_do_not_trigger_refreshes_while_the_scheduler_runs():
+    driver = _Driver()
+    svc = SchemaStatsService(interval_sec=3600, max_age_sec=0, cold_wait_sec=5)
+    try:
+        svc.get('bolt://h', 'neo4j', 'fp', lambda: driver)
+        for _ in range(3):
+            bump_graph_epoch()
+            snap = svc.get('bolt://h', 'neo4j', 'fp', lambda: driver)
+            assert snap['stats']['stale'] and not snap['stats']['refreshing']
+        assert _triple_scans(driver) == 1
+        # The scheduler's pass rebuilds it once
+        assert svc.refresh_stale() == 1 and svc.refresh_stale() == 0
+        assert _triple_scans(driver) == 2
+    finally:
+        svc.stop()
+
+
+def test_counts_fall_back_to_count_store_lookups_without_apoc():
+    driver = _Driver(apoc=False)
+    svc = SchemaStatsService(interval_sec=0, cold_wait_sec=5)
+    snap = svc.get('bolt://h', None, 'fp', lambda: driver)
+    assert snap['stats']['counts_source'] == 'count_store'
+    assert {n['label']: n['c'] for n in snap['nodes']} == {'File': 7, 'Folder': 2}
+    # No full-graph node scan was issued for the counts
+    assert not any(q.startswith('MATCH (n) ') for q in driver.queries)
@@ -0,0 +1,127 @@
+import os
+import statistics
+import time
+
+import pytest
+
+from scidk.core import path_index_sqlite as pix
+from scidk.core import search_index
+from scidk.core.graph import InMemoryGraph
+
+
+def _row(path, size, scan_id, ext='.txt', mtime=1.0, typ='file'):
+    parent, name = path.rsplit('/', 1)
+    return (path, parent, name, path.count('/') - 1, typ, size, mtime, ext, None, None, None, 'local:h', scan_id, None)
+
+
+def _search(q, **kw):
+    conn = pix.connect(readonly=True)
+    try:
+        pix.init_db(conn)
+        return search_index.search(conn, q, **kw)
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    monkeypatch.setenv('SCIDK_DB_PATH', str(tmp_path / 'files.db'))
+    return tmp_path / 'files.db'
+
+
+def test_files_rows_and_graph_datasets_are_searchable(db):
+    pix.batch_insert_files([
+        _row('/data', 0, 's1', ext='', typ='folder'),
+        _row('/data/Alpha_Script.py', 10, 's1', ext='.py', mtime=100.0),
+        _row('/data/beta.csv', 2000, 's1', ext='.csv', mtime=200.0),
+        _row('/data/sub/alphabet.txt', 5, 's1', mtime=300.0),
+    ])
+    g = InMemoryGraph()
+    g.upsert_dataset({'checksum': 'c1', 'path': '/data/beta.csv', 'filename': 'beta.csv', 'extension': '.csv',
+                      'size_bytes': 2000, 'created': 0, 'modified': 200.0, 'mime_type': 'text/csv'})
+    g.add_interpretation('c1', 'csv_table', {'status': 'success'})
+    assert search_index.sync_graph(g) == 1
+    assert search_index.sync_graph(g) == 0  # nothing changed since
+
+    results, more, _ = _search('ALPHA')
+    assert [r['filename'] for r in results] == ['alphabet.txt', 'Alpha_Script.py']  # shorter filename first
+    assert not more and all(r['matched_on'] == ['filename'] for r in results)
+    # Short queries fall back to LIKE; folders are not indexed
+    assert {r['filename'] for r in _search('et')[0]} == {'beta.csv', 'alphabet.txt'}
+
+    (hit,), _, _ = _search('csv_tab')
+    assert hit['id'] == g.list_datasets()[0]['id'] and hit['matched_on'] == ['interpreter_id']
+
+    assert [r['filename'] for r in _search('alpha', extensions=['PY'])[0]] == ['Alpha_Script.py']
+    assert [r['filename'] for r in _search('', interpreter='csv_table')[0]] == ['beta.csv']
+    assert [r['filename'] for r in _search('', min_size=100)[0]] == ['beta.csv']
+    assert [r['filename'] for r in _search('', modified_after=150.0, modified_before=250.0)[0]] == ['beta.csv']
+
+    page1, more, _ = _search('a', limit=2)
+    page2, more2, _ = _search('a', limit=2, offset=2)
+    assert more and not more2
+    assert len({r['path'] for r in page1 + page2}) == 3
+
+
+def test_deleted_files_leave_the_index(db):
+    pix.batch_insert_files([_row('/data/a.txt', 1, 's1'), _row('/data/gone.txt', 1, 's1')])
+    pix.batch_insert_files([_row('/data/a.txt', 1, 's2')])
+    pix.apply_basic_change_history('s2', '/data', recursive=True)
+    assert [r['filename'] for r in _search('.txt')[0]] == ['a.txt']
+
+
+def _bench_rows(n):
+    pix.batch_insert_files(
+        _row(f'/bench/d{i % 100}/sample_{i:07d}_{("raw", "proc", "qc")[i % 3]}.dat', i, 'b1', ext='.dat')
+        for i in range(n)
+    )
+
+
+def test_substring_queries_over_generated_paths(db):
+    _bench_rows(300)
+    assert sorted(r['path'] for r in _search('d42/sample')[0]) == [
+        '/bench/d42/sample_0000042_raw.dat', '/bench/d42/sample_0000142_proc.dat', '/bench/d42/sample_0000242_qc.dat']
+    assert [r['path'] for r in _search('0000199')[0]] == ['/bench/d99/sample_0000199_proc.dat']
+    qc, more, _ = _search('_qc.', limit=50)
+    assert more and len(qc) == 50 and all(r['path'].endswith('_qc.dat') for r in qc)
+    assert _search('nomatch_xyz')[0] == []
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not os.environ.get('SCIDK_SEARCH_BENCH_ROWS'),
+                    reason='latency benchmark: set SCIDK_SEARCH_BENCH_ROWS (e.g. 50000) to run it')
+def test_search_latency_benchmark(db):
+    n = int(os.environ['SCIDK_SEARCH_BENCH_ROWS'])
+    target_ms = float(os.environ.get('SCIDK_SEARCH_BENCH_P95_MS') or 50)
+    _bench_rows(n)
+    queries = ['sample_00012', 'proc', '_qc.', 'd42/sample', '0004999', 'nomatch_xyz']
+    timings = []
+    for _ in range(5):
+        for q in queries:
+            t0 = time.perf_counter()
+            _search(q, limit=50)
+            timings.append((time.perf_counter() - t0) * 1000)
+    p95 = statistics.quantiles(timings, n=20)[-1]
+    print(f"search over {n} rows: median={statistics.median(timings):.2f}ms p95={p95:.2f}ms")
+    assert p95 < target_ms
+
+
+def test_file_deleted_between_append_mode_scans_leaves_the_index(db):
+    pix.batch_insert_files([_row('/d', 0, 's1', ext='', typ='folder'),
+                            _row('/d/alpha1.txt', 1, 's1'), _row('/d/alpha2.txt', 1, 's1')])
+    assert pix.finalize_versioned_scan('s1', '/d') is None
+    pix.batch_insert_files([_row('/d', 0, 's2', ext='', typ='folder'), _row('/d/alpha1.txt', 1, 's2')])
+    assert pix.finalize_versioned_scan('s2', '/d') is None
+    assert [r['path'] for r in _search('alpha')[0]] == ['/d/alpha1.txt']
+
+
+def test_compaction_purges_paths_without_files_rows(db):
+    from scidk.core.file_versions import compact
+    pix.batch_insert_files([_row('/d/keep.txt', 1, 's1'), _row('/d/old.txt', 1, 's1')])
+    conn = pix.connect()
+    try:
+        conn.execute("DELETE FROM files WHERE path = '/d/old.txt'")
+        assert compact(conn, vacuum=False)['search_removed'] == 1
+    finally:
+        conn.close()
+    assert [r['path'] for r in _search('.txt')[0]] == ['/d/keep.txt']
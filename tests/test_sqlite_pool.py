@@ -0,0 +1,90 @@
+import sqlite3
+import threading
+
+import pytest
+
+from scidk.core import path_index_sqlite as pix
+from scidk.core import sqlite_pool
+from scidk.core.migrations import migrate
+
+
+def test_close_returns_connection_with_fresh_state(tmp_path):
+    db = str(tmp_path / 'pool.db')
+    conn = sqlite_pool.connect(db)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    conn.row_factory = sqlite3.Row
+    conn.execute("INSERT INTO t VALUES (1)")  # left uncommitted
+    conn.close()
+
+    again = sqlite_pool.connect(db)
+    assert again is conn
+    assert again.row_factory is None
+    assert again.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    # Nested checkouts in one thread get their own connection
+    nested = sqlite_pool.connect(db)
+    assert nested is not again
+    nested.close()
+    again.close()
+
+
+def test_readonly_pool_and_writer_lock(tmp_path):
+    db = str(tmp_path / 'pool.db')
+    with sqlite_pool.write(db) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+
+    def writer(i):
+        with sqlite_pool.write(db) as w:
+            w.execute("INSERT INTO t VALUES (?)", (i,))
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    ro = sqlite_pool.connect(db, readonly=True)
+    try:
+        assert ro.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 8
+        with pytest.raises(sqlite3.OperationalError):
+            ro.execute("INSERT INTO t VALUES (99)")
+    finally:
+        ro.close()
+
+
+def test_schema_setup_runs_once_per_database_file(monkeypatch, tmp_path):
+    db = tmp_path / 'files.db'
+    monkeypatch.setenv('SCIDK_DB_PATH', str(db))
+    assert migrate() >= 28
+    pix.init_db()
+    before = sqlite_pool.stats()['queries_total']
+    conn = pix.connect()
+    try:
+        migrate(conn)
+        pix.init_db(conn)
+    finally:
+        conn.close()
+    assert sqlite_pool.stats()['queries_total'] == before
+
+    # A recreated file is a new database and gets its schema again
+    for suffix in ('', '-wal', '-shm'):
+        (tmp_path / f'files.db{suffix}').unlink(missing_ok=True)
+    conn = pix.connect()
+    try:
+        pix.init_db(conn)
+        assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_statements_are_counted_per_scope(tmp_path):
+    db = str(tmp_path / 'pool.db')
+    sqlite_pool.set_scope('test.endpoint')
+    try:
+        conn = sqlite_pool.connect(db)
+        conn.execute("SELECT 1").fetchone()
+        conn.close()
+    finally:
+        sqlite_pool.set_scope(None)
+    scope = sqlite_pool.stats()['scopes']['test.endpoint']
+    assert scope['queries'] >= 1 and scope['lock_errors'] == 0